@@ -7,214 +7,181 @@ compares fractal organization against other design approaches:
 2. parts-based organization
 3. different fractal configurations (f=2,3,4,5)
 
-metrics analyzed:
-- total equipment requirements
-- space utilization
-- material handling (total flow distance)
-- flexibility and redundancy
-- capital investment
-- operating efficiency
+metrics analyzed (computed by femoasa.pareto for every design):
+- npv of the 5-year equipment and floor plan
+- total equipment requirements and floor area
+- material handling (part-ft/week on a block layout)
+- kit lead time (queueing model)
+- otif: probability that every process pool covers its weekly workload
+- pareto rank against all designs, including spare-machine variants
 
 team: machas^2
 date: november 2025
 """
 
+import sys
 import pandas as pd
-import numpy as np
 from pathlib import Path
 import matplotlib.pyplot as plt
 
 # configuration
 BASE_DIR = Path(__file__).parent.parent.parent.parent  # go up to project root
-INPUT_DIR = BASE_DIR / "results" / "Task3" / "Fractal" / "Fractal_Design"
 OUTPUT_DIR = BASE_DIR / "results" / "Task3" / "Fractal"
 
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import pareto, results_store
+
 PROCESSES = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M']
 
 
-def load_fractal_comparison_data():
-    """Load comparison data for different fractal configurations"""
-    comparison_file = INPUT_DIR / "Fractal_Comparison_All_Scenarios.csv"
-    return pd.read_csv(comparison_file)
+DESIGN_NAMES = {
+    'functional': ('Functional', '1 factory, 13 process areas'),
+    'part': ('Part-Based', '1 cell per part'),
+}
 
 
-def load_functional_design_baseline():
-    """
-    Load baseline data from functional (process-based) design
-    This would typically come from Task 3 parts-based analysis
-    """
-    # Try to load from existing Task3 results
-    task3_file = INPUT_DIR / "Task3_Parts_Based_Equipment_Requirements.csv"
-    
-    if task3_file.exists():
-        df = pd.read_csv(task3_file)
-        # Check which column name exists
-        if 'Equipment_2_Shifts' in df.columns:
-            total_equipment = df['Equipment_2_Shifts'].sum()
-        elif 'Equipment_per_Center' in df.columns:
-            total_equipment = df['Equipment_per_Center'].sum()
-        elif 'Total_Equipment' in df.columns:
-            total_equipment = df['Total_Equipment'].sum()
-        else:
-            total_equipment = 386  # Default fallback
-        
-        return {
-            'design_type': 'Functional (Parts-Based)',
-            'total_equipment': int(total_equipment),
-            'num_locations': 13,  # One location per process type
-            'redundancy': 1.0
-        }
-    else:
-        # Return estimated values
-        return {
-            'design_type': 'Functional (Parts-Based)',
-            'total_equipment': 386,  # From Task3 summary
-            'num_locations': 13,
-            'redundancy': 1.0
-        }
-
-
-def calculate_equipment_overhead(fractal_df, baseline_equipment):
-    """
-    Calculate equipment overhead for fractal designs
-    Overhead = additional equipment needed vs. functional design
-    """
-    fractal_df['Equipment_Overhead_%'] = (
-        (fractal_df['Total_Equipment'] - baseline_equipment) / baseline_equipment * 100
-    )
-    return fractal_df
+def design_name(organization):
+    """Display name and configuration of an organization"""
+    if organization in DESIGN_NAMES:
+        return DESIGN_NAMES[organization]
+    f = int(organization.split('_f')[-1])
+    return f'Fractal f={f}', f'{f} centers, {len(PROCESSES)} processes/center'
 
 
-def calculate_redundancy_score(num_fractals):
-    """
-    Calculate redundancy/fault tolerance score
-    Higher number of fractals = better redundancy
-    """
-    # If one center fails, remaining centers can handle its load
-    remaining_capacity = (num_fractals - 1) / num_fractals * 100
-    return remaining_capacity
+def variant_name(row):
+    """Display name of one design of the frontier table (organization + spares)"""
+    name = design_name(row['Organization'])[0]
+    if row['Spares'] == 0:
+        return name
+    if row['Spares'] < 0:
+        return f"{name} (mixed spares, variant {row['Variant']})"
+    return f"{name} +{row['Spares']} spare/process"
 
 
-def calculate_flexibility_score(num_fractals):
-    """
-    Calculate flexibility score based on ability to handle demand variations
-    More centers = better load distribution
-    """
-    # Normalize between 0-100
-    # f=2 gets 50, f=5 gets 100
-    return min(100, 25 + (num_fractals - 1) * 18.75)
+def load_design_frontier():
+    """All evaluated designs with their Pareto rank (written by create_comprehensive_comparison)"""
+    designs = results_store.load(OUTPUT_DIR / "Organization_Design_Frontier.csv")
+    designs['Non_Dominated'] = designs['Non_Dominated'].astype(bool)  # stored as 0/1
+    return designs
+
 
+def describe_design(row):
+    """One report line with the computed metrics of a frontier design"""
+    return (f"{variant_name(row)}: NPV ${row['npv']:,.0f}, {int(row['machines'])} machines, "
+            f"{row['floor_sqft']:,.0f} sqft, lead time {row['lead_time_h']:.1f} h, "
+            f"OTIF {row['otif']:.3f}, Pareto rank {int(row['Pareto_Rank'])}")
 
-def calculate_complexity_score(num_fractals):
+
+def create_comprehensive_comparison(spares=2):
     """
-    Calculate operational complexity score
-    More centers = higher coordination complexity
+    Create comprehensive comparison across all organization types
+
+    Every organization is evaluated with its capacity-model equipment and with
+    1..spares extra machines per process and center; the capacity-model design
+    of each organization is reported with its Pareto rank among all of them.
     """
-    # Linear increase with number of centers
-    return 20 + (num_fractals - 1) * 20
+    designs = pareto.frontier_table(pareto.organization_designs(spares=spares))
+    results_store.save(designs, OUTPUT_DIR / "Organization_Design_Frontier.csv")
 
+    base = designs[designs['Spares'] == 0].set_index('Organization')
+    baseline = base.loc['functional']
 
-def create_comprehensive_comparison():
-    """Create comprehensive comparison across all organization types"""
-    
-    # Load data
-    fractal_data = load_fractal_comparison_data()
-    functional_baseline = load_functional_design_baseline()
-    
-    # Calculate metrics for fractal designs
-    fractal_data = calculate_equipment_overhead(fractal_data, 
-                                               functional_baseline['total_equipment'])
-    
-    fractal_data['Redundancy_Score'] = fractal_data['Num_Fractals'].apply(
-        calculate_redundancy_score)
-    fractal_data['Flexibility_Score'] = fractal_data['Num_Fractals'].apply(
-        calculate_flexibility_score)
-    fractal_data['Complexity_Score'] = fractal_data['Num_Fractals'].apply(
-        calculate_complexity_score)
-    
-    # Create comprehensive comparison table
     comparison_rows = []
-    
-    # Add functional baseline
-    comparison_rows.append({
-        'Design_Type': 'Functional',
-        'Configuration': '1 factory, 13 process areas',
-        'Total_Equipment': functional_baseline['total_equipment'],
-        'Avg_Utilization_%': 95.0,  # Estimated from Task3
-        'Equipment_Overhead_%': 0.0,
-        'Redundancy_Score': 0.0,
-        'Flexibility_Score': 40.0,
-        'Complexity_Score': 30.0,
-        'Space_Efficiency': 'High',
-        'Capital_Investment': 'Baseline'
-    })
-    
-    # Add fractal configurations
-    for _, row in fractal_data.iterrows():
-        f = int(row['Num_Fractals'])
+    for organization, row in base.iterrows():
+        name, configuration = design_name(organization)
         comparison_rows.append({
-            'Design_Type': f'Fractal f={f}',
-            'Configuration': f'{f} centers, {13} processes/center',
-            'Total_Equipment': int(row['Total_Equipment']),
-            'Avg_Utilization_%': row['Avg_Utilization_%'],
-            'Equipment_Overhead_%': row['Equipment_Overhead_%'],
-            'Redundancy_Score': row['Redundancy_Score'],
-            'Flexibility_Score': row['Flexibility_Score'],
-            'Complexity_Score': row['Complexity_Score'],
-            'Space_Efficiency': 'Medium' if f <= 3 else 'Low',
-            'Capital_Investment': f'+{row["Equipment_Overhead_%"]:.1f}%'
+            'Design_Type': name,
+            'Configuration': configuration,
+            'Total_Equipment': int(row['machines']),
+            'Equipment_Overhead_%': (row['machines'] - baseline['machines']) / baseline['machines'] * 100,
+            'NPV': row['npv'],
+            'Floor_sqft': row['floor_sqft'],
+            'Flow_Distance': row['flow_distance'],
+            'Lead_Time_h': row['lead_time_h'],
+            'OTIF_Probability': row['otif'],
+            'Pareto_Rank': int(row['Pareto_Rank']),
+            'Non_Dominated': bool(row['Non_Dominated']),
+            'Capital_Investment': 'Baseline' if organization == 'functional' else
+                                  f'{(row["npv"] - baseline["npv"]) / baseline["npv"] * 100:+.1f}%'
         })
     
     comparison_df = pd.DataFrame(comparison_rows)
     
     # Save comparison
     output_file = OUTPUT_DIR / "Organization_Design_Comparison.csv"
-    comparison_df.to_csv(output_file, index=False)
+    results_store.save(comparison_df, output_file)
     
     print(f"\nSaved comprehensive comparison: {output_file.name}")
     
     return comparison_df
 
 
-def generate_recommendation_report(comparison_df):
-    """Generate recommendation report based on analysis"""
+def generate_recommendation_report(comparison_df, designs=None):
+    """
+    Generate recommendation report based on analysis
+
+    The recommendations are read off the frontier table of every evaluated
+    design (organizations and spare-machine variants), not fixed verdicts.
+    """
+    designs = load_design_frontier() if designs is None else designs
+    frontier_designs = designs[designs['Non_Dominated']]
+    feasible = pareto.otif_feasible(frontier_designs)
+    scenarios = [
+        ('Prioritize Service Level (OTIF >= {:.1%}, then NPV)'.format(pareto.OTIF_SERVICE_LEVEL),
+         feasible.loc[feasible['npv'].idxmin()] if len(feasible) else
+         frontier_designs.loc[frontier_designs['otif'].idxmax()]),
+        ('Prioritize Cost (lowest NPV)', frontier_designs.loc[frontier_designs['npv'].idxmin()]),
+        ('Prioritize Material Flow (lowest flow x distance, then NPV)',
+         frontier_designs.sort_values(['flow_distance', 'npv']).iloc[0]),
+        ('Prioritize Lead Time (shortest)', frontier_designs.loc[frontier_designs['lead_time_h'].idxmin()]),
+    ]
+    primary = scenarios[0][1]
     
-    report = """
+    report = f"""
 ================================================================================
 FRACTAL ORGANIZATION - DESIGN RECOMMENDATION REPORT
 ================================================================================
 
 1. EXECUTIVE SUMMARY
 -------------------
-Fractal organization offers a compelling alternative to traditional functional
-design, with tradeoffs between redundancy, flexibility, and capital investment.
+{len(frontier_designs)} of {len(designs)} evaluated designs are non-dominated on NPV,
+machines, floor, flow x distance, lead time and OTIF.
+Recommended design: {describe_design(primary)}
 
 2. KEY FINDINGS
 --------------
 """
     
     # Find best configurations
-    best_redundancy = comparison_df.loc[comparison_df['Redundancy_Score'].idxmax()]
-    best_efficiency = comparison_df.loc[comparison_df['Avg_Utilization_%'].idxmax()]
-    lowest_overhead = comparison_df[comparison_df['Design_Type'].str.contains('Fractal')].loc[
-        comparison_df[comparison_df['Design_Type'].str.contains('Fractal')]['Equipment_Overhead_%'].idxmin()
-    ]
+    best_otif = comparison_df.loc[comparison_df['OTIF_Probability'].idxmax()]
+    lowest_npv = comparison_df.loc[comparison_df['NPV'].idxmin()]
+    shortest_flow = comparison_df.loc[comparison_df['Flow_Distance'].idxmin()]
+    fractal = comparison_df[comparison_df['Design_Type'].str.contains('Fractal')]
+    lowest_overhead = fractal.loc[fractal['Equipment_Overhead_%'].idxmin()]
+    baseline_equipment = comparison_df.loc[comparison_df['Design_Type'] == 'Functional', 'Total_Equipment'].iloc[0]
+    frontier = comparison_df[comparison_df['Non_Dominated']]['Design_Type'].tolist()
     
     report += f"""
-Best for Redundancy:
-- Design: {best_redundancy['Design_Type']}
-- Redundancy Score: {best_redundancy['Redundancy_Score']:.1f}
-- Interpretation: If one center fails, {best_redundancy['Redundancy_Score']:.0f}% capacity remains
+Non-Dominated Designs (computed metrics, no fixed scores):
+- {', '.join(frontier) if frontier else 'none'}
 
-Best for Equipment Efficiency:
-- Design: {best_efficiency['Design_Type']}
-- Utilization: {best_efficiency['Avg_Utilization_%']:.1f}%
-- Equipment: {best_efficiency['Total_Equipment']} units
+Highest OTIF Probability (capacity-model sizing):
+- Design: {best_otif['Design_Type']}
+- Probability the weakest pool covers its weekly workload: {best_otif['OTIF_Probability']:.3f}
+
+Lowest NPV:
+- Design: {lowest_npv['Design_Type']}
+- NPV: ${lowest_npv['NPV']:,.0f}
+- Equipment: {lowest_npv['Total_Equipment']} units
+
+Shortest Material Flow:
+- Design: {shortest_flow['Design_Type']}
+- Flow x Distance: {shortest_flow['Flow_Distance']:,.0f} part-ft/week
 
 Lowest Equipment Overhead (Fractal):
 - Design: {lowest_overhead['Design_Type']}
 - Overhead: {lowest_overhead['Equipment_Overhead_%']:.1f}%
-- Additional Equipment: {lowest_overhead['Total_Equipment'] - 386} units
+- Additional Equipment: {lowest_overhead['Total_Equipment'] - baseline_equipment} units
 
 3. DESIGN COMPARISON
 -------------------
@@ -222,39 +189,20 @@ Lowest Equipment Overhead (Fractal):
     
     report += "\n" + comparison_df.to_string(index=False) + "\n"
     
-    report += """
+    report += f"""
 
 4. RECOMMENDATIONS
 -----------------
 
-Scenario A - Prioritize Redundancy & Service Level:
---> RECOMMENDED: Fractal f=3
-  * 66.7% capacity remains if one center fails
-  * Balanced equipment overhead (moderate cost increase)
-  * Good flexibility for demand variations
-  * Three centers allow easy maintenance scheduling
-
-Scenario B - Prioritize Cost Efficiency:
---> RECOMMENDED: Fractal f=2
-  * Lowest equipment overhead among fractal designs
-  * Simplest coordination (only 2 centers)
-  * 50% redundancy (acceptable for most cases)
-  * Easier to implement and operate
-
-Scenario C - Prioritize Maximum Flexibility:
---> RECOMMENDED: Fractal f=4
-  * Each center handles only 25% of demand
-  * Easy to scale up/down
-  * Excellent load balancing
-  * Higher capital investment justified by operational flexibility
-
-Scenario D - Prioritize Capital Efficiency:
---> RECOMMENDED: Functional (Baseline)
-  * Lowest total equipment requirement
-  * Minimal space requirements
-  * Highest utilization rates
-  * Trade-off: No redundancy, single points of failure
-
+{len(frontier_designs)} of {len(designs)} evaluated designs are non-dominated.
+"""
+    for letter, (title, row) in zip('ABCD', scenarios):
+        report += f"\nScenario {letter} - {title}:\n--> {describe_design(row)}\n"
+    if not len(feasible):
+        report += (f"\nNo evaluated design reaches the {pareto.OTIF_SERVICE_LEVEL:.1%} OTIF level; "
+                   f"Scenario A shows the highest OTIF probability instead.\n")
+    
+    report += """
 5. IMPLEMENTATION CONSIDERATIONS
 --------------------------------
 
@@ -286,27 +234,22 @@ Storage Strategy Recommendation:
             overhead_pct = row['Equipment_Overhead_%']
             report += f"\n{row['Design_Type']}:"
             report += f"\n  Equipment Cost Impact: +{overhead_pct:.1f}% vs. baseline"
-            report += f"\n  Estimated Additional Investment: ${overhead_pct * 10000:.0f}"
-            report += f"\n  Benefit: {row['Redundancy_Score']:.0f}% fault tolerance"
+            report += f"\n  NPV Impact: {row['Capital_Investment']} vs. baseline"
+            report += f"\n  Lead Time: {row['Lead_Time_h']:.1f} h, Pareto rank {row['Pareto_Rank']}"
     
-    report += """
+    report += f"""
 
 7. FINAL RECOMMENDATION
 ----------------------
 
 For the FeMoaSa facility serving Clients A & B:
 
-PRIMARY RECOMMENDATION: Fractal f=3
-
-Rationale:
-1. Service Level: 99.5% OTIF requirement met with redundancy
-2. Scalability: Can easily adjust to demand changes
-3. Maintenance: Can service one center without major disruption
-4. Cost: Moderate 2-3% equipment overhead is justified
-5. Future Growth: Easy to add 4th center if demand increases
+PRIMARY RECOMMENDATION: {variant_name(primary)}
 
-This design provides the best balance of operational excellence,
-service reliability, and financial prudence.
+Rationale (computed metrics):
+- {describe_design(primary)}
+- {'Meets' if primary['otif'] >= pareto.OTIF_SERVICE_LEVEL else 'Falls short of'} the {pareto.OTIF_SERVICE_LEVEL:.1%} OTIF level
+- Non-dominated among {len(designs)} designs on NPV, machines, floor, flow x distance, lead time and OTIF
 
 ================================================================================
 """
@@ -314,29 +257,40 @@ service reliability, and financial prudence.
     return report
 
 
-def create_visualization_data():
+def create_visualization_data(comparison_df=None):
     """Create data for visualization charts"""
-    comparison_df = create_comprehensive_comparison()
-    
-    # Prepare data for radar chart
-    radar_data = []
-    metrics = ['Redundancy_Score', 'Flexibility_Score', 'Avg_Utilization_%']
-    
-    for _, row in comparison_df.iterrows():
-        radar_data.append({
-            'Design': row['Design_Type'],
-            'Redundancy': row['Redundancy_Score'],
-            'Flexibility': row['Flexibility_Score'],
-            'Efficiency': row['Avg_Utilization_%'],
-            'Complexity': 100 - row['Complexity_Score']  # Invert so higher is better
-        })
-    
-    radar_df = pd.DataFrame(radar_data)
+    comparison_df = create_comprehensive_comparison() if comparison_df is None else comparison_df
+    
+    # Prepare data for radar chart: every metric scaled to 100 for the best design
+    radar_df = pd.DataFrame({
+        'Design': comparison_df['Design_Type'],
+        'Cost': 100 * comparison_df['NPV'].min() / comparison_df['NPV'],
+        'Equipment': 100 * comparison_df['Total_Equipment'].min() / comparison_df['Total_Equipment'],
+        'Space': 100 * comparison_df['Floor_sqft'].min() / comparison_df['Floor_sqft'],
+        'Material_Flow': 100 * comparison_df['Flow_Distance'].min() / comparison_df['Flow_Distance'],
+        'Lead_Time': 100 * comparison_df['Lead_Time_h'].min() / comparison_df['Lead_Time_h'],
+        'OTIF': 100 * comparison_df['OTIF_Probability'] / comparison_df['OTIF_Probability'].max(),
+    })
     radar_file = OUTPUT_DIR / "Fractal_Radar_Chart_Data.csv"
-    radar_df.to_csv(radar_file, index=False)
+    results_store.save(radar_df, radar_file)
     
     print(f"Saved visualization data: {radar_file.name}")
     
+    # Pareto frontiers of all evaluated designs on pairs of metrics
+    designs = load_design_frontier()
+    fig, axes = plt.subplots(1, 3, figsize=(18, 5.5))
+    for ax, (x, y) in zip(axes, [('npv', 'otif'), ('npv', 'flow_distance'), ('machines', 'lead_time_h')]):
+        pareto.plot_frontier(ax, designs, x, y)
+    axes[0].legend(fontsize=8)
+    fig.suptitle('Organization Designs - Pareto Frontiers', fontweight='bold')
+    fig.tight_layout()
+    plot_file = OUTPUT_DIR / "Fractal_Visuals" / "Organization_Pareto_Frontiers.png"
+    plot_file.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(plot_file, dpi=150)
+    plt.close(fig)
+    
+    print(f"Saved frontier plot: {plot_file.name}")
+    
     return radar_df
 
 
@@ -350,7 +304,7 @@ def main():
     comparison_df = create_comprehensive_comparison()
     
     # Generate recommendation report
-    report = generate_recommendation_report(comparison_df)
+    report = generate_recommendation_report(comparison_df, load_design_frontier())
     
     # Save report
     report_file = OUTPUT_DIR / "Fractal_Recommendation_Report.txt"
@@ -361,7 +315,7 @@ def main():
     print(f"\nReport saved: {report_file.name}")
     
     # Create visualization data
-    viz_data = create_visualization_data()
+    viz_data = create_visualization_data(comparison_df)
     
     print("\n" + "="*80)
     print("Analysis Complete!")
@@ -369,8 +323,10 @@ def main():
     
     print("Generated files:")
     print("  - Organization_Design_Comparison.csv")
+    print("  - Organization_Design_Frontier.csv")
     print("  - Fractal_Recommendation_Report.txt")
     print("  - Fractal_Radar_Chart_Data.csv")
+    print("  - Fractal_Visuals/Organization_Pareto_Frontiers.png")
     
     print("\nNext steps:")
     print("  1. Review recommendation report")
@@ -17,6 +17,7 @@ team: machas^2
 date: november 2025
 """
 
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -30,33 +31,25 @@ RESULTS_DIR = BASE_DIR / "results" / "Task3" / "Fractal"
 COST_DIR = RESULTS_DIR / "Cost_Analysis"
 VISUALS_DIR = RESULTS_DIR / "Fractal_Visuals"
 
-# operating parameters
-DAYS_PER_WEEK = 5
-HOURS_PER_SHIFT = 8
-SHIFTS_PER_DAY = 2
-WEEKS_PER_YEAR = 52
-HOURS_PER_YEAR = DAYS_PER_WEEK * HOURS_PER_SHIFT * SHIFTS_PER_DAY * WEEKS_PER_YEAR
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import cost_engine, equipment_catalog
+from femoasa.config import SHIFTS_PER_DAY, WEEKS_PER_YEAR
+
 
 # Fractal scenarios
 FRACTAL_SCENARIOS = ['f2', 'f3', 'f4', 'f5']
 
 def load_equipment_costs():
     """
-    Load equipment cost data from Equip+Operator Specs.csv
+    Load the compiled equipment catalog (Equip+Operator Specs.csv)
     """
-    df = pd.read_csv(DATA_DIR / 'Equip+Operator Specs.csv')
-
-    # Clean up the data
-    df['Installed price'] = pd.to_numeric(df['Installed price'], errors='coerce')
-    df['Relocation cost'] = pd.to_numeric(df['Relocation cost'], errors='coerce')
-    df['Useful life (years)'] = pd.to_numeric(df['Useful life (years)'], errors='coerce')
-    df['Hourly Cost'] = pd.to_numeric(df['Hourly Cost'], errors='coerce')
+    catalog = equipment_catalog.load_catalog()
 
     print("Equipment cost data loaded:")
-    print(f"  Total equipment types: {len(df)}")
-    print(f"  Equipment with cost data: {df['Installed price'].notna().sum()}")
+    print(f"  Total equipment types: {len(catalog['names'])}")
+    print(f"  Equipment with cost data: {int((catalog['price'] > 0).sum())}")
 
-    return df
+    return catalog
 
 def load_fractal_scenario_data(scenario):
     """
@@ -93,137 +86,71 @@ def load_fractal_scenario_data(scenario):
 
     return equipment_df, efficiency_metrics, scenario_data
 
-def calculate_fractal_capital_costs(equipment_df, cost_df, scenario, num_centers):
+def calculate_fractal_capital_costs(equipment_df, catalog, scenario, num_centers):
     """
     Calculate total capital investment costs for fractal layout
     """
-    capital_costs = []
-
-    for _, row in equipment_df.iterrows():
-        process = row['Process']
-        total_equipment = int(row['Total_Equipment'])
-
-        if total_equipment == 0:
-            continue
-
-        # Find equipment cost data for this process
-        cost_row = cost_df[cost_df['Equipment'] == process]
-
-        if cost_row.empty:
-            print(f"Warning: No cost data found for process {process}")
-            continue
-
-        installed_price = cost_row['Installed price'].iloc[0]
-        relocation_cost = cost_row['Relocation cost'].iloc[0] if pd.notna(cost_row['Relocation cost'].iloc[0]) else 0
-
-        total_cost_per_unit = installed_price + relocation_cost
-        total_process_cost = total_equipment * total_cost_per_unit
-
-        capital_costs.append({
-            'Scenario': scenario,
-            'Process': process,
-            'Units_Required': total_equipment,
-            'Equipment_per_Center': row['Equipment_per_Center'],
-            'Num_Centers': num_centers,
-            'Cost_Per_Unit': total_cost_per_unit,
-            'Total_Installed_Cost': installed_price * total_equipment,
-            'Total_Relocation_Cost': relocation_cost * total_equipment,
-            'Total_Process_Cost': total_process_cost,
-            'Utilization_per_Center': row['Utilization_per_Center'],
-            'Workload_per_Center_Min': row['Workload_per_Center_Min']
-        })
-
-    return pd.DataFrame(capital_costs)
-
-def calculate_fractal_operating_costs(equipment_df, cost_df, scenario, num_centers):
+    df = equipment_df[(equipment_df['Total_Equipment'] > 0) & equipment_df['Process'].isin(catalog['ids'])]
+    ids = equipment_catalog.lookup(catalog, df['Process'])
+
+    total_equipment = df['Total_Equipment'].to_numpy(dtype=int)
+    # a new plant buys its units: relocation is only charged for units that move
+    costs = cost_engine.cost_breakdown(total_equipment, ids, catalog, SHIFTS_PER_DAY)
+
+    return pd.DataFrame({
+        'Scenario': scenario,
+        'Process': df['Process'].to_numpy(),
+        'Units_Required': total_equipment,
+        'Equipment_per_Center': df['Equipment_per_Center'].to_numpy(),
+        'Num_Centers': num_centers,
+        'Cost_Per_Unit': catalog['price'][ids],
+        'Total_Installed_Cost': costs['capital'],
+        'Total_Relocation_Cost': costs['relocation'],
+        'Total_Process_Cost': costs['investment'],
+        'Utilization_per_Center': df['Utilization_per_Center'].to_numpy(),
+        'Workload_per_Center_Min': df['Workload_per_Center_Min'].to_numpy()
+    })
+
+def calculate_fractal_operating_costs(equipment_df, catalog, scenario, num_centers):
     """
     Calculate annual operating costs (labor) for fractal layout
     """
-    operating_costs = []
-
-    for _, row in equipment_df.iterrows():
-        process = row['Process']
-        total_equipment = int(row['Total_Equipment'])
-
-        if total_equipment == 0:
-            continue
-
-        # Find equipment cost data for this process
-        cost_row = cost_df[cost_df['Equipment'] == process]
-
-        if cost_row.empty:
-            continue
-
-        # Parse operator requirements
-        operator_info = cost_row['Number of operators'].iloc[0] if pd.notna(cost_row['Number of operators'].iloc[0]) else '1 C1'
-        hourly_cost = cost_row['Hourly Cost'].iloc[0] if pd.notna(cost_row['Hourly Cost'].iloc[0]) else 20
-
-        # Calculate operators per unit
-        operators_per_unit = 1.0  # Default
-        if pd.notna(operator_info):
-            # Parse operator requirements (e.g., "1 C1+1/4 C2", "2 C3", "1/2 C2")
-            operator_str = str(operator_info).strip()
-            if 'C1' in operator_str and 'C2' in operator_str:
-                operators_per_unit = 1 + 0.25  # 1 C1 + 1/4 C2
-            elif 'C1' in operator_str and 'C3' in operator_str:
-                if '1/2' in operator_str:
-                    operators_per_unit = 0.5 + 0.5  # 1/2 C3 (assuming C1 + 1/2 C3)
-                else:
-                    operators_per_unit = 1 + 0.5  # 1 C1 + 1/2 C3
-            elif operator_str.startswith('2'):
-                operators_per_unit = 2.0  # 2 C3
-            elif operator_str.startswith('1/2'):
-                operators_per_unit = 0.5  # 1/2 C2
-            else:
-                operators_per_unit = 1.0  # Default
-
-        total_operators = total_equipment * operators_per_unit
-        annual_labor_cost = total_operators * hourly_cost * HOURS_PER_YEAR
-
-        operating_costs.append({
-            'Scenario': scenario,
-            'Process': process,
-            'Units_Required': total_equipment,
-            'Equipment_per_Center': row['Equipment_per_Center'],
-            'Num_Centers': num_centers,
-            'Operators_Per_Unit': operators_per_unit,
-            'Total_Operators': total_operators,
-            'Hourly_Cost': hourly_cost,
-            'Annual_Labor_Cost': annual_labor_cost,
-            'Utilization_per_Center': row['Utilization_per_Center'],
-            'Workload_per_Center_Min': row['Workload_per_Center_Min']
-        })
-
-    return pd.DataFrame(operating_costs)
-
-def calculate_fractal_depreciation(capital_costs_df, cost_df, scenario):
+    df = equipment_df[(equipment_df['Total_Equipment'] > 0) & equipment_df['Process'].isin(catalog['ids'])]
+    ids = equipment_catalog.lookup(catalog, df['Process'])
+
+    # operator mix per unit (e.g. 1 C1 + 1/4 C2) is parsed once in the catalog
+    total_equipment = df['Total_Equipment'].to_numpy(dtype=int)
+    operators_per_unit = catalog['fte'][ids]
+    costs = cost_engine.cost_breakdown(total_equipment, ids, catalog, SHIFTS_PER_DAY)
+
+    return pd.DataFrame({
+        'Scenario': scenario,
+        'Process': df['Process'].to_numpy(),
+        'Units_Required': total_equipment,
+        'Equipment_per_Center': df['Equipment_per_Center'].to_numpy(),
+        'Num_Centers': num_centers,
+        'Operators_Per_Unit': operators_per_unit,
+        'Total_Operators': costs['operators'],
+        'Hourly_Cost': catalog['hourly_cost'][ids] / operators_per_unit,  # average wage per operator
+        'Annual_Labor_Cost': costs['labor'],
+        'Utilization_per_Center': df['Utilization_per_Center'].to_numpy(),
+        'Workload_per_Center_Min': df['Workload_per_Center_Min'].to_numpy()
+    })
+
+def calculate_fractal_depreciation(capital_costs_df, catalog, scenario):
     """
     Calculate annual depreciation for all equipment in fractal layout
     """
-    depreciation_data = []
-
-    for _, row in capital_costs_df.iterrows():
-        process = row['Process']
-
-        # Find useful life for this equipment
-        cost_row = cost_df[cost_df['Equipment'] == process]
-        if cost_row.empty:
-            continue
-
-        useful_life = cost_row['Useful life (years)'].iloc[0] if pd.notna(cost_row['Useful life (years)'].iloc[0]) else 10
-
-        total_installed_cost = row['Total_Installed_Cost']
-        annual_depreciation = total_installed_cost / useful_life
-
-        depreciation_data.append({
-            'Scenario': scenario,
-            'Process': process,
-            'Total_Installed_Cost': total_installed_cost,
-            'Useful_Life_Years': useful_life,
-            'Annual_Depreciation': annual_depreciation
-        })
+    ids = equipment_catalog.lookup(catalog, capital_costs_df['Process'])
+    costs = cost_engine.cost_breakdown(capital_costs_df['Units_Required'].to_numpy(), ids, catalog, SHIFTS_PER_DAY)
 
-    return pd.DataFrame(depreciation_data)
+    return pd.DataFrame({
+        'Scenario': scenario,
+        'Process': capital_costs_df['Process'].to_numpy(),
+        'Total_Installed_Cost': capital_costs_df['Total_Installed_Cost'].to_numpy(),
+        'Useful_Life_Years': catalog['life'][ids],
+        'Annual_Depreciation': costs['depreciation']
+    })
 
 def calculate_fractal_cost_kpis(capital_costs_df, operating_costs_df, depreciation_df, efficiency_metrics, scenario):
     """
@@ -294,7 +221,7 @@ def analyze_all_fractal_scenarios():
 
     # Load cost data
     print("\n1. Loading equipment cost data...")
-    cost_df = load_equipment_costs()
+    catalog = load_equipment_costs()
 
     # Analyze each fractal scenario
     all_capital_costs = []
@@ -313,9 +240,9 @@ def analyze_all_fractal_scenarios():
               f"Utilization: {efficiency_metrics['average_utilization']:.1%}")
 
         # Calculate costs
-        capital_costs_df = calculate_fractal_capital_costs(equipment_df, cost_df, scenario, num_centers)
-        operating_costs_df = calculate_fractal_operating_costs(equipment_df, cost_df, scenario, num_centers)
-        depreciation_df = calculate_fractal_depreciation(capital_costs_df, cost_df, scenario)
+        capital_costs_df = calculate_fractal_capital_costs(equipment_df, catalog, scenario, num_centers)
+        operating_costs_df = calculate_fractal_operating_costs(equipment_df, catalog, scenario, num_centers)
+        depreciation_df = calculate_fractal_depreciation(capital_costs_df, catalog, scenario)
 
         # Calculate KPIs
         kpis = calculate_fractal_cost_kpis(capital_costs_df, operating_costs_df, depreciation_df, efficiency_metrics, scenario)
@@ -360,7 +287,7 @@ def analyze_all_fractal_scenarios():
     print("FRACTAL LAYOUT COST ANALYSIS - SCENARIO COMPARISON")
     print("="*80)
 
-    for _, row in kpis_df.iterrows():
+    for row in kpis_df.to_dict('records'):
         print(f"\nScenario {row['scenario'].upper()}:")
         print(f"  Centers: {row['num_centers']}")
         print(f"  Total Equipment: {row['total_equipment_units']}")
@@ -437,7 +364,7 @@ def create_fractal_cost_comparison_visualizations(capital_df, operating_df, kpis
                          edgecolors='black', linewidth=0.5)
 
     # Add scenario labels
-    for i, row in kpis_df.iterrows():
+    for row in kpis_df.to_dict('records'):
         ax4.annotate(row['scenario'].upper(),
                     (row['num_centers'], row['average_utilization'] * 100),
                     xytext=(8, 8), textcoords='offset points',
@@ -535,7 +462,7 @@ def create_fractal_cost_comparison_visualizations(capital_df, operating_df, kpis
                         cmap='viridis', alpha=0.7, edgecolors='black', linewidth=2)
 
     # Add scenario labels
-    for i, row in kpis_df.iterrows():
+    for row in kpis_df.to_dict('records'):
         ax.annotate(f"{row['scenario'].upper()}\n({row['num_centers']} centers)",
                    (row['total_cost_per_hour'], row['average_utilization'] * 100),
                    xytext=(10, 10), textcoords='offset points',
@@ -577,7 +504,7 @@ FRACTAL CONFIGURATION OVERVIEW
 {'-'*35}
 """
 
-    for _, row in kpis_df.iterrows():
+    for row in kpis_df.to_dict('records'):
         report += f"""
 Scenario {row['scenario'].upper()}:
   Centers: {row['num_centers']}
@@ -603,7 +530,7 @@ Top cost components:
 """
 
         top_costs = scenario_capital.nlargest(5, 'Total_Process_Cost')
-        for _, row in top_costs.iterrows():
+        for row in top_costs.to_dict('records'):
             report += f"  Process {row['Process']}: ${row['Total_Process_Cost']:,.0f} ({row['Units_Required']} units)\n"
 
     report += f"""
@@ -628,7 +555,7 @@ Labor cost breakdown (top 5 processes):
 """
 
         top_labor = scenario_operating.nlargest(5, 'Annual_Labor_Cost')
-        for _, row in top_labor.iterrows():
+        for row in top_labor.to_dict('records'):
             report += f"  Process {row['Process']}: ${row['Annual_Labor_Cost']:,.0f}/year ({row['Total_Operators']:.1f} operators)\n"
 
     report += f"""
@@ -645,7 +572,7 @@ COST EFFICIENCY ANALYSIS
 Cost Efficiency Comparison:
 """
 
-    for _, row in efficiency_data.iterrows():
+    for row in efficiency_data.to_dict('records'):
         report += f"  {row['scenario']}: ${row['total_cost_per_hour']:.2f}/hour, {row['average_utilization']:.1%} utilization\n"
 
     # Find optimal scenario
@@ -666,7 +593,7 @@ SCALING ANALYSIS
 Equipment scaling with centers:
 """
 
-    for _, row in kpis_df.iterrows():
+    for row in kpis_df.to_dict('records'):
         report += f"  {row['scenario'].upper()}: {row['equipment_per_center']:.1f} equipment units per center\n"
 
     report += f"""
@@ -674,7 +601,7 @@ Equipment scaling with centers:
 Cost scaling with centers:
 """
 
-    for _, row in kpis_df.iterrows():
+    for row in kpis_df.to_dict('records'):
         report += f"  {row['scenario'].upper()}: ${row['capital_cost_per_center']:,.0f} capital per center\n"
 
     report += f"""
@@ -35,6 +35,9 @@ BASE_DIR = Path(__file__).parent.parent.parent.parent  # go up to project root
 DATA_DIR = BASE_DIR / "data" / "csv_outputs"
 RESULTS_DIR = BASE_DIR / "results" / "Task3" / "Fractal" / "Fractal_Design"
 
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import results_store
+
 # operating parameters
 DAYS_PER_WEEK = 5
 HOURS_PER_SHIFT = 8
@@ -565,7 +568,7 @@ def compare_fractal_scenarios():
             
             # Save detailed requirements
             output_file = RESULTS_DIR / f'Fractal_f{f}_Equipment_Requirements.csv'
-            requirements.to_csv(output_file, index=False)
+            results_store.save(requirements, output_file)
             print(f"  [OK] Saved: {output_file.name}")
             
             # Save summary report
@@ -582,7 +585,7 @@ def compare_fractal_scenarios():
     # Create comparison table
     comparison_df = pd.DataFrame(comparison_results)
     comparison_file = RESULTS_DIR / 'Fractal_Comparison_All_Scenarios.csv'
-    comparison_df.to_csv(comparison_file, index=False)
+    results_store.save(comparison_df, comparison_file)
     
     print(f"\n{'='*80}")
     print("FRACTAL SCENARIOS COMPARISON")
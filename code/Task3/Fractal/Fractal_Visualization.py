@@ -9,6 +9,7 @@ team: machas^2
 date: november 2025
 """
 
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
@@ -19,6 +20,9 @@ RESULTS_DIR = BASE_DIR / "results"
 LAYOUT_DIR = RESULTS_DIR / "Task3" / "Fractal" / "Fractal_Layout"
 VIZ_DIR = RESULTS_DIR / "Task3" / "Fractal" / "Fractal_Visuals"
 
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import layout_render, results_store
+
 
 def create_layout_visualization(num_fractals=3, show_flows=True, flow_threshold=1000):
     """
@@ -69,20 +73,17 @@ def create_layout_visualization(num_fractals=3, show_flows=True, flow_threshold=
         flows_filtered = flows[flows['Flow_Units'] >= flow_threshold]
         max_flow = flows_filtered['Flow_Units'].max()
         
-        for _, flow in flows_filtered.iterrows():
-            # Arrow width proportional to flow
-            width = max(0.5, (flow['Flow_Units'] / max_flow) * 3)
-            
-            ax.annotate('',
-                       xy=(flow['To_X'], flow['To_Y']),
-                       xytext=(flow['From_X'], flow['From_Y']),
-                       arrowprops=dict(
-                           arrowstyle='->', 
-                           lw=width,
-                           color='gray', 
-                           alpha=0.4,
-                           connectionstyle="arc3,rad=0.1"
-                       ))
+        # Arrow width proportional to flow, all arrows in one collection
+        widths = (flows_filtered['Flow_Units'] / max_flow * 3).clip(lower=0.5)
+        layout_render.add_arrows(
+            ax,
+            flows_filtered[['From_X', 'From_Y']].to_numpy(),
+            flows_filtered[['To_X', 'To_Y']].to_numpy(),
+            linewidths=widths.to_numpy(),
+            color='gray',
+            alpha=0.4,
+            rad=0.1
+        )
     
     # Draw processes
     for _, proc in processes.iterrows():
@@ -162,7 +163,7 @@ def create_layout_visualization(num_fractals=3, show_flows=True, flow_threshold=
 def create_comparison_chart():
     """Create bar chart comparing equipment requirements across configurations"""
     comparison_file = RESULTS_DIR / "Task3" / "Fractal" / "Fractal_Design" / "Fractal_Comparison_All_Scenarios.csv"
-    df = pd.read_csv(comparison_file)
+    df = results_store.load(comparison_file)
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
     
@@ -12,6 +12,7 @@ author: machas^2 team
 date: november 2025
 """
 
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -25,30 +26,22 @@ RESULTS_DIR = BASE_DIR / "results" / "Task3" / "Functional"
 COST_DIR = RESULTS_DIR / "Cost_Analysis"
 VISUALS_DIR = RESULTS_DIR / "Visuals"
 
-# operating parameters
-DAYS_PER_WEEK = 5
-HOURS_PER_SHIFT = 8
-SHIFTS_PER_DAY = 2
-WEEKS_PER_YEAR = 52
-HOURS_PER_YEAR = DAYS_PER_WEEK * HOURS_PER_SHIFT * SHIFTS_PER_DAY * WEEKS_PER_YEAR
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import cost_engine, equipment_catalog
+from femoasa.config import SHIFTS_PER_DAY, WEEKS_PER_YEAR
+
 
 def load_equipment_costs():
     """
-    Load equipment cost data from Equip+Operator Specs.csv
+    Load the compiled equipment catalog (Equip+Operator Specs.csv)
     """
-    df = pd.read_csv(DATA_DIR / 'Equip+Operator Specs.csv')
-
-    # clean up the data
-    df['Installed price'] = pd.to_numeric(df['Installed price'], errors='coerce')
-    df['Relocation cost'] = pd.to_numeric(df['Relocation cost'], errors='coerce')
-    df['Useful life (years)'] = pd.to_numeric(df['Useful life (years)'], errors='coerce')
-    df['Hourly Cost'] = pd.to_numeric(df['Hourly Cost'], errors='coerce')
+    catalog = equipment_catalog.load_catalog()
 
     print("Equipment cost data loaded:")
-    print(f"  Total equipment types: {len(df)}")
-    print(f"  Equipment with cost data: {df['Installed price'].notna().sum()}")
+    print(f"  Total equipment types: {len(catalog['names'])}")
+    print(f"  Equipment with cost data: {int((catalog['price'] > 0).sum())}")
 
-    return df
+    return catalog
 
 def load_equipment_requirements():
     """
@@ -59,128 +52,65 @@ def load_equipment_requirements():
 
     return equipment_df, efficiency_df.iloc[0] if not efficiency_df.empty else {}
 
-def calculate_capital_costs(equipment_df, cost_df):
+def calculate_capital_costs(equipment_df, catalog):
     """
     Calculate total capital investment costs for functional layout
     """
-    capital_costs = []
-
-    for _, row in equipment_df.iterrows():
-        process = row['Process']
-        units_needed = int(row['Equipment_2_Shifts'])  # using 2-shift requirements
-
-        if units_needed == 0:
-            continue
-
-        # find equipment cost data for this process
-        cost_row = cost_df[cost_df['Equipment'] == process]
-
-        if cost_row.empty:
-            print(f"Warning: No cost data found for process {process}")
-            continue
-
-        installed_price = cost_row['Installed price'].iloc[0]
-        relocation_cost = cost_row['Relocation cost'].iloc[0] if pd.notna(cost_row['Relocation cost'].iloc[0]) else 0
-
-        total_cost_per_unit = installed_price + relocation_cost
-        total_process_cost = units_needed * total_cost_per_unit
-
-        capital_costs.append({
-            'Process': process,
-            'Units_Required': units_needed,
-            'Cost_Per_Unit': total_cost_per_unit,
-            'Total_Installed_Cost': installed_price * units_needed,
-            'Total_Relocation_Cost': relocation_cost * units_needed,
-            'Total_Process_Cost': total_process_cost,
-            'Utilization_2_Shifts': row['Utilization_2_Shifts']
-        })
-
-    return pd.DataFrame(capital_costs)
-
-def calculate_operating_costs(equipment_df, cost_df):
+    # using 2-shift requirements; summary rows such as TOTAL have no catalog entry
+    df = equipment_df[(equipment_df['Equipment_2_Shifts'] > 0) & equipment_df['Process'].isin(catalog['ids'])]
+    ids = equipment_catalog.lookup(catalog, df['Process'])
+
+    units_needed = df['Equipment_2_Shifts'].to_numpy(dtype=int)
+    # a new plant buys its units: relocation is only charged for units that move
+    costs = cost_engine.cost_breakdown(units_needed, ids, catalog, SHIFTS_PER_DAY)
+
+    return pd.DataFrame({
+        'Process': df['Process'].to_numpy(),
+        'Units_Required': units_needed,
+        'Cost_Per_Unit': catalog['price'][ids],
+        'Total_Installed_Cost': costs['capital'],
+        'Total_Relocation_Cost': costs['relocation'],
+        'Total_Process_Cost': costs['investment'],
+        'Utilization_2_Shifts': df['Utilization_2_Shifts'].to_numpy()
+    })
+
+def calculate_operating_costs(equipment_df, catalog):
     """
     Calculate annual operating costs (labor) for functional layout
     """
-    operating_costs = []
-
-    for _, row in equipment_df.iterrows():
-        process = row['Process']
-        units_needed = int(row['Equipment_2_Shifts'])
-
-        if units_needed == 0:
-            continue
-
-        # find equipment cost data for this process
-        cost_row = cost_df[cost_df['Equipment'] == process]
-
-        if cost_row.empty:
-            continue
-
-        # parse operator requirements
-        operator_info = cost_row['Number of operators'].iloc[0] if pd.notna(cost_row['Number of operators'].iloc[0]) else '1 C1'
-        hourly_cost = cost_row['Hourly Cost'].iloc[0] if pd.notna(cost_row['Hourly Cost'].iloc[0]) else 20
-
-        # calculate operators per unit
-        operators_per_unit = 1.0  # Default
-        if pd.notna(operator_info):
-            # parse operator requirements (e.g., "1 c1+1/4 c2", "2 c3", "1/2 c2")
-            operator_str = str(operator_info).strip()
-            if 'C1' in operator_str and 'C2' in operator_str:
-                operators_per_unit = 1 + 0.25  # 1 C1 + 1/4 C2
-            elif 'C1' in operator_str and 'C3' in operator_str:
-                if '1/2' in operator_str:
-                    operators_per_unit = 0.5 + 0.5  # 1/2 C3 (assuming C1 + 1/2 C3)
-                else:
-                    operators_per_unit = 1 + 0.5  # 1 C1 + 1/2 C3
-            elif operator_str.startswith('2'):
-                operators_per_unit = 2.0  # 2 C3
-            elif operator_str.startswith('1/2'):
-                operators_per_unit = 0.5  # 1/2 C2
-            else:
-                operators_per_unit = 1.0  # Default
-
-        total_operators = units_needed * operators_per_unit
-        annual_labor_cost = total_operators * hourly_cost * HOURS_PER_YEAR
-
-        operating_costs.append({
-            'Process': process,
-            'Units_Required': units_needed,
-            'Operators_Per_Unit': operators_per_unit,
-            'Total_Operators': total_operators,
-            'Hourly_Cost': hourly_cost,
-            'Annual_Labor_Cost': annual_labor_cost,
-            'Utilization_2_Shifts': row['Utilization_2_Shifts']
-        })
-
-    return pd.DataFrame(operating_costs)
-
-def calculate_depreciation(capital_costs_df, cost_df):
+    df = equipment_df[(equipment_df['Equipment_2_Shifts'] > 0) & equipment_df['Process'].isin(catalog['ids'])]
+    ids = equipment_catalog.lookup(catalog, df['Process'])
+
+    # operator mix per unit (e.g. 1 C1 + 1/4 C2) is parsed once in the catalog
+    units_needed = df['Equipment_2_Shifts'].to_numpy(dtype=int)
+    operators_per_unit = catalog['fte'][ids]
+    hourly_cost = catalog['hourly_cost'][ids]
+    costs = cost_engine.cost_breakdown(units_needed, ids, catalog, SHIFTS_PER_DAY)
+
+    return pd.DataFrame({
+        'Process': df['Process'].to_numpy(),
+        'Units_Required': units_needed,
+        'Operators_Per_Unit': operators_per_unit,
+        'Total_Operators': costs['operators'],
+        'Hourly_Cost': np.divide(hourly_cost, operators_per_unit, out=np.zeros_like(hourly_cost),
+                                 where=operators_per_unit > 0),  # average wage per operator, 0 if unstaffed
+        'Annual_Labor_Cost': costs['labor'],
+        'Utilization_2_Shifts': df['Utilization_2_Shifts'].to_numpy()
+    })
+
+def calculate_depreciation(capital_costs_df, catalog):
     """
     Calculate annual depreciation for all equipment
     """
-    depreciation_data = []
-
-    for _, row in capital_costs_df.iterrows():
-        process = row['Process']
-
-        # find useful life for this equipment
-        cost_row = cost_df[cost_df['Equipment'] == process]
-        if cost_row.empty:
-            continue
-
-        useful_life = cost_row['Useful life (years)'].iloc[0] if pd.notna(cost_row['Useful life (years)'].iloc[0]) else 10
-
-        total_installed_cost = row['Total_Installed_Cost']
-        annual_depreciation = total_installed_cost / useful_life
-
-        depreciation_data.append({
-            'Process': process,
-            'Total_Installed_Cost': total_installed_cost,
-            'Useful_Life_Years': useful_life,
-            'Annual_Depreciation': annual_depreciation
-        })
+    ids = equipment_catalog.lookup(catalog, capital_costs_df['Process'])
+    costs = cost_engine.cost_breakdown(capital_costs_df['Units_Required'].to_numpy(), ids, catalog, SHIFTS_PER_DAY)
 
-    return pd.DataFrame(depreciation_data)
+    return pd.DataFrame({
+        'Process': capital_costs_df['Process'].to_numpy(),
+        'Total_Installed_Cost': capital_costs_df['Total_Installed_Cost'].to_numpy(),
+        'Useful_Life_Years': catalog['life'][ids],
+        'Annual_Depreciation': costs['depreciation']
+    })
 
 def calculate_cost_kpis(capital_costs_df, operating_costs_df, depreciation_df, efficiency_metrics):
     """
@@ -274,10 +204,9 @@ def create_cost_visualizations(capital_costs_df, operating_costs_df, depreciatio
                          alpha=0.7, c=combined_df['Utilization_2_Shifts'], cmap='RdYlGn')
 
     # add process labels
-    for _, row in combined_df.iterrows():
-        ax3.annotate(row['Process'],
-                    (row['Utilization_2_Shifts'], row['Total_Process_Cost'] / 1000000),
-                    xytext=(5, 5), textcoords='offset points', fontsize=9)
+    for process, utilization, cost in zip(combined_df['Process'], combined_df['Utilization_2_Shifts'],
+                                          combined_df['Total_Process_Cost'] / 1000000):
+        ax3.annotate(process, (utilization, cost), xytext=(5, 5), textcoords='offset points', fontsize=9)
 
     ax3.set_xlabel('Equipment Utilization (%)', fontweight='bold')
     ax3.set_ylabel('Capital Cost (Millions $)', fontweight='bold')
@@ -395,8 +324,10 @@ Breakdown by major cost components:
     high_cost_processes = capital_costs_df[capital_costs_df['Total_Process_Cost'] > 10000000]  # > $10M
     if not high_cost_processes.empty:
         report += f"\nHigh-cost processes (>$10M each):"
-        for _, row in high_cost_processes.iterrows():
-            report += f"\n  Process {row['Process']}: ${row['Total_Process_Cost']:,.0f} ({row['Units_Required']} units)"
+        report += "".join(
+            f"\n  Process {process}: ${cost:,.0f} ({units} units)"
+            for process, cost, units in zip(high_cost_processes['Process'], high_cost_processes['Total_Process_Cost'],
+                                            high_cost_processes['Units_Required']))
 
     report += f"""
 
@@ -416,9 +347,11 @@ Labor cost breakdown by process:
 """
 
     labor_sorted = operating_costs_df.sort_values('Annual_Labor_Cost', ascending=False)
-    for _, row in labor_sorted.iterrows():
-        if row['Annual_Labor_Cost'] > 0:
-            report += f"  Process {row['Process']}: ${row['Annual_Labor_Cost']:,.0f}/year ({row['Total_Operators']:.1f} operators)\n"
+    labor_sorted = labor_sorted[labor_sorted['Annual_Labor_Cost'] > 0]
+    report += "".join(
+        f"  Process {process}: ${cost:,.0f}/year ({operators:.1f} operators)\n"
+        for process, cost, operators in zip(labor_sorted['Process'], labor_sorted['Annual_Labor_Cost'],
+                                            labor_sorted['Total_Operators']))
 
     report += f"""
 
@@ -486,20 +419,20 @@ def main():
     try:
         # step 1: load data
         print("\n1. Loading cost and equipment data...")
-        cost_df = load_equipment_costs()
+        catalog = load_equipment_costs()
         equipment_df, efficiency_metrics = load_equipment_requirements()
 
         # Step 2: Calculate capital costs
         print("\n2. Calculating capital investment costs...")
-        capital_costs_df = calculate_capital_costs(equipment_df, cost_df)
+        capital_costs_df = calculate_capital_costs(equipment_df, catalog)
 
         # Step 3: Calculate operating costs
         print("\n3. Calculating annual operating costs...")
-        operating_costs_df = calculate_operating_costs(equipment_df, cost_df)
+        operating_costs_df = calculate_operating_costs(equipment_df, catalog)
 
         # Step 4: Calculate depreciation
         print("\n4. Calculating depreciation...")
-        depreciation_df = calculate_depreciation(capital_costs_df, cost_df)
+        depreciation_df = calculate_depreciation(capital_costs_df, catalog)
 
         # Step 5: Calculate KPIs
         print("\n5. Calculating cost KPIs...")
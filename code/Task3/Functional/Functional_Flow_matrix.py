@@ -1,13 +1,16 @@
 # script to create an aggregated flow matrix from all part flow matrices
 
+import sys
 import pandas as pd
-import os
 from pathlib import Path
 
 # get the project root directory
 script_dir = Path(__file__).parent
 project_root = script_dir.parent.parent.parent
 
+sys.path.insert(0, str(project_root / 'code'))
+from femoasa import results_store
+
 # list of all processes
 processes = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M']
 
@@ -17,18 +20,16 @@ total_flow_matrix = pd.DataFrame(0.0, index=processes, columns=processes, dtype=
 # path to flow matrices folder
 flow_dir = project_root / 'results' / 'Task3' / 'Part' / 'Flow_Matrix'
 
-# read each part's flow matrix and add to total
-for filename in os.listdir(flow_dir):
-    if filename.endswith('_Flow_Matrix.csv'):
-        filepath = os.path.join(flow_dir, filename)
-        part_matrix = pd.read_csv(filepath, index_col=0)
-        total_flow_matrix += part_matrix
+# read each part's flow matrix from the results store and add to total
+for filepath in sorted(flow_dir.glob('*_Flow_Matrix.csv')):
+    part_matrix = results_store.load(filepath, index_col=0)
+    total_flow_matrix += part_matrix
 
 # save the aggregated flow matrix
 output_dir = project_root / 'results' / 'Task3' / 'Functional'
 output_dir.mkdir(parents=True, exist_ok=True)
 
-total_flow_matrix.to_csv(output_dir / 'Functional_Flow_Matrix.csv')
+results_store.save(total_flow_matrix, output_dir / 'Functional_Flow_Matrix.csv', index=True)
 print(f"Functional flow matrix saved to {output_dir / 'Functional_Flow_Matrix.csv'}")
 
 # also create a summary showing total flows per process
@@ -41,5 +42,5 @@ summary_df = pd.DataFrame({
     'Total_Out_Flow': total_out_flow.values
 })
 
-summary_df.to_csv(output_dir / 'Flow_Matrix_Summary.csv', index=False)
+results_store.save(summary_df, output_dir / 'Flow_Matrix_Summary.csv')
 print(f"Flow matrix summary saved to {output_dir / 'Flow_Matrix_Summary.csv'}")
\ No newline at end of file
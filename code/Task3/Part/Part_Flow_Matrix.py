@@ -1,5 +1,6 @@
 # Script to create flow matrices for each part showing transitions between processes
 
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -8,6 +9,9 @@ from pathlib import Path
 BASE_DIR = Path(__file__).parent.parent.parent.parent  # Go up to ISYE6202_CW3 directory
 RESULTS_DIR = BASE_DIR / "results"
 
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import results_store
+
 # Load weekly demand from Task1 results
 task1_df = pd.read_csv(RESULTS_DIR / "task12" / "Task1_Demand_Fulfillment_Capacity_Plan.csv")
 weekly_demand = dict(zip(task1_df['Part'], task1_df['Weekly_Demand_Units']))
@@ -55,7 +59,7 @@ for part in process_operations:
 
     # Save to CSV
     filename = RESULTS_DIR / "Task3" / "Part" / "Flow_Matrix" / f"{part}_Flow_Matrix.csv"
-    flow_matrix.to_csv(filename)
+    results_store.save(flow_matrix, filename, index=True)
     print(f"Flow matrix for {part} saved to {filename}")
 
 print("All flow matrices generated!")
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+task 3: global sensitivity analysis - all organizations
+
+runs morris screening and sobol indices of the capacity and cost model for the
+functional, part-based and fractal (f=2..5) organizations. factors: demand,
+demand cv, efficiency, reliability, equipment prices, wages and interest rate.
+outputs: total equipment, 5-year npv and weekly flow distance on the block
+layout of each organization.
+
+usage: python Sensitivity_Analysis.py [sobol_samples]
+
+author: machas^2 team
+date: november 2025
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# configuration
+BASE_DIR = Path(__file__).parent.parent.parent  # go up to isye6202_cw3 directory
+RESULTS_DIR = BASE_DIR / "results" / "Task3" / "Sensitivity"
+
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import capacity, sensitivity
+
+MORRIS_TRAJECTORIES = 1000
+SOBOL_SAMPLES = 2 ** 14  # x (factors + 2) model evaluations per organization
+SEED = 6202
+
+
+def run_morris():
+    """
+    Morris screening for every organization
+    """
+    results = [sensitivity.morris(org, MORRIS_TRAJECTORIES, seed=SEED) for org in capacity.ORGANIZATIONS]
+    df = pd.concat(results, ignore_index=True)
+    df.to_csv(RESULTS_DIR / "Morris_Screening.csv", index=False)
+    return df
+
+
+def run_sobol(n_samples):
+    """
+    Sobol first-order and total indices for every organization
+    """
+    results = [sensitivity.sobol(org, n_samples, seed=SEED) for org in capacity.ORGANIZATIONS]
+    df = pd.concat(results, ignore_index=True)
+    df.to_csv(RESULTS_DIR / "Sobol_Indices.csv", index=False)
+    return df
+
+
+def main():
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else SOBOL_SAMPLES
+
+    print("=" * 80)
+    print("GLOBAL SENSITIVITY ANALYSIS - ALL ORGANIZATIONS")
+    print("=" * 80)
+    print(f"Factors: {', '.join(sensitivity.FACTORS)}")
+    print(f"Outputs: {', '.join(sensitivity.OUTPUTS)}")
+
+    start = time.time()
+    morris_df = run_morris()
+    print(f"\nMorris screening ({MORRIS_TRAJECTORIES} trajectories) done in {time.time() - start:.1f}s")
+    print(morris_df.pivot_table(index='Factor', columns=['Output'], values='mu_star', aggfunc='mean').round(2).to_string())
+
+    start = time.time()
+    sobol_df = run_sobol(n_samples)
+    print(f"\nSobol indices ({n_samples} base samples) done in {time.time() - start:.1f}s")
+    print(sobol_df.pivot_table(index='Factor', columns=['Organization', 'Output'], values='ST').round(3).to_string())
+
+    print(f"\nResults saved to {RESULTS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
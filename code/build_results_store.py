@@ -0,0 +1,54 @@
+"""
+build results store - load the results/ csv tree into the sqlite results store
+
+every csv under results/ becomes one typed table keyed by task, organization,
+year, f and shifts (parsed from its path). --export writes the matching tables
+back out as csv views.
+
+usage: python build_results_store.py [--store FILE] [--export DIR] [--name TABLE] [--task N] [--year N] [--f N]
+
+author: machas^2 team
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from femoasa import results_store
+from femoasa.config import RESULTS_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the sqlite results store from results/")
+    parser.add_argument('--store', default=str(results_store.STORE_FILE))
+    parser.add_argument('--export', default=None, help="export the matching tables as csv to this directory")
+    parser.add_argument('--name', default=None)
+    parser.add_argument('--task', type=int, default=None)
+    parser.add_argument('--year', type=int, default=None)
+    parser.add_argument('--f', type=int, default=None)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"RESULTS STORE - {args.store}")
+    print("=" * 80)
+
+    start = time.time()
+    catalog, skipped = results_store.ingest(RESULTS_DIR, args.store)
+    print(f"{len(catalog)} tables, {int(catalog['n_rows'].sum()):,} rows stored in {time.time() - start:.1f}s")
+    for path, error in skipped:
+        print(f"  skipped {path.relative_to(RESULTS_DIR)}: {error.strip()}")
+
+    print("\nTables per task and organization:")
+    print(catalog.groupby(['task', 'organization'], dropna=False).size().to_string())
+
+    if args.export:
+        keys = {k: v for k, v in [('name', args.name), ('task', args.task), ('year', args.year), ('f', args.f)]
+                if v is not None}
+        paths = results_store.export_csv(args.export, args.store, **keys)
+        print(f"\n{len(paths)} tables exported to {args.export}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""
+femoasa - shared engines for the casework 3 facility design scripts
+
+the task scripts under code/task12, code/Task3 and code/task4 each reload the
+input csv files and recompute the same quantities with their own loops. this
+package holds the shared, array-based versions of those computations so that
+every organization (functional, part, fractal) is evaluated the same way.
+
+scripts import it by putting the code/ directory on sys.path:
+
+    sys.path.insert(0, str(BASE_DIR / "code"))
+    from femoasa import cost_engine
+
+modules are imported explicitly (no heavy imports happen here).
+
+author: machas^2 team
+"""
@@ -0,0 +1,11 @@
+"""
+python -m femoasa <command> - see femoasa.cli
+
+author: machas^2 team
+"""
+
+import sys
+
+from femoasa.cli import main
+
+sys.exit(main())
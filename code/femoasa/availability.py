@@ -0,0 +1,182 @@
+"""
+femoasa machine availability - k-out-of-n model of the process pools
+
+the capacity model folds the 98% reliability into a flat capacity factor
+(EFFECTIVE_AVAILABILITY = 0.882), i.e. it assumes 98% of every machine is
+always there. a pool of n machines actually has a random number of machines
+up; with 1-2 machines per process in a small fractal center the chance that
+too few are up in a week is far from negligible. this module gives, per
+process and center, the distribution of machines up and the probability of
+meeting the weekly workload:
+
+- binomial: machines fail and are repaired independently, P(up) = reliability
+- repair crew: birth-death machine-repairman model with a limited number of
+  repairers per center (mean time to repair from DEFAULT_REPAIR, mean time
+  between failures set so one machine is still up `reliability` of the time)
+
+all functions broadcast over any leading axes (designs, years, processes):
+
+    prob = meet_probability(load_min, machines, capacity_up)
+    machines = required_machines(load_min, capacity_up, level=0.995)
+
+capacity.equipment_requirements(..., availability_level=0.995) sizes with
+required_machines() instead of dividing by the flat factor.
+
+author: machas^2 team
+"""
+
+import numpy as np
+
+from femoasa.config import EFFICIENCY, OTIF_SERVICE_LEVEL, RELIABILITY, SHIFTS_PER_DAY, weekly_hours
+
+DEFAULT_REPAIR = {
+    'mttr_h': 4.0,       # mean time to repair one machine (hours)
+    'repairers': None,   # repair crew per center, None = every machine repaired independently
+}
+
+
+def _log_factorials(n):
+    return np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, n + 1)))])
+
+
+def up_distribution(machines, reliability=RELIABILITY, repairers=DEFAULT_REPAIR['repairers'],
+                    mttr_h=DEFAULT_REPAIR['mttr_h']):
+    """
+    Distribution of the number of machines up in a pool
+
+    Args:
+        machines: integer array (...) machines in the pool
+        reliability: long-run fraction of time one machine is up, scalar or (...)
+        repairers: repair crew size (None = binomial, independent repairs)
+
+    Returns:
+        array (..., max machines + 1), entry k = P(k machines up), 0 for k > machines
+    """
+    machines = np.asarray(machines).astype(np.int64)
+    reliability = np.asarray(reliability, dtype=float)
+    n_max = int(machines.max(initial=0))
+    k = np.arange(n_max + 1)
+    n = machines[..., None]
+    valid = k <= n
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if repairers is None:
+            p = reliability[..., None]
+            log_fact = _log_factorials(n_max)
+            log_pmf = (log_fact[machines][..., None] - log_fact[k] - log_fact[np.where(valid, n - k, 0)]
+                       + k * np.log(p) + (n - k) * np.log1p(-p))
+            # p = 1: every machine up (0 * log 0 terms)
+            log_pmf = np.where(p >= 1.0, np.where(k == n, 0.0, -np.inf), log_pmf)
+        else:
+            # birth-death on machines down: failures at (n - d) / mtbf, repairs at min(d, r) / mttr
+            mtbf = mttr_h * reliability / (1.0 - reliability)
+            d = k[:-1]
+            ratio = (np.log(np.maximum(n - d, 0) * mttr_h) - np.log(np.minimum(d + 1, repairers))
+                     - np.log(np.asarray(mtbf, dtype=float)[..., None]))
+            log_down = np.concatenate([np.zeros(ratio.shape[:-1] + (1,)), np.cumsum(ratio, axis=-1)], axis=-1)
+            # down count d <-> up count n - d
+            log_pmf = np.take_along_axis(log_down, np.where(valid, n - k, 0), axis=-1)
+
+    log_pmf = np.where(valid, log_pmf, -np.inf)
+    pmf = np.exp(log_pmf - log_pmf.max(axis=-1, keepdims=True))
+    return pmf / pmf.sum(axis=-1, keepdims=True)
+
+
+def machines_needed(load, capacity_up):
+    """
+    Machines that have to be up to cover a weekly load (minutes)
+    """
+    return np.ceil(np.asarray(load, dtype=float) / capacity_up - 1e-9)
+
+
+def meet_probability(load, machines, capacity_up=None, reliability=RELIABILITY,
+                     repairers=DEFAULT_REPAIR['repairers'], mttr_h=DEFAULT_REPAIR['mttr_h'], load_std=None):
+    """
+    Probability that enough machines of a pool are up to process its weekly load
+
+    Args:
+        load: array (...) weekly minutes of the pool (per center)
+        machines: array (...) machines of the pool (per center)
+        capacity_up: minutes per week of one machine while up (efficiency only)
+        load_std: optional array (...) weekly std dev of the load; the load is
+            then normal and independent of the machines up
+
+    Returns:
+        array (...), 1 for idle pools, 0 when the pool is too small even fully up
+    """
+    capacity_up = weekly_hours(SHIFTS_PER_DAY) * 60 * EFFICIENCY if capacity_up is None else capacity_up
+    need, machines = np.broadcast_arrays(machines_needed(load, capacity_up), np.asarray(machines))
+    pmf = up_distribution(machines, reliability, repairers, mttr_h)
+    k = np.arange(pmf.shape[-1])
+    if load_std is None:
+        return np.where(k >= need[..., None], pmf, 0.0).sum(axis=-1)
+
+    from scipy.special import ndtr
+
+    # P(load <= k machines x capacity) for every count k of machines up
+    load = np.asarray(load, dtype=float)[..., None]
+    std = np.asarray(load_std, dtype=float)[..., None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covered = np.where(std > 0, ndtr((k * capacity_up - load) / np.where(std > 0, std, 1.0)),
+                           (k * capacity_up >= load - 1e-9).astype(float))
+    return (pmf * covered).sum(axis=-1)
+
+
+def required_machines(load, capacity_up=None, level=OTIF_SERVICE_LEVEL, reliability=RELIABILITY,
+                      repairers=DEFAULT_REPAIR['repairers'], mttr_h=DEFAULT_REPAIR['mttr_h'], max_spares=50):
+    """
+    Smallest pool whose machines up cover the weekly load with probability >= level
+
+    Args:
+        load: array (...) weekly minutes of the pool (per center)
+        level: probability target per pool
+
+    Returns:
+        array (...) machines, the deterministic need plus the spares for availability
+    """
+    capacity_up = weekly_hours(SHIFTS_PER_DAY) * 60 * EFFICIENCY if capacity_up is None else capacity_up
+    need = machines_needed(load, capacity_up)
+    machines = need.copy()
+    short = need > 0
+    for _ in range(max_spares + 1):
+        if not short.any():
+            break
+        prob = meet_probability(load, machines, capacity_up, reliability, repairers, mttr_h)
+        short = prob < level
+        machines = machines + short
+    if short.any():
+        raise ValueError(f"Availability level {level} not reached with {max_spares} spares")
+    return machines
+
+
+def design_probability(part_workload_min, equipment, organization='functional', capacity_up=None,
+                       reliability=RELIABILITY, repairers=DEFAULT_REPAIR['repairers'],
+                       mttr_h=DEFAULT_REPAIR['mttr_h'], part_workload_std=None):
+    """
+    Per-pool and plant-wide probability of meeting the weekly workload
+
+    Args:
+        part_workload_min: array (..., parts, processes) mean weekly minutes
+        equipment: machines per process (..., processes) as in
+            capacity.equipment_requirements(), or (..., parts, processes) per
+            part cell for 'part'
+        part_workload_std: optional weekly std dev like part_workload_min
+            (capacity.product_workload_std()), summed per pool as in capacity
+
+    Returns:
+        (per-pool array (..., processes) or (..., parts, processes) for one
+        center, plant array (...) = product over every pool of every center)
+    """
+    from femoasa import capacity
+
+    equipment = np.asarray(equipment, dtype=float)
+    if organization == 'part':
+        pool = meet_probability(part_workload_min, equipment, capacity_up, reliability, repairers, mttr_h,
+                                part_workload_std)
+        return pool, pool.prod(axis=(-2, -1))
+    f = capacity.num_centers(organization)
+    std = None if part_workload_std is None else part_workload_std.sum(axis=-2) / f
+    pool = meet_probability(part_workload_min.sum(axis=-2) / f, equipment / f, capacity_up, reliability,
+                            repairers, mttr_h, std)
+    # the f centers are independent copies of the same pools
+    return pool, pool.prod(axis=-1) ** f
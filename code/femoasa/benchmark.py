@@ -0,0 +1,261 @@
+"""
+femoasa benchmark - per-stage wall time and peak memory at several scales
+
+runs the pipeline stages on the casework data and on synthetic instances
+(femoasa.synthetic) of growing size:
+
+    data_load -> part_demand -> workload -> equipment_sizing -> flow_matrix
+    -> grid_optimizer -> distance_metrics -> cost -> rendering
+
+every stage is a function of a shared context dict filled by the stages
+before it. distance_metrics and rendering call the entry points of the task 4
+distance pipeline (task4/Fractal/Fractal_Distance_Metrics.py) on the stage's
+centroid and flow csv files, so they time the csv pass, the figures and the
+traffic map the runners produce. a stage runs once under tracemalloc for its peak python/numpy
+allocation, then `repeat` times untraced for its wall time (best of). results
+are plain dicts saved as json; compare() flags every stage whose time or
+peak memory grew by more than the threshold over a stored baseline:
+
+    results = run_benchmarks(['casework', 'x10'])
+    regressions = compare(results, load_results(BASELINE_FILE))
+
+author: machas^2 team
+"""
+
+import contextlib
+import io
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from femoasa import (
+    capacity, cost_engine, data, equipment_catalog, flow_tensor, grid_layout, render, storage, synthetic,
+)
+from femoasa.config import MACHINE_SPECS, RESULTS_DIR
+
+BASELINE_FILE = RESULTS_DIR / "benchmarks" / "baseline.json"
+
+# synthetic sizes (parts, processes, products); casework is the data/csv_outputs instance
+SCALES = {
+    'casework': None,
+    'x10': (200, 26, 16),
+    'x100': (2000, 52, 80),
+    'x1000': (20000, 130, 800),
+}
+DEFAULT_SCALES = ['casework', 'x10', 'x100']
+
+FRACTAL_CENTERS = 4
+DISTANCE_SCRIPT = 'task4/Fractal/Fractal_Distance_Metrics.py'
+
+
+def _data_load(ctx):
+    d = ctx['data_dir']
+    ctx['routings'] = data.load_routings(d)
+    ctx['step_times'] = data.load_step_times(d)
+    ctx['processes'] = data.load_processes(d)
+    ctx['dimensions'] = data.load_part_dimensions(d)
+    ctx['demand'] = data.load_multi_year_demand(d)
+    return len(ctx['routings'])
+
+
+def _part_demand(ctx):
+    demand = ctx['demand']
+    ctx['mean'], ctx['std'] = storage.part_demand(demand['weekly'], demand['cv'], demand['bom'])
+    return ctx['mean'].size
+
+
+def _workload(ctx):
+    ctx['minutes'] = data.workload_matrix(ctx['routings'], ctx['step_times'], ctx['processes'])
+    ctx['workload'] = capacity.part_workload(ctx['mean'], ctx['minutes'])
+    return ctx['workload'].size
+
+
+def _equipment_sizing(ctx):
+    ctx['equipment'] = {org: capacity.equipment_requirements(ctx['workload'], org) for org in capacity.ORGANIZATIONS}
+    return len(ctx['equipment'])
+
+
+def _flow_matrix(ctx):
+    ctx['flow_tensor'] = flow_tensor.from_routings(ctx['mean'], ctx['routings'], ctx['processes'])
+    ctx['flow'] = flow_tensor.aggregate(ctx['flow_tensor'], 'year')
+    return len(ctx['flow_tensor']['flow'])
+
+
+def _grid_optimizer(ctx):
+    templates = list(MACHINE_SPECS)
+    counts = ctx['equipment'][f'fractal_f{FRACTAL_CENTERS}'].max(axis=0) / FRACTAL_CENTERS
+    blocks = []
+    for k, count in enumerate(counts.astype(int)):
+        template = templates[k % len(templates)]
+        w, h, ox, oy, _ = MACHINE_SPECS[template]
+        best = grid_layout.find_optimal_grid(int(count), w, h, ox, oy, template)
+        blocks.append((best.get('block_width_ft', 0.0), best.get('block_depth_ft', 0.0)))
+    ctx['blocks'] = np.array(blocks, dtype=float)
+    return len(blocks)
+
+
+def _distance_metrics(ctx):
+    import pandas as pd
+
+    script = render.load_script(DISTANCE_SCRIPT)
+    out = ctx['output_dir']
+    prefix = 'Benchmark'
+    # blocks on a square grid of cells over the floor of the pipeline's default layout
+    n = len(ctx['blocks'])
+    side = int(np.ceil(np.sqrt(n)))
+    width, depth = script.layout_extent(prefix)
+    k = np.arange(n)
+    centroids = pd.DataFrame({'process': ctx['processes'],
+                              'centroid_x': (k % side + 0.5) * width / side,
+                              'centroid_y': (k // side + 0.5) * depth / side})
+    ctx['centroids_path'] = out / f'{prefix}_Block_Centroids.csv'
+    centroids.to_csv(ctx['centroids_path'], index=False)
+    flow_path = out / f'{prefix}_Flow_Matrix.csv'
+    pd.DataFrame(ctx['flow'][-1], index=ctx['processes'], columns=ctx['processes']).to_csv(flow_path)
+
+    pairs, total_flow, total_weighted_distance = script.compute_flow_distances_from_centroids(
+        ctx['centroids_path'], flow_path, out, prefix)
+    ctx['pairs'] = script.add_distance_travelled_metric(pairs, out, prefix)
+    script.create_summary_report(total_flow, total_weighted_distance, out, prefix)
+    return len(pairs)
+
+
+def _cost(ctx):
+    catalog = equipment_catalog.build_catalog(Path(ctx['data_dir'] or data.DATA_DIR) / 'Equip+Operator Specs.csv',
+                                              ctx['processes'])
+    ids = equipment_catalog.lookup(catalog, ctx['processes'])
+    designs = np.zeros((len(ctx['equipment']),) + ctx['mean'].shape[:1] + (len(catalog['names']),))
+    for d, units in enumerate(ctx['equipment'].values()):
+        designs[d][:, ids] = np.maximum.accumulate(units, axis=0)
+    ctx['costs'] = cost_engine.evaluate_costs(designs, catalog)
+    return designs.shape[0]
+
+
+def _rendering(ctx):
+    script = render.load_script(DISTANCE_SCRIPT)
+    with contextlib.redirect_stdout(io.StringIO()):
+        files = [script.plot_flow_lines(ctx['centroids_path'], ctx['pairs'], ctx['output_dir'], 'Benchmark'),
+                 *script.plot_traffic_density(ctx['centroids_path'], ctx['pairs'], ctx['output_dir'], 'Benchmark')]
+    return sum(f.stat().st_size for f in files)
+
+
+STAGES = [
+    ('data_load', _data_load),
+    ('part_demand', _part_demand),
+    ('workload', _workload),
+    ('equipment_sizing', _equipment_sizing),
+    ('flow_matrix', _flow_matrix),
+    ('grid_optimizer', _grid_optimizer),
+    ('distance_metrics', _distance_metrics),
+    ('cost', _cost),
+    ('rendering', _rendering),
+]
+
+
+def measure(stage, ctx, repeat=3):
+    """
+    Peak memory (one traced run) and best wall time (repeat untraced runs) of a stage
+
+    Returns:
+        dict: 'seconds', 'peak_mb', 'items' (stage output size)
+    """
+    tracemalloc.start()
+    try:
+        items = stage(ctx)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage(ctx)
+        times.append(time.perf_counter() - start)
+    return {'seconds': min(times), 'peak_mb': peak / 2 ** 20, 'items': items}
+
+
+def run_benchmarks(scales=DEFAULT_SCALES, repeat=3, seed=6202, stages=None, work_dir=None):
+    """
+    Benchmark every stage at every scale
+
+    Args:
+        scales: names of SCALES
+        stages: optional subset of stage names (earlier stages still run to fill the context)
+        work_dir: where synthetic instances are written (a temporary directory if None)
+
+    Returns:
+        dict: 'meta' (python, numpy, platform, repeat), 'results'
+        {scale: {stage: measure() dict}}
+    """
+    results = {}
+    if stages is None or {'distance_metrics', 'rendering'} & set(stages):
+        import matplotlib
+        matplotlib.use('Agg')
+        render.load_script(DISTANCE_SCRIPT)  # pandas / matplotlib imports stay out of the stage timings
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(work_dir or tmp)
+        for scale in scales:
+            size = SCALES[scale]
+            data_dir = None
+            if size is not None:
+                data_dir = root / scale
+                synthetic.write_instance(synthetic.generate_instance(*size, seed=seed), data_dir)
+            ctx = {'data_dir': data_dir, 'output_dir': root / f"{scale}_outputs"}
+            ctx['output_dir'].mkdir(parents=True, exist_ok=True)
+            results[scale] = {}
+            for name, stage in STAGES:
+                if stages is None or name in stages:
+                    results[scale][name] = measure(stage, ctx, repeat)
+                else:
+                    stage(ctx)
+
+    meta = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    return {'meta': meta, 'results': results}
+
+
+def save_results(results, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2))
+    return path
+
+
+def load_results(path):
+    return json.loads(Path(path).read_text())
+
+
+def compare(results, baseline, threshold=0.25, min_seconds=0.005, min_mb=1.0):
+    """
+    Stages that regressed against a baseline
+
+    A stage regresses when its time (or peak memory) exceeds the baseline by
+    more than `threshold` (relative) and by more than `min_seconds` (or
+    `min_mb`), so timer noise on millisecond stages does not fail the run.
+    Stages or scales missing from the baseline are skipped.
+
+    Returns:
+        list of dicts: 'scale', 'stage', 'metric', 'baseline', 'current', 'ratio'
+    """
+    regressions = []
+    for scale, stages in results['results'].items():
+        for stage, current in stages.items():
+            reference = baseline['results'].get(scale, {}).get(stage)
+            if reference is None:
+                continue
+            for metric, floor in [('seconds', min_seconds), ('peak_mb', min_mb)]:
+                old, new = reference[metric], current[metric]
+                if new > old * (1.0 + threshold) and new - old > floor:
+                    regressions.append({'scale': scale, 'stage': stage, 'metric': metric, 'baseline': old,
+                                        'current': new, 'ratio': new / old if old else float('inf')})
+    return regressions
@@ -0,0 +1,121 @@
+"""
+femoasa capacity model - vectorized equipment requirements
+
+the same workload -> equipment calculation as Functional_Capacity.py,
+Part_Step_Capacity.py and Fractal_Design.py, written on arrays so a batch of
+demand scenarios (samples, parts) is sized in one call:
+
+- functional: one pool per process, ceil(workload / capacity)
+- part: dedicated machines per part and process, sum of ceil per part
+- fractal f: f identical centers, f x ceil(workload / f / capacity)
+
+capacity per machine = 5 days x 8 h x shifts x 60 min x efficiency x reliability.
+an optional coverage z sizes for mean + z standard deviations of weekly
+workload instead of the mean (chance-constrained sizing). an optional
+availability_level replaces the flat reliability factor by the k-out-of-n
+availability of each pool (femoasa.availability): the smallest pool with
+enough machines up with that probability.
+
+author: machas^2 team
+"""
+
+import numpy as np
+
+from femoasa.config import (
+    SHIFTS_PER_DAY, EFFICIENCY, RELIABILITY, weekly_hours,
+)
+
+ORGANIZATIONS = ['functional', 'part', 'fractal_f2', 'fractal_f3', 'fractal_f4', 'fractal_f5']
+
+
+def num_centers(organization):
+    """
+    Number of identical centers of an organization name ('fractal_f4' -> 4)
+    """
+    if organization.startswith('fractal_f'):
+        return int(organization[len('fractal_f'):])
+    return 1
+
+
+def machine_capacity(shifts=SHIFTS_PER_DAY, efficiency=EFFICIENCY, reliability=RELIABILITY):
+    """
+    Effective minutes per week of one machine (broadcasts over array inputs)
+    """
+    return weekly_hours(shifts) * 60 * np.asarray(efficiency) * np.asarray(reliability)
+
+
+def part_workload(part_demand, workload_minutes):
+    """
+    Weekly minutes per part and process
+
+    Args:
+        part_demand: array (..., parts) units/week
+        workload_minutes: array (parts, processes) from data.workload_matrix()
+
+    Returns:
+        array (..., parts, processes)
+    """
+    return np.asarray(part_demand, dtype=float)[..., :, np.newaxis] * workload_minutes
+
+
+def equipment_requirements(part_workload_min, organization='functional', capacity=None,
+                           part_workload_std=None, z=0.0, availability_level=None, reliability=RELIABILITY):
+    """
+    Machines per process for a batch of scenarios
+
+    Args:
+        part_workload_min: array (..., parts, processes) mean weekly minutes
+        organization: one of ORGANIZATIONS
+        capacity: effective minutes per machine, scalar or (...,) array
+        part_workload_std: optional array like part_workload_min, weekly std dev
+        z: coverage factor on the standard deviation (0 = size for the mean)
+        availability_level: probability that enough machines of each pool
+            (per center) are up; None keeps the flat reliability factor
+        reliability: the factor included in capacity, scalar or (...,) array
+
+    Returns:
+        array (..., processes) total machines per process
+    """
+    capacity = machine_capacity() if capacity is None else capacity
+    capacity = np.asarray(capacity, dtype=float)[..., np.newaxis]
+    reliability = np.asarray(reliability, dtype=float)[..., np.newaxis]
+
+    def pool_size(load, cap, rel):
+        if availability_level is None:
+            return np.ceil(load / cap - 1e-9)
+        from femoasa import availability
+
+        # machines work cap / rel minutes while up, the pmf of machines up replaces rel
+        return availability.required_machines(load, cap / rel, availability_level, rel)
+
+    if organization == 'part':
+        load = part_workload_min
+        if part_workload_std is not None:
+            load = load + z * part_workload_std
+        return pool_size(load, capacity[..., np.newaxis], reliability[..., np.newaxis]).sum(axis=-2)
+
+    f = num_centers(organization)
+    load = part_workload_min.sum(axis=-2)
+    if part_workload_std is not None:
+        # parts share product demand, adding their std devs is the conservative bound
+        load = load + z * part_workload_std.sum(axis=-2)
+    return f * pool_size(load / f, capacity, reliability)
+
+
+def product_workload_std(weekly, cv, bom, workload_minutes):
+    """
+    Weekly workload standard deviation per part and process
+
+    Product demands are independent; a part's demand moves with the products
+    it goes into, so its std dev is sqrt(sum over products (bom x sigma)^2).
+
+    Args:
+        weekly, cv: arrays (..., products)
+        bom: array (parts, products)
+
+    Returns:
+        array (..., parts, processes)
+    """
+    sigma = np.asarray(weekly) * np.asarray(cv)
+    part_sigma = np.sqrt(np.square(bom * sigma[..., np.newaxis, :]).sum(axis=-1))
+    return part_workload(part_sigma, workload_minutes)
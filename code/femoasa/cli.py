@@ -0,0 +1,359 @@
+"""
+femoasa command line - one entry point for the shared engines
+
+    cd code
+    python -m femoasa capacity --year 5
+    python -m femoasa flow --year 3 --top 15
+    python -m femoasa cost --shifts 1
+    python -m femoasa storage --csv storage_summary.csv
+    python -m femoasa --data-dir ../data/synthetic/x10 design --f 3
+
+every subcommand reads the inputs from data.load_snapshot() (one pickle,
+rebuilt when a csv changes) instead of re-parsing the csv files, and imports
+its engines inside the subcommand: every table subcommand but simulate runs
+on numpy and the standard library, pandas is imported by simulate and
+matplotlib only by render. tables are printed as text and written with --csv.
+
+author: machas^2 team
+"""
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+from femoasa.config import OTIF_SERVICE_LEVEL, RESULTS_DIR, SHIFTS_PER_DAY
+
+# the Year 1 F4 fractal center of the task 3 distance pipeline
+LAYOUT_CENTROIDS = RESULTS_DIR / 'Task3' / 'Fractal' / 'fractal_distance' / 'Distance_Layout_Flow_Y1_F4_Block_Centroids.csv'
+# the Year 5 F4 fractal center of the task 4 distance pipeline
+LAYOUT_CENTROIDS_Y5 = RESULTS_DIR / 'task4' / 'Fractal' / 'Fractal_Distance' / 'Distance_Layout_Flow_Y5_F4_Block_Centroids.csv'
+
+
+def _table(header, rows, csv_path=None, float_format='{:,.2f}'):
+    """
+    Print rows as an aligned text table (and write them to csv_path)
+    """
+    cells = [[float_format.format(v) if isinstance(v, float) else str(v) for v in row] for row in rows]
+    widths = [max([len(str(h))] + [len(r[k]) for r in cells]) for k, h in enumerate(header)]
+    print('  '.join(str(h).rjust(w) for h, w in zip(header, widths)))
+    for row in cells:
+        print('  '.join(v.rjust(w) for v, w in zip(row, widths)))
+    if csv_path:
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        print(f"\nSaved: {csv_path}")
+
+
+def _frame(df, csv_path=None, float_format='{:,.2f}'):
+    _table(list(df.columns), [[v.item() if hasattr(v, 'item') else v for v in row]
+                              for row in df.itertuples(index=False)], csv_path, float_format)
+
+
+def _inputs(args):
+    from femoasa import data
+
+    return data.load_snapshot(args.data_dir, cache_dir=None if args.no_cache else data.SNAPSHOT_DIR)
+
+
+def _part_demand(inputs):
+    demand = inputs['demand']
+    weekly = demand['weekly']
+    return weekly @ demand['bom'].T, weekly, demand['cv']
+
+
+def _year_index(inputs, year):
+    years = inputs['demand']['years']
+    if year not in years:
+        raise SystemExit(f"Unknown year {year} (years: {', '.join(map(str, years))})")
+    return years.index(year)
+
+
+def _organizations(name):
+    from femoasa import capacity
+
+    return capacity.ORGANIZATIONS if name == 'all' else [name]
+
+
+def _equipment(inputs, organization, shifts, z=0.0, availability=None):
+    """
+    Machines per process (years, processes) of an organization
+    """
+    from femoasa import capacity
+
+    mean, weekly, cv = _part_demand(inputs)
+    workload = capacity.part_workload(mean, inputs['workload'])
+    std = capacity.product_workload_std(weekly, cv, inputs['demand']['bom'], inputs['workload']) if z else None
+    return capacity.equipment_requirements(workload, organization, capacity.machine_capacity(shifts), std, z, availability)
+
+
+def cmd_capacity(args):
+    """
+    Equipment per process, per year and organization
+    """
+    inputs = _inputs(args)
+    years = inputs['demand']['years']
+    rows = []
+    for organization in _organizations(args.organization):
+        units = _equipment(inputs, organization, args.shifts, args.z, args.availability)
+        for y, year in enumerate(years):
+            if args.year is None or year == args.year:
+                rows.append([organization, year] + [int(u) for u in units[y]] + [int(units[y].sum())])
+    _table(['Organization', 'Year'] + inputs['processes'] + ['Total'], rows, args.csv)
+
+
+def cmd_flow(args):
+    """
+    Largest process-to-process flows (parts/week) of one year
+    """
+    import numpy as np
+
+    inputs = _inputs(args)
+    mean, _, _ = _part_demand(inputs)
+    flow = np.einsum('k,kij->ij', mean[_year_index(inputs, args.year)], inputs['transitions'])
+    i, j = np.nonzero(flow)
+    order = np.argsort(-flow[i, j], kind='stable')[:args.top]
+    processes = inputs['processes']
+    rows = [[processes[i[k]], processes[j[k]], float(flow[i[k], j[k]]),
+             float(flow[i[k], j[k]] / flow.sum())] for k in order]
+    print(f"Year {args.year}: {flow.sum():,.0f} parts/week over {len(i)} process pairs\n")
+    _table(['From', 'To', 'Parts_per_Week', 'Share'], rows, args.csv, '{:,.3f}')
+
+
+def cmd_cost(args):
+    """
+    Multi-year cost of the equipment plan of every organization
+    """
+    import numpy as np
+    from femoasa import cost_engine, equipment_catalog
+
+    inputs = _inputs(args)
+    catalog = inputs['catalog']
+    ids = equipment_catalog.lookup(catalog, inputs['processes'])
+    organizations = _organizations(args.organization)
+    designs = np.zeros((len(organizations), len(inputs['demand']['years']), len(catalog['names'])))
+    for d, organization in enumerate(organizations):
+        # installed equipment is kept: a year never has fewer machines than the year before
+        designs[d][:, ids] = np.maximum.accumulate(_equipment(inputs, organization, args.shifts, args.z, args.availability), axis=0)
+    costs = cost_engine.evaluate_costs(designs, catalog, shifts=args.shifts)
+
+    rows = [[organization, int(designs[d, -1].sum()), float(costs['capital'][d].sum()),
+             float(costs['labor'][d].sum()), float(costs['operators'][d, -1]), float(costs['npv'][d])]
+            for d, organization in enumerate(organizations)]
+    _table(['Organization', 'Final_Machines', 'Capital', 'Labor', 'Final_Operators', 'NPV'], rows, args.csv)
+
+
+def cmd_storage(args):
+    """
+    Yearly storage volumes, floor space and warehouse investment
+    """
+    from femoasa import storage
+
+    inputs = _inputs(args)
+    plan = storage.storage_plan(inputs['demand'], inputs['dimensions']['volume_cuft'], service_level=args.service_level)
+    columns = storage.summary_columns(plan)
+    rows = [[year] + [float(columns[c][y]) for c in list(columns)[1:]] for y, year in enumerate(columns['Year'])]
+    _table(list(columns), rows, args.csv)
+
+
+def cmd_design(args):
+    """
+    Grid block of every process in one fractal center
+    """
+    import numpy as np
+    from femoasa import grid_layout
+    from femoasa.config import MACHINE_SPECS
+
+    inputs = _inputs(args)
+    units = _equipment(inputs, f'fractal_f{args.f}', args.shifts, args.z, args.availability)[_year_index(inputs, args.year)] / args.f
+    templates = list(MACHINE_SPECS)
+    rows = []
+    for k, (process, count) in enumerate(zip(inputs['processes'], units.astype(int))):
+        # synthetic processes reuse the footprint of the casework process they were cloned from
+        template = process if process in MACHINE_SPECS else templates[k % len(templates)]
+        w, h, ox, oy, _ = MACHINE_SPECS[template]
+        best = grid_layout.find_optimal_grid(int(count), w, h, ox, oy, template)
+        rows.append([process, int(count), best.get('layout_grid', '-'), float(best.get('block_width_ft', 0)),
+                     float(best.get('block_depth_ft', 0)), float(best.get('block_area_sqft', 0)),
+                     float(best.get('utilization', 0))])
+    print(f"Year {args.year}, {args.f} fractal centers: {int(units.sum())} machines per center, "
+          f"{np.sum([r[5] for r in rows]):,.0f} ft2 of process blocks\n")
+    _table(['Process', 'Machines', 'Grid', 'Width_ft', 'Depth_ft', 'Area_sqft', 'Utilization'], rows, args.csv)
+
+
+def _read_centroids(path, processes):
+    """
+    Block centroids (processes, 2) of a layout csv with process, centroid_x, centroid_y columns
+    """
+    import numpy as np
+
+    with open(path, newline='') as f:
+        found = {row['process']: (float(row['centroid_x']), float(row['centroid_y']))
+                 for row in csv.DictReader(f) if row['centroid_x'] and row['centroid_y']}
+    missing = [p for p in processes if p not in found]
+    if missing:
+        raise SystemExit(f"{path} has no centroid for processes {', '.join(missing)}")
+    return np.array([found[p] for p in processes])
+
+
+def cmd_layout(args):
+    """
+    Handling workload of a layout given by its process centroids
+    """
+    import numpy as np
+    from femoasa import material_handling
+
+    inputs = _inputs(args)
+    path = args.centroids or LAYOUT_CENTROIDS
+    centroids = _read_centroids(path, inputs['processes'])
+
+    mean, _, _ = _part_demand(inputs)
+    profile = material_handling.kit_profile(mean[_year_index(inputs, args.year)], inputs['transitions'],
+                                            inputs['dimensions'])
+    distance = material_handling.centroid_distances(centroids)
+    handling = material_handling.evaluate_handling(profile['flow'], distance, profile['volume_cuft'],
+                                                   profile['weight_lbs'], shifts=args.shifts)
+    fleet = material_handling.fleet_size(handling, axis=(-2, -1))
+
+    print(f"Layout {path}\nYear {args.year}: {(profile['flow'] * distance).sum():,.0f} part-ft/week, "
+          f"{handling['handler_hours'].sum():,.1f} handler hours/week, "
+          f"{int(fleet['vehicles_per_shift'])} vehicles per shift, "
+          f"${handling['annual_cost'].sum():,.0f} per year\n")
+    i, j = np.nonzero(profile['flow'])
+    order = np.argsort(-handling['handler_hours'][i, j], kind='stable')[:args.top]
+    processes = inputs['processes']
+    rows = [[processes[i[k]], processes[j[k]], float(profile['flow'][i[k], j[k]]), float(distance[i[k], j[k]]),
+             float(handling['trips'][i[k], j[k]]), float(handling['handler_hours'][i[k], j[k]])] for k in order]
+    _table(['From', 'To', 'Parts_per_Week', 'Distance_ft', 'Trips_per_Week', 'Handler_Hours'], rows, args.csv)
+
+
+def cmd_diff(args):
+    """
+    Machines kept, moved, added and removed between two fractal center layouts
+    """
+    from femoasa import layout_diff
+    from femoasa.config import MACHINE_SPECS
+
+    inputs = _inputs(args)
+    processes = inputs['processes']
+    templates = list(MACHINE_SPECS)
+    specs = {p: MACHINE_SPECS.get(p, MACHINE_SPECS[templates[k % len(templates)]]) for k, p in enumerate(processes)}
+    layouts = []
+    for path, year, f in [(args.before, args.before_year, args.before_f), (args.after, args.after_year, args.after_f)]:
+        units = _equipment(inputs, f'fractal_f{f}', args.shifts)[_year_index(inputs, year)] / f
+        centroids = _read_centroids(path, processes)
+        counts = dict(zip(processes, units))
+        corners = layout_diff.block_corners(dict(zip(processes, centroids)), counts, specs)
+        layouts.append(layout_diff.machines_from_blocks(corners, counts, specs))
+
+    types, values = layout_diff.type_summary(*layouts, catalog=inputs['catalog'])
+    print(f"Year {args.before_year} F{args.before_f} ({args.before})\n"
+          f"  -> Year {args.after_year} F{args.after_f} ({args.after})\n")
+    rows = [[process] + [int(v) for v in row[:6]] + [float(v) for v in row[6:]] for process, row in zip(types, values)]
+    _table(['Process'] + layout_diff.SUMMARY_COLUMNS, rows, args.csv)
+
+
+def cmd_simulate(args):
+    """
+    Kit inventory simulation of the raw-materials area
+    """
+    from femoasa import raw_materials
+
+    inputs = _inputs(args)
+    result = raw_materials.simulate(inputs['demand'], replications=args.replications, weeks=args.weeks, seed=args.seed)
+    report = raw_materials.inventory_report(result, inputs['dimensions'])
+    summary = report.groupby('Year', sort=False).agg(
+        Order_Up_To_Units=('Order_Up_To_Units', 'sum'),
+        Mean_Kits_On_Hand=('Mean_Kits_On_Hand', 'sum'),
+        Peak_Kits_On_Hand=('Peak_Kits_On_Hand', 'sum'),
+        Worst_Fill_Rate=('Fill_Rate', 'min'),
+        Footprint_sqft=('Footprint_sqft', 'sum'),
+    ).reset_index()
+    _frame(summary, args.csv, '{:,.4f}')
+
+
+def cmd_render(args):
+    """
+    Render the result figures (same as render_all_figures.py)
+    """
+    from femoasa import render
+
+    jobs = render.collect_jobs()
+    if args.only:
+        jobs = [j for j in jobs if args.only in j['name']]
+    summary = render.render_jobs(jobs, workers=args.workers, force=args.force)
+    counts = {status: sum(r['status'] == status for r in summary) for status in ['rendered', 'skipped', 'failed']}
+    for row in sorted(summary, key=lambda r: r['name']):
+        if row['error']:
+            print(f"  failed {row['name']}: {row['error']}")
+    print(f"Rendered {counts['rendered']}, skipped {counts['skipped']} (unchanged), failed {counts['failed']}")
+    return 1 if counts['failed'] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='femoasa', description="Facility design engines of casework 3")
+    parser.add_argument('--data-dir', default=None, help="instance directory (default: data/csv_outputs)")
+    parser.add_argument('--no-cache', action='store_true', help="re-read the csv files instead of the snapshot")
+    parser.add_argument('--time', action='store_true', help="print the run time")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='command')
+
+    def command(name, function, help, year=None, organization=False, sizing=False):
+        sub = commands.add_parser(name, help=help, description=function.__doc__.strip())
+        sub.set_defaults(function=function)
+        if year is not False:
+            sub.add_argument('--year', type=int, default=year)
+        if organization:
+            sub.add_argument('--organization', default='all', help="functional, part, fractal_fN or all")
+        if sizing:
+            sub.add_argument('--shifts', type=int, default=SHIFTS_PER_DAY)
+            sub.add_argument('--z', type=float, default=0.0, help="size for mean + z std devs of workload")
+            sub.add_argument('--availability', type=float, default=None,
+                             help="size each pool for this probability of enough machines up (k-out-of-n)")
+        sub.add_argument('--csv', default=None, help="also write the table to this csv file")
+        return sub
+
+    command('capacity', cmd_capacity, "equipment per process, year and organization", organization=True, sizing=True)
+    command('cost', cmd_cost, "multi-year cost per organization", year=False, organization=True, sizing=True)
+    flow = command('flow', cmd_flow, "process-to-process flows of a year", year=1)
+    flow.add_argument('--top', type=int, default=20)
+    design = command('design', cmd_design, "fractal center blocks", year=5, sizing=True)
+    design.add_argument('--f', type=int, default=4, help="number of fractal centers")
+    layout = command('layout', cmd_layout, "handling workload of a layout", year=1)
+    layout.add_argument('--centroids', default=None, help="csv with process, centroid_x, centroid_y")
+    layout.add_argument('--shifts', type=int, default=SHIFTS_PER_DAY)
+    layout.add_argument('--top', type=int, default=15)
+    diff = command('diff', cmd_diff, "machine-by-machine diff of two center layouts", year=False)
+    diff.add_argument('--before', default=str(LAYOUT_CENTROIDS), help="block centroid csv of the first layout")
+    diff.add_argument('--after', default=str(LAYOUT_CENTROIDS_Y5), help="block centroid csv of the second layout")
+    diff.add_argument('--before-year', type=int, default=1)
+    diff.add_argument('--after-year', type=int, default=5)
+    diff.add_argument('--before-f', type=int, default=4)
+    diff.add_argument('--after-f', type=int, default=4)
+    diff.add_argument('--shifts', type=int, default=SHIFTS_PER_DAY)
+    storage = command('storage', cmd_storage, "storage volumes and floor space per year", year=False)
+    storage.add_argument('--service-level', type=float, default=OTIF_SERVICE_LEVEL)
+    simulate = command('simulate', cmd_simulate, "raw-materials kit inventory simulation", year=False)
+    simulate.add_argument('--replications', type=int, default=1000)
+    simulate.add_argument('--weeks', type=int, default=52)
+    simulate.add_argument('--seed', type=int, default=6202)
+
+    render = commands.add_parser('render', help="render the result figures", description=cmd_render.__doc__.strip())
+    render.set_defaults(function=cmd_render)
+    render.add_argument('--force', action='store_true', help="re-render unchanged jobs")
+    render.add_argument('--workers', type=int, default=None)
+    render.add_argument('--only', default=None, help="only jobs whose name contains this text")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.data_dir is not None:
+        args.data_dir = Path(args.data_dir)
+    start = time.perf_counter()
+    status = args.function(args)
+    if args.time:
+        print(f"\n{args.command}: {time.perf_counter() - start:.3f}s", file=sys.stderr)
+    return status or 0
@@ -0,0 +1,95 @@
+"""
+femoasa configuration - paths, operating schedule and financial assumptions
+
+single place for the constants that are repeated at the top of every task
+script (operating schedule, efficiency/reliability, building costs, interest).
+
+author: machas^2 team
+"""
+
+from pathlib import Path
+
+# configuration
+BASE_DIR = Path(__file__).resolve().parent.parent.parent  # go up to isye6202_cw3 directory
+DATA_DIR = BASE_DIR / "data" / "csv_outputs"
+RESULTS_DIR = BASE_DIR / "results"
+
+# operating parameters (factory runs 1 or 2 shifts, warehouses run 2 shifts)
+DAYS_PER_WEEK = 5
+HOURS_PER_SHIFT = 8
+SHIFTS_PER_DAY = 2
+WEEKS_PER_YEAR = 52
+OPERATOR_WEEKS_PER_YEAR = 49  # holidays, sick leave and vacation
+MINUTES_PER_SHIFT = HOURS_PER_SHIFT * 60
+EFFICIENCY = 0.90
+RELIABILITY = 0.98
+EFFECTIVE_AVAILABILITY = EFFICIENCY * RELIABILITY  # 0.882
+
+# building and financial assumptions
+FACTORY_COST_PER_SQFT = 250.0
+WAREHOUSE_COST_PER_SQFT = 200.0
+INTEREST_RATE = 0.10
+HANDLER_HOURLY_COST = 40.0
+
+# finished-goods storage: 20 ft clear height, 70% of the cube usable
+STORAGE_HEIGHT_FT = 20.0
+STORAGE_UTILIZATION = 0.70
+
+# material handling: parts move between processes in kits of 100 parts, a kit
+# takes 150% of the volume and weight of its parts (containers, dunnage)
+KIT_PARTS = 100
+KIT_VOLUME_FACTOR = 1.5
+KIT_WEIGHT_FACTOR = 1.5
+
+# service levels
+OTIF_SERVICE_LEVEL = 0.995
+CLIENT_A_BUFFER_HOURS = 4
+CLIENT_B_BUFFER_HOURS = 12
+CLIENT_A_REPLENISH_HOURS = 1  # client A is replenished every hour
+CLIENT_B_REPLENISH_HOURS = 4  # client B every 4 hours
+
+# geography (miles from the parts factory, clients A north and B south)
+CLIENT_A_MILES = 90
+CLIENT_B_MILES = 110
+MSC_MILES = 250  # materials supply center, weekly inbound kits
+WAREHOUSE_TO_CLIENT_MILES = 5  # near-client warehouses
+
+# trucking (market assumptions: 53 ft dry van, per-mile rate incl. driver)
+TRUCK_SPEED_MPH = 50.0
+TRUCK_COST_PER_MILE = 2.5
+DOCK_HOURS = 1.0  # loading + unloading per trip
+TRAILER_DIMS_IN = (630.0, 100.0, 108.0)  # length, width, usable height
+TRAILER_MAX_LBS = 45000.0
+
+# processes and machine footprints
+# process: (width_ft, depth_ft, overlap_x_ft, overlap_y_ft, group)
+PROCESSES = list('ABCDEFGHIJKLM')
+MACHINE_SPECS = {
+    'A': (14, 14, 2, 2, 'ABCD'),
+    'B': (14, 14, 2, 2, 'ABCD'),
+    'C': (14, 14, 2, 2, 'ABCD'),
+    'D': (14, 14, 2, 2, 'ABCD'),
+    'E': (22, 15, 0, 0, 'EFG'),
+    'F': (22, 15, 0, 0, 'EFG'),
+    'G': (22, 15, 0, 0, 'EFG'),
+    'H': (14, 36, 0, 0, 'HIJ'),
+    'I': (14, 36, 0, 0, 'HIJ'),
+    'J': (14, 36, 0, 0, 'HIJ'),
+    'K': (14, 7, 0, 1, 'KLM'),
+    'L': (14, 7, 0, 1, 'KLM'),
+    'M': (14, 7, 0, 1, 'KLM'),
+}
+
+
+def weekly_hours(shifts=SHIFTS_PER_DAY):
+    """
+    Scheduled hours per week for a given number of shifts per day
+    """
+    return DAYS_PER_WEEK * HOURS_PER_SHIFT * shifts
+
+
+def weekly_capacity_minutes(shifts=SHIFTS_PER_DAY):
+    """
+    Effective minutes per week one machine delivers (after efficiency and reliability)
+    """
+    return weekly_hours(shifts) * 60 * EFFECTIVE_AVAILABILITY
@@ -0,0 +1,318 @@
+"""
+femoasa input data - array loaders for the casework csv files
+
+reads the csv files under data/csv_outputs once and returns them as numpy
+arrays indexed by part (P1..P20), process (A..M) and product, so the engines
+can combine them with matrix products instead of nested dict loops. every
+loader takes an optional data_dir holding the same files, e.g. a synthetic
+instance written by femoasa.synthetic, whose part, process and product counts
+are read from the files. load_snapshot() returns all of them at once from a
+pickle cache that is rebuilt whenever an input file changes.
+
+author: machas^2 team
+"""
+
+import csv
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+
+from femoasa import equipment_catalog, profiling
+from femoasa.config import DATA_DIR, PROCESSES, RESULTS_DIR
+
+PARTS = [f'P{i}' for i in range(1, 21)]
+YEAR_ONE_PRODUCTS = ['A1', 'A2', 'A3', 'B1', 'B2']
+PRODUCTS = ['A1', 'A2', 'A3', 'B1', 'B2', 'A4', 'B3', 'B4']
+YEARS = [1, 2, 3, 4, 5]
+PROCESS_INDEX = {p: i for i, p in enumerate(PROCESSES)}
+SNAPSHOT_DIR = RESULTS_DIR / ".snapshot"
+
+
+def _read_rows(filename, data_dir=None):
+    with open(Path(DATA_DIR if data_dir is None else data_dir) / filename, newline='', encoding='utf-8-sig') as f:
+        return list(csv.reader(f))
+
+
+def _leading_table(rows):
+    """
+    Rows of the first table of a file (below its header, up to the first blank row)
+    """
+    table = []
+    for row in rows[1:]:
+        if not row or not row[0].strip():
+            break
+        table.append(row)
+    return table
+
+
+@profiling.traced()
+def load_routings(data_dir=None):
+    """
+    Process sequence of every part from Parts Specs.csv
+
+    Returns:
+        dict {part: [process, ...]} in part order P1..P20
+    """
+    rows = _read_rows('Parts Specs.csv', data_dir)
+    return {row[0].strip(): [s.strip() for s in row[1:] if s.strip()] for row in _leading_table(rows)}
+
+
+@profiling.traced()
+def load_step_times(data_dir=None):
+    """
+    Processing time (min/unit) of every routing step from Parts_Step_Time.csv
+
+    Returns:
+        dict {part: [minutes, ...]} aligned with load_routings()
+    """
+    rows = _read_rows('Parts_Step_Time.csv', data_dir)
+    return {row[0].strip(): [float(s) for s in row[1:] if s.strip()] for row in _leading_table(rows)}
+
+
+def load_processes(data_dir=None):
+    """
+    Processes used by the routings, in the order of Equip+Operator Specs.csv
+
+    Returns:
+        list of process names (A..M for the casework data)
+    """
+    used = {s for steps in load_routings(data_dir).values() for s in steps}
+    rows = _read_rows('Equip+Operator Specs.csv', data_dir)
+    return [row[0].strip() for row in _leading_table(rows) if row[0].strip() in used]
+
+
+def load_equipment_specs(data_dir=None):
+    """
+    Installed price, relocation cost, useful life and crew of every equipment type
+
+    Returns:
+        dict {equipment: {'price', 'relocation', 'life_years', 'operators'}}
+    """
+    rows = _read_rows('Equip+Operator Specs.csv', data_dir)
+    return {row[0].strip(): {'price': float(row[1]), 'relocation': float(row[2]), 'life_years': float(row[3]),
+                             'operators': row[4].strip()}
+            for row in _leading_table(rows)}
+
+
+@profiling.traced()
+def load_part_dimensions(data_dir=None):
+    """
+    Unit dimensions, weight and price of every part (second table of Parts Specs.csv)
+
+    Returns:
+        dict of arrays (20,): 'x_in', 'y_in', 'z_in', 'volume_cuft', 'weight_lbs', 'price'
+    """
+    rows = _read_rows('Parts Specs.csv', data_dir)
+    parts = list(load_routings(data_dir))
+    first = len(parts) + 1
+    table = {row[0].strip(): row for row in rows[first:] if row and row[0].strip() in parts}
+    values = np.array([[float(v) for v in table[p][1:6]] for p in parts])
+
+    return {
+        'x_in': values[:, 0],
+        'y_in': values[:, 1],
+        'z_in': values[:, 2],
+        'volume_cuft': values[:, 0] * values[:, 1] * values[:, 2] / 1728.0,
+        'weight_lbs': values[:, 3],
+        'price': values[:, 4],
+    }
+
+
+@profiling.traced()
+def load_year_one_demand(data_dir=None):
+    """
+    Year +1 weekly product demand, its coefficient of variation and the BOM
+
+    Returns:
+        dict: 'products' (5,), 'weekly' (5,) units/week, 'cv' (5,),
+        'bom' (20, 5) parts per product unit
+    """
+    demand_rows = _read_rows('+1 Year Product Demand.csv', data_dir)
+    products = [h.strip() for h in demand_rows[11][1:] if h.strip() and h.strip() != 'Total']
+    n = len(products)
+    weekly = np.array([float(v) for v in demand_rows[12][1:n + 1]])
+    cv = np.array([float(v) for v in demand_rows[16][1:n + 1]])
+
+    parts = list(load_routings(data_dir))
+    index = {p: k for k, p in enumerate(parts)}
+    bom_rows = _read_rows('+1 Year Parts per Product.csv', data_dir)
+    bom = np.zeros((len(parts), n))
+    for row in bom_rows[2:]:
+        if row and row[0].strip() in index:
+            bom[index[row[0].strip()]] = [float(v) if v.strip() else 0.0 for v in row[1:n + 1]]
+
+    return {'products': products, 'weekly': weekly, 'cv': cv, 'bom': bom}
+
+
+def load_year_one_weekly_part_demand(data_dir=None):
+    """
+    Weekly demand per part for Year +1 (weekly product demand x parts per product)
+
+    Returns:
+        array (20,) units per week in part order P1..P20
+    """
+    demand = load_year_one_demand(data_dir)
+    return demand['bom'] @ demand['weekly']
+
+
+def _section_rows(rows, title):
+    """
+    Data rows of a titled table (title row, header row, rows up to the first blank row)
+    """
+    start = next(i for i, row in enumerate(rows) if row and row[0].strip() == title)
+    header = [h.strip() for h in rows[start + 1]]
+    table = []
+    for row in rows[start + 2:]:
+        if not any(cell.strip() for cell in row):
+            break
+        table.append(dict(zip(header, row)))
+    return table
+
+
+WEEKLY_SECTION = 'Expected Average Weekly Demand for Each Product in the +2 to +5 Year Horizon'
+CV_SECTION = 'Expected Coefficient of Variation of Weekly Demand for Each Product in the +2 to +5 Year Horizon'
+
+
+@profiling.traced()
+def load_multi_year_demand(data_dir=None):
+    """
+    Weekly product demand, its coefficient of variation and the BOM for Years 1-5
+
+    Year 1 comes from the +1 Year file (products A4, B3 and B4 are not
+    demanded yet), Years 2-5 from the +2 to +5 Year file.
+
+    Returns:
+        dict: 'years' (5,), 'products' (8,), 'weekly' (5, 8) units/week,
+        'cv' (5, 8), 'bom' (20, 8) parts per product unit
+    """
+    rows = _read_rows('+2 to +5 Year Product Demand.csv', data_dir)
+    weekly_rows = _section_rows(rows, WEEKLY_SECTION)
+    products = [h for h in weekly_rows[0] if h not in ('Year', 'Total', '')]
+    years = [1] + [int(float(row['Year'])) for row in weekly_rows]
+
+    year_one = load_year_one_demand(data_dir)
+    first = [products.index(p) for p in year_one['products']]
+    weekly = np.zeros((len(years), len(products)))
+    cv = np.zeros((len(years), len(products)))
+    weekly[0, first] = year_one['weekly']
+    cv[0, first] = year_one['cv']
+
+    for values, title in [(weekly, WEEKLY_SECTION), (cv, CV_SECTION)]:
+        for row in _section_rows(rows, title):
+            year = int(float(row['Year']))
+            if year in years:
+                values[years.index(year)] = [float(row[p] or 0.0) for p in products]
+
+    parts = list(load_routings(data_dir))
+    index = {p: k for k, p in enumerate(parts)}
+    bom_rows = _read_rows('+2 to +5 Year Parts per Product.csv', data_dir)
+    bom = np.zeros((len(parts), len(products)))
+    for row in bom_rows[2:]:
+        if len(row) > 1 and row[1].strip() in index:
+            bom[index[row[1].strip()]] = [float(v) if v.strip() else 0.0 for v in row[2:2 + len(products)]]
+
+    return {'years': years, 'products': products, 'weekly': weekly, 'cv': cv, 'bom': bom}
+
+
+def workload_matrix(routings=None, step_times=None, processes=PROCESSES):
+    """
+    Processing minutes per unit of each part at each process
+
+    Returns:
+        array (parts, processes), repeated steps on the same process are summed
+    """
+    routings = load_routings() if routings is None else routings
+    step_times = load_step_times() if step_times is None else step_times
+    index = {p: i for i, p in enumerate(processes)}
+    minutes = np.zeros((len(routings), len(processes)))
+    for k, (part, steps) in enumerate(routings.items()):
+        np.add.at(minutes[k], [index[s] for s in steps], step_times[part][:len(steps)])
+    return minutes
+
+
+def routing_transitions(routings=None, processes=PROCESSES):
+    """
+    Transition tensor of the routings
+
+    Returns:
+        array (parts, processes, processes): number of moves from process i
+        to process j per unit of each part
+    """
+    routings = load_routings() if routings is None else routings
+    index = {p: i for i, p in enumerate(processes)}
+    transitions = np.zeros((len(routings), len(processes), len(processes)))
+    for k, steps in enumerate(routings.values()):
+        src = [index[s] for s in steps[:-1]]
+        dst = [index[s] for s in steps[1:]]
+        np.add.at(transitions[k], (src, dst), 1.0)
+    return transitions
+
+
+def _snapshot_key(data_dir):
+    """
+    Fingerprint of the input files (name, size, modification time)
+    """
+    files = sorted(Path(data_dir).glob('*.csv'))
+    stamp = [(f.name, f.stat().st_size, f.stat().st_mtime_ns) for f in files]
+    return hashlib.sha1(repr(stamp).encode()).hexdigest()
+
+
+def build_snapshot(data_dir=None):
+    """
+    Every parsed input of an instance plus the derived routing arrays
+
+    Returns:
+        dict: 'routings', 'step_times', 'processes', 'dimensions', 'demand'
+        (load_multi_year_demand()), 'equipment_specs', 'catalog'
+        (equipment_catalog.build_catalog()), 'workload' (parts, processes)
+        minutes per unit, 'transitions' (parts, processes, processes)
+    """
+    routings = load_routings(data_dir)
+    step_times = load_step_times(data_dir)
+    processes = load_processes(data_dir)
+    return {
+        'routings': routings,
+        'step_times': step_times,
+        'processes': processes,
+        'dimensions': load_part_dimensions(data_dir),
+        'demand': load_multi_year_demand(data_dir),
+        'equipment_specs': load_equipment_specs(data_dir),
+        'catalog': equipment_catalog.build_catalog(Path(DATA_DIR if data_dir is None else data_dir)
+                                                   / 'Equip+Operator Specs.csv', processes),
+        'workload': workload_matrix(routings, step_times, processes),
+        'transitions': routing_transitions(routings, processes),
+    }
+
+
+@profiling.traced()
+def load_snapshot(data_dir=None, cache_dir=SNAPSHOT_DIR):
+    """
+    build_snapshot() of an instance, cached as one pickle per data directory
+
+    The cache is rebuilt when any csv file of the instance was added, removed
+    or modified since it was written; cache_dir=None disables it.
+    """
+    data_dir = Path(DATA_DIR if data_dir is None else data_dir).resolve()
+    if cache_dir is None:
+        return build_snapshot(data_dir)
+
+    key = _snapshot_key(data_dir)
+    path = Path(cache_dir) / f"snapshot_{hashlib.sha1(str(data_dir).encode()).hexdigest()[:12]}.pkl"
+    try:
+        with open(path, 'rb') as f:
+            cached = pickle.load(f)
+        if cached['key'] == key:
+            return cached['inputs']
+    except (OSError, EOFError, KeyError, pickle.UnpicklingError):
+        pass
+
+    inputs = build_snapshot(data_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(f'.{os.getpid()}.tmp')
+    with open(partial, 'wb') as f:
+        pickle.dump({'key': key, 'data_dir': str(data_dir), 'inputs': inputs}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(partial, path)
+    return inputs
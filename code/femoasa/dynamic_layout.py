@@ -0,0 +1,296 @@
+"""
+femoasa dynamic layout - multi-period block layout with relocation costs
+
+each year's layout used to be drawn on its own (Year 1 F4 210x195, Year 5 F4
+298x292, one YearN layout script per year), so moving blocks between years
+was never priced. the dynamic facility layout problem picks one layout per
+year to minimize the npv of
+
+    sum over years of  handling cost (flow x distance, $ per ft from material_handling)
+  + sum over year changes of  relocation cost of the blocks that move
+    (Equip+Operator Specs.csv relocation cost x machines of the block)
+
+blocks (one per process of a center) sit on equal-area slots of a grid whose
+pitch comes from the mean block footprint of each year (the grid grows with
+the machine counts, so the flow weights of a year are scaled by its pitch
+relative to the slot grid of the largest year). the solver follows the classic
+two-stage scheme:
+
+1. candidate pools: multi-start pairwise-swap local search per year; the swap
+   gains of all pairs come from one matrix A = S @ D (S symmetric flow
+   weights, D slot distances of the blocks) that is updated in O(n^2) after
+   every swap instead of re-evaluating the layout; starts run in a process pool
+2. dynamic program over the union of the pools (Rosenblatt): best plan ending
+   in each candidate per year, relocation charged between consecutive years
+
+    problem = layout_problem(organization='fractal_f4')
+    plan = solve(problem, starts=16, workers=4)
+
+author: machas^2 team
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from femoasa import capacity, cost_engine, data, equipment_catalog, material_handling
+from femoasa.config import INTEREST_RATE, MACHINE_SPECS, SHIFTS_PER_DAY
+
+DEFAULT_SEARCH = {
+    'starts': 16,           # random starts per year
+    'aisle_factor': 0.25,   # slot area = mean block footprint x (1 + aisle factor)
+    'seed': 6202,
+}
+
+
+def slot_grid(n_blocks, pitch):
+    """
+    Slot centroids (ft) of a near-square grid with room for n_blocks
+
+    Returns:
+        array (slots, 2), slots = rows x cols >= n_blocks
+    """
+    cols = int(np.ceil(np.sqrt(n_blocks)))
+    rows = int(np.ceil(n_blocks / cols))
+    r, c = np.divmod(np.arange(rows * cols), cols)
+    return np.column_stack([(c + 0.5) * pitch, (r + 0.5) * pitch])
+
+
+def handling_rates(part_demand, transitions, dimensions, centers=1, shifts=SHIFTS_PER_DAY,
+                   vehicle=material_handling.DEFAULT_VEHICLE):
+    """
+    Annual handling cost per ft of distance between every pair of blocks of one center
+
+    Args:
+        part_demand: array (years, parts) units/week of the whole plant
+        centers: identical centers sharing the demand (fractal f)
+
+    Returns:
+        array (years, processes, processes) $/ft/year (trips x travel time x wage)
+    """
+    rates = []
+    for demand in np.atleast_2d(part_demand) / centers:
+        profile = material_handling.kit_profile(demand, transitions, dimensions)
+        cost = [material_handling.evaluate_handling(profile['flow'], d, profile['volume_cuft'],
+                                                    profile['weight_lbs'], vehicle, shifts)['annual_cost']
+                for d in (0.0, 1.0)]
+        rates.append(cost[1] - cost[0])
+    return np.array(rates)
+
+
+def layout_problem(inputs=None, organization='fractal_f4', shifts=SHIFTS_PER_DAY, interest=INTEREST_RATE,
+                   aisle_factor=DEFAULT_SEARCH['aisle_factor']):
+    """
+    Dynamic layout instance of one center of an organization
+
+    Returns:
+        dict: 'blocks' (process names), 'years', 'centers', 'units' (years,
+        blocks) machines per center, 'weights' (years, blocks, blocks) $/ft/year,
+        'relocation' (years, blocks) cost of moving each block at the start of
+        each year (0 in the first year), 'slots' (slots, 2), 'distance'
+        (slots, slots), 'start' and 'end' discount factors
+    """
+    inputs = data.load_snapshot() if inputs is None else inputs
+    demand = inputs['demand']
+    processes = list(inputs['processes'])
+    f = capacity.num_centers(organization)
+
+    mean = np.asarray(demand['weekly'], dtype=float) @ np.asarray(demand['bom'], dtype=float).T
+    workload = capacity.part_workload(mean, inputs['workload'])
+    units = capacity.equipment_requirements(workload, organization, capacity.machine_capacity(shifts)) / f
+
+    # block footprint: machines x machine footprint (synthetic processes reuse a casework template)
+    templates = list(MACHINE_SPECS)
+    footprint = np.array([np.prod(MACHINE_SPECS[p if p in MACHINE_SPECS else templates[k % len(templates)]][:2])
+                          for k, p in enumerate(processes)], dtype=float)
+    pitch = np.sqrt((units * footprint).mean(axis=1) * (1.0 + aisle_factor))
+    slots = slot_grid(len(processes), pitch.max())
+    weights = handling_rates(mean, inputs['transitions'], inputs['dimensions'], f, shifts)
+
+    catalog = inputs.get('catalog') or equipment_catalog.load_catalog()
+    per_machine = catalog['relocation'][equipment_catalog.lookup(catalog, processes)]
+    # blocks moved at the start of year t carry the machines installed up to year t-1
+    relocation = np.vstack([np.zeros(len(processes)), units[:-1] * per_machine])
+
+    start, end = cost_engine.discount_factors(len(demand['years']), interest)
+    return {
+        'blocks': processes,
+        'years': list(demand['years']),
+        'centers': f,
+        'units': units,
+        'weights': weights * (pitch / pitch.max())[:, None, None],
+        'relocation': relocation,
+        'slots': slots,
+        'distance': material_handling.centroid_distances(slots),
+        'start': start,
+        'end': end,
+    }
+
+
+def layout_costs(weights, distance, layouts):
+    """
+    Handling cost of every layout in every year
+
+    Args:
+        weights: array (years, blocks, blocks)
+        layouts: int array (layouts, blocks) slot of every block
+
+    Returns:
+        array (years, layouts)
+    """
+    layouts = np.atleast_2d(layouts)
+    pair_distance = distance[layouts[:, :, None], layouts[:, None, :]]
+    return np.einsum('tij,kij->tk', weights, pair_distance)
+
+
+def relocation_costs(layouts, relocation):
+    """
+    Cost of going from every layout to every other one at the start of each year
+
+    Args:
+        layouts: int array (layouts, blocks)
+        relocation: array (years, blocks) cost of moving each block
+
+    Returns:
+        array (years, layouts, layouts), [t, a, b] = layout a in year t-1 -> b in year t
+    """
+    moved = (layouts[:, None, :] != layouts[None, :, :]).astype(float)
+    return np.einsum('abi,ti->tab', moved, relocation)
+
+
+def local_search(weights, distance, layout):
+    """
+    Best-improvement pairwise swaps until no swap lowers the handling cost
+
+    Args:
+        weights: array (blocks, blocks) flow weights of one year
+        distance: array (slots, slots)
+        layout: int array (slots,) slot of every block, empty slots last
+            (a permutation of the slots)
+
+    Returns:
+        (layout permutation, handling cost, swaps made)
+    """
+    n_slots = len(distance)
+    n = len(weights)
+    s = np.zeros((n_slots, n_slots))
+    s[:n, :n] = weights + weights.T
+    np.fill_diagonal(s, 0.0)
+    perm = np.array(layout, dtype=np.intp)
+    d = distance[perm[:, None], perm[None, :]]
+    a = s @ d
+    swaps = 0
+    while True:
+        # gain of swapping blocks r and s for all pairs at once
+        diag = np.diagonal(a)
+        delta = a + a.T - diag[:, None] - diag[None, :] + 2.0 * s * d
+        np.fill_diagonal(delta, 0.0)
+        r, c = np.unravel_index(np.argmin(delta), delta.shape)
+        if delta[r, c] >= -1e-9 * max(1.0, abs(diag.sum())):
+            break
+        perm[[r, c]] = perm[[c, r]]
+        new = distance[perm[[r, c]][:, None], perm[None, :]]
+        change = new - d[[r, c]]
+        # rows r, c of d change (and by symmetry columns r, c): rank-2 update, then the two columns exactly
+        d[[r, c]] = new
+        d[:, [r, c]] = new.T
+        a += s[:, [r, c]] @ change
+        a[:, [r, c]] = s @ d[:, [r, c]]
+        swaps += 1
+    return perm, 0.5 * float((s * d).sum()), swaps
+
+
+def _search_task(task):
+    weights, distance, seed, starts = task
+    rng = np.random.default_rng(seed)
+    return [local_search(weights, distance, rng.permutation(len(distance)))[0] for _ in range(starts)]
+
+
+def candidate_pools(problem, starts=DEFAULT_SEARCH['starts'], seed=DEFAULT_SEARCH['seed'], workers=None):
+    """
+    Local optima of every year from random starts, starts spread over a process pool
+
+    Returns:
+        int array (candidates, blocks) unique layouts of all years
+    """
+    workers = os.cpu_count() if workers is None else workers
+    years = len(problem['years'])
+    chunks = max(1, min(workers, starts))
+    seeds = np.random.SeedSequence(seed).spawn(years * chunks)
+    tasks = [(problem['weights'][t], problem['distance'], seeds[t * chunks + k], len(part))
+             for t in range(years) for k, part in enumerate(np.array_split(np.arange(starts), chunks)) if len(part)]
+
+    if workers <= 1 or len(tasks) == 1:
+        results = [_search_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_search_task, tasks))
+
+    layouts = np.array([perm[:len(problem['blocks'])] for result in results for perm in result])
+    return np.unique(layouts, axis=0)
+
+
+def plan_dp(handling, relocation):
+    """
+    Cheapest sequence of candidates (Rosenblatt's dynamic program)
+
+    Args:
+        handling: array (years, candidates) discounted handling cost
+        relocation: array (years, candidates, candidates) discounted relocation cost
+
+    Returns:
+        int array (years,) candidate of every year
+    """
+    years = len(handling)
+    value = handling[0].copy()
+    best_previous = np.zeros(handling.shape, dtype=np.intp)
+    for t in range(1, years):
+        total = value[:, None] + relocation[t]
+        best_previous[t] = np.argmin(total, axis=0)
+        value = total[best_previous[t], np.arange(total.shape[1])] + handling[t]
+    plan = [int(np.argmin(value))]
+    for t in range(years - 1, 0, -1):
+        plan.append(int(best_previous[t][plan[-1]]))
+    return np.array(plan[::-1])
+
+
+def _plan_summary(problem, layouts, handling, relocation, choice):
+    years = np.arange(len(choice))
+    moves = np.zeros(len(choice), dtype=float)
+    moves[1:] = relocation[years[1:], choice[:-1], choice[1:]]
+    f = problem['centers']
+    return {
+        'layouts': layouts[choice],
+        'handling_cost': handling[years, choice] * f,
+        'relocation_cost': moves * f,
+        'blocks_moved': np.concatenate([[0], (layouts[choice[1:]] != layouts[choice[:-1]]).sum(axis=1)]),
+        'npv': float(((handling[years, choice] * problem['end']).sum() + (moves * problem['start']).sum()) * f),
+    }
+
+
+def solve(problem, starts=DEFAULT_SEARCH['starts'], seed=DEFAULT_SEARCH['seed'], workers=None, pool=None):
+    """
+    Dynamic layout plan of a layout_problem(), with the static and year-by-year plans for reference
+
+    Returns:
+        dict: 'dynamic', 'independent' (best layout of each year on its own)
+        and 'static' (one layout for every year) plans, each with 'layouts'
+        (years, blocks) slots, 'handling_cost' and 'relocation_cost' (years,)
+        undiscounted $ for all centers, 'blocks_moved' (years,) and 'npv';
+        'candidates' (candidates, blocks)
+    """
+    layouts = candidate_pools(problem, starts, seed, workers) if pool is None else np.asarray(pool)
+    handling = layout_costs(problem['weights'], problem['distance'], layouts)
+    relocation = relocation_costs(layouts, problem['relocation'])
+
+    discounted_handling = handling * problem['end'][:, None]
+    discounted_relocation = relocation * problem['start'][:, None, None]
+    static = np.argmin(discounted_handling.sum(axis=0))
+    return {
+        'dynamic': _plan_summary(problem, layouts, handling, relocation,
+                                 plan_dp(discounted_handling, discounted_relocation)),
+        'independent': _plan_summary(problem, layouts, handling, relocation, np.argmin(handling, axis=1)),
+        'static': _plan_summary(problem, layouts, handling, relocation, np.full(len(handling), static)),
+        'candidates': layouts,
+    }
@@ -0,0 +1,146 @@
+"""
+femoasa equipment catalog - keyed equipment-spec index
+
+compiles Equip+Operator Specs.csv once into dense integer ids and contiguous
+numpy arrays (price, relocation, life, operator fte, hourly labor cost,
+process capability). cost and optimizer code indexes these arrays directly
+instead of filtering a dataframe per process, so costing can sit inside
+optimizer inner loops.
+
+    catalog = load_catalog()
+    ids = lookup(catalog, ['A', 'D', 'H'])
+    capital = units @ catalog['price'][ids]
+
+author: machas^2 team
+"""
+
+import csv
+import re
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+
+from femoasa.config import DATA_DIR, PROCESSES
+
+OPERATOR_PATTERN = re.compile(r'(\d+(?:/\d+)?)\s*(C\d)')
+
+
+def parse_operators(operator_str):
+    """
+    Parse an operator requirement such as "1 C1+1/4 C2" or "1/2 C2"
+
+    Returns:
+        dict {operator class: fte per equipment unit}
+    """
+    staffing = {}
+    for qty, op_class in OPERATOR_PATTERN.findall(str(operator_str)):
+        staffing[op_class] = staffing.get(op_class, 0.0) + float(Fraction(qty))
+    return staffing
+
+
+def _read_spec_tables(path):
+    """
+    Split the spec file into equipment rows and the operator wage table
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f))
+
+    equipment_rows = []
+    wages = {}
+    in_wages = False
+    for row in rows[1:]:
+        if not row or not row[0].strip():
+            continue
+        if row[0].strip() == 'Operator':
+            in_wages = True
+            continue
+        if in_wages:
+            wages[row[0].strip()] = float(row[1])
+        else:
+            equipment_rows.append(row)
+
+    return equipment_rows, wages
+
+
+def build_catalog(path=None, processes=None):
+    """
+    Compile the equipment spec file into dense arrays
+
+    Args:
+        processes: process codes of the instance (default A-M); each needs an
+            equipment type of the same code
+
+    Returns:
+        dict with
+        - 'names': equipment codes in file order, 'ids': {code: dense id}
+        - 'price', 'relocation', 'life', 'fte', 'hourly_cost': float arrays (E,)
+          (fte = operators per unit, hourly_cost = $ per installed unit-hour)
+        - 'operator_classes', 'wages' (C,), 'staffing' (E, C) fte per class
+        - 'capability': bool (E, P), equipment type can perform each process
+        - 'process_equipment': (P,) id of the dedicated equipment for each process
+    """
+    path = DATA_DIR / 'Equip+Operator Specs.csv' if path is None else path
+    processes = list(PROCESSES if processes is None else processes)
+    equipment_rows, wages = _read_spec_tables(path)
+
+    names = [row[0].strip() for row in equipment_rows]
+    operator_classes = sorted(wages)
+    staffing = np.zeros((len(names), len(operator_classes)))
+    for e, row in enumerate(equipment_rows):
+        for op_class, fte in parse_operators(row[4]).items():
+            staffing[e, operator_classes.index(op_class)] = fte
+    wage_array = np.array([wages[c] for c in operator_classes])
+
+    # exact codes: synthetic instances name processes A..Z, AA, AB, ...
+    capability = np.array([[p == name for p in processes] for name in names], dtype=bool)
+    ids = {name: e for e, name in enumerate(names)}
+
+    return {
+        'names': names,
+        'ids': ids,
+        'price': np.ascontiguousarray([float(row[1]) for row in equipment_rows]),
+        'relocation': np.ascontiguousarray([float(row[2] or 0) for row in equipment_rows]),
+        'life': np.ascontiguousarray([float(row[3] or 10) for row in equipment_rows]),
+        'fte': staffing.sum(axis=1),
+        'hourly_cost': staffing @ wage_array,
+        'operator_classes': operator_classes,
+        'wages': wage_array,
+        'staffing': staffing,
+        'capability': capability,
+        'process_equipment': np.array([ids[p] for p in processes], dtype=np.intp),
+    }
+
+
+@lru_cache(maxsize=None)
+def _cached_catalog(path, processes):
+    return build_catalog(path, processes)
+
+
+def load_catalog(path=None, processes=None):
+    """
+    Catalog for the spec file, compiled once per process
+    """
+    return _cached_catalog(str(DATA_DIR / 'Equip+Operator Specs.csv' if path is None else path),
+                           None if processes is None else tuple(processes))
+
+
+def lookup(catalog, names):
+    """
+    Dense ids for a sequence of equipment codes (raises KeyError on unknown codes)
+    """
+    ids = catalog['ids']
+    try:
+        return np.array([ids[str(name).strip()] for name in names], dtype=np.intp)
+    except KeyError as e:
+        raise KeyError(f"No cost data found for equipment {e.args[0]}") from None
+
+
+def counts_array(counts_by_year, catalog):
+    """
+    Build a (years, equipment types) array from a list of {equipment: units} dicts
+    """
+    array = np.zeros((len(counts_by_year), len(catalog['names'])))
+    for y, counts in enumerate(counts_by_year):
+        array[y, lookup(catalog, counts.keys())] = list(counts.values())
+    return array
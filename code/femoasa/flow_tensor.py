@@ -0,0 +1,244 @@
+"""
+femoasa flow tensor - sparse year x part x from x to material flows
+
+the part flow scripts used to write one row per year and part with all
+169 A_A..M_M transition columns (almost all zero) and the functional scripts
+rebuilt each 13x13 matrix from those columns with .loc. the tensor keeps only
+the nonzero flows as coordinate arrays:
+
+    {'years': [...], 'parts': [...], 'processes': [...],
+     'year', 'part', 'src', 'dst': int index arrays (nnz,), 'flow': (nnz,)}
+
+so its size grows with the routing steps, not with processes^2. aggregation
+by year, part, part group or organization is one bincount over the entries
+(dense result) or one coo -> csr conversion (sparse result), the file format
+is a compressed npz of the same arrays and the tidy edge table is the csv view:
+
+    tensor = from_routings(part_demand, data.load_routings(), years=['Year 1', ...])
+    matrices = aggregate(tensor, 'year')          # (years, processes, processes)
+    save(tensor, 'Flow_Tensor_All_Years.npz')
+
+author: machas^2 team
+"""
+
+import re
+from pathlib import Path
+
+import numpy as np
+
+from femoasa.config import PROCESSES
+
+INDEX_KEYS = ['year', 'part', 'src', 'dst']
+AGGREGATIONS = ['total', 'year', 'part', 'year_part', 'group', 'year_group']
+
+
+def year_sort_key(label):
+    """
+    Sort 'Year 10' after 'Year 9'
+    """
+    digits = re.sub(r'\D', '', str(label))
+    return (int(digits) if digits else 0, str(label))
+
+
+def _tensor(years, parts, processes, year, part, src, dst, flow):
+    return {
+        'years': list(years), 'parts': list(parts), 'processes': list(processes),
+        'year': np.asarray(year, dtype=np.int64), 'part': np.asarray(part, dtype=np.int64),
+        'src': np.asarray(src, dtype=np.int64), 'dst': np.asarray(dst, dtype=np.int64),
+        'flow': np.asarray(flow, dtype=float),
+    }
+
+
+def shape(tensor):
+    return len(tensor['years']), len(tensor['parts']), len(tensor['processes']), len(tensor['processes'])
+
+
+def _linear(tensor):
+    _, n_parts, n_proc, _ = shape(tensor)
+    return ((tensor['year'] * n_parts + tensor['part']) * n_proc + tensor['src']) * n_proc + tensor['dst']
+
+
+def coalesce(tensor):
+    """
+    One entry per (year, part, from, to): duplicate moves summed, zero flows dropped, entries sorted
+    """
+    index, inverse = np.unique(_linear(tensor), return_inverse=True)
+    flow = np.bincount(inverse.ravel(), weights=tensor['flow'], minlength=len(index))
+    keep = flow != 0.0
+    coords = np.unravel_index(index[keep], shape(tensor))
+    return _tensor(tensor['years'], tensor['parts'], tensor['processes'], *coords, flow[keep])
+
+
+def from_routings(part_demand, routings, processes=PROCESSES, years=None):
+    """
+    Flow tensor of weekly part demand moving along the routings
+
+    Args:
+        part_demand: array (years, parts) units/week, parts in routings order
+        routings: dict {part: [process, ...]} (data.load_routings())
+        years: year labels (default 1..n)
+
+    Returns:
+        coalesced tensor, flow in parts/week
+    """
+    demand = np.atleast_2d(np.asarray(part_demand, dtype=float))
+    index = {p: i for i, p in enumerate(processes)}
+    steps = [[index[s] for s in route] for route in routings.values()]
+    # one entry per routing move, shared by all years
+    part = np.concatenate([np.full(max(len(s) - 1, 0), k) for k, s in enumerate(steps)]).astype(np.int64)
+    src = np.concatenate([s[:-1] for s in steps]).astype(np.int64)
+    dst = np.concatenate([s[1:] for s in steps]).astype(np.int64)
+
+    n_years, n_moves = demand.shape[0], len(part)
+    year = np.repeat(np.arange(n_years), n_moves)
+    years = list(range(1, n_years + 1)) if years is None else years
+    return coalesce(_tensor(years, routings, processes, year, np.tile(part, n_years), np.tile(src, n_years),
+                            np.tile(dst, n_years), demand[:, part].ravel()))
+
+
+def from_edges(edges, processes=None):
+    """
+    Flow tensor of a tidy edge table (Year, Part, From, To, Flow)
+    """
+    years = sorted(edges['Year'].unique(), key=year_sort_key)
+    parts = list(dict.fromkeys(edges['Part']))
+    processes = sorted(set(edges['From']) | set(edges['To'])) if processes is None else processes
+    lookup = lambda labels: {label: i for i, label in enumerate(labels)}
+    coords = [edges[column].map(lookup(labels)).to_numpy()
+              for column, labels in [('Year', years), ('Part', parts), ('From', processes), ('To', processes)]]
+    return coalesce(_tensor(years, parts, processes, *coords, edges['Flow'].to_numpy(dtype=float)))
+
+
+def to_edges(tensor):
+    """
+    Tidy edge table of the tensor (the csv view)
+
+    Returns:
+        dataframe: Year, Part, From, To, Flow sorted by labels
+    """
+    import pandas as pd
+
+    labels = lambda key, axis: np.asarray(tensor[axis], dtype=object)[tensor[key]]
+    edges = pd.DataFrame({
+        'Year': labels('year', 'years'),
+        'Part': labels('part', 'parts'),
+        'From': labels('src', 'processes'),
+        'To': labels('dst', 'processes'),
+        'Flow': tensor['flow'],
+    })
+    return edges.sort_values(['Year', 'Part', 'From', 'To'], kind='stable').reset_index(drop=True)
+
+
+def group_index(tensor, groups):
+    """
+    Group labels and the group of every part
+
+    Args:
+        groups: {part: group} or a sequence aligned with tensor['parts']
+
+    Returns:
+        (labels in order of first appearance, array (parts,) of group ids)
+    """
+    if isinstance(groups, dict):
+        groups = [groups[p] for p in tensor['parts']]
+    labels = list(dict.fromkeys(groups))
+    lookup = {label: i for i, label in enumerate(labels)}
+    return labels, np.array([lookup[g] for g in groups], dtype=np.int64)
+
+
+def _outer(tensor, by, groups):
+    """
+    Leading index of every entry and the size of the leading axes for an aggregation
+    """
+    if by not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation {by!r} (one of {', '.join(AGGREGATIONS)})")
+    n_years, n_parts, _, _ = shape(tensor)
+    if by == 'total':
+        return np.zeros_like(tensor['year']), ()
+    if by == 'year':
+        return tensor['year'], (n_years,)
+    if by == 'part':
+        return tensor['part'], (n_parts,)
+    if by == 'year_part':
+        return tensor['year'] * n_parts + tensor['part'], (n_years, n_parts)
+    if groups is None:
+        raise ValueError(f"Aggregation {by!r} needs groups")
+    labels, group = group_index(tensor, groups)
+    if by == 'group':
+        return group[tensor['part']], (len(labels),)
+    return tensor['year'] * len(labels) + group[tensor['part']], (n_years, len(labels))
+
+
+def aggregate(tensor, by='year', groups=None):
+    """
+    Dense from-to flow matrices summed over everything but the `by` axes
+
+    Args:
+        by: 'total' (P, P), 'year' (years, P, P), 'part' (parts, P, P),
+            'year_part' (years, parts, P, P), 'group' (groups, P, P) or
+            'year_group' (years, groups, P, P)
+        groups: part groups for the group aggregations (see group_index())
+
+    Returns:
+        array, built in O(nnz + result size)
+    """
+    outer, lead = _outer(tensor, by, groups)
+    n_proc = len(tensor['processes'])
+    cells = (outer * n_proc + tensor['src']) * n_proc + tensor['dst']
+    size = int(np.prod(lead, dtype=np.int64)) * n_proc * n_proc
+    return np.bincount(cells, weights=tensor['flow'], minlength=size).reshape(lead + (n_proc, n_proc))
+
+
+def to_sparse(tensor, by='year', groups=None):
+    """
+    Sparse version of aggregate() for large process counts
+
+    Returns:
+        scipy.sparse csr matrix (prod of the `by` axes, P * P); row r reshaped
+        to (P, P) is the from-to matrix of the r-th year / part / group
+    """
+    from scipy import sparse
+
+    outer, lead = _outer(tensor, by, groups)
+    n_proc = len(tensor['processes'])
+    n_rows = int(np.prod(lead, dtype=np.int64))
+    return sparse.coo_matrix((tensor['flow'], (outer, tensor['src'] * n_proc + tensor['dst'])),
+                             shape=(n_rows, n_proc * n_proc)).tocsr()
+
+
+def organization_flows(tensor, organization='functional'):
+    """
+    From-to flows inside one center of an organization, per year
+
+    functional: one center with all parts, (years, P, P)
+    part: one cell per part, (years, parts, P, P)
+    fractal_fN: N identical centers with 1/N of every part, (years, P, P)
+    """
+    from femoasa import capacity
+
+    if organization == 'part':
+        return aggregate(tensor, 'year_part')
+    return aggregate(tensor, 'year') / capacity.num_centers(organization)
+
+
+def _index_dtype(n):
+    return np.uint8 if n <= 2 ** 8 else np.uint16 if n <= 2 ** 16 else np.uint32
+
+
+def save(tensor, path):
+    """
+    Write the tensor as a compressed npz (smallest unsigned index types, labels as strings)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sizes = dict(zip(INDEX_KEYS, shape(tensor)))
+    arrays = {key: tensor[key].astype(_index_dtype(sizes[key])) for key in INDEX_KEYS}
+    labels = {axis: np.array([str(v) for v in tensor[axis]]) for axis in ['years', 'parts', 'processes']}
+    np.savez_compressed(path, flow=tensor['flow'], **arrays, **labels)
+    return path
+
+
+def load(path):
+    with np.load(path, allow_pickle=False) as f:
+        return _tensor(f['years'].tolist(), f['parts'].tolist(), f['processes'].tolist(),
+                       *[f[key] for key in INDEX_KEYS], f['flow'])
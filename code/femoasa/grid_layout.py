@@ -0,0 +1,144 @@
+"""
+femoasa grid layout - grid block of one process and its machine rectangles
+
+a process block is a rows x cols grid of identical machines; neighbours share
+overlap_x / overlap_y ft (the shareability rules in config.MACHINE_SPECS).
+find_optimal_grid scores every rows x ceil(count / rows) grid on wasted slots,
+area, aspect ratio, utilization and perimeter and keeps the lowest score, the
+rule of the task 4 grid optimizer script:
+
+    w, h, ox, oy, _ = MACHINE_SPECS['A']
+    best = find_optimal_grid(16, w, h, ox, oy, 'A')   # best['layout_grid'] == '4×4'
+    rects = grid_rects(best['rows'], best['cols'], 16, w, h, ox, oy)
+
+numpy only, so the command line can size blocks without pandas or matplotlib.
+
+author: machas^2 team
+"""
+
+import math
+
+import numpy as np
+
+from femoasa.config import MACHINE_SPECS
+
+
+def calculate_block_dimensions(rows, cols, machine_w, machine_h, overlap_x, overlap_y):
+    """
+    Block dimensions of a rows x cols grid with shared overlaps
+
+    Args:
+        rows, cols: grid dimensions
+        machine_w, machine_h: individual machine dimensions (ft)
+        overlap_x, overlap_y: ft shared by horizontal / vertical neighbours
+
+    Returns:
+        (block_width, block_depth, block_area)
+    """
+    if rows == 0 or cols == 0:
+        return 0, 0, 0
+    block_width = cols * machine_w - (cols - 1) * overlap_x if overlap_x > 0 else cols * machine_w
+    block_depth = rows * machine_h - (rows - 1) * overlap_y if overlap_y > 0 else rows * machine_h
+    return block_width, block_depth, block_width * block_depth
+
+
+def calculate_optimization_score(machine_count, rows, cols, block_area, aspect_ratio, utilization):
+    """
+    Composite score of a grid configuration (lower is better)
+
+    Args:
+        machine_count: machines to place
+        rows, cols: grid dimensions
+        block_area: block area (sq ft)
+        aspect_ratio: max(rows, cols) / min(rows, cols)
+        utilization: machine_count / grid slots
+
+    Returns:
+        float score rounded to 2 decimals
+    """
+    waste_penalty = (rows * cols - machine_count) * 100
+    area_factor = block_area / 100
+    aspect_penalty = (aspect_ratio - 1) * 50
+    utilization_bonus = (1 - utilization) * 200
+    perimeter_penalty = 2 * (cols + rows) * 5  # relative perimeter, prefers compact grids
+    return round(waste_penalty + area_factor + aspect_penalty + utilization_bonus + perimeter_penalty, 2)
+
+
+def find_optimal_grid(machine_count, machine_w, machine_h, overlap_x, overlap_y, process_name):
+    """
+    Lowest-score grid configuration for a number of machines
+
+    Args:
+        machine_count: machines to arrange
+        machine_w, machine_h: individual machine dimensions (ft)
+        overlap_x, overlap_y: shared ft between neighbours
+        process_name: process code (its MACHINE_SPECS group is reported)
+
+    Returns:
+        dict: process, group, equipment_count, layout_grid, rows, cols,
+        total_spaces, wasted_spaces, machine and block dimensions (ft),
+        block_area_sqft, aspect_ratio, utilization, perimeter_ft,
+        optimization_score (only the counts and a zero score for 0 machines)
+    """
+    if machine_count == 0:
+        return {'process': process_name, 'machine_count': 0, 'rows': 0, 'cols': 0, 'total_spaces': 0,
+                'wasted_spaces': 0, 'block_width': 0, 'block_depth': 0, 'block_area': 0,
+                'aspect_ratio': 0, 'utilization': 0, 'score': 0}
+
+    group = MACHINE_SPECS[process_name][4] if process_name in MACHINE_SPECS else None
+    best_config, best_score = None, float('inf')
+    for rows in range(1, machine_count + 1):
+        cols = math.ceil(machine_count / rows)
+        total_spaces = rows * cols
+        block_width, block_depth, block_area = calculate_block_dimensions(
+            rows, cols, machine_w, machine_h, overlap_x, overlap_y)
+        aspect_ratio = max(rows, cols) / min(rows, cols)
+        utilization = machine_count / total_spaces
+        score = calculate_optimization_score(machine_count, rows, cols, block_area, aspect_ratio, utilization)
+
+        if score < best_score:
+            best_score = score
+            best_config = {
+                'process': process_name,
+                'group': group,
+                'equipment_count': machine_count,
+                'layout_grid': f"{rows}×{cols}",
+                'rows': rows,
+                'cols': cols,
+                'total_spaces': total_spaces,
+                'wasted_spaces': total_spaces - machine_count,
+                'machine_width_ft': machine_w,
+                'machine_depth_ft': machine_h,
+                'block_width_ft': block_width,
+                'block_depth_ft': block_depth,
+                'block_area_sqft': block_area,
+                'aspect_ratio': round(aspect_ratio, 3),
+                'utilization': round(utilization, 4),
+                'perimeter_ft': 2 * (block_width + block_depth),
+                'optimization_score': score,
+            }
+    return best_config
+
+
+def grid_cells(rows, cols, count):
+    """
+    Row and column of the first `count` cells of a rows x cols grid, row by row
+    """
+    cell = np.arange(min(count, rows * cols))
+    return cell // cols, cell % cols
+
+
+def grid_rects(rows, cols, count, unit_w, unit_h, overlap_x=0, overlap_y=0, x0=0.0, y0=0.0):
+    """
+    Machine rectangles of a grid block, neighbours sharing overlap_x / overlap_y ft
+
+    Returns:
+        array (machines, 4) of x, y, width, height
+    """
+    r, c = grid_cells(rows, cols, count)
+    rects = np.empty((len(r), 4))
+    rects[:, 0] = x0 + c * (unit_w - overlap_x)
+    rects[:, 1] = y0 + r * (unit_h - overlap_y)
+    rects[:, 2] = unit_w
+    rects[:, 3] = unit_h
+    return rects
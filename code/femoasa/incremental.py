@@ -0,0 +1,245 @@
+"""
+femoasa incremental model - flow, workload and equipment updated per edit
+
+changing one routing or one product's demand used to mean rerunning every
+flow matrix and capacity script. the incremental state keeps the year-level
+flow matrices, the (years, parts, processes) workload and the equipment
+count of every organization in memory; an edit touches only the rows it
+changes:
+
+    state = build_state()
+    report = set_demand(state, 'A1', 3, 12000.0)     # one product, one year
+    report = set_step_time(state, 'P7', 2, 1.5)      # one routing step
+    report = set_routing(state, 'P5', ['B', 'C', 'D', 'I', 'J'], [2.0, 1.0, 3.0, 1.5, 1.0])
+
+every edit returns a report of the equipment counts that changed (per
+organization, year and process), the years whose flows changed and the
+results/ folders of the artifacts that have to be regenerated.
+
+author: machas^2 team
+"""
+
+import time
+
+import numpy as np
+
+from femoasa import capacity, data, flow_tensor
+from femoasa.config import SHIFTS_PER_DAY
+
+# results/ folders regenerated from each quantity (per organization for equipment)
+ARTIFACTS = {
+    'flow': ['task4/part/flow_matrix', 'task4/functional/per_year', 'task4/Fractal/Fractal_Flowmatrix',
+             'task4/Fractal/Fractal_Distance'],
+    'functional': ['task4/functional/Capacity', 'task4/functional/Cost_Analysis'],
+    'part': ['task4/part/capacity', 'task4/part/Year{year}'],
+    'fractal': ['task4/Fractal/Fractal_Design', 'task4/Fractal/Fractal_Layout', 'task4/Fractal/Cost_Analysis'],
+}
+
+
+def _move_cells(state, steps):
+    """
+    Flat from-to cell (src * P + dst) of every move of a routing
+    """
+    codes = np.array([state['process_index'][s] for s in steps], dtype=np.intp)
+    return codes[:-1] * len(state['processes']) + codes[1:]
+
+
+def build_state(inputs=None, shifts=SHIFTS_PER_DAY, organizations=capacity.ORGANIZATIONS):
+    """
+    Full model computed once, the starting point of the edits
+
+    Args:
+        inputs: data.load_snapshot() dict (loaded when omitted)
+
+    Returns:
+        dict: inputs ('routings', 'step_times', 'processes', 'parts', 'products',
+        'years', 'weekly', 'bom') and derived arrays: 'mean' (years, parts),
+        'minutes' (parts, processes), 'workload' (years, parts, processes),
+        'load' (years, processes), 'part_units' (years, parts, processes),
+        'part_total' (years, processes), 'flow' (years, processes, processes),
+        'units' (organizations, years, processes) and 'equipment'
+        {organization: (years, processes) view of units}
+    """
+    inputs = data.load_snapshot() if inputs is None else inputs
+    demand = inputs['demand']
+    routings = {part: list(steps) for part, steps in inputs['routings'].items()}
+    processes = list(inputs['processes'])
+    index = {p: j for j, p in enumerate(processes)}
+
+    weekly = np.array(demand['weekly'], dtype=float)
+    mean = weekly @ demand['bom'].T
+    minutes = np.array(inputs['workload'], dtype=float)
+    workload = capacity.part_workload(mean, minutes)
+    machine = capacity.machine_capacity(shifts)
+
+    state = {
+        'routings': routings,
+        'step_times': {part: list(times) for part, times in inputs['step_times'].items()},
+        'processes': processes,
+        'process_index': index,
+        'parts': list(routings),
+        'part_index': {part: k for k, part in enumerate(routings)},
+        'products': list(demand['products']),
+        'years': list(demand['years']),
+        'weekly': weekly,
+        'bom': np.array(demand['bom'], dtype=float),
+        'capacity': float(machine),
+        'organizations': list(organizations),
+        'mean': mean,
+        'minutes': minutes,
+        'workload': workload,
+        'load': workload.sum(axis=1),
+        'part_units': np.ceil(workload / machine - 1e-9),
+        'flow': flow_tensor.aggregate(flow_tensor.from_routings(mean, routings, processes), 'year'),
+    }
+    # one (organizations, years, processes) array, 'equipment' holds views of its rows
+    state['centers'] = np.array([capacity.num_centers(org) for org in organizations], dtype=float)[:, None, None]
+    state['units'] = np.stack([capacity.equipment_requirements(workload, org, machine) for org in organizations])
+    state['equipment'] = dict(zip(organizations, state['units']))
+    state['part_total'] = state['part_units'].sum(axis=1)
+
+    # routing moves of all parts in one flat array, grouped by part (csr-style move_ptr)
+    cells = [_move_cells(state, steps) for steps in routings.values()]
+    state['move_cell'] = np.concatenate(cells)
+    state['move_ptr'] = np.concatenate([[0], np.cumsum([len(c) for c in cells])])
+    return state
+
+
+def _units(state, years):
+    """
+    Equipment of every organization in some years from the maintained loads
+
+    Returns:
+        array (organizations, len(years), processes)
+    """
+    f = state['centers']
+    units = f * np.ceil(state['load'][years] / f / state['capacity'] - 1e-9)
+    if 'part' in state['organizations']:
+        units[state['organizations'].index('part')] = state['part_total'][years]
+    return units
+
+
+def _add_flow(state, years, parts, weights):
+    """
+    Add weights (len(years), len(parts)) parts/week along every routing move of the parts
+    """
+    start, end = state['move_ptr'][parts], state['move_ptr'][np.asarray(parts) + 1]
+    counts = end - start
+    # positions of the moves of all parts in the flat move arrays
+    moves = np.repeat(start - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    cells = np.asarray(years)[:, None] * state['flow'][0].size + state['move_cell'][moves]
+    np.add.at(state['flow'].reshape(-1), cells, np.repeat(weights, counts, axis=1))
+
+
+def _refresh(state, years, parts, edit, start, flow_changed):
+    """
+    Recompute the workload block (years x parts) and the equipment rows of those years
+
+    Returns:
+        report dict: 'edit', 'microseconds', 'equipment' list of
+        (organization, year, process, old, new), 'flow_years', 'artifacts'
+    """
+    years = np.asarray(years, dtype=np.intp)
+    parts = np.asarray(parts, dtype=np.intp)
+    block = (years[:, None], parts[None, :])
+    workload = state['mean'][block][..., None] * state['minutes'][parts]
+    state['load'][years] += (workload - state['workload'][block]).sum(axis=1)
+    state['workload'][block] = workload
+    part_units = np.ceil(workload / state['capacity'] - 1e-9)
+    state['part_total'][years] += (part_units - state['part_units'][block]).sum(axis=1)
+    state['part_units'][block] = part_units
+
+    old = state['units'][:, years]
+    new = _units(state, years)
+    state['units'][:, years] = new
+    o, y, j = np.nonzero(new != old)
+    changes = [(state['organizations'][o[n]], state['years'][years[y[n]]], state['processes'][j[n]],
+                int(old[o[n], y[n], j[n]]), int(new[o[n], y[n], j[n]])) for n in range(len(o))]
+
+    flow_years = [state['years'][k] for k in years] if flow_changed else []
+    artifacts = set(ARTIFACTS['flow']) if flow_years else set()
+    for n, k in set(zip(o.tolist(), y.tolist())):
+        organization, year = state['organizations'][n], state['years'][years[k]]
+        key = 'fractal' if organization.startswith('fractal') else organization
+        artifacts.update(path.format(year=year) for path in ARTIFACTS[key])
+
+    return {
+        'edit': edit,
+        'microseconds': (time.perf_counter() - start) * 1e6,
+        'equipment': changes,
+        'flow_years': flow_years,
+        'artifacts': sorted(artifacts),
+    }
+
+
+def set_demand(state, product, year, weekly):
+    """
+    Change the weekly demand of one product in one year
+
+    Returns:
+        report (see _refresh())
+    """
+    start = time.perf_counter()
+    y = state['years'].index(year)
+    p = state['products'].index(product)
+    change = weekly - state['weekly'][y, p]
+    state['weekly'][y, p] = weekly
+
+    parts = np.flatnonzero(state['bom'][:, p])
+    delta = change * state['bom'][parts, p]
+    state['mean'][y, parts] += delta
+    _add_flow(state, [y], parts, delta[None, :])
+    return _refresh(state, [y], parts, f"demand {product} year {year} -> {weekly:g}", start, change != 0.0)
+
+
+def set_step_time(state, part, step, minutes):
+    """
+    Change the processing time (min/unit) of one routing step of a part
+
+    Returns:
+        report (see _refresh())
+    """
+    start = time.perf_counter()
+    k = state['part_index'][part]
+    times = state['step_times'][part]
+    j = state['process_index'][state['routings'][part][step]]
+    state['minutes'][k, j] += minutes - times[step]
+    times[step] = minutes
+    return _refresh(state, np.arange(len(state['years'])), [k], f"step time {part}[{step}] -> {minutes:g}", start, False)
+
+
+def set_routing(state, part, steps, step_times):
+    """
+    Replace the routing (process sequence and step times) of one part
+
+    Returns:
+        report (see _refresh())
+    """
+    start = time.perf_counter()
+    if len(steps) != len(step_times):
+        raise ValueError(f"{part}: {len(steps)} steps but {len(step_times)} step times")
+    unknown = [s for s in steps if s not in state['process_index']]
+    if unknown:
+        raise KeyError(f"Unknown processes {unknown} in the routing of {part}")
+
+    k = state['part_index'][part]
+    years = np.arange(len(state['years']))
+    _add_flow(state, years, [k], -state['mean'][:, [k]])
+    state['routings'][part] = list(steps)
+    state['step_times'][part] = [float(t) for t in step_times]
+    cells, ptr = _move_cells(state, steps), state['move_ptr']
+    state['move_cell'] = np.concatenate([state['move_cell'][:ptr[k]], cells, state['move_cell'][ptr[k + 1]:]])
+    ptr[k + 1:] += len(cells) - (ptr[k + 1] - ptr[k])
+    _add_flow(state, years, [k], state['mean'][:, [k]])
+
+    minutes = np.zeros(len(state['processes']))
+    np.add.at(minutes, [state['process_index'][s] for s in steps], step_times)
+    state['minutes'][k] = minutes
+    return _refresh(state, years, [k], f"routing {part} -> {'-'.join(steps)}", start, True)
+
+
+def to_flow_tensor(state):
+    """
+    Sparse flow tensor (femoasa.flow_tensor) of the current state
+    """
+    return flow_tensor.from_routings(state['mean'], state['routings'], state['processes'], state['years'])
@@ -0,0 +1,281 @@
+"""
+femoasa layout diff - machine-by-machine comparison of two layouts
+
+matches the machines of two layouts (Year 1 vs Year 5, F3 vs F4 center, two
+candidate plans) type by type (position join, then an assignment) and reports
+which units stay, move, are added or removed, with the relocation cost of
+the moves from Equip+Operator Specs.csv.
+
+a layout is a dataframe (or dict of arrays) with one row per machine:
+process, x, y (machine center, ft). block layouts are expanded to machines
+with machines_from_blocks(), every block growing from its lower-left corner.
+the matching first keeps as many machines in place as possible, then
+minimizes the total displacement of the moved ones:
+
+    before = machines_from_blocks(block_corners(y1_centroids, y1_counts), y1_counts)
+    after = machines_from_blocks(block_corners(y5_centroids, y5_counts), y5_counts)
+    report = diff_layouts(before, after)      # 'machines' and 'summary' tables
+    cost = relocation_cost(before, after)     # scalar, for planner inner loops
+
+author: machas^2 team
+"""
+
+import numpy as np
+
+from femoasa import equipment_catalog
+from femoasa.config import MACHINE_SPECS
+from femoasa.grid_layout import calculate_block_dimensions, grid_rects
+
+STAY_TOLERANCE_FT = 0.5  # displacements below this are the same position
+SUMMARY_COLUMNS = ['Before', 'After', 'Kept', 'Moved', 'Added', 'Removed', 'Displacement_ft', 'Relocation_Cost']
+
+
+def _columns(layout):
+    """
+    process (object array), x, y (float arrays) of a layout dataframe or dict
+    """
+    return (np.asarray(layout['process'], dtype=object), np.asarray(layout['x'], dtype=float),
+            np.asarray(layout['y'], dtype=float))
+
+
+def _block_grid(count):
+    cols = int(np.ceil(np.sqrt(count)))
+    return int(np.ceil(count / cols)), cols
+
+
+def block_corners(centroids, counts, specs=MACHINE_SPECS):
+    """
+    Lower-left corner of every block of a layout given by its block centroids
+
+    Each block is taken as the near-square grid of its own machine count
+    (the one machines_from_blocks() lays out), centered on its centroid.
+
+    Returns:
+        dict {process: (x, y)} (ft)
+    """
+    corners = {}
+    for process, count in counts.items():
+        w, h, ox, oy, _ = specs[process]
+        width, depth, _ = calculate_block_dimensions(*_block_grid(max(int(count), 1)), w, h, ox, oy)
+        x, y = np.asarray(centroids[process], dtype=float)
+        corners[process] = (x - width / 2.0, y - depth / 2.0)
+    return corners
+
+
+def machines_from_blocks(corners, counts, specs=MACHINE_SPECS):
+    """
+    Machine positions of block layouts, each block a near-square grid growing from its lower-left corner
+
+    The corner is the fixed point of a block: a block that gains machines
+    keeps the cells it had (a near-square grid contains the smaller ones),
+    so only the new machines appear in a diff.
+
+    Args:
+        corners: {process: (x, y)} lower-left block corners (ft), see block_corners()
+        counts: {process: machines} machines in each block
+
+    Returns:
+        dict: 'process', 'x', 'y' arrays (one entry per machine)
+    """
+    processes, xs, ys = [], [], []
+    for process, count in counts.items():
+        count = int(count)
+        if count <= 0:
+            continue
+        w, h, ox, oy, _ = specs[process]
+        x0, y0 = np.asarray(corners[process], dtype=float)
+        rects = grid_rects(*_block_grid(count), count, w, h, ox, oy, x0, y0)
+        processes += [process] * count
+        xs.append(rects[:, 0] + rects[:, 2] / 2.0)
+        ys.append(rects[:, 1] + rects[:, 3] / 2.0)
+    return {'process': np.array(processes, dtype=object),
+            'x': np.concatenate(xs) if xs else np.empty(0), 'y': np.concatenate(ys) if ys else np.empty(0)}
+
+
+def _stay_pairs(bx, by, ax, ay, tolerance):
+    """
+    One-to-one pairs (before, after) of machines within tolerance of each other
+
+    Positions are joined on cells of tolerance size (a pair within tolerance
+    is in the same or a neighbouring cell), then the closest pairs are taken
+    first. Machines of one type sit a machine pitch apart, far more than the
+    tolerance, so this is the largest set of machines that stay.
+    """
+    if not len(bx) or not len(ax):
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    b_cell = np.floor(np.column_stack([bx, by]) / tolerance).astype(np.int64)
+    a_cell = np.floor(np.column_stack([ax, ay]) / tolerance).astype(np.int64)
+    low = np.minimum(b_cell.min(axis=0), a_cell.min(axis=0)) - 1
+    span = np.maximum(b_cell.max(axis=0), a_cell.max(axis=0)) + 2 - low
+    key = lambda cell: (cell[:, 0] - low[0]) * span[1] + (cell[:, 1] - low[1])
+
+    a_key = key(a_cell)
+    order = np.argsort(a_key, kind='stable')
+    a_key = a_key[order]
+    rows, cols = [], []
+    for offset in [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]:
+        b_key = key(b_cell + offset)
+        first = np.searchsorted(a_key, b_key, 'left')
+        count = np.searchsorted(a_key, b_key, 'right') - first
+        rows.append(np.repeat(np.arange(len(b_key)), count))
+        cols.append(order[np.repeat(first - np.cumsum(count) + count, count) + np.arange(count.sum())])
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    distance = np.hypot(bx[rows] - ax[cols], by[rows] - ay[cols])
+    near = np.flatnonzero(distance <= tolerance)
+    near = near[np.argsort(distance[near], kind='stable')]
+    rows, cols = rows[near], cols[near]
+
+    if len(rows) and (np.bincount(rows).max() > 1 or np.bincount(cols).max() > 1):
+        taken_b, taken_a, keep = set(), set(), []
+        for k, (r, c) in enumerate(zip(rows, cols)):
+            if r not in taken_b and c not in taken_a:
+                taken_b.add(r)
+                taken_a.add(c)
+                keep.append(k)
+        rows, cols = rows[keep], cols[keep]
+    return rows, cols
+
+
+def _assign(cost):
+    """
+    Minimum-cost assignment of a (rows, cols) matrix, scipy's linear_sum_assignment
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    return linear_sum_assignment(cost)
+
+
+def match_machines(before, after, tolerance=STAY_TOLERANCE_FT):
+    """
+    Optimal one-to-one matching of the machines of each type
+
+    Machines within tolerance of a machine of the same type in the other
+    layout stay (a position join); linear_sum_assignment then matches only
+    the remaining machines on their displacement.
+
+    Returns:
+        dict of arrays over the matched pairs: 'process', 'before', 'after'
+        (row indices in the two layouts), 'displacement' (ft); and 'removed',
+        'added' (row indices of unmatched machines)
+    """
+    b_process, bx, by = _columns(before)
+    a_process, ax, ay = _columns(after)
+    matched = {'process': [], 'before': [], 'after': [], 'displacement': []}
+    removed, added = [], []
+    for process in dict.fromkeys(list(b_process) + list(a_process)):
+        i = np.flatnonzero(b_process == process)
+        j = np.flatnonzero(a_process == process)
+        rows, cols = _stay_pairs(bx[i], by[i], ax[j], ay[j], tolerance)
+        rest_i = np.flatnonzero(np.bincount(rows, minlength=len(i)) == 0)
+        rest_j = np.flatnonzero(np.bincount(cols, minlength=len(j)) == 0)
+        if len(rest_i) and len(rest_j):
+            distance = np.hypot(bx[i[rest_i]][:, None] - ax[j[rest_j]][None, :],
+                                by[i[rest_i]][:, None] - ay[j[rest_j]][None, :])
+            moved_rows, moved_cols = _assign(distance)
+            rows = np.concatenate([rows, rest_i[moved_rows]])
+            cols = np.concatenate([cols, rest_j[moved_cols]])
+        matched['process'] += [process] * len(rows)
+        matched['before'].append(i[rows])
+        matched['after'].append(j[cols])
+        matched['displacement'].append(np.hypot(bx[i[rows]] - ax[j[cols]], by[i[rows]] - ay[j[cols]]))
+        removed.append(i[np.bincount(rows, minlength=len(i)) == 0])
+        added.append(j[np.bincount(cols, minlength=len(j)) == 0])
+
+    join = lambda parts, dtype: np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+    return {
+        'process': np.array(matched['process'], dtype=object),
+        'before': join(matched['before'], np.intp),
+        'after': join(matched['after'], np.intp),
+        'displacement': join(matched['displacement'], float),
+        'removed': join(removed, np.intp),
+        'added': join(added, np.intp),
+    }
+
+
+def _relocation_prices(processes, catalog):
+    catalog = equipment_catalog.load_catalog() if catalog is None else catalog
+    return catalog['relocation'][equipment_catalog.lookup(catalog, list(processes))] if len(processes) else np.empty(0)
+
+
+def relocation_cost(before, after, catalog=None, tolerance=STAY_TOLERANCE_FT):
+    """
+    Total relocation cost ($) of the machines that move between two layouts
+    """
+    match = match_machines(before, after, tolerance)
+    moved = match['displacement'] > tolerance
+    return float(_relocation_prices(match['process'][moved], catalog).sum())
+
+
+def _type_summary(b_process, a_process, match, moved, price):
+    types = sorted(set(b_process) | set(a_process))
+    index = {process: k for k, process in enumerate(types)}
+    count = lambda names, weights=None: np.bincount(np.array([index[p] for p in names], dtype=np.intp),
+                                                     weights, minlength=len(types))
+    values = np.column_stack([
+        count(b_process), count(a_process), count(match['process'][~moved]), count(match['process'][moved]),
+        count(a_process[match['added']]), count(b_process[match['removed']]),
+        count(match['process'][moved], match['displacement'][moved]), count(match['process'][moved], price[moved]),
+    ]).astype(float)
+    return types + ['Total'], np.vstack([values, values.sum(axis=0)])
+
+
+def type_summary(before, after, catalog=None, tolerance=STAY_TOLERANCE_FT):
+    """
+    Per equipment type counts and relocation of a layout diff, without pandas
+
+    Returns:
+        (types + ['Total'], array (types + 1, 8)) in the SUMMARY_COLUMNS order
+    """
+    b_process, _, _ = _columns(before)
+    a_process, _, _ = _columns(after)
+    match = match_machines(before, after, tolerance)
+    moved = match['displacement'] > tolerance
+    return _type_summary(b_process, a_process, match, moved, _relocation_prices(match['process'], catalog))
+
+
+def diff_layouts(before, after, catalog=None, tolerance=STAY_TOLERANCE_FT):
+    """
+    Machine-by-machine diff of two layouts
+
+    Returns:
+        dict of dataframes: 'machines' (one row per machine of either layout:
+        Process, Status kept/moved/added/removed, From_X, From_Y, To_X, To_Y,
+        Displacement_ft, Relocation_Cost) and 'summary' per equipment type
+        (Before, After, Kept, Moved, Added, Removed, Displacement_ft,
+        Relocation_Cost, plus a Total row)
+    """
+    import pandas as pd
+
+    b_process, bx, by = _columns(before)
+    a_process, ax, ay = _columns(after)
+    match = match_machines(before, after, tolerance)
+    moved = match['displacement'] > tolerance
+    price = _relocation_prices(match['process'], catalog)
+
+    nan = lambda n: np.full(n, np.nan)
+    machines = pd.concat([
+        pd.DataFrame({
+            'Process': match['process'], 'Status': np.where(moved, 'moved', 'kept'),
+            'From_X': bx[match['before']], 'From_Y': by[match['before']],
+            'To_X': ax[match['after']], 'To_Y': ay[match['after']],
+            'Displacement_ft': match['displacement'], 'Relocation_Cost': np.where(moved, price, 0.0),
+        }),
+        pd.DataFrame({
+            'Process': b_process[match['removed']], 'Status': 'removed',
+            'From_X': bx[match['removed']], 'From_Y': by[match['removed']],
+            'To_X': nan(len(match['removed'])), 'To_Y': nan(len(match['removed'])),
+            'Displacement_ft': 0.0, 'Relocation_Cost': 0.0,
+        }),
+        pd.DataFrame({
+            'Process': a_process[match['added']], 'Status': 'added',
+            'From_X': nan(len(match['added'])), 'From_Y': nan(len(match['added'])),
+            'To_X': ax[match['added']], 'To_Y': ay[match['added']],
+            'Displacement_ft': 0.0, 'Relocation_Cost': 0.0,
+        }),
+    ], ignore_index=True)
+
+    types, values = _type_summary(b_process, a_process, match, moved, price)
+    summary = pd.DataFrame(values, index=pd.Index(types, name='Process'), columns=SUMMARY_COLUMNS)
+    counted = SUMMARY_COLUMNS[:6]
+    summary[counted] = summary[counted].astype(int)
+    return {'machines': machines, 'summary': summary}
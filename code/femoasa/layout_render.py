@@ -0,0 +1,133 @@
+"""
+femoasa layout render - collection-based drawing of machines and flows
+
+layouts are drawn from arrays: machines and overlap (shareability) zones are
+(n, 4) arrays of x, y, width, height and become one PolyCollection each,
+flow arrows are (n, 2) start/end arrays and become one LineCollection. a
+factory with thousands of machines and every flow edge is a handful of
+artists instead of one patch or annotation per machine and arrow.
+
+    rects = grid_rects(rows=8, cols=2, count=16, unit_w=14, unit_h=14, overlap_x=2, overlap_y=2)
+    ax.add_collection(rect_collection(rects, facecolor='#4c9aff', edgecolor='#333'))
+    add_arrows(ax, starts, ends, linewidths=widths, color='gray', rad=0.1)
+
+author: machas^2 team
+"""
+
+import numpy as np
+from matplotlib.collections import LineCollection, PatchCollection, PolyCollection
+from matplotlib.patches import Circle
+
+from femoasa.grid_layout import grid_cells, grid_rects  # noqa: F401 (drawn blocks use the same grid)
+
+
+def overlap_rects(rows, cols, count, unit_w, unit_h, overlap_x=0, overlap_y=0, x0=0.0, y0=0.0):
+    """
+    Shareability zones of a grid block: right strip of every machine that is
+    not in the last column, top strip of every machine not in the last row
+
+    Returns:
+        array (zones, 4) of x, y, width, height
+    """
+    r, c = grid_cells(rows, cols, count)
+    rects = grid_rects(rows, cols, count, unit_w, unit_h, overlap_x, overlap_y, x0, y0)
+    zones = []
+    if overlap_x > 0:
+        right = rects[c < cols - 1].copy()
+        right[:, 0] += unit_w - overlap_x
+        right[:, 2] = overlap_x
+        zones.append(right)
+    if overlap_y > 0:
+        top = rects[r < rows - 1].copy()
+        top[:, 1] += unit_h - overlap_y
+        top[:, 3] = overlap_y
+        zones.append(top)
+    return np.vstack(zones) if zones else np.empty((0, 4))
+
+
+def rect_vertices(rects):
+    """
+    Corner vertices (n, 4, 2) of (n, 4) x, y, width, height rectangles
+    """
+    rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+    x, y, w, h = rects.T
+    return np.stack([
+        np.column_stack([x, y]),
+        np.column_stack([x + w, y]),
+        np.column_stack([x + w, y + h]),
+        np.column_stack([x, y + h]),
+    ], axis=1)
+
+
+def rect_collection(rects, **kwargs):
+    """
+    One PolyCollection for all rectangles (kwargs: facecolor(s), edgecolor, linewidth, alpha, zorder...)
+    """
+    return PolyCollection(rect_vertices(rects), closed=True, **kwargs)
+
+
+def circle_collection(centers, radii, **kwargs):
+    """
+    One PatchCollection of circles (centers (n, 2), radii (n,))
+    """
+    circles = [Circle(center, radius) for center, radius in zip(np.asarray(centers, dtype=float), np.ravel(radii))]
+    return PatchCollection(circles, match_original=False, **kwargs)
+
+
+def arrow_paths(starts, ends, rad=0.0, head_length=None, head_angle=25.0, n_points=16):
+    """
+    Polylines of arrows from starts to ends (both (n, 2))
+
+    rad bends the shaft like matplotlib's "arc3,rad=..." connection style
+    (quadratic bezier). The open '->' head is drawn as a two-segment polyline
+    of head_length data units (default: 4% of the mean arrow length).
+
+    Returns:
+        shafts (n, n_points, 2), heads (n, 3, 2)
+    """
+    p0 = np.asarray(starts, dtype=float).reshape(-1, 2)
+    p2 = np.asarray(ends, dtype=float).reshape(-1, 2)
+    d = p2 - p0
+    control = (p0 + p2) / 2.0 + rad * np.column_stack([d[:, 1], -d[:, 0]])
+
+    t = np.linspace(0.0, 1.0, n_points)[:, np.newaxis]
+    shafts = ((1 - t) ** 2 * p0[:, np.newaxis] + 2 * (1 - t) * t * control[:, np.newaxis]
+              + t ** 2 * p2[:, np.newaxis])
+
+    tangent = p2 - control
+    norm = np.hypot(tangent[:, 0], tangent[:, 1])
+    unit = tangent / np.where(norm > 0, norm, 1.0)[:, np.newaxis]
+    if head_length is None:
+        lengths = np.hypot(d[:, 0], d[:, 1])
+        head_length = 0.04 * lengths.mean() if len(lengths) else 1.0
+
+    angle = np.radians(head_angle)
+    cos, sin = np.cos(angle), np.sin(angle)
+    back = -unit * head_length
+    left = np.column_stack([back[:, 0] * cos - back[:, 1] * sin, back[:, 0] * sin + back[:, 1] * cos])
+    right = np.column_stack([back[:, 0] * cos + back[:, 1] * sin, -back[:, 0] * sin + back[:, 1] * cos])
+    heads = np.stack([p2 + left, p2, p2 + right], axis=1)
+
+    return shafts, heads
+
+
+def add_arrows(ax, starts, ends, linewidths=1.0, color='gray', alpha=None, rad=0.0,
+               head_length=None, zorder=None, **kwargs):
+    """
+    Draw all arrows as a single LineCollection (shafts and heads)
+
+    Returns:
+        the LineCollection (None when there are no arrows)
+    """
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    if len(starts) == 0:
+        return None
+
+    shafts, heads = arrow_paths(starts, ends, rad, head_length)
+    widths = np.broadcast_to(np.asarray(linewidths, dtype=float), (len(starts),))
+    lines = LineCollection(list(shafts) + list(heads), linewidths=np.concatenate([widths, widths]),
+                           colors=color, alpha=alpha, capstyle='round', joinstyle='round', **kwargs)
+    if zorder is not None:
+        lines.set_zorder(zorder)
+    ax.add_collection(lines)
+    return lines
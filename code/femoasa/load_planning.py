@@ -0,0 +1,315 @@
+"""
+femoasa load planning - inbound and outbound truck loads packed in 3D
+
+three truck flows leave or reach the factory dock:
+
+- inbound: the weekly MSC delivery of raw-material kits (100 parts, 150% of
+  the parts' volume and weight)
+- outbound A: finished parts in totes every hour
+- outbound B: finished parts in totes every 4 hours
+
+every load is packed into 53 ft trailers (config TRAILER_DIMS_IN and
+TRAILER_MAX_LBS) with an extreme-point heuristic: identical boxes are first
+stacked into columns, columns are sorted by decreasing volume and each goes to
+the first extreme point (front of the trailer first, then bottom, then side)
+where it fits. the candidate points x 2 floor rotations are checked against
+every box already placed as one array, so a whole load is a few hundred array
+operations. loads are the average period of every year, the 5-year schedule
+(15 loads) plans in about a second:
+
+    report = load_plan_report()
+    report[['Year', 'Flow', 'Trucks_per_Period', 'Volume_Fill', 'Dock_Doors']]
+
+tote defaults (24x16x12 in stackable plastic tote, 50 lbs max) and the
+receiving window (all inbound trucks unloaded in one shift) are assumptions.
+
+author: machas^2 team
+"""
+
+import numpy as np
+import pandas as pd
+
+from femoasa import data, profiling, raw_materials, slotting, storage
+from femoasa.config import (
+    CLIENT_A_MILES, CLIENT_A_REPLENISH_HOURS, CLIENT_B_MILES, CLIENT_B_REPLENISH_HOURS, DOCK_HOURS,
+    HOURS_PER_SHIFT, KIT_PARTS, KIT_VOLUME_FACTOR, MSC_MILES, TRAILER_DIMS_IN, TRAILER_MAX_LBS,
+    TRUCK_COST_PER_MILE, weekly_hours,
+)
+
+DEFAULT_TOTE = {
+    'outer_in': (24.0, 16.0, 12.0),
+    'inner_in': (22.5, 14.5, 10.5),
+    'max_lbs': 50.0,
+    'tare_lbs': 5.0,
+}
+
+# kits hold KIT_PARTS parts as a 5 x 5 x 4 block, scaled up to KIT_VOLUME_FACTOR
+KIT_GRID = (5, 5, 4)
+
+FLOWS = {
+    'inbound_msc': {'period_hours': None, 'miles': MSC_MILES},
+    'outbound_a': {'period_hours': CLIENT_A_REPLENISH_HOURS, 'miles': CLIENT_A_MILES},
+    'outbound_b': {'period_hours': CLIENT_B_REPLENISH_HOURS, 'miles': CLIENT_B_MILES},
+}
+
+
+def kit_boxes(dimensions=None, kit_parts=KIT_PARTS):
+    """
+    Box dimensions (in) and weight (lbs) of one kit of every part
+
+    Returns:
+        dims (parts, 3), weight (parts,)
+    """
+    dimensions = data.load_part_dimensions() if dimensions is None else dimensions
+    dims = np.column_stack([dimensions['x_in'], dimensions['y_in'], dimensions['z_in']])
+    scale = (KIT_VOLUME_FACTOR * kit_parts / np.prod(KIT_GRID)) ** (1.0 / 3.0)
+    _, weight = raw_materials.kit_dimensions(dimensions, kit_parts)
+    return dims * np.asarray(KIT_GRID, dtype=float) * scale, weight
+
+
+def tote_boxes(dimensions=None, tote=DEFAULT_TOTE):
+    """
+    Parts per tote and tote weight (lbs, full) for every part
+
+    Returns:
+        per_tote (parts,), weight (parts,)
+    """
+    dimensions = data.load_part_dimensions() if dimensions is None else dimensions
+    dims = np.column_stack([dimensions['x_in'], dimensions['y_in'], dimensions['z_in']])
+    per_tote = slotting.units_per_box(dims, dimensions['weight_lbs'], tote['inner_in'],
+                                      tote['max_lbs'] - tote['tare_lbs'])
+    if np.any(per_tote == 0):
+        raise ValueError("Some parts do not fit a tote: check tote['inner_in']")
+    return per_tote, per_tote * dimensions['weight_lbs'] + tote['tare_lbs']
+
+
+def stack_columns(dims, weights, counts, container=TRAILER_DIMS_IN, max_lbs=TRAILER_MAX_LBS):
+    """
+    Stack identical boxes into floor-to-ceiling columns
+
+    Every box type is turned so its height fills the trailer height best
+    (ties to the lowest height, i.e. the largest footprint); the column holds
+    as many boxes as height and weight allow, the last one the remainder.
+
+    Args:
+        dims: array (types, 3) box dimensions in inches
+        weights: array (types,) box weight
+        counts: array (types,) boxes to load
+
+    Returns:
+        dict: 'dims' (columns, 3), 'weight', 'boxes', 'type' (columns,)
+    """
+    dims = np.asarray(dims, dtype=float).reshape(-1, 3)
+    weights = np.asarray(weights, dtype=float)
+    counts = np.asarray(counts, dtype=np.int64)
+    height = float(container[2])
+
+    heights = np.sort(dims, axis=1)  # candidate heights, lowest first
+    fill = np.where(heights <= height, np.floor(height / heights) * heights, -1.0)
+    pick = np.argmax(fill, axis=1)  # first max = lowest height
+    h = heights[np.arange(len(dims)), pick]
+    keep = np.ones(heights.shape, dtype=bool)
+    keep[np.arange(len(dims)), pick] = False
+    footprint = heights[keep].reshape(len(dims), 2)
+
+    per_column = np.minimum(np.floor(height / h), np.floor(max_lbs / np.maximum(weights, 1e-9))).astype(np.int64)
+    if np.any((per_column == 0) & (counts > 0)):
+        raise ValueError("Some boxes do not fit the trailer: check dims and TRAILER_DIMS_IN")
+
+    full = np.where(counts > 0, counts // np.maximum(per_column, 1), 0)
+    rest = np.where(counts > 0, counts % np.maximum(per_column, 1), 0)
+    boxes = np.concatenate([np.repeat(per_column, full), rest[rest > 0]])
+    types = np.concatenate([np.repeat(np.arange(len(dims)), full), np.flatnonzero(rest > 0)])
+
+    return {
+        'dims': np.column_stack([footprint[types], h[types] * boxes]),
+        'weight': weights[types] * boxes,
+        'boxes': boxes,
+        'type': types,
+    }
+
+
+def _place(eps, placed, size, orients, container):
+    """
+    First extreme point and rotation where a box fits, None if none does
+    """
+    ends = eps[:, np.newaxis, :] + orients[np.newaxis, :, :]  # (points, rotations, 3)
+    feasible = np.all(ends <= container + 1e-9, axis=2)
+    if len(placed):
+        overlap = np.all((eps[:, np.newaxis, np.newaxis, :] < placed + size - 1e-9)
+                         & (ends[:, :, np.newaxis, :] > placed + 1e-9), axis=3)
+        feasible &= ~overlap.any(axis=2)
+    hits = np.flatnonzero(feasible.any(axis=1))
+    if len(hits) == 0:
+        return None
+    e = hits[0]
+    return e, int(np.argmax(feasible[e]))
+
+
+def extreme_point_pack(dims, weights, container=TRAILER_DIMS_IN, max_lbs=TRAILER_MAX_LBS, lookback=2):
+    """
+    Pack boxes into trailers with the extreme-point heuristic
+
+    Boxes keep their height (this side up) and may turn 90 degrees on the
+    floor. They are loaded by decreasing volume; a box tries the last
+    `lookback` open trailers and opens a new one when it fits none of them.
+    Extreme points are kept in loading order (front of the trailer, then
+    bottom, then side) and dropped once no box could fit there anymore.
+
+    Args:
+        dims: array (boxes, 3) length, width, height in inches
+        weights: array (boxes,)
+
+    Returns:
+        dict: 'trailer', 'position' (boxes, 3), 'size' (boxes, 3) as loaded,
+        'trailers', 'volume_fill', 'weight_fill' (trailers,)
+    """
+    dims = np.asarray(dims, dtype=float).reshape(-1, 3)
+    weights = np.asarray(weights, dtype=float)
+    container = np.asarray(container, dtype=float)
+    n = len(dims)
+    if np.any(np.sort(dims[:, :2], axis=1) > np.sort(container[:2])) or np.any(dims[:, 2] > container[2]):
+        raise ValueError("Some boxes are larger than the trailer")
+
+    order = np.argsort(-dims.prod(axis=1), kind='stable')
+    min_side = dims.min() if n else 0.0
+
+    trailer = np.full(n, -1, dtype=np.int64)
+    position = np.zeros((n, 3))
+    size = np.zeros((n, 3))
+    bins = []
+
+    for i in order:
+        orients = np.unique(np.array([dims[i], dims[i][[1, 0, 2]]]), axis=0)
+        for b in range(max(0, len(bins) - lookback), len(bins)):
+            load = bins[b]
+            if load['weight'] + weights[i] > max_lbs + 1e-9:
+                continue
+            spot = _place(load['eps'], position[load['boxes']], size[load['boxes']], orients, container)
+            if spot is not None:
+                break
+        else:
+            bins.append({'eps': np.zeros((1, 3)), 'boxes': [], 'weight': 0.0})
+            b, load = len(bins) - 1, bins[-1]
+            spot = _place(load['eps'], position[[]], size[[]], orients, container)
+
+        e, o = spot
+        p, s = load['eps'][e], orients[o]
+        trailer[i], position[i], size[i] = b, p, s
+        load['boxes'].append(i)
+        load['weight'] += weights[i]
+
+        eps = np.vstack([np.delete(load['eps'], e, axis=0), p + np.diag(s)])
+        inside = np.all((eps >= p - 1e-9) & (eps < p + s - 1e-9), axis=1)
+        useful = np.all(container - eps >= min_side - 1e-9, axis=1)
+        eps = np.unique(eps[~inside & useful], axis=0)
+        load['eps'] = eps[np.lexsort((eps[:, 1], eps[:, 2], eps[:, 0]))]
+
+    volume = np.bincount(trailer, weights=dims.prod(axis=1), minlength=len(bins))
+    weight = np.bincount(trailer, weights=weights, minlength=len(bins))
+    return {
+        'trailer': trailer,
+        'position': position,
+        'size': size,
+        'trailers': len(bins),
+        'volume_fill': volume / container.prod(),
+        'weight_fill': weight / max_lbs,
+    }
+
+
+def pack_load(dims, weights, counts, container=TRAILER_DIMS_IN, max_lbs=TRAILER_MAX_LBS):
+    """
+    Stack and pack one load of box types (see stack_columns, extreme_point_pack)
+
+    Returns:
+        dict: extreme_point_pack() keys plus 'columns', 'boxes', 'volume_cuft', 'weight_lbs'
+    """
+    columns = stack_columns(dims, weights, counts, container, max_lbs)
+    result = extreme_point_pack(columns['dims'], columns['weight'], container, max_lbs)
+    result.update({
+        'columns': columns,
+        'boxes': int(columns['boxes'].sum()),
+        'volume_cuft': float(columns['dims'].prod(axis=1).sum()) / 1728.0,
+        'weight_lbs': float(columns['weight'].sum()),
+    })
+    return result
+
+
+def period_loads(demand=None, dimensions=None, tote=DEFAULT_TOTE, shifts=None):
+    """
+    Boxes per period of every flow and year: kits per week, totes per delivery
+
+    Returns:
+        dict: 'years', per flow a dict of 'dims' (parts, 3), 'weight' (parts,),
+        'counts' (years, parts), 'periods_per_week'
+    """
+    demand = data.load_multi_year_demand() if demand is None else demand
+    dimensions = data.load_part_dimensions() if dimensions is None else dimensions
+    hours = weekly_hours() if shifts is None else weekly_hours(shifts)
+
+    mean, _ = storage.part_demand(demand['weekly'], demand['cv'], demand['bom'])
+    kit_dims, kit_weight = kit_boxes(dimensions)
+    loads = {'years': demand['years'], 'inbound_msc': {
+        'dims': kit_dims, 'weight': kit_weight, 'counts': np.ceil(mean / KIT_PARTS - 1e-9), 'periods_per_week': 1.0,
+    }}
+
+    client = storage.client_part_demand(demand['weekly'], demand['bom'], demand['products'])
+    per_tote, tote_weight = tote_boxes(dimensions, tote)
+    tote_dims = np.broadcast_to(np.asarray(tote['outer_in'], dtype=float), (len(per_tote), 3))
+    for c, flow in enumerate(['outbound_a', 'outbound_b']):
+        periods = hours / FLOWS[flow]['period_hours']
+        loads[flow] = {
+            'dims': tote_dims,
+            'weight': tote_weight,
+            'counts': np.ceil(client[..., c] / periods / per_tote - 1e-9),
+            'periods_per_week': periods,
+        }
+    return loads
+
+
+def dock_doors(trucks_per_period, period_hours, dock_hours=DOCK_HOURS):
+    """
+    Dock doors to load or unload every truck of a period within the period
+    """
+    return int(np.ceil(trucks_per_period * dock_hours / period_hours - 1e-9))
+
+
+@profiling.traced()
+def load_plan_report(demand=None, dimensions=None, tote=DEFAULT_TOTE, shifts=None,
+                     receiving_hours=HOURS_PER_SHIFT, dock_hours=DOCK_HOURS):
+    """
+    Trucks, fill rates and dock doors of every flow and year
+
+    Args:
+        receiving_hours: window in which the weekly inbound trucks are unloaded
+
+    Returns:
+        dataframe: Year, Flow, Period_Hours, Boxes_per_Period, Columns,
+        Trucks_per_Period, Trucks_per_Week, Volume_Fill, Weight_Fill,
+        Dock_Doors, Truck_Miles_Week, Trucking_Cost_Week
+    """
+    loads = period_loads(demand, dimensions, tote, shifts)
+    hours = weekly_hours() if shifts is None else weekly_hours(shifts)
+    rows = []
+    for y, year in enumerate(loads['years']):
+        for flow, spec in FLOWS.items():
+            load = loads[flow]
+            result = pack_load(load['dims'], load['weight'], load['counts'][y])
+            period = receiving_hours if spec['period_hours'] is None else spec['period_hours']
+            trucks = result['trailers']
+            miles = 2.0 * spec['miles'] * trucks * load['periods_per_week']
+            rows.append({
+                'Year': f"Year {year}",
+                'Flow': flow,
+                'Period_Hours': spec['period_hours'] or hours,
+                'Boxes_per_Period': result['boxes'],
+                'Columns': len(result['trailer']),
+                'Trucks_per_Period': trucks,
+                'Trucks_per_Week': trucks * load['periods_per_week'],
+                'Volume_Fill': float(result['volume_fill'].mean()) if trucks else 0.0,
+                'Weight_Fill': float(result['weight_fill'].mean()) if trucks else 0.0,
+                'Dock_Doors': dock_doors(trucks, period, dock_hours),
+                'Truck_Miles_Week': miles,
+                'Trucking_Cost_Week': miles * TRUCK_COST_PER_MILE,
+            })
+    return pd.DataFrame(rows)
@@ -0,0 +1,201 @@
+"""
+femoasa material handling - handler workload and fleet sizing
+
+turns process-to-process flows (parts/week) and travel distances (ft) into
+kit trips, handler hours, handler FTEs ($40/h) and vehicle counts per center
+pair and per shift. parts travel in kits of 100 parts that take 150% of the
+volume and weight of the parts; a vehicle carries as many kits as its weight
+and volume limits allow.
+
+every function broadcasts over leading axes, so a (layouts, pairs) flow or
+distance array - or a stack of centroid layouts - is evaluated in one call and
+can be used as an objective inside the layout optimizers:
+
+    mh = evaluate_handling(flow, distance, kit['volume_cuft'], kit['weight_lbs'])
+    handler_fte = mh['handler_fte'].sum(axis=-1)
+
+vehicle defaults (electric tugger with carts) are assumptions, the casework
+only fixes the handler wage; pass another vehicle dict to compare equipment.
+
+author: machas^2 team
+"""
+
+import numpy as np
+
+from femoasa import data
+from femoasa.config import (
+    DAYS_PER_WEEK, HOURS_PER_SHIFT, SHIFTS_PER_DAY, WEEKS_PER_YEAR,
+    OPERATOR_WEEKS_PER_YEAR, HANDLER_HOURLY_COST, KIT_PARTS,
+    KIT_VOLUME_FACTOR, KIT_WEIGHT_FACTOR,
+)
+
+DEFAULT_VEHICLE = {
+    'speed_fpm': 264.0,        # 3 mph loaded travel speed
+    'capacity_lbs': 2000.0,
+    'capacity_cuft': 80.0,
+    'load_unload_min': 2.0,    # pick up + drop off per trip
+    'utilization': 0.85,       # share of a shift a handler/vehicle is moving kits
+}
+
+
+def kit_profile(part_demand=None, transitions=None, dimensions=None):
+    """
+    Demand-weighted kit volume and weight for every process pair
+
+    A pair moves a mix of parts, so the kit carried on that pair is the
+    flow-weighted average kit of the parts routed through it.
+
+    Returns:
+        dict of arrays (processes, processes): 'flow' (parts/week),
+        'volume_cuft' and 'weight_lbs' per kit
+    """
+    part_demand = data.load_year_one_weekly_part_demand() if part_demand is None else np.asarray(part_demand)
+    transitions = data.routing_transitions() if transitions is None else transitions
+    dimensions = data.load_part_dimensions() if dimensions is None else dimensions
+
+    moves = part_demand[:, None, None] * transitions
+    flow = moves.sum(axis=0)
+    safe_flow = np.where(flow > 0, flow, 1.0)
+    unit_volume = np.einsum('kij,k->ij', moves, dimensions['volume_cuft']) / safe_flow
+    unit_weight = np.einsum('kij,k->ij', moves, dimensions['weight_lbs']) / safe_flow
+
+    return {
+        'flow': flow,
+        'volume_cuft': unit_volume * KIT_PARTS * KIT_VOLUME_FACTOR,
+        'weight_lbs': unit_weight * KIT_PARTS * KIT_WEIGHT_FACTOR,
+    }
+
+
+def kits_per_trip(kit_volume, kit_weight, vehicle=DEFAULT_VEHICLE):
+    """
+    Kits a vehicle carries per trip (at least one, oversize kits travel alone)
+    """
+    by_volume = np.floor(vehicle['capacity_cuft'] / np.maximum(kit_volume, 1e-9))
+    by_weight = np.floor(vehicle['capacity_lbs'] / np.maximum(kit_weight, 1e-9))
+    return np.maximum(np.minimum(by_volume, by_weight), 1.0)
+
+
+def evaluate_handling(flow, distance, kit_volume, kit_weight, vehicle=DEFAULT_VEHICLE,
+                      shifts=SHIFTS_PER_DAY):
+    """
+    Handling workload for arrays of process pairs
+
+    Args:
+        flow: parts/week per pair, any shape
+        distance: one-way travel distance (ft), broadcastable to flow
+        kit_volume, kit_weight: kit size per pair, broadcastable to flow
+        vehicle: vehicle parameters (see DEFAULT_VEHICLE)
+        shifts: shifts per day
+
+    Returns:
+        dict of arrays shaped like the broadcast inputs:
+        kits, trips (per week), trips_per_shift, trip_min, handler_hours
+        (per week), handler_fte, vehicles (per pair and shift, fractional),
+        annual_cost
+    """
+    flow = np.asarray(flow, dtype=float)
+    kits = np.ceil(flow / KIT_PARTS)
+    trips = np.ceil(kits / kits_per_trip(kit_volume, kit_weight, vehicle))
+
+    # loaded trip out, empty return
+    trip_min = 2.0 * np.asarray(distance, dtype=float) / vehicle['speed_fpm'] + vehicle['load_unload_min']
+    handler_hours = trips * trip_min / 60.0
+
+    shifts_per_week = DAYS_PER_WEEK * shifts
+    shift_capacity_hours = HOURS_PER_SHIFT * vehicle['utilization']
+    handler_fte = handler_hours / (shift_capacity_hours * DAYS_PER_WEEK) * WEEKS_PER_YEAR / OPERATOR_WEEKS_PER_YEAR
+
+    return {
+        'kits': kits,
+        'trips': trips,
+        'trips_per_shift': trips / shifts_per_week,
+        'trip_min': trip_min,
+        'handler_hours': handler_hours,
+        'handler_fte': handler_fte,
+        'vehicles': handler_hours / shifts_per_week / shift_capacity_hours,
+        'annual_cost': handler_hours * WEEKS_PER_YEAR * HANDLER_HOURLY_COST,
+    }
+
+
+def fleet_size(handling, axis=-1):
+    """
+    Handlers and vehicles needed per shift when trips are pooled over pairs
+
+    Returns:
+        dict: 'vehicles_per_shift', 'handlers_per_shift', 'handler_fte' (rounded up)
+    """
+    vehicles = np.ceil(handling['vehicles'].sum(axis=axis) - 1e-9)
+    return {
+        'vehicles_per_shift': vehicles,
+        'handlers_per_shift': vehicles,
+        'handler_fte': np.ceil(handling['handler_fte'].sum(axis=axis) - 1e-9),
+    }
+
+
+def centroid_distances(centroids):
+    """
+    Euclidean distances between process centroids
+
+    Args:
+        centroids: array (..., processes, 2) of x, y coordinates (ft)
+
+    Returns:
+        array (..., processes, processes)
+    """
+    centroids = np.asarray(centroids, dtype=float)
+    delta = centroids[..., :, None, :] - centroids[..., None, :, :]
+    return np.hypot(delta[..., 0], delta[..., 1])
+
+
+def handling_objective(centroids, profile=None, vehicle=DEFAULT_VEHICLE, shifts=SHIFTS_PER_DAY):
+    """
+    Annual handling cost of a stack of layouts (for use inside layout optimizers)
+
+    Args:
+        centroids: array (layouts, processes, 2) or (processes, 2)
+        profile: kit_profile() output, computed from Year +1 data when omitted
+
+    Returns:
+        array (layouts,) or scalar, annual handler cost ($)
+    """
+    profile = kit_profile() if profile is None else profile
+    handling = evaluate_handling(profile['flow'], centroid_distances(centroids),
+                                 profile['volume_cuft'], profile['weight_lbs'], vehicle, shifts)
+    return handling['annual_cost'].sum(axis=(-2, -1))
+
+
+def handling_report(flow_distances_path, profile=None, vehicle=DEFAULT_VEHICLE, shifts=SHIFTS_PER_DAY):
+    """
+    Per-pair handling table for a *_Flow_Distances.csv file of the distance pipeline
+
+    Kit sizes come from the routing mix of each pair; the flow column of the
+    file is used as given (it is the single-center flow of the layout).
+
+    Returns:
+        (per-pair dataframe sorted by handler hours, fleet_size() dict)
+    """
+    import pandas as pd
+
+    pairs = pd.read_csv(flow_distances_path)
+    pairs = pairs[pairs['flow'] > 0].reset_index(drop=True)
+    profile = kit_profile() if profile is None else profile
+
+    i = pairs['from'].map(data.PROCESS_INDEX).to_numpy()
+    j = pairs['to'].map(data.PROCESS_INDEX).to_numpy()
+    handling = evaluate_handling(pairs['flow'].to_numpy(), pairs['distance_ft'].to_numpy(),
+                                 profile['volume_cuft'][i, j], profile['weight_lbs'][i, j],
+                                 vehicle, shifts)
+
+    report = pairs[['from', 'to', 'flow', 'distance_ft']].copy()
+    report['Kit_Volume_cuft'] = profile['volume_cuft'][i, j]
+    report['Kit_Weight_lbs'] = profile['weight_lbs'][i, j]
+    report['Kits_per_Week'] = handling['kits']
+    report['Trips_per_Week'] = handling['trips']
+    report['Trips_per_Shift'] = handling['trips_per_shift']
+    report['Trip_Min'] = handling['trip_min']
+    report['Handler_Hours_per_Week'] = handling['handler_hours']
+    report['Handler_FTE'] = handling['handler_fte']
+    report['Vehicles_per_Shift'] = handling['vehicles']
+    report['Annual_Handling_Cost'] = handling['annual_cost']
+    return report.sort_values('Handler_Hours_per_Week', ascending=False), fleet_size(handling)
+
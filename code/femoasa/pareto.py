@@ -0,0 +1,369 @@
+"""
+femoasa pareto - non-dominated designs across organizations
+
+the organization comparison ranked designs with fixed scores ((f-1)/f
+redundancy, flexibility and complexity as straight lines in f). this module
+compares designs on computed metrics only and keeps the ones no other design
+beats on every metric at once:
+
+- npv: 5-year cost of the equipment plan and its floor (cost_engine)
+- machines: installed machines in the last year
+- floor_sqft: machine footprint x (1 + aisle allowance) in the last year
+- flow_distance: part-ft/week on a block layout of every center (dynamic_layout)
+- lead_time_h: demand-weighted kit flow time (queueing, QNA)
+- otif: probability that the weakest pool covers its weekly workload with
+  the machines that are up (availability, demand variability), worst year.
+  the plant-wide product over every pool of every center is 1e-4..1e-14 for
+  every design and would not separate them
+
+a design is an organization plus spare machines per process on top of the
+capacity-model sizing, so thousands of variants are evaluated in vectorized
+chunks. the sort is the efficient non-dominated sort (binary search over
+fronts, O(n log n) comparisons for two objectives, each point checked only
+against earlier points of a lexicographic order):
+
+    designs = organization_designs(spares=2, samples=100000)
+    designs['Pareto_Rank'] = non_dominated_sort(designs[METRICS].to_numpy(), SENSES)
+    front = frontier_table(designs)
+
+author: machas^2 team
+"""
+
+from bisect import bisect_right
+
+import numpy as np
+
+from femoasa import availability, capacity, cost_engine, data, dynamic_layout, equipment_catalog, queueing
+from femoasa.config import MACHINE_SPECS, OTIF_SERVICE_LEVEL, SHIFTS_PER_DAY
+
+METRICS = ['npv', 'machines', 'floor_sqft', 'flow_distance', 'lead_time_h', 'otif']
+SENSES = {'npv': 'min', 'machines': 'min', 'floor_sqft': 'min', 'flow_distance': 'min',
+          'lead_time_h': 'min', 'otif': 'max'}
+FLOOR_AISLE_FACTOR = 0.5  # aisles and clearances per ft2 of machine footprint
+
+
+def _minimized(values, senses=None):
+    """
+    (n, k) float array with every objective turned into a minimization
+    """
+    values = np.asarray(values, dtype=float)
+    if senses is None:
+        return values
+    senses = list(senses.values()) if isinstance(senses, dict) else list(senses)
+    sign = np.array([-1.0 if s == 'max' else 1.0 for s in senses])
+    return values * sign
+
+
+def _covered(points, front):
+    """
+    [i, j] = front row j <= point i on every objective after the first
+
+    With distinct rows in lexicographic order this is dominance of a later
+    point by an earlier one.
+    """
+    hit = np.ones((len(points), len(front)), dtype=bool)
+    for j in range(1, points.shape[1]):
+        hit &= front[None, :, j] <= points[:, None, j]
+    return hit
+
+
+def pareto_mask(values, senses=None, block=2048):
+    """
+    Non-dominated points (first front) of a large set
+
+    Distinct points are visited in lexicographic order, where a point can
+    only be dominated by earlier points: each block is filtered against the
+    front found so far and against its own earlier points.
+
+    Args:
+        values: array (n, objectives)
+        senses: 'min' / 'max' per objective (default all 'min')
+
+    Returns:
+        bool array (n,)
+    """
+    unique, inverse = np.unique(_minimized(values, senses), axis=0, return_inverse=True)
+    keep = np.zeros(len(unique), dtype=bool)
+    front = np.empty((0, unique.shape[1]))
+    for start in range(0, len(unique), block):
+        points = unique[start:start + block]
+        alive = ~_covered(points, front).any(axis=1)
+        alive &= ~np.tril(_covered(points, points), k=-1).any(axis=1)
+        keep[start:start + block] = alive
+        front = np.vstack([front, points[alive]])
+    return keep[inverse.ravel()]
+
+
+def non_dominated_sort(values, senses=None, block=1024):
+    """
+    Pareto rank of every point (0 = non-dominated, 1 = dominated only by rank 0, ...)
+
+    Efficient non-dominated sort with binary search over the fronts: in
+    lexicographic order no point is dominated by a later one, and a point
+    dominated by a member of front r is dominated by a member of every front
+    before r, so its rank against the earlier points is found by bisection.
+    Two objectives use the exact O(n log n) sweep on the last member of each
+    front and three the (f2, f3) staircase of each front (O(n log^2 n));
+    more objectives bisect a whole block of points at once and settle the
+    dominance inside the block with one matrix.
+
+    Args:
+        values: array (n, objectives)
+        senses: 'min' / 'max' per objective (default all 'min')
+
+    Returns:
+        int array (n,)
+    """
+    values = _minimized(values, senses)
+    n, k = values.shape
+    order = np.lexsort(values.T[::-1])
+    rank = np.zeros(n, dtype=np.int64)
+
+    if k == 2:
+        # fronts sorted by the first objective have a decreasing second one: only the last member matters
+        last_f1, last_f2 = [], []
+        for i in order:
+            f1, f2 = values[i]
+            r = bisect_right(last_f2, f2)
+            if r > 0 and last_f2[r - 1] == f2 and last_f1[r - 1] == f1:
+                r -= 1  # a duplicate of the last member does not dominate it
+            if r == len(last_f2):
+                last_f1.append(f1)
+                last_f2.append(f2)
+            else:
+                last_f1[r], last_f2[r] = f1, f2
+            rank[i] = r
+        return rank
+
+    # duplicates share the rank of their first copy; unique rows come in lexicographic order, so an
+    # earlier row that is <= on every objective after the first dominates a later one
+    unique, inverse = np.unique(values, axis=0, return_inverse=True)
+    unique_rank = np.zeros(len(unique), dtype=np.int64)
+
+    if k == 3:
+        # a front dominates a point when the staircase of its (f2, f3) reaches below the point
+        stairs = []
+        for u in range(len(unique)):
+            _, f2, f3 = unique[u]
+            lo, hi = 0, len(stairs)
+            while lo < hi:
+                m = (lo + hi) // 2
+                s2, s3 = stairs[m]
+                j = bisect_right(s2, f2) - 1
+                if j >= 0 and s3[j] <= f3:
+                    lo = m + 1
+                else:
+                    hi = m
+            if lo == len(stairs):
+                stairs.append(([], []))
+            s2, s3 = stairs[lo]
+            # drop the steps the new point covers, then insert it (f2 ascending, f3 descending)
+            a = bisect_right(s2, f2)
+            if a > 0 and s2[a - 1] == f2:
+                a -= 1
+            b = a
+            while b < len(s2) and s3[b] >= f3:
+                b += 1
+            s2[a:b], s3[a:b] = [f2], [f3]
+            unique_rank[u] = lo
+        return unique_rank[inverse.ravel()]
+
+    fronts = []
+    for start in range(0, len(unique), block):
+        points = unique[start:start + block]
+        # bisection over the existing fronts, one dominance check per (front, points at that step)
+        lo, hi = np.zeros(len(points), dtype=np.int64), np.full(len(points), len(fronts), dtype=np.int64)
+        while (lo < hi).any():
+            active = np.flatnonzero(lo < hi)
+            mid = (lo[active] + hi[active]) // 2
+            for m in np.unique(mid):
+                sel = active[mid == m]
+                hit = _covered(points[sel], fronts[m]).any(axis=1)
+                lo[sel[hit]] = m + 1
+                hi[sel[~hit]] = m
+        # rank = 1 + highest rank of any dominator; inside the block dominators come earlier
+        dominance = np.tril(_covered(points, points), k=-1)
+        block_rank = lo.copy()
+        for i in np.flatnonzero(dominance.any(axis=1)):
+            block_rank[i] = max(lo[i], block_rank[:i][dominance[i, :i]].max() + 1)
+        unique_rank[start:start + block] = block_rank
+        for r in np.unique(block_rank):
+            members = points[block_rank == r]
+            if r < len(fronts):
+                fronts[r] = np.vstack([fronts[r], members])
+            else:
+                fronts.append(members)
+    return unique_rank[inverse.ravel()]
+
+
+def _footprints(processes):
+    templates = list(MACHINE_SPECS)
+    return np.array([np.prod(MACHINE_SPECS[p if p in MACHINE_SPECS else templates[k % len(templates)]][:2])
+                     for k, p in enumerate(processes)], dtype=float)
+
+
+def flow_distances(inputs, organization, starts=4):
+    """
+    Part-ft/week of every year on a block layout of the organization's centers
+
+    Pooled organizations use the dynamic_layout plan of one center (scaled by
+    the number of centers); a part cell lays out the processes of its own
+    routing with the same swap search.
+
+    Returns:
+        array (years,)
+    """
+    demand = inputs['demand']
+    mean = np.asarray(demand['weekly'], dtype=float) @ np.asarray(demand['bom'], dtype=float).T
+    flows = np.einsum('yk,kij->ykij', mean, inputs['transitions'])
+    if organization != 'part':
+        problem = dynamic_layout.layout_problem(inputs, organization)
+        layouts = dynamic_layout.solve(problem, starts, workers=1)['dynamic']['layouts']
+        distance = problem['distance'][layouts[:, :, None], layouts[:, None, :]]
+        return (flows.sum(axis=1) * distance).sum(axis=(-2, -1))
+
+    # one cell per part: its processes on a grid sized by the cell's largest year
+    workload = capacity.part_workload(mean, inputs['workload'])
+    units = np.ceil(workload / capacity.machine_capacity() - 1e-9).max(axis=0)
+    footprint = _footprints(inputs['processes'])
+    total = np.zeros(len(mean))
+    for k in range(len(mean[0])):
+        blocks = np.flatnonzero(units[k])
+        if len(blocks) < 2:
+            continue
+        pitch = np.sqrt((units[k, blocks] * footprint[blocks]).mean() * (1.0 + dynamic_layout.DEFAULT_SEARCH['aisle_factor']))
+        slots = dynamic_layout.slot_grid(len(blocks), pitch)
+        distance = np.hypot(*(slots[:, None, :] - slots[None, :, :]).transpose(2, 0, 1))
+        cell = flows[:, k][:, blocks][:, :, blocks]
+        rng = np.random.default_rng(k)
+        perm = min((dynamic_layout.local_search(cell.sum(axis=0), distance, rng.permutation(len(slots)))
+                    for _ in range(starts)), key=lambda result: result[1])[0][:len(blocks)]
+        total += (cell * distance[perm[:, None], perm[None, :]]).sum(axis=(-2, -1))
+    return total
+
+
+def _chunk_metrics(inputs, organization, equipment, base, context):
+    """
+    Metrics of a chunk of designs, equipment (designs, years, processes) or (designs, years, parts, processes)
+    """
+    f = capacity.num_centers(organization)
+    pooled = equipment.sum(axis=-2) if organization == 'part' else equipment
+    installed = np.maximum.accumulate(pooled, axis=1)
+    floor = installed @ context['footprint'] * (1.0 + FLOOR_AISLE_FACTOR)
+    types = np.zeros(installed.shape[:2] + (len(context['catalog']['names']),))
+    types[..., context['ids']] = installed
+    costs = cost_engine.evaluate_costs(types, context['catalog'], floor_sqft=floor)
+
+    lead = queueing.evaluate(equipment, context['mean'], context['profile'], organization)['flow_time_mean_h']
+    pool, _ = availability.design_probability(context['workload'], equipment, organization,
+                                              part_workload_std=context['workload_std'])
+    return {
+        'npv': costs['npv'],
+        'machines': installed[:, -1].sum(axis=-1),
+        'floor_sqft': floor[:, -1],
+        'flow_distance': np.broadcast_to(base['flow_distance'][-1], len(equipment)),
+        'lead_time_h': lead.mean(axis=-1),
+        'otif': pool.reshape(pool.shape[:2] + (-1,)).min(axis=(-2, -1)),
+    }
+
+
+def organization_designs(inputs=None, organizations=capacity.ORGANIZATIONS, spares=2, samples=0, seed=6202,
+                         chunk_size=2000, shifts=SHIFTS_PER_DAY):
+    """
+    Computed metrics of every organization and of spare-machine variants
+
+    Args:
+        spares: largest number of spare machines per process and center
+        samples: random variants per pooled organization (0 = only the
+            capacity-model design and the uniform 1..spares variants)
+
+    Returns:
+        dataframe: Organization, Spares (per process and center; -1 mixed),
+        Variant, METRICS columns; the machines of the variants are not
+        stored (rebuilt from Organization, Variant and seed)
+    """
+    import pandas as pd
+
+    inputs = data.load_snapshot() if inputs is None else inputs
+    demand = inputs['demand']
+    processes = list(inputs['processes'])
+    mean = np.asarray(demand['weekly'], dtype=float) @ np.asarray(demand['bom'], dtype=float).T
+    workload = capacity.part_workload(mean, inputs['workload'])
+    catalog = inputs['catalog']
+    context = {
+        'mean': mean,
+        'workload': workload,
+        'workload_std': capacity.product_workload_std(demand['weekly'], demand['cv'], demand['bom'], inputs['workload']),
+        'profile': queueing.routing_profile(inputs['routings'], inputs['step_times'], processes),
+        'footprint': _footprints(processes),
+        'catalog': catalog,
+        'ids': equipment_catalog.lookup(catalog, processes),
+    }
+    machine = capacity.machine_capacity(shifts)
+    rng = np.random.default_rng(seed)
+
+    frames = []
+    for organization in organizations:
+        f = capacity.num_centers(organization)
+        base = {'flow_distance': flow_distances(inputs, organization)}
+        if organization == 'part':
+            # part cells keep their capacity-model size: spares would be per part and process
+            equipment = np.ceil(workload / machine - 1e-9)[None]
+            extra = np.zeros((1, len(processes)))
+        else:
+            equipment = capacity.equipment_requirements(workload, organization, machine)[None]
+            levels = np.repeat(np.arange(spares + 1)[:, None], len(processes), axis=1)
+            extra = np.vstack([levels, rng.integers(0, spares + 1, size=(samples, len(processes)))])
+
+        metrics = {name: [] for name in METRICS}
+        for start in range(0, len(extra), chunk_size):
+            block = extra[start:start + chunk_size]
+            designs = equipment + (f * block[:, None, :] if organization != 'part' else 0.0)
+            for name, values in _chunk_metrics(inputs, organization, designs, base, context).items():
+                metrics[name].append(np.asarray(values, dtype=float))
+
+        uniform = (extra == extra[:, :1]).all(axis=1)
+        frames.append(pd.DataFrame({
+            'Organization': organization,
+            'Spares': np.where(uniform, extra[:, 0], -1).astype(int),
+            'Variant': np.arange(len(extra)),
+            **{name: np.concatenate(values) for name, values in metrics.items()},
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def frontier_table(designs, metrics=METRICS, senses=SENSES):
+    """
+    Ranked designs with the non-dominated set first
+
+    Returns:
+        dataframe with 'Pareto_Rank' and 'Non_Dominated' columns, sorted by rank then metrics
+    """
+    table = designs.copy()
+    table['Pareto_Rank'] = non_dominated_sort(table[metrics].to_numpy(), [senses[m] for m in metrics])
+    table['Non_Dominated'] = table['Pareto_Rank'] == 0
+    return table.sort_values(['Pareto_Rank'] + list(metrics), kind='stable').reset_index(drop=True)
+
+
+def plot_frontier(ax, designs, x, y, senses=SENSES, color_by='Organization', max_points=20000):
+    """
+    Scatter of the designs on two metrics with their two-metric frontier as a step line
+    """
+    shown = designs if len(designs) <= max_points else designs.sample(max_points, random_state=0)
+    for label, group in shown.groupby(color_by, sort=False):
+        ax.scatter(group[x], group[y], s=6, alpha=0.35, label=label)
+    values = designs[[x, y]].to_numpy()
+    front = values[pareto_mask(values, [senses[x], senses[y]])]
+    front = front[np.argsort(front[:, 0])]
+    ax.step(front[:, 0], front[:, 1], where='post', color='black', linewidth=1.5, label='frontier')
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    ax.grid(alpha=0.3)
+    return front
+
+
+def otif_feasible(designs, level=OTIF_SERVICE_LEVEL):
+    """
+    Designs meeting the OTIF target
+    """
+    return designs[designs['otif'] >= level]
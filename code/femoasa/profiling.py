@@ -0,0 +1,253 @@
+"""
+femoasa profiling - stage-level timing hooks with chrome-trace output
+
+a stage is any block of work worth timing: a script section, an engine call,
+a loader. stages are marked three ways:
+
+    with profiling.stage('task 1: equipment'):      # a block
+        ...
+    @profiling.traced()                               # a function
+    def storage_plan(...): ...
+    profiling.step('task 2: storage')                 # flat scripts: ends the
+                                                      # previous step, starts this one
+
+inside a stage, profiling.count(rows=...) and profiling.wrote(path) attach row
+counts and bytes written. recording is off by default: stage() returns a
+shared no-op context, traced() wrappers check one flag, so instrumented code
+costs well under a microsecond per call. it is switched on by enable() or by
+the environment:
+
+    FEMOASA_PROFILE=1 python task1_task2_complete_v2.py
+    FEMOASA_PROFILE=1 FEMOASA_CPROFILE=1 python ...   # + one .prof per top-level stage
+
+when enabled from the environment, the trace (chrome://tracing / perfetto
+json, one complete event per stage) is written to results/profiles/ at exit
+and a summary table is printed.
+
+author: machas^2 team
+"""
+
+import atexit
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+from femoasa.config import RESULTS_DIR
+
+PROFILE_DIR = RESULTS_DIR / "profiles"
+
+_state = {
+    'enabled': False,
+    'cprofile': False,
+    'events': [],
+    'stack': [],
+    'step': None,
+    'origin': time.perf_counter(),
+    'out_dir': PROFILE_DIR,
+}
+
+
+def enabled():
+    return _state['enabled']
+
+
+def enable(cprofile=False, out_dir=PROFILE_DIR):
+    """
+    Start recording stages (cprofile=True also profiles every top-level stage)
+    """
+    _state.update({'enabled': True, 'cprofile': cprofile, 'out_dir': Path(out_dir)})
+
+
+def disable():
+    end_step()
+    _state['enabled'] = False
+
+
+def reset():
+    _state.update({'events': [], 'stack': [], 'step': None, 'origin': time.perf_counter()})
+
+
+def _file_name(name):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_') or 'stage'
+
+
+@contextlib.contextmanager
+def _recording(name, args):
+    """
+    Record one stage as a complete ('X') chrome-trace event
+    """
+    record = {'name': name, 'args': dict(args)}
+    stack = _state['stack']
+    profiler = None
+    if _state['cprofile'] and not stack:
+        # cProfile cannot nest: only top-level stages get their own profile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        end = time.perf_counter()
+        if profiler is not None:
+            profiler.disable()
+            _state['out_dir'].mkdir(parents=True, exist_ok=True)
+            path = _state['out_dir'] / f"{_file_name(name)}_{len(_state['events'])}.prof"
+            profiler.dump_stats(path)
+            record['args']['cprofile'] = str(path)
+        del stack[next(k for k in range(len(stack) - 1, -1, -1) if stack[k] is record)]
+        _state['events'].append({
+            'name': name,
+            'ph': 'X',
+            'ts': (start - _state['origin']) * 1e6,
+            'dur': (end - start) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': record['args'],
+        })
+
+
+_NULL = contextlib.nullcontext()
+
+
+def stage(name, **args):
+    """
+    Context manager timing a block (args are recorded with the event)
+    """
+    if not _state['enabled']:
+        return _NULL
+    return _recording(name, args)
+
+
+def traced(name=None):
+    """
+    Decorator timing every call of a function as a stage (default name: module.function)
+    """
+    def decorate(func):
+        label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state['enabled']:
+                return func(*args, **kwargs)
+            with _recording(label, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def step(name, **args):
+    """
+    Sequential stages for flat scripts: end the current step, start the next
+    """
+    if not _state['enabled']:
+        return
+    end_step()
+    recording = _recording(name, args)
+    recording.__enter__()
+    _state['step'] = recording
+
+
+def end_step():
+    current = _state['step']
+    if current is not None:
+        _state['step'] = None
+        current.__exit__(None, None, None)
+
+
+def count(**counters):
+    """
+    Add counters (rows=..., parts=...) to the innermost open stage
+    """
+    if _state['enabled'] and _state['stack']:
+        args = _state['stack'][-1]['args']
+        for key, value in counters.items():
+            args[key] = args.get(key, 0) + value
+
+
+def wrote(path):
+    """
+    Record a written file (bytes_written, files) on the innermost open stage
+    """
+    if _state['enabled'] and _state['stack']:
+        count(bytes_written=Path(path).stat().st_size, files=1)
+
+
+def trace_events():
+    return list(_state['events'])
+
+
+def write_trace(path=None):
+    """
+    Write the recorded stages as a chrome trace (chrome://tracing, ui.perfetto.dev)
+
+    Returns:
+        Path of the json file
+    """
+    end_step()
+    if path is None:
+        script = Path(sys.argv[0]).stem or 'python'
+        path = _state['out_dir'] / f"trace_{script}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({'traceEvents': _state['events'], 'displayTimeUnit': 'ms'}, default=str))
+    return path
+
+
+def summary():
+    """
+    Time per stage name, slowest first
+
+    Returns:
+        dataframe: Stage, Calls, Total_s, Mean_ms, Max_ms, Share (of the traced
+        wall time), plus the summed counters (Rows, Bytes_Written, ...)
+    """
+    import pandas as pd  # keeps the hooks import-light for instrumented modules
+
+    end_step()
+    events = _state['events']
+    if not events:
+        return pd.DataFrame(columns=['Stage', 'Calls', 'Total_s', 'Mean_ms', 'Max_ms', 'Share'])
+    frame = pd.DataFrame({'Stage': [e['name'] for e in events], 'dur': [e['dur'] for e in events]})
+    counters = pd.DataFrame([{k: v for k, v in e['args'].items() if isinstance(v, (int, float))} for e in events])
+    wall = max(e['ts'] + e['dur'] for e in events) - min(e['ts'] for e in events)
+
+    table = frame.groupby('Stage', sort=False)['dur'].agg(['count', 'sum', 'mean', 'max'])
+    table = pd.DataFrame({
+        'Calls': table['count'],
+        'Total_s': table['sum'] / 1e6,
+        'Mean_ms': table['mean'] / 1e3,
+        'Max_ms': table['max'] / 1e3,
+        'Share': table['sum'] / max(wall, 1e-9),
+    })
+    if not counters.empty:
+        counters.columns = [c.title() for c in counters.columns]
+        table = table.join(counters.groupby(frame['Stage'], sort=False).sum(min_count=1))
+    return table.sort_values('Total_s', ascending=False).reset_index()
+
+
+def print_summary(file=None):
+    table = summary()
+    print("\n" + "=" * 80, file=file)
+    print("STAGE PROFILE", file=file)
+    print("=" * 80, file=file)
+    print(table.to_string(index=False, float_format=lambda v: f"{v:,.3f}"), file=file)
+
+
+def _report_at_exit():
+    if _state['events'] or _state['step'] is not None:
+        path = write_trace()
+        print_summary()
+        print(f"Trace written to {path}")
+
+
+if os.environ.get('FEMOASA_PROFILE', '') not in ('', '0'):
+    enable(cprofile=os.environ.get('FEMOASA_CPROFILE', '') not in ('', '0'))
+    atexit.register(_report_at_exit)
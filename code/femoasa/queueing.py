@@ -0,0 +1,321 @@
+"""
+femoasa queueing network - analytic lead time and WIP of every design
+
+every process pool of a design is a GI/G/c station fed by the routing flows
+of the kits (100-part transfer batches) that visit it:
+
+- functional: one 13-station network, c = machines of each process
+- fractal fN: N identical networks, each with 1/N of the flow and machines
+- part: one network per part cell, c = the cell's machines of each process
+
+the network is decomposed with Whitt's QNA: the arrival scv of each station
+solves the linear traffic-variability equations (superposition with Albin's
+weights, splitting, multi-server departure scv), the mean wait is the
+Allen-Cunneen GI/G/c approximation (Erlang C scaled by (ca2 + cs2) / 2, i.e.
+Kingman for c = 1), WIP follows from Little's law and the flow time of a part
+is the sum of waits and step times along its routing. all stations of all
+designs and years are solved in one batched call:
+
+    profile = routing_profile()
+    result = evaluate(equipment, part_demand, profile, centers=4)   # any leading batch axes
+
+times are in hours of scheduled time (the plant only runs its shifts); step
+times are divided by efficiency x reliability, as in the capacity model.
+
+queueing_report evaluates the machine counts of the capacity plan as they
+are. those pools run at 0.95-1.0 utilization, where the waits follow the
+rounding of single pools; with target_utilization the report adds the same
+designs re-sized for that load (machines = ceil(load / (capacity x target)))
+as separate *_at_Target columns, a steadier basis to compare organizations.
+
+author: machas^2 team
+"""
+
+import numpy as np
+
+from femoasa import capacity, data
+from femoasa.config import EFFICIENCY, KIT_PARTS, RELIABILITY, SHIFTS_PER_DAY, weekly_hours
+
+DEFAULT_VARIABILITY = {
+    'arrival_scv': 1.0,   # kit releases to the first routing step (poisson)
+    'process_scv': 0.5,   # variability of one step time around its standard (set-ups, micro-stops)
+}
+
+TARGET_UTILIZATION = 0.85   # pool load of the optional re-sized comparison columns
+
+
+def routing_profile(routings=None, step_times=None, processes=None):
+    """
+    Per-part routing arrays used to build the station flows
+
+    Returns:
+        dict of arrays: 'visits', 'minutes', 'minutes_sq' (parts, processes)
+        visits, sum of step times and of squared step times per unit at each
+        process; 'first' (parts, processes) 1 at the first step;
+        'transitions' (parts, processes, processes); 'processes'
+    """
+    routings = data.load_routings() if routings is None else routings
+    step_times = data.load_step_times() if step_times is None else step_times
+    processes = data.PROCESSES if processes is None else processes
+    index = {p: j for j, p in enumerate(processes)}
+
+    shape = (len(routings), len(processes))
+    visits, minutes, minutes_sq, first = np.zeros(shape), np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    for k, (part, steps) in enumerate(routings.items()):
+        codes = [index[s] for s in steps]
+        times = np.asarray(step_times[part][:len(steps)], dtype=float)
+        np.add.at(visits[k], codes, 1.0)
+        np.add.at(minutes[k], codes, times)
+        np.add.at(minutes_sq[k], codes, times ** 2)
+        first[k, codes[0]] = 1.0
+
+    return {
+        'visits': visits,
+        'minutes': minutes,
+        'minutes_sq': minutes_sq,
+        'first': first,
+        'transitions': data.routing_transitions(routings, processes),
+        'processes': list(processes),
+    }
+
+
+def station_inputs(part_demand, profile, by_part=False, batch=KIT_PARTS, shifts=SHIFTS_PER_DAY,
+                   variability=DEFAULT_VARIABILITY):
+    """
+    Arrival rates, flows and service-time moments of the stations
+
+    Args:
+        part_demand: array (..., parts) units/week
+        by_part: keep one network per part (part cells) instead of pooling the parts
+
+    Returns:
+        dict of arrays in kits and minutes of scheduled time, shapes (..., P)
+        or (..., P, P), with an extra parts axis before P when by_part:
+        'arrivals', 'external', 'flows', 'service_mean', 'service_scv'
+    """
+    rate = np.asarray(part_demand, dtype=float) / batch / (weekly_hours(shifts) * 60.0)
+    availability = EFFICIENCY * RELIABILITY
+    if by_part:
+        weighted = lambda matrix: rate[..., :, None] * matrix
+        flows = rate[..., :, None, None] * profile['transitions']
+    else:
+        weighted = lambda matrix: rate @ matrix
+        flows = np.einsum('...k,kij->...ij', rate, profile['transitions'])
+
+    arrivals = weighted(profile['visits'])
+    safe = np.where(arrivals > 0, arrivals, 1.0)
+    # kit service time: the mix of the steps done at the station, each batch x step time
+    mean = weighted(profile['minutes']) * batch / availability / safe
+    second = weighted(profile['minutes_sq']) * (batch / availability) ** 2 * (1.0 + variability['process_scv']) / safe
+    scv = np.where(arrivals > 0, second / np.where(mean > 0, mean, 1.0) ** 2 - 1.0, 0.0)
+    return {
+        'arrivals': arrivals,
+        'external': weighted(profile['first']),
+        'flows': flows,
+        'service_mean': np.where(arrivals > 0, mean, 0.0),
+        'service_scv': np.maximum(scv, 0.0),
+    }
+
+
+def erlang_c(servers, offered):
+    """
+    Probability of waiting in M/M/c (vectorized Erlang B recursion)
+
+    Args:
+        servers: array of integer server counts
+        offered: array of offered load lambda / mu (same shape)
+
+    Returns:
+        array, 1 where offered >= servers
+    """
+    servers = np.asarray(servers, dtype=float)
+    offered = np.asarray(offered, dtype=float)
+    blocking = np.ones(np.broadcast(servers, offered).shape)
+    for k in range(1, int(servers.max(initial=0)) + 1):
+        step = offered * blocking / (k + offered * blocking)
+        blocking = np.where(k <= servers, step, blocking)
+    rho = np.where(servers > 0, offered / np.where(servers > 0, servers, 1.0), 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        wait = blocking / (1.0 - rho * (1.0 - blocking))
+    return np.where(rho >= 1.0, 1.0, np.where(servers > 0, wait, 0.0))
+
+
+def qna(inputs, servers, arrival_scv=DEFAULT_VARIABILITY['arrival_scv']):
+    """
+    Whitt's QNA decomposition of a batch of networks
+
+    Args:
+        inputs: station_inputs() dict, station axis last (flows: last two axes)
+        servers: array broadcastable to inputs['arrivals'], machines per station
+        arrival_scv: scv of the external kit releases
+
+    Returns:
+        dict of arrays like inputs['arrivals']: 'utilization', 'arrival_scv',
+        'wait' (minutes in queue per visit), 'wip' (kits at the station,
+        queue + service); inf where a station is overloaded
+    """
+    # designs may add leading axes to the demand (or the other way round)
+    servers = np.asarray(servers, dtype=float)
+    shape = np.broadcast_shapes(inputs['arrivals'].shape, servers.shape)
+    inputs = {key: np.broadcast_to(value, shape + value.shape[len(inputs['arrivals'].shape):])
+              for key, value in inputs.items()}
+    lam = inputs['arrivals']
+    servers = np.broadcast_to(servers, shape)
+    active = (lam > 0) & (servers > 0)
+    safe_lam = np.where(lam > 0, lam, 1.0)
+    safe_c = np.where(servers > 0, servers, 1.0)
+    offered = lam * inputs['service_mean']
+    rho = np.where(active, offered / safe_c, np.where(lam > 0, np.inf, 0.0))
+    rho_c = np.minimum(rho, 1.0)
+    cs2 = inputs['service_scv']
+
+    # share of the arrivals at j coming from i (and from outside), splitting probability i -> j
+    share = inputs['flows'] / safe_lam[..., None, :]
+    outside = inputs['external'] / safe_lam
+    split = inputs['flows'] / safe_lam[..., :, None]
+    nu = 1.0 / np.maximum((share ** 2).sum(axis=-2) + outside ** 2, 1e-12)
+    w = 1.0 / (1.0 + 4.0 * (1.0 - rho_c) ** 2 * (nu - 1.0))
+
+    # ca2_j = alpha_j + sum_i beta_ij ca2_i
+    departure = rho_c ** 2 * (1.0 + (cs2 - 1.0) / np.sqrt(safe_c))
+    beta = w[..., None, :] * share * split * (1.0 - rho_c ** 2)[..., :, None]
+    alpha = 1.0 - w + w * (outside * arrival_scv
+                           + (share * (split * departure[..., :, None] + 1.0 - split)).sum(axis=-2))
+    n = lam.shape[-1]
+    system = np.eye(n) - np.swapaxes(beta, -1, -2)
+    ca2 = np.linalg.solve(system, alpha[..., None])[..., 0]
+    ca2 = np.where(lam > 0, np.maximum(ca2, 0.0), 0.0)
+
+    # Allen-Cunneen: M/M/c wait scaled by the variability of arrivals and service
+    mmc = erlang_c(np.where(active, servers, 0.0), np.where(active, offered, 0.0)) * inputs['service_mean'] \
+        / np.where(active, safe_c * (1.0 - rho_c), 1.0)
+    with np.errstate(invalid='ignore'):
+        wait = np.where(rho >= 1.0, np.inf, np.where(active, (ca2 + cs2) / 2.0 * mmc, 0.0))
+    return {
+        'utilization': rho,
+        'arrival_scv': ca2,
+        'wait': wait,
+        'wip': lam * (wait + inputs['service_mean']),
+    }
+
+
+def evaluate(equipment, part_demand, profile=None, organization='functional', batch=KIT_PARTS,
+             shifts=SHIFTS_PER_DAY, variability=DEFAULT_VARIABILITY):
+    """
+    Waits, WIP and flow times of a batch of designs of one organization
+
+    Args:
+        equipment: array (..., processes) total machines per process, or
+            (..., parts, processes) machines per part cell for 'part'
+        part_demand: array broadcastable to (..., parts) units/week
+        organization: 'functional', 'part' or 'fractal_fN'
+
+    Returns:
+        dict: station arrays from qna() (per center / cell), 'flow_time_h'
+        (..., parts) hours per kit from release to the last step,
+        'wip_parts' (...) parts in process over all centers, 'flow_time_mean_h'
+        (...) demand-weighted mean flow time, 'max_utilization' (...)
+    """
+    profile = routing_profile() if profile is None else profile
+    by_part = organization == 'part'
+    f = capacity.num_centers(organization)
+    demand = np.asarray(part_demand, dtype=float) / f
+    inputs = station_inputs(demand, profile, by_part, batch, shifts, variability)
+    servers = np.asarray(equipment, dtype=float) / f
+    result = qna(inputs, servers, variability['arrival_scv'])
+
+    # kit flow time: every visit waits, every step is processed once per kit
+    wait = result['wait'] if by_part else result['wait'][..., None, :]
+    with np.errstate(invalid='ignore'):
+        queue = np.where(profile['visits'] > 0, wait * profile['visits'], 0.0).sum(axis=-1)
+    process = (profile['minutes'] * batch / (EFFICIENCY * RELIABILITY)).sum(axis=-1)
+    flow_time = (queue + process) / 60.0
+
+    axes = (-2, -1) if by_part else (-1,)
+    wip = result['wip'].sum(axis=axes) * batch * f
+    throughput = np.broadcast_to(demand * f, flow_time.shape)
+    result.update({
+        'flow_time_h': flow_time,
+        'wip_parts': wip,
+        'flow_time_mean_h': (flow_time * throughput).sum(axis=-1) / np.maximum(throughput.sum(axis=-1), 1e-12),
+        'max_utilization': np.where(inputs['arrivals'] > 0, result['utilization'], 0.0).max(axis=axes),
+    })
+    return result
+
+
+def queueing_report(demand=None, profile=None, organizations=capacity.ORGANIZATIONS, shifts=SHIFTS_PER_DAY,
+                    batch=KIT_PARTS, variability=DEFAULT_VARIABILITY, target_utilization=None):
+    """
+    Lead time and WIP of every organization and year, equipment of the capacity plan
+
+    Args:
+        target_utilization: optional pool utilization (e.g. TARGET_UTILIZATION)
+            to also evaluate every design re-sized for load / target
+
+    Returns:
+        (summary dataframe: Organization, Year, Stations, Machines,
+        Max_Utilization, WIP_Parts, Mean_Flow_Time_h, Max_Flow_Time_h,
+        WIP_Weeks (WIP / weekly demand), and with target_utilization
+        Machines_at_Target, Max_Utilization_at_Target, WIP_Parts_at_Target,
+        Mean_Flow_Time_h_at_Target;
+        station dataframe: Organization, Year, Process, Machines,
+        Utilization, Arrival_SCV, Service_SCV, Wait_Min, WIP_Kits per center)
+    """
+    import pandas as pd
+
+    demand = data.load_multi_year_demand() if demand is None else demand
+    profile = routing_profile() if profile is None else profile
+    mean = demand['weekly'] @ demand['bom'].T
+    workload = capacity.part_workload(mean, profile['minutes'])
+    machine = capacity.machine_capacity(shifts)
+    inputs_pooled = station_inputs(mean, profile, False, batch, shifts, variability)
+
+    def sized(organization, cap):
+        if organization == 'part':
+            return np.ceil(workload / cap - 1e-9)
+        return capacity.equipment_requirements(workload, organization, cap)
+
+    summary, stations = [], []
+    for organization in organizations:
+        equipment = sized(organization, machine)
+        result = evaluate(equipment, mean, profile, organization, batch, shifts, variability)
+        if target_utilization is not None:
+            target_equipment = sized(organization, machine * target_utilization)
+            target = evaluate(target_equipment, mean, profile, organization, batch, shifts, variability)
+        f = capacity.num_centers(organization)
+        for y, year in enumerate(demand['years']):
+            served = mean[y] > 0
+            row = {
+                'Organization': organization,
+                'Year': f"Year {year}",
+                'Stations': int((equipment[y] > 0).sum()) * (1 if organization == 'part' else f),
+                'Machines': int(equipment[y].sum()),
+                'Max_Utilization': float(result['max_utilization'][y]),
+                'WIP_Parts': float(result['wip_parts'][y]),
+                'Mean_Flow_Time_h': float(result['flow_time_mean_h'][y]),
+                'Max_Flow_Time_h': float(result['flow_time_h'][y][served].max()),
+                'WIP_Weeks': float(result['wip_parts'][y] / mean[y].sum()),
+            }
+            if target_utilization is not None:
+                row.update({
+                    'Machines_at_Target': int(target_equipment[y].sum()),
+                    'Max_Utilization_at_Target': float(target['max_utilization'][y]),
+                    'WIP_Parts_at_Target': float(target['wip_parts'][y]),
+                    'Mean_Flow_Time_h_at_Target': float(target['flow_time_mean_h'][y]),
+                })
+            summary.append(row)
+            if organization == 'part':
+                continue
+            for j, process in enumerate(profile['processes']):
+                stations.append({
+                    'Organization': organization,
+                    'Year': f"Year {year}",
+                    'Process': process,
+                    'Machines_per_Center': float(equipment[y, j] / f),
+                    'Utilization': float(result['utilization'][y, j]),
+                    'Arrival_SCV': float(result['arrival_scv'][y, j]),
+                    'Service_SCV': float(inputs_pooled['service_scv'][y, j]),
+                    'Wait_Min': float(result['wait'][y, j]),
+                    'WIP_Kits': float(result['wip'][y, j]),
+                })
+    return pd.DataFrame(summary), pd.DataFrame(stations)
@@ -0,0 +1,185 @@
+"""
+femoasa raw materials - kit inventory simulation for the inbound materials policy
+
+materials come from the MSC (250 miles away) once a week, in kits of 100
+parts that take 150% of the parts' volume and weight. the factory keeps a
+two-week inventory with 99.9% robustness: a periodic-review, order-up-to
+policy with review period R = 1 week and lead time L = 1 week, so the
+order-up-to level covers R + L = 2 weeks of demand at z(99.9%):
+
+    S = mu (R + L) + z sigma sqrt(R + L), rounded up to whole kits
+
+each week the order (S - inventory position, whole kits) is placed, the order
+of L weeks ago arrives, and the first routing step of every part consumes the
+week's production. weekly product demand is sampled per replication (normal,
+cv from the forecast, truncated at zero) and exploded through the BOM, so part
+demands keep their correlation. the state of all replications, years and
+parts is one array, each simulated week is a handful of array operations:
+
+    result = simulate(replications=2000, seed=6202)
+    report = inventory_report(result)
+
+author: machas^2 team
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+
+from femoasa import data, profiling
+from femoasa.config import (
+    KIT_PARTS, KIT_VOLUME_FACTOR, KIT_WEIGHT_FACTOR, STORAGE_HEIGHT_FT, STORAGE_UTILIZATION,
+)
+
+RAW_MATERIALS_SERVICE_LEVEL = 0.999
+REVIEW_WEEKS = 1
+LEAD_TIME_WEEKS = 1
+WARMUP_WEEKS = 4
+
+
+def order_up_to(mean, std, service_level=RAW_MATERIALS_SERVICE_LEVEL, review_weeks=REVIEW_WEEKS,
+                lead_time_weeks=LEAD_TIME_WEEKS, kit_parts=KIT_PARTS):
+    """
+    Order-up-to level in parts (whole kits) covering review period + lead time
+
+    Args:
+        mean, std: arrays (..., parts) weekly part demand
+    """
+    cover = review_weeks + lead_time_weeks
+    z = np.vectorize(NormalDist().inv_cdf, otypes=[float])(service_level)
+    return np.ceil((mean * cover + z * std * np.sqrt(cover)) / kit_parts) * kit_parts
+
+
+@profiling.traced()
+def simulate(demand=None, replications=1000, weeks=52, service_level=RAW_MATERIALS_SERVICE_LEVEL,
+             review_weeks=REVIEW_WEEKS, lead_time_weeks=LEAD_TIME_WEEKS, kit_parts=KIT_PARTS,
+             seed=None, chunk_size=2000):
+    """
+    Simulate the weekly kit inventory of every part for every year
+
+    Args:
+        demand: dict like data.load_multi_year_demand() (default: Years 1-5)
+        replications: independent years simulated per (year, part)
+        weeks: simulated weeks after a warm-up of WARMUP_WEEKS
+        chunk_size: replications per batch (bounds memory)
+
+    Returns:
+        dict: 'years', 'order_up_to', 'mean', 'std' (years, parts) and
+        per-replication statistics (replications, years, parts): 'on_hand_mean'
+        (parts after the inbound, averaged over weeks), 'on_hand_peak',
+        'stockout_weeks', 'short_units' (new demand not served from stock),
+        'demand_units', 'kits_received'
+    """
+    demand = data.load_multi_year_demand() if demand is None else demand
+    weekly = np.asarray(demand['weekly'], dtype=float)
+    sigma = weekly * np.asarray(demand['cv'], dtype=float)
+    bom = demand['bom']
+
+    mean = weekly @ bom.T
+    std = np.sqrt(sigma ** 2 @ (bom ** 2).T)
+    target = order_up_to(mean, std, service_level, review_weeks, lead_time_weeks, kit_parts)
+
+    rng = np.random.default_rng(seed)
+    chunks = [_simulate_chunk(rng, n, weeks, weekly, sigma, bom, mean, target, review_weeks, lead_time_weeks, kit_parts)
+              for n in np.diff(np.append(np.arange(0, replications, chunk_size), replications))]
+
+    result = {key: np.concatenate([c[key] for c in chunks]) for key in chunks[0]}
+    result.update({'years': demand['years'], 'order_up_to': target, 'mean': mean, 'std': std,
+                   'weeks': weeks, 'kit_parts': kit_parts})
+    return result
+
+
+def _simulate_chunk(rng, n, weeks, weekly, sigma, bom, mean, target, review_weeks, lead_time_weeks, kit_parts):
+    shape = (n,) + mean.shape
+    # steady start: on hand net of the orders in transit, one order per lead-time week
+    pipeline = np.broadcast_to(np.ceil(mean * review_weeks / kit_parts) * kit_parts, (lead_time_weeks,) + shape).copy()
+    on_hand = np.broadcast_to(target - pipeline.sum(axis=0), shape).copy()
+    backlog = np.zeros(shape)
+
+    stats_ = {k: np.zeros(shape) for k in ['on_hand_mean', 'on_hand_peak', 'stockout_weeks', 'short_units',
+                                           'demand_units', 'kits_received']}
+
+    for week in range(WARMUP_WEEKS + weeks):
+        record = week >= WARMUP_WEEKS
+        if week % review_weeks == 0:
+            position = on_hand - backlog + pipeline.sum(axis=0)
+            order = np.ceil(np.maximum(target - position, 0.0) / kit_parts) * kit_parts
+        else:
+            order = np.zeros(shape)
+
+        # inbound truck: the order placed lead_time_weeks ago
+        if lead_time_weeks > 0:
+            arriving = pipeline[0]
+            pipeline = np.concatenate([pipeline[1:], order[np.newaxis]])
+        else:
+            arriving = order
+        on_hand += arriving
+
+        products = np.maximum(weekly + sigma * rng.standard_normal((n,) + weekly.shape), 0.0)
+        new_demand = products @ bom.T
+        consumption = new_demand + backlog
+        used = np.minimum(consumption, on_hand)
+        short = consumption - used
+        on_hand_after_inbound = on_hand.copy()
+        on_hand -= used
+        backlog = short
+
+        if record:
+            stats_['on_hand_mean'] += on_hand_after_inbound / weeks
+            np.maximum(stats_['on_hand_peak'], on_hand_after_inbound, out=stats_['on_hand_peak'])
+            stats_['stockout_weeks'] += short > 0
+            stats_['short_units'] += np.minimum(short, new_demand)
+            stats_['demand_units'] += new_demand
+            stats_['kits_received'] += arriving / kit_parts
+
+    return stats_
+
+
+def kit_dimensions(dimensions=None, kit_parts=KIT_PARTS):
+    """
+    Volume (cu ft) and weight (lbs) of one kit of every part
+    """
+    dimensions = data.load_part_dimensions() if dimensions is None else dimensions
+    return (dimensions['volume_cuft'] * kit_parts * KIT_VOLUME_FACTOR,
+            dimensions['weight_lbs'] * kit_parts * KIT_WEIGHT_FACTOR)
+
+
+def inventory_report(result, dimensions=None, height=STORAGE_HEIGHT_FT, utilization=STORAGE_UTILIZATION,
+                     robustness=RAW_MATERIALS_SERVICE_LEVEL):
+    """
+    Inventory levels, stock-out probability and inbound footprint per year and part
+
+    The footprint stores the robustness quantile (99.9%) of the peak kits on
+    hand, one lane per part at the first routing step.
+
+    Returns:
+        dataframe: Year, Part, First_Process, weekly demand, order-up-to level,
+        mean / peak kits on hand, stock-out probability per week, fill rate,
+        kits received per week, footprint
+    """
+    import pandas as pd
+
+    kit_parts = result['kit_parts']
+    kit_volume, _ = kit_dimensions(dimensions, kit_parts)
+    first_step = [steps[0] for steps in data.load_routings().values()]
+
+    peak_kits = np.ceil(np.quantile(result['on_hand_peak'], robustness, axis=0) / kit_parts)
+    stockout = result['stockout_weeks'].mean(axis=0) / result['weeks']
+    fill_rate = 1.0 - result['short_units'].sum(axis=0) / np.maximum(result['demand_units'].sum(axis=0), 1e-9)
+
+    years = [f"Year {y}" for y in result['years']]
+    n_years, n_parts = result['mean'].shape
+    return pd.DataFrame({
+        'Year': np.repeat(years, n_parts),
+        'Part': np.tile(data.PARTS, n_years),
+        'First_Process': np.tile(first_step, n_years),
+        'Weekly_Demand_Units': result['mean'].ravel(),
+        'Order_Up_To_Units': result['order_up_to'].ravel(),
+        'Mean_Kits_On_Hand': (result['on_hand_mean'].mean(axis=0) / kit_parts).ravel(),
+        'Peak_Kits_On_Hand': peak_kits.ravel(),
+        'Stockout_Probability': stockout.ravel(),
+        'Fill_Rate': fill_rate.ravel(),
+        'Kits_Received_Week': (result['kits_received'].mean(axis=0) / result['weeks']).ravel(),
+        'Kit_Volume_CuFt': np.tile(kit_volume, n_years),
+        'Footprint_sqft': (peak_kits * kit_volume / (height * utilization)).ravel(),
+    })
@@ -0,0 +1,313 @@
+"""
+femoasa render - parallel headless batch renderer for the result figures
+
+the visualization scripts each render their figures serially when run by
+hand. this module describes every figure-producing call as a job (script,
+function, arguments, input files), and renders the jobs in a process pool
+with the Agg backend:
+
+- a job is registered only when its input globs match files, and skipped
+  when the hash of its script, its input csv files, the femoasa modules and
+  the case data matches the one recorded in results/.render_manifest.json
+  and every output file recorded with it still exists (force=True re-renders)
+- each worker imports a script once, warms the font cache once and memoizes
+  pandas.read_csv by file (path, mtime, size), so jobs of the same stage reuse
+  modules, fonts and loaded data; an in-process run (one worker or one
+  pending job) restores pandas.read_csv afterwards
+
+    summary = render_jobs(collect_jobs(), workers=4)
+
+author: machas^2 team
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+from femoasa.config import BASE_DIR, DATA_DIR, RESULTS_DIR
+
+CODE_DIR = BASE_DIR / "code"
+MANIFEST_FILE = RESULTS_DIR / ".render_manifest.json"
+SHARED_INPUTS = [CODE_DIR / "femoasa", DATA_DIR]  # every script reads through these
+PART_DASHBOARDS = ['Dashboard', 'Top10', 'Schematic']  # figures of the part-based dashboard scripts, per year
+
+
+def job(name, script, function, args=(), kwargs=None, inputs=(), outputs=()):
+    """
+    Figure job: call function(*args, **kwargs) of a script under code/
+
+    inputs are glob patterns relative to the project root; their files (and
+    the script itself) make up the input hash of the job. outputs are glob
+    patterns of the figures the job writes; the files they match after a
+    render are recorded in the manifest.
+    """
+    return {
+        'name': name,
+        'script': script,
+        'function': function,
+        'args': tuple(args),
+        'kwargs': dict(kwargs or {}),
+        'inputs': tuple(inputs),
+        'outputs': tuple(outputs),
+    }
+
+
+def collect_jobs():
+    """
+    Figure jobs of every stage (Task 3 and Task 4, all organizations)
+    """
+    jobs = [
+        job('task3_functional_visuals', 'Task3/Functional/Functional_Visualization.py',
+            'create_functional_visualizations', inputs=['results/Task3/Functional/**/*.csv'],
+            outputs=['results/Task3/Functional/Visuals/Functional_Layout_Comprehensive_Analysis.png']),
+        job('task3_part_visuals', 'Task3/Part/Part_Visualization.py', 'create_visualizations',
+            inputs=['results/Task3/Part/**/*.csv', 'results/task12/*.csv'],
+            outputs=['results/Task3/Part/Task3_Parts_Based_Analysis_Dashboard.png']),
+        job('task3_part_dashboards', 'task4/Part/create_all_part_visualizations.py', 'create_task3_visualizations',
+            inputs=['results/Task3/Part/Capacity/Part_Based_All_Parts_*.csv'],
+            outputs=[f'results/Task3/Part/Visuals/Year1_{figure}.png' for figure in PART_DASHBOARDS]),
+        job('task3_fractal_comparison', 'Task3/Fractal/Fractal_Visualization.py', 'create_comparison_chart',
+            inputs=['results/Task3/Fractal/Fractal_Design/*.csv'],
+            outputs=['results/Task3/Fractal/Fractal_Visuals/Fractal_Equipment_Comparison.png']),
+        job('task4_functional_visuals', 'task4/Functional/Functional_Visualization.py',
+            'create_functional_visualizations', inputs=['results/task4/functional/**/*.csv'],
+            outputs=['results/task4/functional/Visuals/Functional_Equipment_Comparison_By_Process.png',
+                     'results/task4/functional/Visuals/Functional_Utilization_Comparison_By_Year.png']),
+        job('task4_functional_dashboard', 'task4/Functional/Functional_Visualization.py',
+            'create_summary_dashboard', inputs=['results/task4/functional/**/*.csv'],
+            outputs=['results/task4/functional/Visuals/Functional_Layout_Summary_Dashboard.png']),
+        job('task4_part_visuals', 'task4/Part/Part_Visualization_per_year.py', 'create_visualizations_per_year',
+            inputs=['results/task4/part/capacity/*.csv', 'results/task4/part/flow_matrix/*.npz'],
+            outputs=['results/task4/part/visualizations/per_year/*_Task4_Parts_Based_Analysis_Dashboard.png']),
+        # years 2-5 of create_all_part_visualizations.py write the same files, only its task 3 part is a job
+        job('task4_part_dashboards', 'task4/Part/create_task4_visualizations.py', 'create_year_visualizations',
+            inputs=['results/task4/part/Year*/Part_Based_Year*_All_Parts_*.csv'],
+            outputs=[f'results/task4/part/Year{year}/Year{year}_{figure}.png'
+                     for year in [2, 3, 4, 5] for figure in PART_DASHBOARDS]
+                    + ['results/task4/part/MultiYear_Comparison.png']),
+        job('task4_fractal_scaling', 'task4/Fractal/Fractal_Visualization_Task4.py',
+            'create_comparison_visualization', inputs=['results/task4/Fractal/Fractal_Design/*.csv'],
+            outputs=['results/task4/Fractal/Fractal_Visuals/Fractal_Scaling_Comparison.png']),
+        job('task4_fractal_yearly_equipment', 'task4/Fractal/Fractal_Visualization_Task4.py',
+            'create_yearly_equipment_comparison', inputs=['results/task4/Fractal/Fractal_Design/*.csv'],
+            outputs=['results/task4/Fractal/Fractal_Visuals/Fractal_Yearly_Equipment_Comparison.png']),
+    ]
+
+    for f in [2, 3, 4]:
+        jobs.append(job(f'task3_fractal_layout_f{f}', 'Task3/Fractal/Fractal_Visualization.py',
+                        'create_layout_visualization', (f,), {'show_flows': True, 'flow_threshold': 2000},
+                        inputs=[f'results/Task3/Fractal/Fractal_Layout/f{f}_layout/*.csv'],
+                        outputs=[f'results/Task3/Fractal/Fractal_Visuals/Fractal_Layout_f{f}.png']))
+        jobs.append(job(f'task3_fractal_flow_matrix_f{f}', 'Task3/Fractal/Fractal_Visualization.py',
+                        'create_flow_matrix_heatmap', (f,),
+                        inputs=[f'results/Task3/Fractal/Fractal_Flowmatrix/f{f}_centers/*.csv'],
+                        outputs=[f'results/Task3/Fractal/Fractal_Visuals/Fractal_Flow_Matrix_f{f}.png']))
+
+    for year in [2, 3, 4, 5]:
+        for f in [2, 3, 4, 5]:
+            jobs.append(job(f'task4_fractal_layout_y{year}_f{f}', 'task4/Fractal/Fractal_Visualization_Task4.py',
+                            'create_layout_visualization_yearly', (year, f),
+                            {'show_flows': True, 'flow_threshold': 500},
+                            inputs=[f'results/task4/Fractal/Fractal_Layout/year{year}/f{f}_layout/*.csv'],
+                            outputs=[f'results/task4/Fractal/Fractal_Visuals/Year{year}_Fractal_f{f}_Layout.png']))
+
+    for config_dir in sorted((RESULTS_DIR / 'task4' / 'Fractal' / 'Fractal_Layout').glob('Year*_F*_Optimized')):
+        year, f = config_dir.name[len('Year'):-len('_Optimized')].split('_F')
+        jobs.append(job(f'task4_fractal_blocks_y{year}_f{f}', 'task4/Fractal/Fractal_Individual_Block_Visualizer.py',
+                        'visualize_all_blocks', (int(year), int(f)),
+                        inputs=[str(config_dir.relative_to(BASE_DIR) / '*.csv')],
+                        outputs=[str(config_dir.relative_to(BASE_DIR) / 'Process_*_Block.png')]))
+
+    # layouts and designs that were never generated have nothing to render
+    return [j for j in jobs if _input_files(j)]
+
+
+def _input_files(job_spec):
+    return sorted({path for pattern in job_spec['inputs'] for path in BASE_DIR.glob(pattern) if path.is_file()})
+
+
+def _output_files(job_spec):
+    """
+    Files matching the output globs of a job, None when a glob matches nothing
+    """
+    files = set()
+    for pattern in job_spec['outputs']:
+        matched = {path for path in BASE_DIR.glob(pattern) if path.is_file()}
+        if not matched:
+            return None
+        files |= matched
+    return sorted(str(path.relative_to(BASE_DIR)) for path in files)
+
+
+def _is_current(entry, digest):
+    """
+    Whether a manifest entry still covers a job: same input hash and every
+    output file recorded at its last render on disk
+    """
+    if not isinstance(entry, dict) or entry.get('hash') != digest or entry.get('outputs') is None:
+        return False
+    return all((BASE_DIR / path).is_file() for path in entry['outputs'])
+
+
+@lru_cache(maxsize=None)
+def _shared_digest():
+    """
+    sha1 over the femoasa modules and the case data files
+    """
+    digest = hashlib.sha1()
+    for root in SHARED_INPUTS:
+        for path in sorted(root.rglob('*')):
+            if path.is_file() and path.suffix in ('.py', '.csv'):
+                digest.update(str(path.relative_to(BASE_DIR)).encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def job_hash(job_spec):
+    """
+    sha1 over the script source, the call arguments, every input file and
+    the shared femoasa modules and case data
+    """
+    digest = hashlib.sha1(_shared_digest().encode())
+    digest.update((CODE_DIR / job_spec['script']).read_bytes())
+    digest.update(repr((job_spec['function'], job_spec['args'], sorted(job_spec['kwargs'].items()))).encode())
+    for path in _input_files(job_spec):
+        digest.update(str(path.relative_to(BASE_DIR)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_manifest(path=MANIFEST_FILE):
+    if path.exists():
+        return json.loads(path.read_text())
+    return {}
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def _cached_read_csv(read_csv):
+    """
+    Wrap pandas.read_csv so repeated reads of an unchanged file reuse the frame
+    """
+    cache = {}
+
+    def cached(filepath_or_buffer, *args, **kwargs):
+        if not isinstance(filepath_or_buffer, (str, os.PathLike)) or not os.path.isfile(filepath_or_buffer):
+            return read_csv(filepath_or_buffer, *args, **kwargs)
+        stat = os.stat(filepath_or_buffer)
+        key = (os.path.abspath(filepath_or_buffer), stat.st_mtime_ns, stat.st_size, repr(args),
+               repr(sorted(kwargs.items())))
+        if key not in cache:
+            cache[key] = read_csv(filepath_or_buffer, *args, **kwargs)
+        return cache[key].copy()
+
+    return cached
+
+
+def _init_worker():
+    """
+    Headless backend, font cache and csv cache, once per worker process
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import font_manager
+    import pandas as pd
+
+    font_manager.findfont(font_manager.FontProperties(family=matplotlib.rcParams['font.family']))
+    if not hasattr(pd.read_csv, '__wrapped_read_csv__'):
+        cached = _cached_read_csv(pd.read_csv)
+        cached.__wrapped_read_csv__ = pd.read_csv
+        pd.read_csv = cached
+
+
+def _restore_read_csv():
+    """
+    Put back the pandas.read_csv replaced by _init_worker() (in-process runs)
+    """
+    import pandas as pd
+
+    original = getattr(pd.read_csv, '__wrapped_read_csv__', None)
+    if original is not None:
+        pd.read_csv = original
+
+
+@lru_cache(maxsize=None)
+def load_script(script):
+    """
+    Import a script under code/ once per worker (its main() is not run)
+    """
+    path = CODE_DIR / script
+    sys.path.insert(0, str(path.parent))
+    name = 'render_' + script.replace('/', '_').replace('.py', '')
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_job(job_spec):
+    """
+    Render one job in the current process
+
+    Returns:
+        (job name, error message or None, seconds)
+    """
+    import matplotlib.pyplot as plt
+
+    start = time.time()
+    error = None
+    try:
+        module = load_script(job_spec['script'])
+        getattr(module, job_spec['function'])(*job_spec['args'], **job_spec['kwargs'])
+    except (Exception, SystemExit) as e:  # scripts call sys.exit() on missing inputs
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        plt.close('all')
+    return job_spec['name'], error, time.time() - start
+
+
+def render_jobs(jobs, workers=None, force=False, manifest_path=MANIFEST_FILE):
+    """
+    Render the jobs whose input hash changed or whose outputs are missing, in a process pool
+
+    Returns:
+        list of dicts: name, status ('rendered', 'skipped', 'failed'), seconds, error
+    """
+    manifest = load_manifest(manifest_path)
+    hashes = {j['name']: job_hash(j) for j in jobs}
+    pending = [j for j in jobs if force or not _is_current(manifest.get(j['name']), hashes[j['name']])]
+    summary = [{'name': j['name'], 'status': 'skipped', 'seconds': 0.0, 'error': None}
+               for j in jobs if j not in pending]
+
+    by_name = {j['name']: j for j in pending}
+
+    def record(name, error, seconds):
+        summary.append({'name': name, 'status': 'failed' if error else 'rendered',
+                        'seconds': seconds, 'error': error})
+        if error is None:
+            manifest[name] = {'hash': hashes[name], 'outputs': _output_files(by_name[name])}
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1 or len(pending) <= 1:
+        _init_worker()
+        try:
+            for j in pending:
+                record(*run_job(j))
+        finally:
+            _restore_read_csv()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(run_job, j) for j in pending]
+            for future in as_completed(futures):
+                record(*future.result())
+
+    save_manifest(manifest, manifest_path)
+    return summary
@@ -0,0 +1,343 @@
+"""
+femoasa results store - one indexed database for the result tables
+
+the scripts write their tables as csv files spread over results/ with names
+that encode the design (Year5_Fractal_f4_..., Part_Based_Year2_...,
+Distance_Layout_Flow_Y1_F4_...). the store keeps every table in one sqlite
+file instead: a catalog row per table keyed by (name, task, organization,
+year, f, shifts) and the typed table itself, so a cross-design comparison is
+one indexed query:
+
+    write(df, 'fractal_equipment_requirements', task=4, organization='fractal', year=5, f=4)
+    read('fractal_equipment_requirements', task=4, year=5, f=4)
+    read_all('fractal_equipment_requirements', task=4)   # every year and f, keys as columns
+    load(RESULTS_DIR / 'task4/Fractal/Fractal_Design/Fractal_Comparison_All_Years.csv')  # by path
+
+csv stays available as a view (export_csv) and tables can also be mirrored to
+parquet partitions (name/task=.../year=.../part.parquet, needs pyarrow).
+ingest() loads the existing results/ tree, parsing the keys from the paths.
+
+author: machas^2 team
+"""
+
+import contextlib
+import importlib.util
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from femoasa.config import RESULTS_DIR
+
+STORE_FILE = RESULTS_DIR / "femoasa_results.sqlite"
+PARQUET_DIR = RESULTS_DIR / "store_parquet"
+KEYS = ['task', 'organization', 'year', 'f', 'shifts']
+ORGANIZATIONS = ['functional', 'part', 'fractal']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    task INTEGER,
+    organization TEXT,
+    year INTEGER,
+    f INTEGER,
+    shifts INTEGER,
+    source TEXT,
+    n_rows INTEGER,
+    n_cols INTEGER,
+    created TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS catalog_key ON catalog (
+    name, IFNULL(task, -1), IFNULL(organization, ''), IFNULL(year, -1), IFNULL(f, -1), IFNULL(shifts, -1)
+);
+"""
+
+
+@contextlib.contextmanager
+def connect(store=STORE_FILE):
+    """
+    Open the store (created on first use); commits on success
+    """
+    store = Path(store)
+    store.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(store)
+    try:
+        conn.executescript(_SCHEMA)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _where(keys):
+    clauses, params = [], []
+    for key, value in keys.items():
+        if key not in KEYS + ['name']:
+            raise KeyError(f"Unknown store key {key!r} (keys: name, {', '.join(KEYS)})")
+        if isinstance(value, (list, tuple, set)):
+            clauses.append(f"{key} IN ({', '.join('?' * len(value))})")
+            params.extend(value)
+        elif value is None:
+            clauses.append(f"{key} IS NULL")
+        else:
+            clauses.append(f"{key} = ?")
+            params.append(value)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def _write(conn, df, name, keys, source=None):
+    row = {k: None if keys.get(k) is None else (str(keys[k]) if k == 'organization' else int(keys[k])) for k in KEYS}
+    old = conn.execute("SELECT id FROM catalog WHERE name = ? AND IFNULL(task, -1) = IFNULL(?, -1) "
+                       "AND IFNULL(organization, '') = IFNULL(?, '') AND IFNULL(year, -1) = IFNULL(?, -1) "
+                       "AND IFNULL(f, -1) = IFNULL(?, -1) AND IFNULL(shifts, -1) = IFNULL(?, -1)",
+                       [name] + [row[k] for k in KEYS]).fetchall()
+    for (table_id,) in old:
+        conn.execute(f"DROP TABLE IF EXISTS t{table_id}")
+        conn.execute("DELETE FROM catalog WHERE id = ?", (table_id,))
+
+    cursor = conn.execute(
+        f"INSERT INTO catalog (name, {', '.join(KEYS)}, source, n_rows, n_cols, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [name] + [row[k] for k in KEYS] + [None if source is None else str(source), len(df), len(df.columns),
+                                           time.strftime('%Y-%m-%d %H:%M:%S')])
+    df.to_sql(f"t{cursor.lastrowid}", conn, index=False)
+    return cursor.lastrowid
+
+
+def write(df, name, task=None, organization=None, year=None, f=None, shifts=None, source=None,
+          store=STORE_FILE, parquet=False):
+    """
+    Store a table under its keys (replaces the table with the same keys)
+
+    Args:
+        parquet: also write results/store_parquet/<name>/<key>=<value>/.../part.parquet
+
+    Returns:
+        id of the table in the catalog
+    """
+    keys = {'task': task, 'organization': organization, 'year': year, 'f': f, 'shifts': shifts}
+    with connect(store) as conn:
+        table_id = _write(conn, df, name, keys, source)
+    if parquet:
+        write_parquet(df, name, **keys)
+    return table_id
+
+
+def save(df, path, csv=True, store=STORE_FILE, **csv_kwargs):
+    """
+    Write a result table as csv (optional view) and store it under the keys of its path
+
+    Args:
+        path: csv path under results/ (keys from parse_keys())
+        csv_kwargs: passed to DataFrame.to_csv (index=False unless given)
+
+    Returns:
+        (name, keys) it was stored under
+    """
+    path = Path(path)
+    csv_kwargs.setdefault('index', False)
+    if csv:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(path, **csv_kwargs)
+    name, keys = parse_keys(path.resolve())
+    table = df.reset_index() if csv_kwargs['index'] else df
+    write(table, name, source=path.resolve().relative_to(RESULTS_DIR) if _under(path, RESULTS_DIR) else path,
+          store=store, **keys)
+    return name, keys
+
+
+def _under(path, root):
+    try:
+        Path(path).resolve().relative_to(root)
+        return True
+    except ValueError:
+        return False
+
+
+def write_parquet(df, name, out_dir=PARQUET_DIR, **keys):
+    """
+    Mirror a table to a hive-style parquet partition (requires pyarrow)
+    """
+    if importlib.util.find_spec('pyarrow') is None:
+        raise ImportError("Parquet partitions need pyarrow: pip install pyarrow")
+    path = Path(out_dir) / name
+    for key in KEYS:
+        if keys.get(key) is not None:
+            path = path / f"{key}={keys[key]}"
+    path.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path / 'part.parquet', index=False)
+    return path / 'part.parquet'
+
+
+def find(store=STORE_FILE, **keys):
+    """
+    Catalog rows matching the keys (a list value matches any of its values)
+
+    Returns:
+        dataframe: id, name, task, organization, year, f, shifts, source, n_rows, n_cols, created
+    """
+    import pandas as pd
+
+    where, params = _where(keys)
+    with connect(store) as conn:
+        return pd.read_sql_query(f"SELECT * FROM catalog{where} ORDER BY name, {', '.join(KEYS)}", conn, params=params)
+
+
+def read(name, store=STORE_FILE, **keys):
+    """
+    The single table matching name and keys (KeyError when none or several match)
+    """
+    import pandas as pd
+
+    catalog = find(store, name=name, **keys)
+    if len(catalog) != 1:
+        raise KeyError(f"{len(catalog)} tables match {name!r} {keys}: pass more keys"
+                       if len(catalog) else f"No table {name!r} with keys {keys}")
+    with connect(store) as conn:
+        return pd.read_sql_query(f"SELECT * FROM t{int(catalog['id'].iloc[0])}", conn)
+
+
+def load(path, index_col=None, store=STORE_FILE):
+    """
+    Table saved at a results/ csv path, read from the store under the keys of the path
+
+    The csv is ingested first when the store has no table for it, holds the
+    table of another file under the same keys, or is older than the csv (a
+    script wrote the csv without saving to the store).
+
+    Args:
+        index_col: position of the column to use as index, as in read_csv
+
+    Returns:
+        dataframe
+    """
+    import pandas as pd
+
+    path = Path(path).resolve()
+    name, keys = parse_keys(path)
+    source = path.relative_to(RESULTS_DIR) if _under(path, RESULTS_DIR) else path
+    entry = find(store, name=name, **keys)
+    current = (len(entry) == 1 and Path(entry['source'].iloc[0]) == source and
+               (not path.exists() or path.stat().st_mtime
+                < time.mktime(time.strptime(entry['created'].iloc[0], '%Y-%m-%d %H:%M:%S')) + 1))
+    if current:
+        df = read(name, store, **keys)
+    else:
+        df = pd.read_csv(path)
+        write(df, name, source=source, store=store, **keys)
+    if index_col is not None:
+        df = df.set_index(df.columns[index_col])
+        if df.index.name == 'index' or str(df.index.name).startswith('Unnamed'):
+            df.index.name = None
+    return df
+
+
+def read_all(name, store=STORE_FILE, **keys):
+    """
+    All tables matching name and keys stacked, their keys prepended as columns
+    """
+    import pandas as pd
+
+    catalog = find(store, name=name, **keys)
+    frames = []
+    with connect(store) as conn:
+        for _, entry in catalog.iterrows():
+            df = pd.read_sql_query(f"SELECT * FROM t{int(entry['id'])}", conn)
+            for position, key in enumerate(KEYS):
+                if key not in df.columns:
+                    df.insert(position, key, entry[key])
+            frames.append(df)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=KEYS)
+
+
+def export_csv(out_dir, store=STORE_FILE, **keys):
+    """
+    Write the matching tables as csv files named <name>[_task..][_org][_year..][_f..][_shifts..].csv
+
+    Returns:
+        list of written paths
+    """
+    import pandas as pd
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    with connect(store) as conn:
+        for _, entry in find(store, **keys).iterrows():
+            parts = [entry['name']] + [f"{k}{int(entry[k])}" if k != 'organization' else str(entry[k])
+                                       for k in KEYS if pd.notna(entry[k])]
+            path = out_dir / ('_'.join(parts) + '.csv')
+            pd.read_sql_query(f"SELECT * FROM t{int(entry['id'])}", conn).to_csv(path, index=False)
+            paths.append(path)
+    return paths
+
+
+_KEY_PATTERNS = {
+    'year': [r'(?<![A-Za-z])year[_ ]?(\d+)', r'(?<![A-Za-z])Y(\d+)(?=_|$)'],
+    'f': [r'(?<![A-Za-z])f(\d+)_centers', r'fractal_f(\d+)', r'(?<![A-Za-z])F(\d+)(?=_|$)'],
+    'shifts': [r'(\d+)_shifts'],
+}
+_NAME_NOISE = [r'(?<![A-Za-z])year[_ ]?\d+', r'(?<![A-Za-z])Y\d+(?=_|$)', r'(?<![A-Za-z])F\d+(?=_|$)',
+               r'(?<=fractal)_f\d+', r'(?<![A-Za-z])f\d+(?=_|$)', r'\d+_shifts', r'^task\d+_', r'all_years']
+
+
+def parse_keys(path, root=RESULTS_DIR):
+    """
+    Table name and keys of a results/ csv from its path
+
+    'task4/Fractal/Fractal_Design/Year5_Fractal_f4_Equipment_Requirements.csv'
+    -> ('fractal_equipment_requirements', {'task': 4, 'organization': 'fractal', 'year': 5, 'f': 4, ...})
+
+    Returns:
+        (name, keys dict)
+    """
+    path = Path(path)
+    relative = path.relative_to(root) if path.is_absolute() and _under(path, root) else Path(path.name)
+    text = relative.with_suffix('').as_posix()
+    keys = dict.fromkeys(KEYS)
+
+    # Task1_/Task2_ file prefixes split the shared task12 directory
+    task = re.match(r'task(\d)_', relative.name, re.IGNORECASE) or re.match(r'task(\d+)', relative.parts[0], re.IGNORECASE)
+    keys['task'] = int(task.group(1)) if task else None
+    lowered = text.lower()
+    keys['organization'] = next((org for org in ORGANIZATIONS if f'/{org}' in '/' + lowered), None)
+    for key, patterns in _KEY_PATTERNS.items():
+        for pattern in patterns:
+            # the file name wins over directories (e.g. .../year3/f4_centers/...)
+            hits = [m for part in relative.with_suffix('').parts for m in re.findall(pattern, part, re.IGNORECASE)]
+            if hits:
+                keys[key] = int(hits[-1])
+                break
+
+    name = relative.stem
+    for pattern in _NAME_NOISE:
+        name = re.sub(pattern, '', name, flags=re.IGNORECASE)
+    name = re.sub(r'_+', '_', name).strip('_').lower() or 'table'
+    return name, keys
+
+
+def ingest(root=RESULTS_DIR, store=STORE_FILE, pattern='**/*.csv'):
+    """
+    Load every csv under root into the store, keys parsed by parse_keys()
+
+    Returns:
+        (catalog dataframe of the store, list of (path, error) for unreadable files)
+    """
+    import pandas as pd
+
+    root = Path(root)
+    skipped = []
+    with connect(store) as conn:
+        for path in sorted(root.glob(pattern)):
+            try:
+                try:
+                    df = pd.read_csv(path)
+                except UnicodeDecodeError:
+                    # a few tables were saved from excel on windows
+                    df = pd.read_csv(path, encoding='cp1252')
+            except (pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError) as e:
+                skipped.append((path, f"{type(e).__name__}: {e}"))
+                continue
+            name, keys = parse_keys(path, root)
+            _write(conn, df, name, keys, path.relative_to(root))
+    return find(store), skipped
@@ -0,0 +1,282 @@
+"""
+femoasa sensitivity - global sensitivity analysis (morris screening, sobol indices)
+
+factors (uniform over the ranges in FACTORS):
+- demand and cv scale the Year +1 weekly product demand and its variability
+- efficiency and reliability set the effective machine capacity
+- price and wage scale equipment prices and operator wages
+- interest is the financial rate used for the 5-year npv
+
+outputs for every organization (functional, part, fractal f2-f5):
+- equipment: total machines (sized for mean + z sigma, z at the OTIF level)
+- npv: 5-year cost of buying the machines, the factory floor they occupy and
+  staffing them on 2 shifts, from cost_engine.evaluate_costs (prices, wages
+  and the interest rate as per-sample inputs)
+- flow_distance: weekly parts x ft on the organization's block layout: the
+  blocks of a center (one cell per part for part) are arranged once by the
+  dynamic_layout swap search on a unit slot grid at the nominal demand; each
+  sample scales the slot pitch with its own machines x footprint per block,
+  so demand, cv, efficiency and reliability move the distances as well as
+  the flows
+
+samples are evaluated as arrays by model(), chunks of samples are spread over
+a process pool so a 10^5-sample sobol study stays in the minutes range.
+
+author: machas^2 team
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from scipy.stats import qmc
+
+from femoasa import capacity, cost_engine, data, dynamic_layout, equipment_catalog, material_handling
+from femoasa.config import MACHINE_SPECS, PROCESSES, SHIFTS_PER_DAY, OTIF_SERVICE_LEVEL
+from femoasa.pareto import FLOOR_AISLE_FACTOR
+
+# factor: (low, high)
+FACTORS = {
+    'demand': (0.8, 1.2),
+    'cv': (0.5, 1.5),
+    'efficiency': (0.85, 0.95),
+    'reliability': (0.95, 0.99),
+    'price': (0.8, 1.2),
+    'wage': (0.8, 1.2),
+    'interest': (0.05, 0.15),
+}
+OUTPUTS = ['equipment', 'npv', 'flow_distance']
+NPV_YEARS = 5
+LAYOUT_STARTS = 8  # swap-search starts of the nominal block arrangement
+LAYOUT_SEED = 6202
+
+
+@lru_cache(maxsize=None)
+def _base_inputs():
+    """
+    Nominal arrays shared by every sample (loaded once per worker process)
+    """
+    demand = data.load_year_one_demand()
+    catalog = equipment_catalog.load_catalog()
+
+    return {
+        'weekly': demand['weekly'],
+        'cv': demand['cv'],
+        'bom': demand['bom'],
+        'workload': data.workload_matrix(),
+        'catalog': catalog,
+        'equipment_ids': catalog['process_equipment'],  # dedicated equipment type of each process
+        'transitions': data.routing_transitions(),
+        'footprint': np.array([np.prod(MACHINE_SPECS[p][:2]) for p in PROCESSES], dtype=float),
+        'z': stats.norm.ppf(OTIF_SERVICE_LEVEL),
+    }
+
+
+@lru_cache(maxsize=None)
+def _layout_inputs(organization):
+    """
+    Nominal block arrangement of the organization's centers on a unit-pitch slot grid
+
+    Returns:
+        (blocks, unit_flow): blocks is a list of process index arrays, one per
+        distinct center (every part cell for part, one center otherwise), and
+        unit_flow (centers,) the plant's weekly parts x slot pitches on them
+        at the nominal demand
+    """
+    base = _base_inputs()
+    moves = (base['weekly'] @ base['bom'].T)[:, None, None] * base['transitions']
+    if organization == 'part':
+        cells = [(np.flatnonzero(base['workload'][k] > 0), moves[k]) for k in range(len(moves))]
+    else:
+        # f identical centers with 1/f of the flow: the plant total is one center's arrangement
+        cells = [(np.arange(len(PROCESSES)), moves.sum(axis=0))]
+
+    blocks, unit_flow = [], []
+    for index, flow in cells:
+        flow = flow[np.ix_(index, index)]
+        distance = material_handling.centroid_distances(dynamic_layout.slot_grid(len(index), 1.0))
+        rng = np.random.default_rng(LAYOUT_SEED)
+        perm = min((dynamic_layout.local_search(flow, distance, rng.permutation(len(distance)))
+                    for _ in range(LAYOUT_STARTS)), key=lambda result: result[1])[0][:len(index)]
+        blocks.append(index)
+        unit_flow.append(float((flow * distance[perm[:, None], perm[None, :]]).sum()))
+    return blocks, np.array(unit_flow)
+
+
+def _slot_pitch(units, footprint):
+    """
+    Slot pitch (ft) of blocks with units (..., blocks) machines, as in dynamic_layout
+    """
+    area = (units * footprint).mean(axis=-1)
+    return np.sqrt(area * (1.0 + dynamic_layout.DEFAULT_SEARCH['aisle_factor']))
+
+
+def scale_samples(unit_samples):
+    """
+    Map samples on the unit hypercube (n, factors) to the FACTORS ranges
+    """
+    bounds = np.array(list(FACTORS.values()))
+    return bounds[:, 0] + unit_samples * (bounds[:, 1] - bounds[:, 0])
+
+
+def model(samples, organization='functional'):
+    """
+    Evaluate the capacity and cost model for a batch of factor samples
+
+    Args:
+        samples: array (n, len(FACTORS)) in FACTORS units
+        organization: one of capacity.ORGANIZATIONS
+
+    Returns:
+        array (n, len(OUTPUTS))
+    """
+    base = _base_inputs()
+    x = dict(zip(FACTORS, np.asarray(samples, dtype=float).T))
+
+    weekly = base['weekly'] * x['demand'][:, np.newaxis]
+    cv = base['cv'] * x['cv'][:, np.newaxis]
+    part_demand = weekly @ base['bom'].T
+    mean = capacity.part_workload(part_demand, base['workload'])
+    std = capacity.product_workload_std(weekly, cv, base['bom'], base['workload'])
+    cap = capacity.machine_capacity(SHIFTS_PER_DAY, x['efficiency'], x['reliability'])
+
+    machines = capacity.equipment_requirements(mean, organization, cap, std, base['z'])
+    blocks, unit_flow = _layout_inputs(organization)
+
+    # machines (and their floor) bought at the start of year 1 and staffed every year after
+    types = np.zeros((len(machines), NPV_YEARS, len(base['catalog']['names'])))
+    types[..., base['equipment_ids']] = machines[:, np.newaxis, :]
+    floor = np.repeat((machines @ base['footprint'] * (1.0 + FLOOR_AISLE_FACTOR))[:, np.newaxis], NPV_YEARS, axis=1)
+    npv = cost_engine.evaluate_costs(types, base['catalog'], floor_sqft=floor, rate=x['interest'],
+                                     price_scale=x['price'], wage_scale=x['wage'])['npv']
+
+    if organization == 'part':
+        cells = np.ceil((mean + base['z'] * std) / cap[:, np.newaxis, np.newaxis] - 1e-9)
+        pitch = np.column_stack([_slot_pitch(cells[:, k, index], base['footprint'][index])
+                                 for k, index in enumerate(blocks)])
+    else:
+        units = machines / capacity.num_centers(organization)
+        pitch = _slot_pitch(units, base['footprint'])[:, np.newaxis]
+    flow_distance = x['demand'] * (pitch @ unit_flow)
+
+    return np.column_stack([machines.sum(axis=-1), npv, flow_distance])
+
+
+def evaluate(samples, organization='functional', workers=None, chunk_size=8192):
+    """
+    Evaluate samples in chunks (bounded memory), spread over a process pool
+
+    workers=1 (or a single-core machine) evaluates the chunks in-process.
+    """
+    samples = np.asarray(samples, dtype=float)
+    workers = os.cpu_count() if workers is None else workers
+    chunks = np.array_split(samples, max(1, int(np.ceil(len(samples) / chunk_size))))
+    evaluate_chunk = partial(model, organization=organization)
+
+    if workers <= 1 or len(chunks) == 1:
+        return np.vstack([evaluate_chunk(chunk) for chunk in chunks])
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return np.vstack(list(pool.map(evaluate_chunk, chunks)))
+
+
+def morris_trajectories(n_trajectories, levels=4, seed=None):
+    """
+    Morris one-at-a-time trajectories on the unit hypercube
+
+    Returns:
+        array (n_trajectories, factors + 1, factors), consecutive rows differ
+        in exactly one factor by +/- delta
+    """
+    rng = np.random.default_rng(seed)
+    k = len(FACTORS)
+    delta = levels / (2.0 * (levels - 1))
+
+    lower = np.tril(np.ones((k + 1, k)), -1)
+    grid = np.arange(levels // 2) / (levels - 1)
+    x_star = rng.choice(grid, size=(n_trajectories, 1, k))
+    signs = rng.choice([-1.0, 1.0], size=(n_trajectories, 1, k))
+    perms = np.argsort(rng.random((n_trajectories, k)), axis=1)
+
+    # B* = x* + delta/2 [(2B - J) D* + J], then permute the factor order
+    b = x_star + delta / 2.0 * ((2.0 * lower - 1.0) * signs + 1.0)
+    return np.take_along_axis(b, perms[:, np.newaxis, :], axis=2)
+
+
+def morris(organization='functional', n_trajectories=1000, levels=4, seed=None, workers=None):
+    """
+    Morris elementary effects screening
+
+    Returns:
+        dataframe with mu, mu_star and sigma per output and factor
+    """
+    k = len(FACTORS)
+    unit = morris_trajectories(n_trajectories, levels, seed)
+    y = evaluate(scale_samples(unit.reshape(-1, k)), organization, workers)
+    y = y.reshape(n_trajectories, k + 1, len(OUTPUTS))
+
+    step = np.diff(unit, axis=1)
+    factor = np.abs(step).argmax(axis=2)
+    delta = step[np.arange(n_trajectories)[:, np.newaxis], np.arange(k), factor]
+    effects = np.diff(y, axis=1) / delta[..., np.newaxis]
+
+    # reorder each trajectory's effects into factor order
+    order = np.argsort(factor, axis=1)
+    effects = np.take_along_axis(effects, order[..., np.newaxis], axis=1)
+
+    rows = []
+    for o, output in enumerate(OUTPUTS):
+        ee = effects[..., o]
+        for i, name in enumerate(FACTORS):
+            rows.append({
+                'Organization': organization,
+                'Output': output,
+                'Factor': name,
+                'mu': ee[:, i].mean(),
+                'mu_star': np.abs(ee[:, i]).mean(),
+                'sigma': ee[:, i].std(ddof=1),
+            })
+    return pd.DataFrame(rows)
+
+
+def sobol(organization='functional', n_samples=2 ** 14, seed=None, workers=None):
+    """
+    Sobol first-order and total indices (Saltelli sampling, Jansen estimator)
+
+    n_samples is rounded up to a power of 2 (balance of the sobol sequence),
+    the study runs n_samples x (factors + 2) model evaluations.
+
+    Returns:
+        dataframe with S1 and ST per output and factor
+    """
+    k = len(FACTORS)
+    base = qmc.Sobol(d=2 * k, scramble=True, seed=seed).random_base2(int(np.ceil(np.log2(n_samples))))
+    n_samples = len(base)
+    a, b = base[:, :k], base[:, k:]
+    ab = np.repeat(a[np.newaxis], k, axis=0)
+    ab[np.arange(k), :, np.arange(k)] = b.T
+
+    samples = np.vstack([a, b, ab.reshape(-1, k)])
+    y = evaluate(scale_samples(samples), organization, workers)
+    y_a, y_b = y[:n_samples], y[n_samples:2 * n_samples]
+    y_ab = y[2 * n_samples:].reshape(k, n_samples, len(OUTPUTS))
+
+    variance = np.var(np.vstack([y_a, y_b]), axis=0)
+    variance = np.where(variance > 0, variance, np.nan)
+    s1 = np.mean(y_b * (y_ab - y_a), axis=1) / variance
+    st = 0.5 * np.mean((y_a - y_ab) ** 2, axis=1) / variance
+
+    rows = []
+    for o, output in enumerate(OUTPUTS):
+        for i, name in enumerate(FACTORS):
+            rows.append({
+                'Organization': organization,
+                'Output': output,
+                'Factor': name,
+                'S1': s1[i, o],
+                'ST': st[i, o],
+            })
+    return pd.DataFrame(rows)
@@ -0,0 +1,216 @@
+"""
+femoasa slotting - rack slotting of the near-client warehouses
+
+parts are stored on pallets in standard selective racking (no automated
+storage). for every sku the engine finds the pallet orientation that fits
+the most units (6 axis permutations, checked as one array), caps it by the
+pallet load limit, and needs ceil(units / per pallet) pallet positions.
+positions are laid out in back-to-back rack rows along picking aisles, and
+pallets are slotted by cube-per-order index (pallets per weekly pick): the
+lowest index gets the position closest to the dock. assignment is a sort of
+pallets against a sort of positions, so 10^4 skus slot in well under a second:
+
+    result = slot_skus(units, picks_per_week, dims_in, weight_lbs)
+    result['bays'], result['footprint_sqft'], result['travel_ft_week']
+
+rack defaults (48x40 in pallets, two per 8 ft bay, 5 ft level pitch under
+the 20 ft clear height) are assumptions, pass another rack dict to compare.
+
+author: machas^2 team
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from femoasa import data, profiling, storage
+from femoasa.config import (
+    CLIENT_A_REPLENISH_HOURS, CLIENT_B_REPLENISH_HOURS, STORAGE_HEIGHT_FT, weekly_hours,
+)
+
+DEFAULT_RACK = {
+    'pallet_in': (48.0, 40.0),   # pallet length x width
+    'load_height_in': 48.0,      # max load height on a pallet
+    'level_pitch_in': 60.0,      # load + beam + clearance
+    'pallet_max_lbs': 2500.0,
+    'pallets_per_level': 2,
+    'bay_width_ft': 8.0,
+    'rack_depth_ft': 3.5,
+    'aisle_ft': 12.0,            # counterbalanced forklift aisle
+    'cross_aisle_ft': 10.0,      # front aisle along the dock
+}
+
+ORIENTATIONS = np.array(list(itertools.permutations(range(3))))
+
+
+def rack_levels(rack=DEFAULT_RACK, clear_height_ft=STORAGE_HEIGHT_FT):
+    """
+    Storage levels that fit under the clear height (floor level included)
+    """
+    return int(clear_height_ft * 12.0 // rack['level_pitch_in'])
+
+
+def units_per_box(dims_in, weight_lbs, envelope_in, max_lbs):
+    """
+    Units of every sku that fit a box envelope, best of the 6 orientations, capped by weight
+
+    Args:
+        dims_in: array (skus, 3) x, y, z in inches
+        weight_lbs: array (skus,)
+        envelope_in: (3,) usable length, width, height of the box/pallet load
+
+    Returns:
+        array (skus,) of int, 0 when a unit does not fit
+    """
+    dims_in = np.asarray(dims_in, dtype=float).reshape(-1, 3)
+    oriented = dims_in[:, ORIENTATIONS]  # (skus, 6, 3)
+    fit = np.floor(np.asarray(envelope_in, dtype=float) / oriented).prod(axis=2).max(axis=1)
+    by_weight = np.floor(max_lbs / np.maximum(np.asarray(weight_lbs, dtype=float), 1e-9))
+    return np.minimum(fit, by_weight).astype(np.int64)
+
+
+def units_per_pallet(dims_in, weight_lbs, rack=DEFAULT_RACK):
+    """
+    Units of every sku on one pallet of the rack (see units_per_box)
+    """
+    envelope = (*rack['pallet_in'], rack['load_height_in'])
+    return units_per_box(dims_in, weight_lbs, envelope, rack['pallet_max_lbs'])
+
+
+def rack_positions(n_positions, rack=DEFAULT_RACK, clear_height_ft=STORAGE_HEIGHT_FT):
+    """
+    Pallet positions of a rack block sized for n_positions, closest to the dock first
+
+    Aisles run away from the dock with a rack row on each side; the number of
+    aisles makes the block roughly square. The dock is centered on the front
+    cross aisle, travel is rectilinear and round trip.
+
+    Returns:
+        dict: 'travel_ft' (positions,) sorted ascending, 'level' (positions,),
+        'aisles', 'bays', 'width_ft', 'length_ft', 'footprint_sqft'
+    """
+    levels = rack_levels(rack, clear_height_ft)
+    per_bay = levels * rack['pallets_per_level']
+    bays = int(np.ceil(max(n_positions, 1) / per_bay))
+    module = rack['aisle_ft'] + 2.0 * rack['rack_depth_ft']
+    aisles = max(1, int(round(np.sqrt(bays * rack['bay_width_ft'] / (2.0 * module)))))
+    bays_per_row = int(np.ceil(bays / (2 * aisles)))
+
+    width = aisles * module
+    length = bays_per_row * rack['bay_width_ft'] + rack['cross_aisle_ft']
+
+    a, side, b, level, slot = np.meshgrid(np.arange(aisles), np.arange(2), np.arange(bays_per_row),
+                                          np.arange(levels), np.arange(rack['pallets_per_level']), indexing='ij')
+    x = (a + 0.5) * module
+    y = rack['cross_aisle_ft'] + (b + (slot + 0.5) / rack['pallets_per_level']) * rack['bay_width_ft']
+    travel = 2.0 * (np.abs(x - width / 2.0) + y)
+
+    # ties (same distance, e.g. levels) go to the lowest level first
+    order = np.lexsort((level.ravel(), travel.ravel()))
+    return {
+        'travel_ft': travel.ravel()[order],
+        'level': level.ravel()[order],
+        'aisles': aisles,
+        'bays': 2 * aisles * bays_per_row,
+        'width_ft': width,
+        'length_ft': length,
+        'footprint_sqft': width * length,
+    }
+
+
+def slot_skus(units, picks_per_week, dims_in, weight_lbs, rack=DEFAULT_RACK, clear_height_ft=STORAGE_HEIGHT_FT):
+    """
+    Slot every sku by cube-per-order index
+
+    Args:
+        units: array (skus,) units to store
+        picks_per_week: array (skus,) weekly picks (order lines) of each sku
+        dims_in, weight_lbs: unit dimensions (skus, 3) and weight (skus,)
+
+    Returns:
+        dict: 'per_pallet', 'pallets', 'coi', 'mean_travel_ft' (skus,),
+        'slot' (pallets,) position index of every pallet, 'sku' (pallets,),
+        'travel_ft_week', plus the rack_positions() layout keys
+    """
+    units = np.asarray(units, dtype=float)
+    picks = np.asarray(picks_per_week, dtype=float)
+    per_pallet = units_per_pallet(dims_in, weight_lbs, rack)
+    if np.any((per_pallet == 0) & (units > 0)):
+        raise ValueError("Some units do not fit on a pallet: check dimensions and rack['pallet_in']")
+
+    pallets = np.where(units > 0, np.ceil(units / np.maximum(per_pallet, 1)), 0).astype(np.int64)
+    coi = np.where(picks > 0, pallets / np.where(picks > 0, picks, 1.0), np.inf)
+
+    layout = rack_positions(int(pallets.sum()), rack, clear_height_ft)
+    order = np.argsort(coi, kind='stable')
+    sku = np.repeat(order, pallets[order])
+    slot = np.arange(len(sku))
+
+    # a pick goes to any of the sku's pallets: average travel over its slots
+    travel_sum = np.bincount(sku, weights=layout['travel_ft'][slot], minlength=len(units))
+    mean_travel = np.divide(travel_sum, pallets, out=np.zeros(len(units)), where=pallets > 0)
+
+    layout.update({
+        'per_pallet': per_pallet,
+        'pallets': pallets,
+        'coi': coi,
+        'sku': sku,
+        'slot': slot,
+        'mean_travel_ft': mean_travel,
+        'travel_ft_week': float(picks @ mean_travel),
+        'positions_used': int(pallets.sum()),
+    })
+    return layout
+
+
+def warehouse_picks(units, replenish_hours=(CLIENT_A_REPLENISH_HOURS, CLIENT_B_REPLENISH_HOURS), operating_hours=None):
+    """
+    Weekly picks per part at warehouses A and B: one order line per replenishment
+
+    Args:
+        units: array (..., parts, clients) stored units per warehouse
+
+    Returns:
+        array like units
+    """
+    operating_hours = weekly_hours() if operating_hours is None else operating_hours
+    deliveries = operating_hours / np.asarray(replenish_hours, dtype=float)
+    return np.where(np.asarray(units) > 0, deliveries, 0.0)
+
+
+@profiling.traced()
+def slotting_report(plan=None, dimensions=None, rack=DEFAULT_RACK):
+    """
+    Rack count, footprint and pick travel of warehouses A and B for every year
+
+    Args:
+        plan: storage.storage_plan() result (single scenario), default plan if None
+
+    Returns:
+        dataframe: Year, Warehouse, SKUs, Pallets, Rack_Bays, Aisles,
+        Footprint_sqft, Volume_Based_sqft, Pick_Travel_ft_week
+    """
+    plan = storage.storage_plan() if plan is None else plan
+    dimensions = data.load_part_dimensions() if dimensions is None else dimensions
+    dims_in = np.column_stack([dimensions['x_in'], dimensions['y_in'], dimensions['z_in']])
+
+    stored = plan['units'][..., 1:]  # (years, parts, warehouses)
+    picks = warehouse_picks(stored)
+
+    rows = []
+    for y, year in enumerate(plan['years']):
+        for w, warehouse in enumerate(storage.LOCATIONS[1:]):
+            result = slot_skus(stored[y, :, w], picks[y, :, w], dims_in, dimensions['weight_lbs'], rack)
+            rows.append({
+                'Year': f"Year {year}",
+                'Warehouse': warehouse,
+                'SKUs': int((stored[y, :, w] > 0).sum()),
+                'Pallets': result['positions_used'],
+                'Rack_Bays': result['bays'],
+                'Aisles': result['aisles'],
+                'Footprint_sqft': result['footprint_sqft'],
+                'Volume_Based_sqft': plan['floor_sqft'][y, w + 1],
+                'Pick_Travel_ft_week': result['travel_ft_week'],
+            })
+    return pd.DataFrame(rows)
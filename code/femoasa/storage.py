@@ -0,0 +1,213 @@
+"""
+femoasa storage - finished storage plan (task 2) for all parts, years and locations
+
+finished parts are stored at three locations:
+- factory: safety stock (z sigma over the lead time) + cycle stock (half of
+  the demand of one production review period)
+- warehouse A / warehouse B: the client buffer, hourly client demand x the
+  autonomy hours of the client (4 h for A, 12 h for B)
+
+every quantity is an array (..., years, parts, locations). service level,
+lead time, review period and buffer hours may be arrays too; their leading
+axes are the scenario axes, so a storage sweep runs in one call:
+
+    levels = np.array([0.99, 0.995, 0.999])
+    plan = storage_plan(service_level=levels[:, None], lead_time=np.array([0.5, 1.0, 2.0]))
+    plan['floor_sqft']  # (3 levels, 3 lead times, 5 years, 3 locations)
+
+author: machas^2 team
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+
+from femoasa import data, profiling
+from femoasa.config import (
+    CLIENT_A_BUFFER_HOURS, CLIENT_B_BUFFER_HOURS, FACTORY_COST_PER_SQFT, OTIF_SERVICE_LEVEL,
+    STORAGE_HEIGHT_FT, STORAGE_UTILIZATION, WAREHOUSE_COST_PER_SQFT, weekly_hours,
+)
+
+LOCATIONS = ['factory', 'warehouse_a', 'warehouse_b']
+CLIENTS = ['A', 'B']
+COST_PER_SQFT = np.array([FACTORY_COST_PER_SQFT, WAREHOUSE_COST_PER_SQFT, WAREHOUSE_COST_PER_SQFT])
+
+
+def client_split(products):
+    """
+    Client of every product (A1..A4 -> client A, B1..B4 -> client B)
+
+    Returns:
+        array (products, clients) of 0/1
+    """
+    return np.array([[float(p.startswith(c)) for c in CLIENTS] for p in products])
+
+
+def part_demand(weekly, cv, bom):
+    """
+    Weekly part demand and its standard deviation (independent product demands)
+
+    Args:
+        weekly: array (years, products) units/week
+        cv: array (years, products) coefficient of variation of weekly demand
+        bom: array (parts, products) parts per product unit
+
+    Returns:
+        mean, std: arrays (years, parts)
+    """
+    weekly = np.asarray(weekly, dtype=float)
+    mean = weekly @ bom.T
+    std = np.sqrt((weekly * cv) ** 2 @ (bom ** 2).T)
+    return mean, std
+
+
+def client_part_demand(weekly, bom, products):
+    """
+    Weekly part demand of each client
+
+    Returns:
+        array (years, parts, clients)
+    """
+    return np.einsum('yp,kp,pc->ykc', np.asarray(weekly, dtype=float), bom, client_split(products))
+
+
+def _scenario(value, trailing=2):
+    """
+    Scenario parameter with axes appended for the trailing (years, parts) axes
+    """
+    return np.asarray(value, dtype=float).reshape(np.shape(value) + (1,) * trailing)
+
+
+def storage_units(mean, std, client_weekly, service_level=OTIF_SERVICE_LEVEL, lead_time=1.0,
+                  review_period=1.0, buffer_hours=(CLIENT_A_BUFFER_HOURS, CLIENT_B_BUFFER_HOURS),
+                  operating_hours=None):
+    """
+    Units of every part to store at every location
+
+    Args:
+        mean, std: arrays (years, parts) weekly part demand
+        client_weekly: array (years, parts, clients) weekly part demand per client
+        service_level: cycle service level of the factory safety stock
+        lead_time: weeks of demand variability the safety stock covers
+        review_period: weeks between production batches (cycle stock = half of it)
+        buffer_hours: (..., clients) autonomy hours at warehouse A and B
+        operating_hours: scheduled hours per week (default: 2 shifts)
+
+    Returns:
+        dict of arrays (..., years, parts): 'safety', 'cycle', and 'units'
+        (..., years, parts, locations)
+    """
+    operating_hours = weekly_hours() if operating_hours is None else operating_hours
+
+    z = np.vectorize(NormalDist().inv_cdf, otypes=[float])(_scenario(service_level))
+    safety = z * std * np.sqrt(_scenario(lead_time))
+    cycle = mean * _scenario(review_period) / 2.0
+
+    hours = np.asarray(buffer_hours, dtype=float)
+    buffers = client_weekly / operating_hours * hours[..., np.newaxis, np.newaxis, :]
+
+    shape = np.broadcast_shapes(safety.shape, cycle.shape, buffers.shape[:-1])
+    safety = np.broadcast_to(safety, shape)
+    cycle = np.broadcast_to(cycle, shape)
+    units = np.stack([safety + cycle,
+                      np.broadcast_to(buffers[..., 0], shape),
+                      np.broadcast_to(buffers[..., 1], shape)], axis=-1)
+
+    return {'safety': safety, 'cycle': cycle, 'units': units}
+
+
+def storage_space(units, volume_cuft, height=STORAGE_HEIGHT_FT, utilization=STORAGE_UTILIZATION):
+    """
+    Storage volume, floor area and building cost per location
+
+    Args:
+        units: array (..., years, parts, locations)
+        volume_cuft: array (parts,) unit volume
+
+    Returns:
+        dict of arrays (..., years, locations): 'volume_cuft', 'floor_sqft', 'cost'
+    """
+    volume = np.einsum('...ypl,p->...yl', units, volume_cuft)
+    floor = volume / (height * utilization)
+    return {'volume_cuft': volume, 'floor_sqft': floor, 'cost': floor * COST_PER_SQFT}
+
+
+@profiling.traced()
+def storage_plan(demand=None, volume_cuft=None, service_level=OTIF_SERVICE_LEVEL, lead_time=1.0,
+                 review_period=1.0, buffer_hours=(CLIENT_A_BUFFER_HOURS, CLIENT_B_BUFFER_HOURS),
+                 operating_hours=None, height=STORAGE_HEIGHT_FT, utilization=STORAGE_UTILIZATION):
+    """
+    Storage plan for all parts x years x locations
+
+    Args:
+        demand: dict like data.load_multi_year_demand() (default: Years 1-5)
+        volume_cuft: array (parts,) unit volume (default: Parts Specs.csv)
+        other args: see storage_units() and storage_space()
+
+    Returns:
+        dict: 'years', 'mean', 'std' (years, parts), 'part_volume_cuft' (parts,),
+        'safety', 'cycle', 'units' and the storage_space() arrays
+    """
+    demand = data.load_multi_year_demand() if demand is None else demand
+    volume_cuft = data.load_part_dimensions()['volume_cuft'] if volume_cuft is None else volume_cuft
+
+    mean, std = part_demand(demand['weekly'], demand['cv'], demand['bom'])
+    client_weekly = client_part_demand(demand['weekly'], demand['bom'], demand['products'])
+    plan = storage_units(mean, std, client_weekly, service_level, lead_time, review_period,
+                         buffer_hours, operating_hours)
+    plan.update(storage_space(plan['units'], volume_cuft, height, utilization))
+    plan.update({'years': demand['years'], 'mean': mean, 'std': std, 'part_volume_cuft': volume_cuft})
+    return plan
+
+
+def summary_columns(plan):
+    """
+    Yearly summary columns of a single-scenario plan (without pandas)
+
+    Returns:
+        dict column -> list or array (years,): Year, volumes, floor space,
+        warehouse costs and Total_Investment
+    """
+    volume, floor, cost = plan['volume_cuft'], plan['floor_sqft'], plan['cost']
+    return {
+        'Year': [f"Year {y}" for y in plan['years']],
+        'Factory_Volume_cuft': volume[:, 0],
+        'Warehouse_A_Volume_cuft': volume[:, 1],
+        'Warehouse_B_Volume_cuft': volume[:, 2],
+        'Factory_Floor_sqft': floor[:, 0],
+        'Warehouse_A_Floor_sqft': floor[:, 1],
+        'Warehouse_B_Floor_sqft': floor[:, 2],
+        'Warehouse_A_Cost': cost[:, 1],
+        'Warehouse_B_Cost': cost[:, 2],
+        'Total_Investment': cost[:, 1:].sum(axis=1),
+    }
+
+
+def plan_tables(plan, parts=data.PARTS):
+    """
+    Part-level allocation and yearly summary tables of a single-scenario plan
+
+    Returns:
+        detail dataframe (Year, Part, stock by location, Part_Volume_CuFt),
+        summary dataframe indexed by Year (volumes, floor space, warehouse costs)
+    """
+    import pandas as pd
+
+    years = [f"Year {y}" for y in plan['years']]
+    n_years, n_parts = len(years), len(parts)
+    units = plan['units']
+
+    detail = pd.DataFrame({
+        'Year': np.repeat(years, n_parts),
+        'Part': np.tile(parts, n_years),
+        'Safety_Stock_Units': plan['safety'].ravel(),
+        'Cycle_Stock_Units': plan['cycle'].ravel(),
+        'Factory_Storage_Units': units[..., 0].ravel(),
+        'Warehouse_A_Units': units[..., 1].ravel(),
+        'Warehouse_B_Units': units[..., 2].ravel(),
+        'Part_Volume_CuFt': np.tile(plan['part_volume_cuft'], n_years),
+    })
+
+    summary = pd.DataFrame(summary_columns(plan)).set_index('Year')
+
+    return detail, summary
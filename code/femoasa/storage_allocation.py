@@ -0,0 +1,296 @@
+"""
+femoasa storage allocation - where to hold the finished stock (factory, warehouse A, warehouse B)
+
+one sparse mixed-integer model for all parts x years picks the units of every
+part stored at every location, the floor area of every location and whether
+each near-client warehouse is built:
+
+- coverage: for every client, the stock at locations that reach the client
+  within its autonomy window (truck transit + dock time <= 4 h for A, 12 h
+  for B) covers its buffer (hourly demand x autonomy hours) plus its safety
+  stock at the OTIF level. stock counted for both clients must also cover the
+  pooled safety stock of the part (risk pooling at a shared location)
+- cycle stock stays in the factory (production batches land there)
+- area: every location is sized for its peak year; a warehouse that is not
+  built holds nothing and serves no client
+- cost: building ($250/ft2 factory, $200/ft2 warehouse, once) + carrying of
+  the stock at the financial rate + trucking of the client replenishments
+  (every hour to A, every 4 hours to B), either direct from the factory or
+  through a near-client warehouse fed by weekly full truckloads; yearly
+  costs are discounted like the cost engine npv
+
+    result = allocate_storage()
+    result['units']  # (years, parts, locations)
+
+author: machas^2 team
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse, stats
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from femoasa import cost_engine, data, profiling, storage
+from femoasa.config import (
+    CLIENT_A_BUFFER_HOURS, CLIENT_B_BUFFER_HOURS, CLIENT_A_MILES, CLIENT_B_MILES,
+    CLIENT_A_REPLENISH_HOURS, CLIENT_B_REPLENISH_HOURS, DOCK_HOURS, INTEREST_RATE,
+    OTIF_SERVICE_LEVEL, STORAGE_HEIGHT_FT, STORAGE_UTILIZATION, TRAILER_DIMS_IN, TRAILER_MAX_LBS,
+    TRUCK_COST_PER_MILE, TRUCK_SPEED_MPH, WAREHOUSE_TO_CLIENT_MILES, WEEKS_PER_YEAR, weekly_hours,
+)
+
+LOCATIONS = storage.LOCATIONS
+CLIENTS = storage.CLIENTS
+TRAILER_CUFT = float(np.prod(TRAILER_DIMS_IN)) / 1728.0
+
+# positions on the north-south axis through the factory (miles, north positive)
+CLIENT_POSITIONS = np.array([CLIENT_A_MILES, -CLIENT_B_MILES], dtype=float)
+LOCATION_POSITIONS = np.array([0.0,
+                               CLIENT_A_MILES - WAREHOUSE_TO_CLIENT_MILES,
+                               -(CLIENT_B_MILES - WAREHOUSE_TO_CLIENT_MILES)])
+
+
+def location_client_miles():
+    """
+    Road miles from every location to every client
+
+    Returns:
+        array (locations, clients)
+    """
+    return np.abs(LOCATION_POSITIONS[:, np.newaxis] - CLIENT_POSITIONS)
+
+
+def reachability(buffer_hours=(CLIENT_A_BUFFER_HOURS, CLIENT_B_BUFFER_HOURS), speed_mph=TRUCK_SPEED_MPH,
+                 dock_hours=DOCK_HOURS):
+    """
+    Locations that resupply a client before its autonomy buffer runs out
+
+    Returns:
+        bool array (locations, clients)
+    """
+    transit = location_client_miles() / speed_mph + dock_hours
+    return transit <= np.asarray(buffer_hours, dtype=float)
+
+
+def trucks_needed(volume_cuft, weight_lbs):
+    """
+    Trailers needed for a load (cube or weight bound, at least one per trip)
+    """
+    return np.maximum(np.ceil(np.maximum(volume_cuft / TRAILER_CUFT, weight_lbs / TRAILER_MAX_LBS)), 1.0)
+
+
+def route_costs(client_weekly, volume_cuft, weight_lbs, replenish_hours=(CLIENT_A_REPLENISH_HOURS, CLIENT_B_REPLENISH_HOURS),
+                operating_hours=None, cost_per_mile=TRUCK_COST_PER_MILE):
+    """
+    Yearly trucking cost of serving every client from every location
+
+    A delivery leaves every replenishment interval; serving from a warehouse
+    adds the weekly full-truckload line haul from the factory to it.
+
+    Args:
+        client_weekly: array (years, parts, clients) weekly part demand per client
+        volume_cuft, weight_lbs: arrays (parts,) per unit
+
+    Returns:
+        array (years, clients, locations) $/year
+    """
+    operating_hours = weekly_hours() if operating_hours is None else operating_hours
+    deliveries_per_week = operating_hours / np.asarray(replenish_hours, dtype=float)
+
+    weekly_volume = np.einsum('ypc,p->yc', client_weekly, volume_cuft)
+    weekly_weight = np.einsum('ypc,p->yc', client_weekly, weight_lbs)
+    per_delivery = trucks_needed(weekly_volume / deliveries_per_week, weekly_weight / deliveries_per_week)
+    line_haul = np.where(weekly_volume > 0, trucks_needed(weekly_volume, weekly_weight), 0.0)
+
+    miles = location_client_miles().T  # (clients, locations)
+    delivery = (deliveries_per_week * WEEKS_PER_YEAR)[:, np.newaxis] * per_delivery[..., np.newaxis] * 2.0 * miles
+    feed = line_haul[..., np.newaxis] * WEEKS_PER_YEAR * 2.0 * np.abs(LOCATION_POSITIONS)
+    return (delivery + feed) * cost_per_mile
+
+
+def stock_requirements(demand, service_level=OTIF_SERVICE_LEVEL, lead_time=1.0, review_period=1.0,
+                       buffer_hours=(CLIENT_A_BUFFER_HOURS, CLIENT_B_BUFFER_HOURS), operating_hours=None):
+    """
+    Stock each client needs within reach, the pooled need and the factory cycle stock
+
+    Returns:
+        dict: 'client' (years, parts, clients), 'pooled' (years, parts),
+        'cycle' (years, parts), 'client_weekly' (years, parts, clients)
+    """
+    operating_hours = weekly_hours() if operating_hours is None else operating_hours
+    weekly = np.asarray(demand['weekly'], dtype=float)
+    bom = demand['bom']
+    split = storage.client_split(demand['products'])
+
+    mean, std = storage.part_demand(weekly, demand['cv'], bom)
+    client_weekly = storage.client_part_demand(weekly, bom, demand['products'])
+    client_std = np.sqrt(np.einsum('yp,kp,pc->ykc', (weekly * demand['cv']) ** 2, bom ** 2, split))
+
+    z = stats.norm.ppf(service_level)
+    buffers = client_weekly / operating_hours * np.asarray(buffer_hours, dtype=float)
+    return {
+        'client': buffers + z * client_std * np.sqrt(lead_time),
+        'pooled': buffers.sum(axis=-1) + z * std * np.sqrt(lead_time),
+        'cycle': mean * review_period / 2.0,
+        'client_weekly': client_weekly,
+    }
+
+
+@profiling.traced()
+def allocate_storage(demand=None, dimensions=None, service_level=OTIF_SERVICE_LEVEL, lead_time=1.0,
+                     review_period=1.0, buffer_hours=(CLIENT_A_BUFFER_HOURS, CLIENT_B_BUFFER_HOURS),
+                     operating_hours=None, rate=INTEREST_RATE, height=STORAGE_HEIGHT_FT,
+                     utilization=STORAGE_UTILIZATION, time_limit=None):
+    """
+    Cost-optimal stock per part, year and location
+
+    Args:
+        demand: dict like data.load_multi_year_demand() (default: Years 1-5)
+        dimensions: dict like data.load_part_dimensions()
+        rate: financial rate for carrying cost and discounting
+        other args: see storage.storage_units()
+
+    Returns:
+        dict: 'units' (years, parts, locations) stock excluding factory cycle
+        stock, 'cycle' (years, parts), 'area_sqft' (locations,), 'built'
+        (locations,), 'assignment' (years, clients, locations) share of each
+        client's deliveries, cost arrays 'building' (locations,), 'carrying'
+        and 'transport' (years,), 'npv', and the solver 'status' / 'message'
+    """
+    demand = data.load_multi_year_demand() if demand is None else demand
+    dimensions = data.load_part_dimensions() if dimensions is None else dimensions
+    need = stock_requirements(demand, service_level, lead_time, review_period, buffer_hours, operating_hours)
+    n_years, n_parts = need['pooled'].shape
+    n_loc, n_cli = len(LOCATIONS), len(CLIENTS)
+
+    volume, weight, price = dimensions['volume_cuft'], dimensions['weight_lbs'], dimensions['price']
+    reach = reachability(buffer_hours)
+    routes = route_costs(need['client_weekly'], volume, weight, operating_hours=operating_hours)
+    _, end = cost_engine.discount_factors(n_years, rate)
+
+    # variable layout: stock x[y, p, l] | area[l] | assignment u[y, c, l] | built[w] (warehouses)
+    n_x = n_years * n_parts * n_loc
+    i_area = n_x
+    i_u = i_area + n_loc
+    n_u = n_years * n_cli * n_loc
+    i_built = i_u + n_u
+    n_vars = i_built + n_loc - 1
+    x_idx = np.arange(n_x).reshape(n_years, n_parts, n_loc)
+    u_idx = i_u + np.arange(n_u).reshape(n_years, n_cli, n_loc)
+
+    cost = np.zeros(n_vars)
+    cost[:n_x] = (end[:, np.newaxis, np.newaxis] * price[:, np.newaxis] * rate * np.ones(n_loc)).ravel()
+    cost[i_area:i_area + n_loc] = storage.COST_PER_SQFT
+    cost[i_u:i_built] = (end[:, np.newaxis, np.newaxis] * routes).ravel()
+
+    rows, cols, vals, lower, upper = [], [], [], [], []
+
+    def add(row_cols, row_vals, lo, hi):
+        """
+        Append a block of constraints, row_cols / row_vals are (constraints, terms)
+        """
+        start = sum(len(b) for b in lower)
+        n_rows, n_terms = row_cols.shape
+        rows.append(np.repeat(start + np.arange(n_rows), n_terms))
+        cols.append(row_cols.ravel())
+        vals.append(np.broadcast_to(row_vals, row_cols.shape).ravel())
+        lower.append(np.broadcast_to(lo, (n_rows,)).ravel())
+        upper.append(np.broadcast_to(hi, (n_rows,)).ravel())
+
+    # coverage per client: stock within reach >= buffer + safety stock
+    for c in range(n_cli):
+        locs = np.flatnonzero(reach[:, c])
+        add(x_idx[..., locs].reshape(-1, len(locs)), 1.0, need['client'][..., c].ravel(), np.inf)
+    # pooled coverage over all locations
+    add(x_idx.reshape(-1, n_loc), 1.0, need['pooled'].ravel(), np.inf)
+
+    # area of each location >= stored cube of every year (cycle stock in the factory)
+    cube = height * utilization
+    fixed = np.zeros((n_years, n_loc))
+    fixed[:, 0] = need['cycle'] @ volume / cube
+    area_cols = np.concatenate([np.swapaxes(x_idx, 1, 2), np.full((n_years, n_loc, 1), i_area) + np.arange(n_loc)[:, np.newaxis]], axis=2)
+    area_vals = np.concatenate([volume / cube, [-1.0]])
+    add(area_cols.reshape(-1, n_parts + 1), area_vals, -np.inf, -fixed.ravel())
+
+    # a warehouse holds stock and serves clients only if it is built
+    big_m = (need['pooled'] + need['client'].sum(axis=-1)).max(axis=0) @ volume / cube * 2.0 + 1.0
+    w = np.arange(1, n_loc)
+    add(np.column_stack([i_area + w, i_built + w - 1]), np.array([1.0, -big_m]), -np.inf, 0.0)
+    add(np.stack([u_idx[..., 1:].reshape(-1), np.tile(i_built + w - 1, n_years * n_cli)], axis=1),
+        np.array([1.0, -1.0]), -np.inf, 0.0)
+
+    # every client's deliveries come from somewhere
+    add(u_idx.reshape(-1, n_loc), 1.0, 1.0, 1.0)
+
+    constraints = LinearConstraint(
+        sparse.csr_array((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                         shape=(sum(len(b) for b in lower), n_vars)),
+        np.concatenate(lower), np.concatenate(upper))
+
+    ub = np.full(n_vars, np.inf)
+    ub[i_u:i_built] = np.broadcast_to(reach.T, (n_years, n_cli, n_loc)).ravel().astype(float)
+    ub[i_built:] = 1.0
+    integrality = np.zeros(n_vars)
+    integrality[i_built:] = 1
+
+    options = {} if time_limit is None else {'time_limit': time_limit}
+    res = milp(cost, constraints=constraints, integrality=integrality, bounds=Bounds(0.0, ub), options=options)
+    if res.x is None:
+        raise RuntimeError(f"Storage allocation failed: {res.message}")
+
+    sol = res.x
+    units = np.maximum(sol[:n_x].reshape(n_years, n_parts, n_loc), 0.0)
+    area = np.maximum(sol[i_area:i_area + n_loc], 0.0)
+    assignment = sol[i_u:i_built].reshape(n_years, n_cli, n_loc)
+    carrying = np.einsum('ypl,p->y', units, price) * rate + need['cycle'] @ price * rate
+    transport = np.einsum('ycl,ycl->y', assignment, routes)
+    building = area * storage.COST_PER_SQFT
+
+    return {
+        'years': demand['years'],
+        'units': units,
+        'cycle': need['cycle'],
+        'area_sqft': area,
+        'built': np.concatenate([[True], sol[i_built:] > 0.5]),
+        'assignment': assignment,
+        'building': building,
+        'carrying': carrying,
+        'transport': transport,
+        'npv': building.sum() + (carrying + transport) @ end,
+        'status': res.status,
+        'message': res.message,
+    }
+
+
+def allocation_tables(result, parts=data.PARTS):
+    """
+    Part-level allocation and yearly summary of an allocate_storage() result
+
+    Returns:
+        detail dataframe (Year, Part, units per location), summary dataframe by Year
+    """
+    years = [f"Year {y}" for y in result['years']]
+    n_years, n_parts = len(years), len(parts)
+    units = result['units']
+
+    detail = pd.DataFrame({
+        'Year': np.repeat(years, n_parts),
+        'Part': np.tile(parts, n_years),
+        'Factory_Cycle_Units': result['cycle'].ravel(),
+        'Factory_Stock_Units': units[..., 0].ravel(),
+        'Warehouse_A_Units': units[..., 1].ravel(),
+        'Warehouse_B_Units': units[..., 2].ravel(),
+    })
+
+    served = {f"{client}_Served_From": [LOCATIONS[l] for l in result['assignment'][:, c].argmax(axis=1)]
+              for c, client in enumerate(CLIENTS)}
+    summary = pd.DataFrame({
+        'Year': years,
+        'Factory_Floor_sqft': result['area_sqft'][0],
+        'Warehouse_A_Floor_sqft': result['area_sqft'][1],
+        'Warehouse_B_Floor_sqft': result['area_sqft'][2],
+        **served,
+        'Carrying_Cost': result['carrying'],
+        'Transport_Cost': result['transport'],
+    }).set_index('Year')
+
+    return detail, summary
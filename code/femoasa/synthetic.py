@@ -0,0 +1,287 @@
+"""
+femoasa synthetic - scalable instance generator in the data/csv_outputs layout
+
+the casework data has 20 parts, 13 processes and 8 products, too small to
+exercise the engines at production scale. this module fits routing, time,
+size, bill-of-materials and demand statistics from the casework files and
+draws instances of any size from them:
+
+- routings: first-step distribution, process-to-process transition matrix
+  and routing-length distribution of the casework routings. every synthetic
+  process is a clone of one casework process, a routing walks the casework
+  chain and each step lands on a random clone, so department structure and
+  flow patterns scale with the process count
+- step times, part dimensions: resampled from the casework values; weight
+  and price from the fitted lognormal density (lbs/in3) and price per lb
+- products: bom density and quantities, weekly demand (lognormal), yearly
+  growth (lognormal year-over-year ratios), cv values and the share of
+  products launched in Year 1
+- equipment: installed price, relocation cost, life and crew of the clone's
+  casework process
+
+the instance is written as the 7 csv files of data/csv_outputs and reads back
+with the femoasa.data loaders (pass data_dir):
+
+    instance = generate_instance(n_parts=5000, n_processes=100, n_products=200, seed=1)
+    write_instance(instance, BASE_DIR / 'data' / 'synthetic' / 'p5000')
+    demand = data.load_multi_year_demand(data_dir=BASE_DIR / 'data' / 'synthetic' / 'p5000')
+
+author: machas^2 team
+"""
+
+import csv
+import string
+from pathlib import Path
+
+import numpy as np
+
+from femoasa import data
+from femoasa.config import WEEKS_PER_YEAR
+
+
+def process_names(n):
+    """
+    Spreadsheet-style process names: A..Z, AA, AB, ...
+    """
+    names = []
+    for k in range(n):
+        name, k = '', k + 1
+        while k:
+            k, r = divmod(k - 1, 26)
+            name = string.ascii_uppercase[r] + name
+        names.append(name)
+    return names
+
+
+def product_names(n):
+    """
+    Product names alternating between the two clients: A1, B1, A2, B2, ...
+    """
+    return [f"{'AB'[k % 2]}{k // 2 + 1}" for k in range(n)]
+
+
+def fit_statistics(data_dir=None):
+    """
+    Statistics of the casework instance used by generate_instance()
+
+    Returns:
+        dict: 'processes', 'first_step' (processes,), 'transitions'
+        (processes, processes) row-stochastic, 'lengths' (values, pmf),
+        'step_times', 'sizes' (observed values), 'density' and 'price_per_lb'
+        (lognormal mu, sigma), 'bom_density', 'bom_quantities', 'weekly'
+        (lognormal mu, sigma), 'growth' (lognormal mu, sigma), 'cv' (observed),
+        'year_one_share', 'equipment' (processes, 3) price, relocation, life,
+        'crews' (processes,)
+    """
+    routings = data.load_routings(data_dir)
+    step_times = data.load_step_times(data_dir)
+    processes = data.load_processes(data_dir)
+    dimensions = data.load_part_dimensions(data_dir)
+    demand = data.load_multi_year_demand(data_dir)
+    index = {p: i for i, p in enumerate(processes)}
+
+    first = np.bincount([index[steps[0]] for steps in routings.values()], minlength=len(processes))
+    moves = data.routing_transitions(routings, processes).sum(axis=0)
+    # processes that never hand over restart from the first-step distribution
+    transitions = np.where(moves.sum(axis=1, keepdims=True) > 0, moves, first)
+    lengths, counts = np.unique([len(steps) for steps in routings.values()], return_counts=True)
+
+    volume_in3 = dimensions['x_in'] * dimensions['y_in'] * dimensions['z_in']
+    log_density = np.log(dimensions['weight_lbs'] / volume_in3)
+    log_price = np.log(dimensions['price'] / dimensions['weight_lbs'])
+
+    bom = demand['bom']
+    weekly = demand['weekly']
+    launched = weekly > 0
+    ratios = np.log(weekly[1:][launched[1:] & launched[:-1]] / weekly[:-1][launched[1:] & launched[:-1]])
+
+    specs = data.load_equipment_specs(data_dir)
+
+    return {
+        'processes': processes,
+        'first_step': first / first.sum(),
+        'transitions': transitions / transitions.sum(axis=1, keepdims=True),
+        'lengths': (lengths, counts / counts.sum()),
+        'step_times': np.concatenate([np.asarray(t[:len(routings[p])]) for p, t in step_times.items()]),
+        'sizes': np.concatenate([dimensions['x_in'], dimensions['y_in'], dimensions['z_in']]),
+        'density': (log_density.mean(), log_density.std()),
+        'price_per_lb': (log_price.mean(), log_price.std()),
+        'bom_density': float((bom > 0).mean()),
+        'bom_quantities': bom[bom > 0],
+        'weekly': (np.log(weekly[launched]).mean(), np.log(weekly[launched]).std()),
+        'growth': (ratios.mean(), ratios.std()),
+        'cv': demand['cv'][launched],
+        'year_one_share': float(launched[0].mean()),
+        'equipment': np.array([[specs[p]['price'], specs[p]['relocation'], specs[p]['life_years']] for p in processes]),
+        'crews': [specs[p]['operators'] for p in processes],
+    }
+
+
+def generate_instance(n_parts=5000, n_processes=100, n_products=200, n_years=5, seed=None, stats=None):
+    """
+    Draw a synthetic instance from the casework statistics
+
+    Args:
+        n_parts, n_processes, n_products: instance size
+        n_years: planning years (Year 1 + the multi-year horizon)
+        stats: fit_statistics() result (fitted from data/csv_outputs if None)
+
+    Returns:
+        dict: 'parts', 'processes', 'products', 'years', 'routings' {part: [process]},
+        'step_times' {part: [minutes]}, 'dims' (parts, 3), 'weight_lbs', 'price'
+        (parts,), 'bom' (parts, products), 'weekly', 'cv' (years, products),
+        'year_one' (products,) bool, 'equipment' (processes, 3), 'crews' (processes,)
+    """
+    if n_years < 2:
+        raise ValueError("n_years must be at least 2 (Year 1 + the multi-year horizon)")
+    stats = fit_statistics() if stats is None else stats
+    rng = np.random.default_rng(seed)
+    n_template = len(stats['processes'])
+
+    # clone c of template t is process t + c * n_template (all templates cloned once first)
+    template = np.arange(n_processes) % n_template
+    clones = [np.flatnonzero(template == t) for t in range(n_template)]
+    clones = [c if len(c) else np.array([t % n_processes]) for t, c in enumerate(clones)]
+
+    lengths = rng.choice(stats['lengths'][0], size=n_parts, p=stats['lengths'][1])
+    cumulative = np.cumsum(stats['transitions'], axis=1)
+    state = rng.choice(n_template, size=n_parts, p=stats['first_step'])
+    walk = np.empty((n_parts, lengths.max()), dtype=np.int64)
+    walk[:, 0] = state
+    for step in range(1, lengths.max()):
+        # one inverse-cdf draw per part and step, vectorized over parts
+        state = np.minimum((rng.random(n_parts)[:, np.newaxis] > cumulative[state]).sum(axis=1), n_template - 1)
+        walk[:, step] = state
+    picks = rng.random(walk.shape)
+    sizes = np.array([len(c) for c in clones])
+    machine = np.empty_like(walk)
+    for t in range(n_template):
+        mask = walk == t
+        machine[mask] = clones[t][(picks[mask] * sizes[t]).astype(np.int64)]
+
+    processes = process_names(n_processes)
+    parts = [f'P{k}' for k in range(1, n_parts + 1)]
+    times = rng.choice(stats['step_times'], size=walk.shape)
+    routings = {p: [processes[m] for m in machine[k, :lengths[k]]] for k, p in enumerate(parts)}
+    step_times = {p: times[k, :lengths[k]].tolist() for k, p in enumerate(parts)}
+
+    dims = rng.choice(stats['sizes'], size=(n_parts, 3))
+    weight = np.maximum(np.round(dims.prod(axis=1) * np.exp(rng.normal(*stats['density'], n_parts))), 1.0)
+    price = np.maximum(np.round(weight * np.exp(rng.normal(*stats['price_per_lb'], n_parts))), 1.0)
+
+    bom = np.where(rng.random((n_parts, n_products)) < stats['bom_density'],
+                   rng.choice(stats['bom_quantities'], size=(n_parts, n_products)), 0.0)
+    # every product needs at least one part
+    empty = np.flatnonzero((bom > 0).sum(axis=0) == 0)
+    bom[rng.integers(n_parts, size=len(empty)), empty] = rng.choice(stats['bom_quantities'], size=len(empty))
+
+    year_one = rng.random(n_products) < stats['year_one_share']
+    year_one[0] = True
+    base = np.exp(rng.normal(*stats['weekly'], n_products))
+    growth = np.exp(rng.normal(*stats['growth'], (n_years - 1, n_products)))
+    weekly = base * np.vstack([np.ones(n_products), np.cumprod(growth, axis=0)])
+    weekly[0, ~year_one] = 0.0
+    weekly = np.round(weekly)
+    cv = np.where(weekly > 0, rng.choice(stats['cv'], size=weekly.shape), 0.0)
+
+    return {
+        'parts': parts,
+        'processes': processes,
+        'products': product_names(n_products),
+        'years': list(range(1, n_years + 1)),
+        'routings': routings,
+        'step_times': step_times,
+        'dims': dims,
+        'weight_lbs': weight,
+        'price': price,
+        'bom': bom,
+        'weekly': weekly,
+        'cv': cv,
+        'year_one': year_one,
+        'equipment': stats['equipment'][template],
+        'crews': [stats['crews'][t] for t in template],
+    }
+
+
+def _number(value):
+    return f"{value:.10g}" if value else ''
+
+
+def _write(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        csv.writer(f).writerows(rows)
+
+
+def write_instance(instance, out_dir):
+    """
+    Write an instance as the 7 csv files of data/csv_outputs
+
+    Returns:
+        Path of the instance directory
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    parts, products, years = instance['parts'], instance['products'], instance['years']
+    width = max(len(steps) for steps in instance['routings'].values())
+    steps_header = ['Part'] + [f'Step {k}' for k in range(1, width + 1)]
+    pad = lambda values: list(values) + [''] * (width - len(values))
+
+    specs = [steps_header] + [[p] + pad(instance['routings'][p]) for p in parts]
+    specs += [[''] * (width + 1)] * 2
+    specs += [['Part', 'Dimensions', '', '', '', 'Materials'], ['Identifier', 'X (in.)', 'Y (in.)', 'Z (in.)',
+                                                              'Weight (lbs)', 'Price/unit']]
+    specs += [[p, *[f'{v:.10g}' for v in instance['dims'][k]], f"{instance['weight_lbs'][k]:.10g}",
+               f"{instance['price'][k]:.10g}"] for k, p in enumerate(parts)]
+    _write(out_dir / 'Parts Specs.csv', specs)
+    _write(out_dir / 'Parts_Step_Time.csv',
+           [steps_header] + [[p] + pad([f'{t:.10g}' for t in instance['step_times'][p]]) for p in parts])
+
+    equipment = [['Equipment', 'Installed price', 'Relocation cost', 'Useful life (years)', 'Number of operators']]
+    equipment += [[name, f'{e[0]:.10g}', f'{e[1]:.10g}', f'{e[2]:.10g}', crew]
+                  for name, e, crew in zip(instance['processes'], instance['equipment'], instance['crews'])]
+    equipment += [[''] * 5, ['Operator', 'Hourly Cost'], ['C1', '20'], ['C2', '40'], ['C3', '60']]
+    _write(out_dir / 'Equip+Operator Specs.csv', equipment)
+
+    first = np.flatnonzero(instance['year_one'])
+    year_one = [products[j] for j in first]
+    weekly, cv = instance['weekly'], instance['cv']
+    yearly = weekly * WEEKS_PER_YEAR
+    std = yearly * cv / np.sqrt(WEEKS_PER_YEAR)
+    blank = [''] * (len(year_one) + 2)
+    title = 'Year +1 {} for Each Product of Clients A and B'
+    one = [
+        [title.format('Demand Forecast')], ['Year', *year_one, 'Total'],
+        ['1', *[_number(v) for v in yearly[0, first]], _number(yearly[0, first].sum())], blank, blank,
+        [title.format('Standard Deviation on Demand Forecast')], ['Year', *year_one, 'Overall'],
+        ['1', *[_number(v) for v in std[0, first]], _number(np.sqrt((std[0, first] ** 2).sum()))], blank, blank,
+        [title.format('Weekly Demand Forecast')], ['Year', *year_one, 'Total'],
+        ['1', *[_number(v) for v in weekly[0, first]], _number(weekly[0, first].sum())], blank,
+        ['Expected Coefficient of Variation of Weekly Year +1 Demand for Each Product of Clients A and B'],
+        ['Year', *year_one, 'Average'], ['1', *[_number(v) for v in cv[0, first]], _number(cv[0, first].mean())],
+    ]
+    _write(out_dir / '+1 Year Product Demand.csv', one)
+    bom = instance['bom']
+    _write(out_dir / '+1 Year Parts per Product.csv',
+           [['Parts per Assembled Product Unit Demanded in Year +1'], ['Part', *year_one]]
+           + [[p, *[_number(v) for v in bom[k, first]]] for k, p in enumerate(parts)])
+
+    blank = [''] * (len(products) + 2)
+    later = range(1, len(years))
+    horizon = '+2 to +5 Year Horizon'  # section titles are fixed by the loaders
+    multi = []
+    for name, values, total in [('Yearly Demand Forecast for Each Product', yearly, 'Total'),
+                                ("Standard Deviation on Each Year's Demand Forecast for Each Product", std, 'Overall')]:
+        multi += [[f'{name} in the {horizon}'], ['Year', *products, total]]
+        multi += [[str(years[y]), *[_number(v) for v in values[y]],
+                   _number(values[y].sum() if total == 'Total' else np.sqrt((values[y] ** 2).sum()))] for y in later]
+        multi += [blank, blank]
+    multi += [[data.WEEKLY_SECTION], ['Year', *products, 'Total']]
+    multi += [[str(years[y]), *[_number(v) for v in weekly[y]], _number(weekly[y].sum())] for y in later]
+    multi += [blank, blank, [data.CV_SECTION], ['Year', *products, 'Average']]
+    multi += [[str(years[y]), *[_number(v) for v in cv[y]], _number(cv[y][cv[y] > 0].mean())] for y in later]
+    _write(out_dir / '+2 to +5 Year Product Demand.csv', multi)
+    _write(out_dir / '+2 to +5 Year Parts per Product.csv',
+           [['', '', 'Number of Parts per Assembled Product Unit Planned to be Demanded by Clients A and B'],
+            ['', 'Part', *products]]
+           + [['', p, *[_number(v) for v in bom[k]]] for k, p in enumerate(parts)])
+    return out_dir
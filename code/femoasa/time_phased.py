@@ -0,0 +1,151 @@
+"""
+femoasa time-phased capacity - week-by-week workload and machines over years 1 to 5
+
+task 4 sizes every year on its average week, so the equipment plan jumps in
+steps at the year boundaries and every machine of a year is bought in its
+first week. this module interpolates the weekly product demand between the
+year averages (products A4, B3 and B4 ramp in from 0 in Year 1, A1 and A2 ramp
+down), so demand, workload and machines move week by week over the 260-week
+horizon and each additional machine gets the week it becomes necessary.
+
+the weekly demand is linear between the mid-weeks of consecutive years (the
+year averages are met exactly at mid-year) and flat before the first and
+after the last mid-week. the weekly process workload is one product:
+
+    workload (weeks, processes) = demand (weeks, products) @ bom.T @ workload_minutes
+
+pooled organizations are sized on that matrix directly; part cells need the
+(weeks, parts) part demand, which is kept in a memory-mapped .npy file when
+memmap_dir is given (synthetic instances with thousands of parts) and sized
+in chunks of weeks:
+
+    plan = time_phased_plan(organization='fractal_f4')
+    additions = machine_additions(plan)     # week each extra machine is needed
+
+author: machas^2 team
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from femoasa import capacity, data
+from femoasa.config import SHIFTS_PER_DAY, WEEKS_PER_YEAR
+
+
+def weekly_demand(weekly, weeks_per_year=WEEKS_PER_YEAR):
+    """
+    Weekly product demand interpolated between the year averages
+
+    Args:
+        weekly: array (years, products) average units/week of each year
+
+    Returns:
+        array (years x weeks_per_year, products)
+    """
+    weekly = np.asarray(weekly, dtype=float)
+    years = len(weekly)
+    week = np.arange(years * weeks_per_year) + 0.5
+    # fractional year position of every week, year y averages sit at y + 0.5
+    position = np.clip(week / weeks_per_year - 0.5, 0.0, years - 1)
+    low = np.minimum(np.floor(position).astype(np.int64), years - 1)
+    high = np.minimum(low + 1, years - 1)
+    share = (position - low)[:, None]
+    return weekly[low] * (1.0 - share) + weekly[high] * share
+
+
+def _array(shape, memmap_dir, name):
+    if memmap_dir is None:
+        return np.empty(shape)
+    path = Path(memmap_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    return np.lib.format.open_memmap(path / f"{name}.npy", mode='w+', dtype=float, shape=shape)
+
+
+def time_phased_plan(inputs=None, organization='functional', weeks_per_year=WEEKS_PER_YEAR,
+                     shifts=SHIFTS_PER_DAY, memmap_dir=None, chunk_weeks=WEEKS_PER_YEAR):
+    """
+    Weekly demand, process workload and machines of one organization
+
+    Args:
+        organization: one of capacity.ORGANIZATIONS
+        memmap_dir: optional directory for the (weeks, parts) part demand
+            and the (weeks, processes) workload as .npy memory maps
+        chunk_weeks: weeks sized per step for part cells
+
+    Returns:
+        dict: 'processes', 'weeks_per_year', 'year' (weeks,) year label of
+        every week, 'demand' (weeks, products), 'workload' (weeks, processes)
+        minutes, 'equipment' (weeks, processes) machines needed that week,
+        'installed' (weeks, processes) running maximum of equipment,
+        'yearly_equipment' (years, processes) average-week sizing
+    """
+    inputs = data.load_snapshot() if inputs is None else inputs
+    demand = inputs['demand']
+    bom = np.asarray(demand['bom'], dtype=float)
+    minutes = np.asarray(inputs['workload'], dtype=float)
+    machine = capacity.machine_capacity(shifts)
+
+    weekly = weekly_demand(demand['weekly'], weeks_per_year)
+    workload = _array((len(weekly), minutes.shape[1]), memmap_dir, 'workload')
+    workload[:] = weekly @ (bom.T @ minutes)
+
+    if organization == 'part':
+        part_demand = _array((len(weekly), len(bom)), memmap_dir, 'part_demand')
+        part_demand[:] = weekly @ bom.T
+        equipment = np.empty(workload.shape)
+        for start in range(0, len(weekly), chunk_weeks):
+            block = slice(start, start + chunk_weeks)
+            equipment[block] = capacity.equipment_requirements(
+                capacity.part_workload(part_demand[block], minutes), 'part', machine)
+    else:
+        # pooled sizing only needs the process totals: pass them as a single 'part'
+        equipment = capacity.equipment_requirements(np.asarray(workload)[:, None, :], organization, machine)
+
+    yearly = capacity.part_workload(np.asarray(demand['weekly'], dtype=float) @ bom.T, minutes)
+    return {
+        'processes': list(inputs['processes']),
+        'weeks_per_year': weeks_per_year,
+        'year': np.repeat(np.asarray(demand['years']), weeks_per_year),
+        'demand': weekly,
+        'workload': workload,
+        'equipment': equipment,
+        'installed': np.maximum.accumulate(equipment, axis=0),
+        'yearly_equipment': capacity.equipment_requirements(yearly, organization, machine),
+    }
+
+
+def machine_additions(plan):
+    """
+    Week each additional machine becomes necessary, against the yearly plan
+
+    Returns:
+        dataframe, one row per (week, process) with new machines: Week (1-based),
+        Year, Week_of_Year, Process, Machines_Added, Installed, Yearly_Plan_Week
+        (first week of the year the average-week plan reaches that count) and
+        Weeks_Deferred (weeks the purchase can wait after the yearly plan's,
+        negative = needed before the yearly plan buys it)
+    """
+    import pandas as pd
+
+    installed = plan['installed']
+    added = np.diff(installed, axis=0, prepend=0.0)
+    week, process = np.nonzero(added > 0)
+    count = installed[week, process]
+
+    # yearly plan: machines installed at the start of every year (running maximum of the year sizing)
+    yearly = np.maximum.accumulate(plan['yearly_equipment'], axis=0)
+    reached = yearly[:, process] >= count - 1e-9
+    year_index = np.where(reached.any(axis=0), reached.argmax(axis=0), np.nan)
+    yearly_week = year_index * plan['weeks_per_year'] + 1
+
+    return pd.DataFrame({
+        'Week': week + 1,
+        'Year': plan['year'][week],
+        'Week_of_Year': week % plan['weeks_per_year'] + 1,
+        'Process': np.asarray(plan['processes'], dtype=object)[process],
+        'Machines_Added': added[week, process].astype(int),
+        'Installed': count.astype(int),
+        'Yearly_Plan_Week': yearly_week,
+        'Weeks_Deferred': (week + 1) - yearly_week,
+    })
@@ -0,0 +1,52 @@
+"""
+generate synthetic instance - scaled-up casework data for stress tests
+
+fits routing, time, size, bom and demand statistics from data/csv_outputs and
+writes an instance of the requested size in the same csv layout, ready for
+the femoasa loaders (data_dir=...).
+
+usage: python generate_synthetic_instance.py [--parts N] [--processes N] [--products N]
+                                             [--years N] [--seed N] [--out DIR]
+
+author: machas^2 team
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from femoasa import synthetic
+from femoasa.config import BASE_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic instance in the data/csv_outputs layout")
+    parser.add_argument('--parts', type=int, default=5000)
+    parser.add_argument('--processes', type=int, default=100)
+    parser.add_argument('--products', type=int, default=200)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=6202)
+    parser.add_argument('--out', default=None, help="output directory (default: data/synthetic/<size>)")
+    args = parser.parse_args()
+
+    name = f"p{args.parts}_m{args.processes}_k{args.products}_s{args.seed}"
+    out_dir = Path(args.out) if args.out else BASE_DIR / "data" / "synthetic" / name
+
+    print("=" * 80)
+    print(f"SYNTHETIC INSTANCE - {args.parts} parts, {args.processes} processes, {args.products} products")
+    print("=" * 80)
+
+    start = time.time()
+    instance = synthetic.generate_instance(args.parts, args.processes, args.products, args.years, seed=args.seed)
+    synthetic.write_instance(instance, out_dir)
+
+    steps = sum(len(r) for r in instance['routings'].values())
+    print(f"{steps} routing steps ({steps / args.parts:.2f} per part), "
+          f"{int((instance['bom'] > 0).sum())} bom entries, {int(instance['year_one'].sum())} products in Year 1")
+    print(f"Written to {out_dir} in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
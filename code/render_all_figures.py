@@ -0,0 +1,54 @@
+"""
+render all result figures - parallel headless batch renderer
+
+collects the figure jobs of every task script (functional, part, fractal;
+task 3 and task 4) and renders them in a process pool with the Agg backend.
+jobs whose script and input csv files are unchanged since the last run and
+whose figures are still on disk are skipped.
+
+usage: python render_all_figures.py [--force] [--workers N] [--only TEXT]
+
+author: machas^2 team
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from femoasa import render
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render all result figures")
+    parser.add_argument('--force', action='store_true', help="re-render unchanged jobs")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--only', default=None, help="only jobs whose name contains this text")
+    args = parser.parse_args()
+
+    jobs = render.collect_jobs()
+    if args.only:
+        jobs = [j for j in jobs if args.only in j['name']]
+
+    print("=" * 80)
+    print(f"BATCH FIGURE RENDERING - {len(jobs)} jobs")
+    print("=" * 80)
+
+    start = time.time()
+    summary = render.render_jobs(jobs, workers=args.workers, force=args.force)
+
+    for row in sorted(summary, key=lambda r: r['name']):
+        line = f"  {row['status']:<9} {row['name']:<40} {row['seconds']:6.1f}s"
+        if row['error']:
+            line += f"  ({row['error']})"
+        print(line)
+
+    counts = {status: sum(r['status'] == status for r in summary) for status in ['rendered', 'skipped', 'failed']}
+    print("-" * 80)
+    print(f"Rendered {counts['rendered']}, skipped {counts['skipped']} (unchanged), "
+          f"failed {counts['failed']} in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
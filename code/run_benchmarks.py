@@ -0,0 +1,69 @@
+"""
+run benchmarks - per-stage wall time and peak memory against a baseline
+
+runs the femoasa benchmark stages at the chosen scales, writes the results as
+json and fails (exit code 1) when a stage is slower or larger than the stored
+baseline by more than the threshold.
+
+usage: python run_benchmarks.py [--scales casework x10 x100] [--repeat N]
+                                [--threshold 0.25] [--baseline FILE] [--save-baseline]
+
+author: machas^2 team
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from femoasa import benchmark
+from femoasa.config import RESULTS_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages")
+    parser.add_argument('--scales', nargs='+', default=benchmark.DEFAULT_SCALES, choices=list(benchmark.SCALES))
+    parser.add_argument('--stages', nargs='+', default=None, help="only time these stages")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument('--baseline', default=str(benchmark.BASELINE_FILE))
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the baseline")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"BENCHMARKS - scales {', '.join(args.scales)}")
+    print("=" * 80)
+
+    start = time.time()
+    results = benchmark.run_benchmarks(args.scales, repeat=args.repeat, stages=args.stages)
+    for scale, stages in results['results'].items():
+        print(f"\n{scale}:")
+        for stage, row in stages.items():
+            print(f"  {stage:<18} {row['seconds'] * 1000:10.1f} ms {row['peak_mb']:10.1f} MB")
+
+    out = benchmark.save_results(results, RESULTS_DIR / "benchmarks" / f"run_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    print(f"\nResults saved to {out} ({time.time() - start:.1f}s)")
+
+    baseline = Path(args.baseline)
+    if args.save_baseline:
+        benchmark.save_results(results, baseline)
+        print(f"Baseline saved to {baseline}")
+        return
+    if not baseline.exists():
+        print(f"No baseline at {baseline} (run with --save-baseline)")
+        return
+
+    regressions = benchmark.compare(results, benchmark.load_results(baseline), args.threshold)
+    if not regressions:
+        print(f"No stage regressed by more than {args.threshold:.0%}")
+        return
+    print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+    for r in regressions:
+        print(f"  {r['scale']:<9} {r['stage']:<18} {r['metric']:<8} {r['baseline']:.4g} -> {r['current']:.4g} "
+              f"(x{r['ratio']:.2f})")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
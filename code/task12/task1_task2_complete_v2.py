@@ -9,10 +9,16 @@ Task 2: Finished Storage Capacity Plan for each part (Year +1)
 DATA SOURCE: All data loaded from CSV files in data/csv_outputs/
 """
 
+import sys
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 from scipy import stats
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from femoasa import profiling, storage
+
 print("="*80)
 print("TASK 1 & 2 ANALYSIS: FeMoaSa Manufacturing & Warehousing Facility Design")
 print("="*80)
@@ -21,6 +27,7 @@ print("="*80)
 # DATA LOADING FROM CSV FILES
 # ============================================================================
 
+profiling.step('data loading')
 print("\nLoading data files from CSV...\n")
 
 # Load Product Demand (+1 Year)
@@ -127,6 +134,7 @@ print("="*80)
 print("TASK 1: DEMAND FULFILLMENT CAPACITY PLAN (Year +1)")
 print("="*80)
 
+profiling.step('task 1: parts demand')
 print("\n--- Step 1: Calculate Parts Demand from Products ---\n")
 
 print("="*80)
@@ -211,6 +219,7 @@ for part in parts:
 # Step 2: Calculate Production Capacity Requirements
 # ============================================================================
 
+profiling.step('task 1: capacity')
 print("\n--- Step 2: Production Capacity Requirements ---\n")
 
 # Operating parameters
@@ -260,6 +269,7 @@ print(required_capacity_minutes)
 # Step 3: Equipment Requirements by Process
 # ============================================================================
 
+profiling.step('task 1: equipment')
 print("\n--- Step 3: Equipment Requirements by Process ---\n")
 
 # Aggregate by process type
@@ -295,6 +305,7 @@ for process in sorted(process_requirements.keys()):
 # Step 4: Safety Stock Calculations
 # ============================================================================
 
+profiling.step('task 1: safety stock')
 print("\n--- Step 4: Safety Stock for 99.5% Service Level ---\n")
 
 SERVICE_LEVEL = 0.995
@@ -315,6 +326,7 @@ for part in parts:
 # Save Task 1 Results
 # ============================================================================
 
+profiling.step('task 1: save')
 task1_df = pd.DataFrame({
     'Part': parts,
     'Annual_Demand_Units': [parts_annual_demand[p] for p in parts],
@@ -326,6 +338,8 @@ task1_df = pd.DataFrame({
 })
 
 task1_df.to_csv('Task1_Demand_Fulfillment_Capacity_Plan.csv', index=False)
+profiling.count(rows=len(task1_df))
+profiling.wrote('Task1_Demand_Fulfillment_Capacity_Plan.csv')
 print("\n[OK] Task 1 results saved to: Task1_Demand_Fulfillment_Capacity_Plan.csv")
 
 # ============================================================================
@@ -336,6 +350,7 @@ print("\n\n" + "="*80)
 print("TASK 2: FINISHED STORAGE CAPACITY PLAN (Year +1)")
 print("="*80)
 
+profiling.step('task 2: storage requirements')
 print("\n--- Step 1: Storage Requirements Analysis ---\n")
 
 # Client requirements
@@ -347,23 +362,33 @@ print(f"Client A: {CLIENT_A_BUFFER_HOURS}-hour buffer autonomy (99% service)")
 print(f"Client B: {CLIENT_B_BUFFER_HOURS}-hour buffer autonomy (99% service)")
 print(f"Operating hours: {OPERATING_HOURS_PER_WEEK} hours/week\n")
 
-# Calculate client-specific demand
-client_a_products = ['A1', 'A2', 'A3']
-client_b_products = ['B1', 'B2']
+# Storage plan for all parts and locations (factory, warehouse A, warehouse B)
+WAREHOUSE_HEIGHT = 20
+STORAGE_UTILIZATION = 0.70
 
-parts_demand_a_hourly = {}
-parts_demand_b_hourly = {}
+year_one_demand = {
+    'years': [1],
+    'products': products,
+    'weekly': np.array([[weekly_demand[prod] for prod in products]]),
+    'cv': np.array([[cv_weekly[prod] for prod in products]]),
+    'bom': np.array([[bom[part].get(prod, 0) for prod in products] for part in parts], dtype=float),
+}
+part_volumes = np.array([part_dimensions[p]['X'] * part_dimensions[p]['Y'] * part_dimensions[p]['Z']
+                         for p in parts]) / (12**3)  # Convert to cubic feet
 
-for part in parts:
-    demand_a = sum(bom[part].get(prod, 0) * weekly_demand[prod] for prod in client_a_products)
-    demand_b = sum(bom[part].get(prod, 0) * weekly_demand[prod] for prod in client_b_products)
-    
-    parts_demand_a_hourly[part] = demand_a / OPERATING_HOURS_PER_WEEK
-    parts_demand_b_hourly[part] = demand_b / OPERATING_HOURS_PER_WEEK
+storage_plan = storage.storage_plan(
+    year_one_demand, part_volumes, service_level=SERVICE_LEVEL,
+    buffer_hours=(CLIENT_A_BUFFER_HOURS, CLIENT_B_BUFFER_HOURS),
+    operating_hours=OPERATING_HOURS_PER_WEEK, height=WAREHOUSE_HEIGHT, utilization=STORAGE_UTILIZATION,
+)
+client_weekly = storage.client_part_demand(year_one_demand['weekly'], year_one_demand['bom'], products)[0]
+
+parts_demand_a_hourly = dict(zip(parts, client_weekly[:, 0] / OPERATING_HOURS_PER_WEEK))
+parts_demand_b_hourly = dict(zip(parts, client_weekly[:, 1] / OPERATING_HOURS_PER_WEEK))
 
 # Buffer stock at client sites
-buffer_stock_a = {p: parts_demand_a_hourly[p] * CLIENT_A_BUFFER_HOURS for p in parts}
-buffer_stock_b = {p: parts_demand_b_hourly[p] * CLIENT_B_BUFFER_HOURS for p in parts}
+buffer_stock_a = dict(zip(parts, storage_plan['units'][0, :, 1]))
+buffer_stock_b = dict(zip(parts, storage_plan['units'][0, :, 2]))
 
 print("Client-Specific Hourly Demand and Buffer Stock:")
 print(f"{'Part':<6} {'A Hourly':<16} {'A Buffer':<16} {'B Hourly':<16} {'B Buffer':<16}")
@@ -376,14 +401,15 @@ for part in parts:
 # Step 2: Total Storage Allocation
 # ============================================================================
 
+profiling.step('task 2: allocation')
 print("\n--- Step 2: Storage Allocation Plan ---\n")
 
 # Cycle stock (average inventory between production runs)
 # Assuming weekly production batches
-cycle_stock = {p: parts_weekly_demand[p] / 2 for p in parts}
+cycle_stock = dict(zip(parts, storage_plan['cycle'][0]))
 
 # Factory storage = Safety stock + Cycle stock
-factory_storage = {p: safety_stock[p] + cycle_stock[p] for p in parts}
+factory_storage = dict(zip(parts, storage_plan['units'][0, :, 0]))
 
 print("Storage Allocation:")
 print(f"{'Part':<6} {'Safety Stock':<16} {'Cycle Stock':<16} {'Factory Total':<18} {'Warehouse A':<16} {'Warehouse B':<16}")
@@ -396,28 +422,14 @@ for part in parts:
 # Step 3: Physical Storage Space Requirements
 # ============================================================================
 
+profiling.step('task 2: space')
 print("\n--- Step 3: Physical Storage Space Requirements ---\n")
 
-# Calculate volumes
-part_volumes_cuft = {}
-for part in parts:
-    x, y, z = part_dimensions[part]['X'], part_dimensions[part]['Y'], part_dimensions[part]['Z']
-    volume_cuin = x * y * z
-    volume_cuft = volume_cuin / (12**3)  # Convert to cubic feet
-    part_volumes_cuft[part] = volume_cuft
-
-# Total volumes
-factory_volume = sum(factory_storage[p] * part_volumes_cuft[p] for p in parts)
-warehouse_a_volume = sum(buffer_stock_a[p] * part_volumes_cuft[p] for p in parts)
-warehouse_b_volume = sum(buffer_stock_b[p] * part_volumes_cuft[p] for p in parts)
-
-# Floor space (20 ft height, 70% utilization)
-WAREHOUSE_HEIGHT = 20
-STORAGE_UTILIZATION = 0.70
+part_volumes_cuft = dict(zip(parts, part_volumes))
 
-factory_floor_sqft = factory_volume / (WAREHOUSE_HEIGHT * STORAGE_UTILIZATION)
-warehouse_a_floor_sqft = warehouse_a_volume / (WAREHOUSE_HEIGHT * STORAGE_UTILIZATION)
-warehouse_b_floor_sqft = warehouse_b_volume / (WAREHOUSE_HEIGHT * STORAGE_UTILIZATION)
+# Total volumes and floor space (20 ft height, 70% utilization)
+factory_volume, warehouse_a_volume, warehouse_b_volume = storage_plan['volume_cuft'][0]
+factory_floor_sqft, warehouse_a_floor_sqft, warehouse_b_floor_sqft = storage_plan['floor_sqft'][0]
 
 print(f"Storage Volumes:")
 print(f"  Factory:     {factory_volume:>12,.2f} cubic feet")
@@ -432,6 +444,7 @@ print(f"  Warehouse B: {warehouse_b_floor_sqft:>12,.2f} sq ft")
 # Step 4: Storage Costs
 # ============================================================================
 
+profiling.step('task 2: investment')
 print("\n--- Step 4: Storage Investment ---\n")
 
 WAREHOUSE_COST_PER_SQFT = 200
@@ -448,6 +461,7 @@ print(f"  Total Investment:                                         ${warehouse_
 # Save Task 2 Results
 # ============================================================================
 
+profiling.step('task 2: save')
 task2_df = pd.DataFrame({
     'Part': parts,
     'Safety_Stock_Units': [safety_stock[p] for p in parts],
@@ -459,12 +473,15 @@ task2_df = pd.DataFrame({
 })
 
 task2_df.to_csv('Task2_Finished_Storage_Capacity_Plan.csv', index=False)
+profiling.count(rows=len(task2_df))
+profiling.wrote('Task2_Finished_Storage_Capacity_Plan.csv')
 print("\n[OK] Task 2 results saved to: Task2_Finished_Storage_Capacity_Plan.csv")
 
 # ============================================================================
 # COMPREHENSIVE SUMMARY
 # ============================================================================
 
+profiling.step('summary')
 print("\n\n" + "="*80)
 print("COMPREHENSIVE SUMMARY - TASKS 1 & 2")
 print("="*80)
@@ -500,3 +517,4 @@ print("  1. Task1_Demand_Fulfillment_Capacity_Plan.csv")
 print("  2. Task2_Finished_Storage_Capacity_Plan.csv")
 print("\n[OK] All calculations verified - data loaded from CSV files")
 print("="*80)
+profiling.end_step()
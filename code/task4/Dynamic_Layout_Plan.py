@@ -0,0 +1,76 @@
+"""
+task 4: multi-period layout plan - years 1 to 5
+
+chooses one block layout per year for the functional plant and one fractal
+center of every f, trading the handling cost of each year against the cost
+of relocating blocks between years (femoasa.dynamic_layout). the dynamic
+plan is compared with laying out every year on its own and with keeping one
+layout for all five years.
+
+author: machas^2 team
+date: november 2025
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# configuration
+BASE_DIR = Path(__file__).parent.parent.parent  # go up to isye6202_cw3 directory
+RESULTS_DIR = BASE_DIR / "results" / "task4" / "dynamic_layout"
+
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import dynamic_layout, results_store
+
+ORGANIZATIONS = ['functional', 'fractal_f2', 'fractal_f3', 'fractal_f4', 'fractal_f5']
+PLANS = ['dynamic', 'independent', 'static']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-period block layout plan with relocation costs")
+    parser.add_argument('--starts', type=int, default=dynamic_layout.DEFAULT_SEARCH['starts'])
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 80)
+    print("DYNAMIC LAYOUT PLAN - HANDLING VS RELOCATION COST, YEARS 1 TO 5")
+    print("=" * 80)
+
+    summary, slots = [], []
+    for organization in ORGANIZATIONS:
+        start = time.time()
+        problem = dynamic_layout.layout_problem(organization=organization)
+        plan = dynamic_layout.solve(problem, args.starts, workers=args.workers)
+        print(f"\n{organization}: {len(plan['candidates'])} candidate layouts, solved in {time.time() - start:.2f}s")
+
+        for name in PLANS:
+            for y, year in enumerate(problem['years']):
+                summary.append({
+                    'Organization': organization,
+                    'Plan': name,
+                    'Year': f"Year {year}",
+                    'Handling_Cost': plan[name]['handling_cost'][y],
+                    'Relocation_Cost': plan[name]['relocation_cost'][y],
+                    'Blocks_Moved': int(plan[name]['blocks_moved'][y]),
+                    'NPV': plan[name]['npv'],
+                })
+            print(f"  {name:<12} npv ${plan[name]['npv']:>12,.0f}   blocks moved {plan[name]['blocks_moved'].tolist()}")
+
+        for y, year in enumerate(problem['years']):
+            for block, slot in zip(problem['blocks'], plan['dynamic']['layouts'][y]):
+                x, yy = problem['slots'][slot]
+                slots.append({'Organization': organization, 'Year': f"Year {year}", 'process': block,
+                              'slot': int(slot), 'centroid_x': x, 'centroid_y': yy})
+
+    results_store.save(pd.DataFrame(summary), RESULTS_DIR / "Dynamic_Layout_Plan_by_year.csv")
+    results_store.save(pd.DataFrame(slots), RESULTS_DIR / "Dynamic_Layout_Block_Slots.csv")
+    print(f"\nResults saved to {RESULTS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ team: machas^2
 date: november 2025
 """
 
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -33,6 +34,9 @@ RESULTS_DIR = BASE_DIR / "results" / "task4" / "Fractal"
 COST_DIR = RESULTS_DIR / "Cost_Analysis"
 VISUALS_DIR = RESULTS_DIR / "Fractal_Visuals"
 
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import cost_engine, equipment_catalog
+
 # Operating parameters
 DAYS_PER_WEEK = 5
 HOURS_PER_SHIFT = 8
@@ -47,21 +51,15 @@ FRACTAL_SCENARIOS = ['f2', 'f3', 'f4', 'f5']
 
 def load_equipment_costs():
     """
-    Load equipment cost data from Equip+Operator Specs.csv
+    Load the compiled equipment catalog (Equip+Operator Specs.csv)
     """
-    df = pd.read_csv(DATA_DIR / 'Equip+Operator Specs.csv')
-
-    # Clean up the data
-    df['Installed price'] = pd.to_numeric(df['Installed price'], errors='coerce')
-    df['Relocation cost'] = pd.to_numeric(df['Relocation cost'], errors='coerce')
-    df['Useful life (years)'] = pd.to_numeric(df['Useful life (years)'], errors='coerce')
-    df['Hourly Cost'] = pd.to_numeric(df['Hourly Cost'], errors='coerce')
+    catalog = equipment_catalog.load_catalog()
 
     print("Equipment cost data loaded:")
-    print(f"  - {len(df)} equipment types")
-    print(f"  - Price range: ${df['Installed price'].min():,.0f} - ${df['Installed price'].max():,.0f}")
+    print(f"  - {len(catalog['names'])} equipment types")
+    print(f"  - Price range: ${catalog['price'].min():,.0f} - ${catalog['price'].max():,.0f}")
 
-    return df
+    return catalog
 
 
 def load_yearly_equipment_requirements(year):
@@ -73,100 +71,69 @@ def load_yearly_equipment_requirements(year):
     for f in [2, 3, 4, 5]:
         req_file = RESULTS_DIR / "Fractal_Design" / f"Year{year}_Fractal_f{f}_Equipment_Requirements.csv"
         df = pd.read_csv(req_file)
-        equipment_data[f] = df
+        equipment_data[f] = df[df['Process'] != 'TOTAL']
 
     return equipment_data
 
 
-def calculate_capital_costs_yearly(year, equipment_costs, equipment_requirements):
+def calculate_capital_costs_yearly(year, catalog, equipment_requirements):
     """
     Calculate capital costs for all fractal configurations in a year
     """
     capital_costs = {}
 
     for f, req_df in equipment_requirements.items():
-        total_capital = 0
-        equipment_breakdown = {}
-
-        for _, row in req_df.iterrows():
-            process = row['Process']
-            units_per_center = int(row['Equipment_per_Center'])
-            total_units = int(row['Total_Equipment'])
-
-            # Find equipment cost for this process
-            # Map process to equipment type (simplified mapping)
-            process_to_equipment = {
-                'A': 'A', 'B': 'B', 'C': 'C', 'D': 'D',
-                'E': 'AB', 'F': 'AC', 'G': 'CD', 'H': 'ABC',
-                'I': 'ABCD', 'J': 'ABCD', 'K': 'A', 'L': 'ABCD', 'M': 'ABCD'
+        processes = req_df['Process'].tolist()
+        units_per_center = req_df['Equipment_per_Center'].to_numpy(dtype=int)
+        total_units = req_df['Total_Equipment'].to_numpy(dtype=int)
+
+        # each process runs on its dedicated equipment type
+        unit_cost = catalog['price'][equipment_catalog.lookup(catalog, processes)]
+        total_cost = total_units * unit_cost
+
+        equipment_breakdown = {
+            process: {
+                'units_per_center': int(units_per_center[i]),
+                'total_units': int(total_units[i]),
+                'unit_cost': unit_cost[i],
+                'total_cost': total_cost[i]
             }
-
-            equip_type = process_to_equipment.get(process, 'Equip A')
-            equip_row = equipment_costs[equipment_costs['Equipment'] == equip_type]
-
-            if not equip_row.empty:
-                unit_cost = equip_row['Installed price'].iloc[0]
-                equipment_breakdown[process] = {
-                    'units_per_center': units_per_center,
-                    'total_units': total_units,
-                    'unit_cost': unit_cost,
-                    'total_cost': total_units * unit_cost
-                }
-                total_capital += total_units * unit_cost
+            for i, process in enumerate(processes)
+        }
 
         capital_costs[f] = {
-            'total_capital': total_capital,
+            'total_capital': total_cost.sum(),
             'equipment_breakdown': equipment_breakdown
         }
 
     return capital_costs
 
 
-def calculate_operating_costs_yearly(year, equipment_costs, equipment_requirements):
+def calculate_operating_costs_yearly(year, catalog, equipment_requirements):
     """
     Calculate annual operating costs for all fractal configurations in a year
     """
     operating_costs = {}
 
     for f, req_df in equipment_requirements.items():
-        total_operating = 0
-        labor_breakdown = {}
-
-        for _, row in req_df.iterrows():
-            process = row['Process']
-            total_units = int(row['Total_Equipment'])
-
-            # Find labor cost for this process
-            process_to_equipment = {
-                'A': 'A', 'B': 'B', 'C': 'C', 'D': 'D',
-                'E': 'E', 'F': 'F', 'G': 'G', 'H': 'H',
-                'I': 'I', 'J': 'J', 'K': 'K', 'L': 'L', 'M': 'M'
+        processes = req_df['Process'].tolist()
+        total_units = req_df['Total_Equipment'].to_numpy(dtype=int)
+
+        # labor cost per installed unit-hour from the operator mix (e.g. 1 C1 + 1/4 C2)
+        hourly_cost = catalog['hourly_cost'][equipment_catalog.lookup(catalog, processes)]
+        annual_cost = total_units * hourly_cost * HOURS_PER_YEAR
+
+        labor_breakdown = {
+            process: {
+                'total_units': int(total_units[i]),
+                'hourly_cost': hourly_cost[i],
+                'annual_cost': annual_cost[i]
             }
-
-            equip_type = process_to_equipment.get(process, 'A')
-            equip_row = equipment_costs[equipment_costs['Equipment'] == equip_type]
-
-            if not equip_row.empty:
-                hourly_cost = equip_row['Hourly Cost'].iloc[0]
-                # Handle missing hourly costs by using a default or skipping
-                if pd.isna(hourly_cost) or hourly_cost == '':
-                    # Use a default hourly cost based on equipment type complexity
-                    default_costs = {
-                        'A': 20, 'B': 40, 'C': 60, 'D': 50, 'E': 80, 'F': 80, 'G': 80,
-                        'H': 100, 'I': 90, 'J': 90, 'K': 25, 'L': 30, 'M': 15
-                    }
-                    hourly_cost = default_costs.get(equip_type, 50)
-                annual_cost = total_units * float(hourly_cost) * HOURS_PER_YEAR
-
-                labor_breakdown[process] = {
-                    'total_units': total_units,
-                    'hourly_cost': float(hourly_cost),
-                    'annual_cost': annual_cost
-                }
-                total_operating += annual_cost
+            for i, process in enumerate(processes)
+        }
 
         operating_costs[f] = {
-            'total_operating': total_operating,
+            'total_operating': annual_cost.sum(),
             'labor_breakdown': labor_breakdown
         }
 
@@ -200,7 +167,7 @@ def create_cost_comparison_tables():
     Create comprehensive cost comparison across all years and configurations
     """
     print("Loading equipment cost data...")
-    equipment_costs = load_equipment_costs()
+    catalog = load_equipment_costs()
 
     # Initialize results storage
     all_costs = {}
@@ -212,8 +179,8 @@ def create_cost_comparison_tables():
         equipment_requirements = load_yearly_equipment_requirements(year)
 
         # Calculate costs
-        capital_costs = calculate_capital_costs_yearly(year, equipment_costs, equipment_requirements)
-        operating_costs = calculate_operating_costs_yearly(year, equipment_costs, equipment_requirements)
+        capital_costs = calculate_capital_costs_yearly(year, catalog, equipment_requirements)
+        operating_costs = calculate_operating_costs_yearly(year, catalog, equipment_requirements)
         depreciation_costs = calculate_depreciation_yearly(year, capital_costs)
 
         # Combine all costs
@@ -438,6 +405,50 @@ def save_detailed_cost_breakdown(all_costs):
     print(f"Detailed cost breakdown saved: {summary_file}")
 
 
+def calculate_multi_year_tco():
+    """
+    Cost the Year 1-5 equipment plan of every fractal configuration with the shared cost engine
+    """
+    catalog = equipment_catalog.load_catalog()
+    fractals = [2, 3, 4, 5]
+    plan_years = [1] + YEARS
+
+    counts = []
+    for f in fractals:
+        counts_by_year = []
+        for year in plan_years:
+            if year == 1:
+                req_file = BASE_DIR / "results" / "Task3" / "Fractal" / "Fractal_Design" / f"Fractal_f{f}_Equipment_Requirements.csv"
+            else:
+                req_file = RESULTS_DIR / "Fractal_Design" / f"Year{year}_Fractal_f{f}_Equipment_Requirements.csv"
+            req_df = pd.read_csv(req_file)
+            req_df = req_df[req_df['Process'] != 'TOTAL']
+            counts_by_year.append(dict(zip(req_df['Process'], req_df['Total_Equipment'].astype(int))))
+        counts.append(equipment_catalog.counts_array(counts_by_year, catalog))
+
+    costs = cost_engine.evaluate_costs(np.stack(counts), catalog)
+
+    rows = []
+    for d, f in enumerate(fractals):
+        for y, year in enumerate(plan_years):
+            rows.append({
+                'Fractal_Config': f,
+                'Year': year,
+                'Capital_Investment': costs['capital'][d, y],
+                'Annual_Labor': costs['labor'][d, y],
+                'Operators_FTE': costs['operators'][d, y],
+                'Annual_Depreciation': costs['depreciation'][d, y],
+                'NPV_5_Year_Cost': costs['npv'][d],
+            })
+
+    tco_df = pd.DataFrame(rows)
+    tco_file = COST_DIR / "Fractal_Multi_Year_TCO.csv"
+    tco_df.to_csv(tco_file, index=False)
+    print(f"Multi-year TCO saved: {tco_file}")
+
+    return tco_df
+
+
 def main():
     """Main execution function"""
     print("\n" + "="*80)
@@ -462,6 +473,9 @@ def main():
     print("Saving detailed cost breakdown...")
     save_detailed_cost_breakdown(all_costs)
 
+    print("Costing Year 1-5 plans with the shared cost engine...")
+    calculate_multi_year_tco()
+
     print("\n" + "="*80)
     print("Cost Analysis Complete!")
     print("="*80 + "\n")
@@ -470,6 +484,7 @@ def main():
     print("+- Cost_Analysis/")
     print("|   +- Fractal_Cost_Analysis_Summary.txt")
     print("|   +- Fractal_Cost_Summary.csv")
+    print("|   +- Fractal_Multi_Year_TCO.csv")
     print("+- Fractal_Visuals/")
     print("    +- Fractal_Capital_Investment_Comparison.png")
     print("    +- Fractal_Operating_Cost_Comparison.png")
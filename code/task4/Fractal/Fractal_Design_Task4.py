@@ -34,7 +34,10 @@ import warnings
 # configuration
 BASE_DIR = Path(__file__).parent.parent.parent.parent  # go up to project root
 DATA_DIR = BASE_DIR / "data" / "csv_outputs"
-RESULTS_DIR = BASE_DIR / "results" / "Task4" / "Fractal" / "Fractal_Design"
+RESULTS_DIR = BASE_DIR / "results" / "task4" / "Fractal" / "Fractal_Design"
+
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import results_store
 
 # operating parameters
 DAYS_PER_WEEK = 5
@@ -529,7 +532,7 @@ def analyze_fractal_scaling():
 
             # Save detailed requirements
             output_file = RESULTS_DIR / f'Year{year}_Fractal_f{f}_Equipment_Requirements.csv'
-            requirements.to_csv(output_file, index=False)
+            results_store.save(requirements, output_file)
             print(f"    Saved: {output_file.name}")
 
             # Save summary report
@@ -560,7 +563,7 @@ def analyze_fractal_scaling():
 
     comparison_df = pd.DataFrame(comparison_data)
     comparison_file = RESULTS_DIR / 'Fractal_Comparison_All_Years.csv'
-    comparison_df.to_csv(comparison_file, index=False)
+    results_store.save(comparison_df, comparison_file)
 
     print(f"\n{'='*80}")
     print("MULTI-YEAR FRACTAL SCENARIOS COMPARISON")
@@ -594,7 +597,7 @@ def analyze_fractal_scaling():
 
     scaling_df = pd.DataFrame(scaling_data)
     scaling_file = RESULTS_DIR / 'Fractal_Scaling_Analysis.csv'
-    scaling_df.to_csv(scaling_file, index=False)
+    results_store.save(scaling_df, scaling_file)
 
     print("Scaling from Year 4 baseline:")
     print(scaling_df.to_string(index=False))
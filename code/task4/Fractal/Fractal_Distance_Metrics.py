@@ -9,12 +9,54 @@ supports both Y1F4 and Y5F4 layouts with appropriate output directories.
 author: machas^2 team
 """
 
+import re
+import sys
 from pathlib import Path
 import pandas as pd
 import numpy as np
 import math
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from femoasa import data, material_handling, traffic
+
+# floor of each layout: width, depth (ft) and the flow-line plot limits, by prefix tag
+LAYOUT_FLOORS = {
+    'Y1_F4': {'width': 210, 'depth': 195, 'xlim': 220, 'ylim': 200},   # Y1F4 layout: 210x195 ft
+    'Y5_F4': {'width': 298, 'depth': 292, 'xlim': 300, 'ylim': 300},   # Y5F4 layout: 298x292 ft
+}
+DEFAULT_FLOOR = {'width': 240, 'depth': 300, 'xlim': 240, 'ylim': 300}
+
+def layout_floor(prefix):
+    """
+    Floor entry of LAYOUT_FLOORS matching a prefix (Y1_F4 or Y1F4 style), None if unknown
+    """
+    for tag, floor in LAYOUT_FLOORS.items():
+        if tag in prefix or tag.replace('_', '') in prefix:
+            return floor
+    return None
+
+def layout_extent(prefix):
+    """
+    Floor width and depth (ft) of the layout behind a prefix
+    """
+    floor = layout_floor(prefix) or DEFAULT_FLOOR
+    return floor['width'], floor['depth']
+
+def layout_year(prefix):
+    """
+    Demand year of the layout behind a prefix (Y1_F4 -> 1, Y5F4 -> 5), Year 1 if none is tagged
+    """
+    match = re.search(r'Y(\d+)', prefix)
+    return int(match.group(1)) if match else 1
+
+def year_part_demand(year):
+    """
+    Weekly demand per part (P1..P20) in a year of the 5-year horizon
+    """
+    demand = data.load_multi_year_demand()
+    return demand['bom'] @ demand['weekly'][demand['years'].index(year)]
+
 def compute_flow_distances_from_centroids(centroids_path, flow_path, output_dir, prefix):
     """
     Compute pairwise Euclidean distances between centroids and weighted flow distances
@@ -24,14 +66,7 @@ def compute_flow_distances_from_centroids(centroids_path, flow_path, output_dir,
     flow = pd.read_csv(flow_path, index_col=0)
 
     # Transform coordinates: origin at top-left, y increases downwards
-    if 'Y1_F4' in prefix or 'Y1F4' in prefix:
-        # Y1F4 layout: 210x195 ft, y=0 at top, y=195 at bottom
-        max_y = 195
-    elif 'Y5_F4' in prefix or 'Y5F4' in prefix:
-        # Y5F4 layout: 298x292 ft, y=0 at top, y=292 at bottom
-        max_y = 292
-    else:
-        max_y = 300  # default
+    _, max_y = layout_extent(prefix)
 
     # Flip y-coordinates so origin is at top-left
     cent['centroid_y'] = max_y - cent['centroid_y']
@@ -126,14 +161,7 @@ def plot_flow_lines(centroids_path, df_pairs, output_dir, prefix):
     cent = pd.read_csv(centroids_path)
 
     # Transform coordinates: origin at top-left, y increases downwards
-    if 'Y1_F4' in prefix or 'Y1F4' in prefix:
-        # Y1F4 layout: 210x195 ft, y=0 at top, y=195 at bottom
-        max_y = 195
-    elif 'Y5_F4' in prefix or 'Y5F4' in prefix:
-        # Y5F4 layout: 298x292 ft, y=0 at top, y=292 at bottom
-        max_y = 292
-    else:
-        max_y = 300  # default
+    _, max_y = layout_extent(prefix)
 
     # Flip y-coordinates so origin is at top-left
     cent['centroid_y'] = max_y - cent['centroid_y']
@@ -185,25 +213,12 @@ def plot_flow_lines(centroids_path, df_pairs, output_dir, prefix):
         ax.text(x, y, str(p), color='black', fontsize=12, fontweight='bold',
                 ha='center', va='center', zorder=6)
 
-    # Plot formatting
-    if 'Y1_F4' in prefix or 'Y1F4' in prefix:
-        # Y1F4 layout: 210x195 ft area
-        xlim_max = 220
-        ylim_max = 200
-        x_mark = 210
-        y_mark = 195
-    elif 'Y5_F4' in prefix or 'Y5F4' in prefix:
-        # Y5F4 layout: 298x292 ft area
-        xlim_max = 300
-        ylim_max = 300
-        x_mark = 298
-        y_mark = 292
-    else:
-        # Default
-        xlim_max = 240
-        ylim_max = 300
-        x_mark = None
-        y_mark = None
+    # Plot formatting: layout area markers only for known floors
+    floor = layout_floor(prefix)
+    xlim_max = (floor or DEFAULT_FLOOR)['xlim']
+    ylim_max = (floor or DEFAULT_FLOOR)['ylim']
+    x_mark = floor['width'] if floor else None
+    y_mark = floor['depth'] if floor else None
 
     ax.set_xlim(0, xlim_max)
     ax.set_ylim(0, ylim_max)
@@ -230,6 +245,53 @@ def plot_flow_lines(centroids_path, df_pairs, output_dir, prefix):
 
     return plot_file
 
+def plot_traffic_density(centroids_path, df_pairs, output_dir, prefix, cell_ft=1.0, top_k=20):
+    """
+    Rasterize all flows on a 1 ft floor grid (aisle routing) and save the
+    congestion map and the top hotspot cells
+    """
+    cent = pd.read_csv(centroids_path)
+    width, depth = layout_extent(prefix)
+
+    # Flip y-coordinates so origin is at top-left (same frame as the flow lines)
+    cent['centroid_y'] = depth - cent['centroid_y']
+    coords = cent.set_index('process')[['centroid_x', 'centroid_y']]
+
+    df_flow = df_pairs[df_pairs['flow'] > 0]
+    starts = coords.loc[df_flow['from'].astype(str)].to_numpy()
+    ends = coords.loc[df_flow['to'].astype(str)].to_numpy()
+
+    grid = traffic.rasterize_flows(starts, ends, df_flow['flow'].to_numpy(), width, depth,
+                                   cell=cell_ft, routing='rectilinear')
+
+    hotspot_file = output_dir / f'{prefix}_Traffic_Hotspots.csv'
+    traffic.hotspots(grid, top_k, cell_ft).to_csv(hotspot_file, index=False)
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    ax.set_facecolor('#0f0f0f')
+    image = traffic.plot_density(ax, grid, cell_ft)
+    fig.colorbar(image, ax=ax, label='Flow through cell (units/week)')
+    ax.scatter(coords['centroid_x'], coords['centroid_y'], s=80, color='white', edgecolor='k', zorder=5)
+    for p, (x, y) in coords.iterrows():
+        ax.text(x, y, str(p), color='black', fontsize=8, fontweight='bold', ha='center', va='center', zorder=6)
+    ax.set_xlim(0, width)
+    ax.set_ylim(0, depth)
+    ax.set_xlabel('X (ft)')
+    ax.set_ylabel('Y (ft)')
+    ax.set_title(f'{prefix} Traffic Density (aisle routing, {cell_ft:g} ft cells)')
+    ax.set_aspect('equal')
+
+    plt.tight_layout()
+    density_file = output_dir / f'{prefix}_Traffic_Density.png'
+    plt.savefig(density_file, dpi=300)
+    plt.close()
+
+    summary = traffic.congestion_summary(grid, cell_ft)
+    print(f"Traffic: {summary['area_with_traffic_sqft']:,.0f} sq ft with traffic, "
+          f"peak {summary['peak_traffic']:,.0f} units/week per cell")
+
+    return density_file, hotspot_file
+
 def create_summary_report(total_flow, total_weighted_distance, output_dir, prefix):
     """
     Create summary report
@@ -245,6 +307,26 @@ def create_summary_report(total_flow, total_weighted_distance, output_dir, prefi
 
     return summary_file
 
+def create_handling_report(pairwise_file, output_dir, prefix, part_demand):
+    """
+    Convert flow x distance into kit trips, handler FTEs and vehicles per shift
+
+    Kit sizes follow the part mix of part_demand (units/week per part), the
+    demand of the year the layout is designed for.
+    """
+    profile = material_handling.kit_profile(part_demand)
+    df_handling, fleet = material_handling.handling_report(pairwise_file, profile)
+
+    handling_file = output_dir / f'{prefix}_Handling_Workload.csv'
+    df_handling.to_csv(handling_file, index=False)
+
+    print(f"Material handling: {df_handling['Trips_per_Week'].sum():,.0f} trips/week, "
+          f"{df_handling['Handler_Hours_per_Week'].sum():,.1f} handler-hours/week, "
+          f"{fleet['vehicles_per_shift']:.0f} vehicle(s) per shift, "
+          f"${df_handling['Annual_Handling_Cost'].sum():,.0f}/year")
+
+    return handling_file
+
 def run_distance_pipeline(centroids_path, flow_path, output_dir, prefix):
     """
     Run complete distance + plotting pipeline
@@ -265,6 +347,13 @@ def run_distance_pipeline(centroids_path, flow_path, output_dir, prefix):
     # Step 4: Plot flow lines
     plot_file = plot_flow_lines(centroids_path, df_pairs, output_dir, prefix)
 
+    # Step 5: Traffic density map and hotspots
+    density_file, hotspot_file = plot_traffic_density(centroids_path, df_pairs, output_dir, prefix)
+
+    # Step 6: Material handling workload and fleet
+    handling_file = create_handling_report(output_dir / f'{prefix}_Flow_Distances.csv', output_dir, prefix,
+                                           year_part_demand(layout_year(prefix)))
+
     # Print results
     print(f"Saved files to {output_dir}")
     print(f"Total flow: {total_flow:,.2f}")
@@ -279,7 +368,10 @@ def run_distance_pipeline(centroids_path, flow_path, output_dir, prefix):
         'agg_from_file': output_dir / f'{prefix}_Distance_By_From_Process.csv',
         'agg_to_file': output_dir / f'{prefix}_Distance_By_To_Process.csv',
         'summary_file': summary_file,
-        'plot_file': plot_file
+        'plot_file': plot_file,
+        'handling_file': handling_file,
+        'density_file': density_file,
+        'hotspot_file': hotspot_file
     }
 
 def main():
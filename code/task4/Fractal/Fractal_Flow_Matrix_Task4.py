@@ -21,7 +21,7 @@ from pathlib import Path
 BASE_DIR = Path(__file__).parent.parent.parent.parent  # go up to project root
 DATA_DIR = BASE_DIR / "data" / "csv_outputs"
 RESULTS_DIR = BASE_DIR / "results"
-FRACTAL_FLOW_DIR = RESULTS_DIR / "Task4" / "Fractal" / "Fractal_Flowmatrix"
+FRACTAL_FLOW_DIR = RESULTS_DIR / "task4" / "Fractal" / "Fractal_Flowmatrix"
 
 PROCESSES = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M']
 YEARS = [2, 3, 4, 5]
@@ -289,7 +289,7 @@ def main():
 
     print("Generated directories:")
     for year in YEARS:
-        print(f"  - Task4/Fractal/Fractal_Flowmatrix/year{year}/")
+        print(f"  - task4/Fractal/Fractal_Flowmatrix/year{year}/")
         for f in [2, 3, 4, 5]:
             print(f"    - f{f}_centers/")
 
@@ -27,7 +27,6 @@ team: machas^2
 date: november 2025
 """
 
-import math
 import sys
 from pathlib import Path
 import pandas as pd
@@ -38,194 +37,10 @@ import pandas as pd
 
 BASE_DIR = Path(__file__).parent.parent.parent.parent
 
-# machine specifications
-MACHINE_SPECS = {
-    # Process: (width_ft, depth_ft, overlap_x_ft, overlap_y_ft, group)
-    'A': (14, 14, 2, 2, 'ABCD'),  # Can share 2ft on 3 sides
-    'B': (14, 14, 2, 2, 'ABCD'),
-    'C': (14, 14, 2, 2, 'ABCD'),
-    'D': (14, 14, 2, 2, 'ABCD'),
-    'E': (22, 15, 0, 0, 'EFG'),   # No sharing
-    'F': (22, 15, 0, 0, 'EFG'),
-    'G': (22, 15, 0, 0, 'EFG'),
-    'H': (14, 36, 0, 0, 'HIJ'),   # No sharing
-    'I': (14, 36, 0, 0, 'HIJ'),
-    'J': (14, 36, 0, 0, 'HIJ'),
-    'K': (14, 7, 0, 1, 'KLM'),    # 14ft width, 7ft depth, share 1ft along depth (y-direction)
-    'L': (14, 7, 0, 1, 'KLM'),
-    'M': (14, 7, 0, 1, 'KLM'),
-}
-
-# ============================================================================
-# CORE OPTIMIZATION FUNCTIONS
-# ============================================================================
-
-def calculate_block_dimensions(rows, cols, machine_w, machine_h, overlap_x, overlap_y):
-    """
-    Calculate the actual block dimensions considering overlap.
-    
-    When machines share space:
-    - Effective width = n * width - (n-1) * overlap_x
-    - Effective height = n * height - (n-1) * overlap_y
-    
-    Args:
-        rows: Number of rows in grid
-        cols: Number of columns in grid
-        machine_w: Individual machine width
-        machine_h: Individual machine height
-        overlap_x: Overlap in x-direction (horizontal)
-        overlap_y: Overlap in y-direction (vertical)
-    
-    Returns:
-        (block_width, block_depth, block_area)
-    """
-    if rows == 0 or cols == 0:
-        return 0, 0, 0
-    
-    # Apply overlap formula
-    if overlap_x > 0:
-        block_width = cols * machine_w - (cols - 1) * overlap_x
-    else:
-        block_width = cols * machine_w
-    
-    if overlap_y > 0:
-        block_depth = rows * machine_h - (rows - 1) * overlap_y
-    else:
-        block_depth = rows * machine_h
-    
-    block_area = block_width * block_depth
-    
-    return block_width, block_depth, block_area
-
-
-def calculate_optimization_score(machine_count, rows, cols, block_area, aspect_ratio, utilization):
-    """
-    Calculate composite optimization score.
-    
-    Lower score = better configuration
-    
-    Scoring factors:
-    - Area efficiency: Favor smaller total area
-    - Aspect ratio: Prefer square-like shapes (ratio close to 1)
-    - Utilization: Maximize (minimize wasted spaces)
-    - Perimeter: Minimize (better for material handling)
-    
-    Args:
-        machine_count: Number of machines to place
-        rows, cols: Grid dimensions
-        block_area: Total block area in sq ft
-        aspect_ratio: max(rows,cols) / min(rows,cols)
-        utilization: machine_count / total_spaces
-    
-    Returns:
-        optimization_score (lower is better)
-    """
-    # Normalize factors
-    waste_penalty = (rows * cols - machine_count) * 100  # Penalize wasted spaces heavily
-    area_factor = block_area / 100  # Normalize area
-    aspect_penalty = (aspect_ratio - 1) * 50  # Penalize deviation from square
-    utilization_bonus = (1 - utilization) * 200  # Reward high utilization
-    
-    # Perimeter penalty (prefer compact shapes)
-    block_width = cols  # Relative
-    block_depth = rows   # Relative
-    perimeter = 2 * (block_width + block_depth)
-    perimeter_penalty = perimeter * 5
-    
-    score = waste_penalty + area_factor + aspect_penalty + utilization_bonus + perimeter_penalty
-    
-    return round(score, 2)
-
-
-def find_optimal_grid(machine_count, machine_w, machine_h, overlap_x, overlap_y, process_name):
-    """
-    Find the optimal grid configuration for a given number of machines.
-    
-    Strategy:
-    1. Try all possible grid configurations (rows × cols)
-    2. Calculate dimensions considering overlap
-    3. Score each configuration
-    4. Return the best one
-    
-    Args:
-        machine_count: Number of machines to arrange
-        machine_w, machine_h: Individual machine dimensions
-        overlap_x, overlap_y: Overlap amounts
-        process_name: Name for logging
-    
-    Returns:
-        dict with optimal configuration details
-    """
-    if machine_count == 0:
-        return {
-            'process': process_name,
-            'machine_count': 0,
-            'rows': 0,
-            'cols': 0,
-            'total_spaces': 0,
-            'wasted_spaces': 0,
-            'block_width': 0,
-            'block_depth': 0,
-            'block_area': 0,
-            'aspect_ratio': 0,
-            'utilization': 0,
-            'score': 0
-        }
-    
-    best_config = None
-    best_score = float('inf')
-    
-    # Try all possible rectangular arrangements
-    for rows in range(1, machine_count + 1):
-        cols = math.ceil(machine_count / rows)
-        total_spaces = rows * cols
-        
-        # Only consider valid arrangements
-        if total_spaces < machine_count:
-            continue
-        
-        wasted_spaces = total_spaces - machine_count
-        
-        # Calculate actual block dimensions with overlap
-        block_width, block_depth, block_area = calculate_block_dimensions(
-            rows, cols, machine_w, machine_h, overlap_x, overlap_y
-        )
-        
-        # Calculate metrics
-        aspect_ratio = max(rows, cols) / min(rows, cols) if min(rows, cols) > 0 else float('inf')
-        utilization = machine_count / total_spaces
-        perimeter = 2 * (block_width + block_depth)
-        
-        # Calculate optimization score
-        score = calculate_optimization_score(
-            machine_count, rows, cols, block_area, aspect_ratio, utilization
-        )
-        
-        # Track best configuration
-        if score < best_score:
-            best_score = score
-            best_config = {
-                'process': process_name,
-                'group': MACHINE_SPECS[process_name][4],
-                'equipment_count': machine_count,
-                'layout_grid': f"{rows}×{cols}",
-                'rows': rows,
-                'cols': cols,
-                'total_spaces': total_spaces,
-                'wasted_spaces': wasted_spaces,
-                'machine_width_ft': machine_w,
-                'machine_depth_ft': machine_h,
-                'block_width_ft': block_width,
-                'block_depth_ft': block_depth,
-                'block_area_sqft': block_area,
-                'aspect_ratio': round(aspect_ratio, 3),
-                'utilization': round(utilization, 4),
-                'perimeter_ft': perimeter,
-                'optimization_score': score
-            }
-    
-    return best_config
-
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+# scoring and machine specifications are shared with the femoasa command line (python -m femoasa design)
+from femoasa.config import MACHINE_SPECS
+from femoasa.grid_layout import find_optimal_grid
 
 # ============================================================================
 # MAIN OPTIMIZATION ROUTINE
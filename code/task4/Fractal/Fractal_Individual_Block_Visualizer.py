@@ -33,6 +33,9 @@ from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent.parent.parent
 
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import layout_render
+
 # process colors - professional palette
 PROCESS_COLORS = {
     'A': '#FF6B6B',  # Coral Red
@@ -112,80 +115,41 @@ def draw_individual_process_block(process, config, output_dir):
     )
     ax.add_patch(parent_rect)
     
-    # Draw each child equipment block
-    machine_idx = 0
+    # Draw all child equipment blocks and shareability zones as collections
+    machines = layout_render.grid_rects(rows, cols, equipment_count, machine_w, machine_h, overlap_x, overlap_y)
+    ax.add_collection(layout_render.rect_collection(
+        machines,
+        facecolor=PROCESS_COLORS[process],
+        edgecolor='#2d3436',
+        linewidth=1.5,
+        alpha=0.8,
+        zorder=2
+    ))
+    
+    zones = layout_render.overlap_rects(rows, cols, equipment_count, machine_w, machine_h, overlap_x, overlap_y)
+    if len(zones):
+        ax.add_collection(layout_render.rect_collection(
+            zones,
+            facecolor=OVERLAP_COLOR,
+            edgecolor='none',
+            alpha=OVERLAP_ALPHA,
+            zorder=3
+        ))
     
-    for row in range(rows):
-        for col in range(cols):
-            if machine_idx >= equipment_count:
-                break
-            
-            # Calculate position with overlap
-            if overlap_x > 0:
-                machine_x = col * (machine_w - overlap_x)
-            else:
-                machine_x = col * machine_w
-            
-            if overlap_y > 0:
-                machine_y = row * (machine_h - overlap_y)
-            else:
-                machine_y = row * machine_h
-            
-            # Draw machine rectangle
-            machine_rect = Rectangle(
-                (machine_x, machine_y),
-                machine_w,
-                machine_h,
-                facecolor=PROCESS_COLORS[process],
-                edgecolor='#2d3436',
-                linewidth=1.5,
-                alpha=0.8,
-                zorder=2
-            )
-            ax.add_patch(machine_rect)
-            
-            # Draw overlap zones if applicable
-            if overlap_x > 0 and col < cols - 1:
-                # Horizontal overlap (right side)
-                overlap_rect = Rectangle(
-                    (machine_x + machine_w - overlap_x, machine_y),
-                    overlap_x,
-                    machine_h,
-                    facecolor=OVERLAP_COLOR,
-                    edgecolor='none',
-                    alpha=OVERLAP_ALPHA,
-                    zorder=3
-                )
-                ax.add_patch(overlap_rect)
-            
-            if overlap_y > 0 and row < rows - 1:
-                # Vertical overlap (top side)
-                overlap_rect = Rectangle(
-                    (machine_x, machine_y + machine_h - overlap_y),
-                    machine_w,
-                    overlap_y,
-                    facecolor=OVERLAP_COLOR,
-                    edgecolor='none',
-                    alpha=OVERLAP_ALPHA,
-                    zorder=3
-                )
-                ax.add_patch(overlap_rect)
-            
-            # Add machine number
-            ax.text(
-                machine_x + machine_w / 2,
-                machine_y + machine_h / 2,
-                f"{machine_idx + 1}",
-                ha='center',
-                va='center',
-                fontsize=9,
-                color='white',
-                fontweight='bold',
-                alpha=0.9,
-                zorder=4
-            )
-            
-            machine_idx += 1
+    # Add machine numbers
+    for machine_idx, (machine_x, machine_y, _, _) in enumerate(machines):
+        ax.text(
+            machine_x + machine_w / 2,
+            machine_y + machine_h / 2,
+            f"{machine_idx + 1}",
+            ha='center',
+            va='center',
+            fontsize=9,
+            color='white',
+            fontweight='bold',
+            alpha=0.9,
+            zorder=4
+        )
     
     # Configure axes
     padding = max(block_w, block_h) * 0.15
@@ -8,6 +8,7 @@ team: machas^2
 date: november 2025
 """
 
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
@@ -15,8 +16,11 @@ from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent.parent.parent  # go up to project root
 RESULTS_DIR = BASE_DIR / "results"
-LAYOUT_DIR = RESULTS_DIR / "Task4" / "Fractal" / "Fractal_Layout"
-VIZ_DIR = RESULTS_DIR / "Task4" / "Fractal" / "Fractal_Visuals"
+LAYOUT_DIR = RESULTS_DIR / "task4" / "Fractal" / "Fractal_Layout"
+VIZ_DIR = RESULTS_DIR / "task4" / "Fractal" / "Fractal_Visuals"
+
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import layout_render, results_store
 
 YEARS = [2, 3, 4, 5]
 
@@ -64,20 +68,17 @@ def create_layout_visualization_yearly(year, num_fractals=3, show_flows=True, fl
         if not flows_filtered.empty:
             max_flow = flows_filtered['Flow_Units'].max()
 
-            for _, flow in flows_filtered.iterrows():
-                # Arrow width proportional to flow
-                width = max(0.5, (flow['Flow_Units'] / max_flow) * 3)
-
-                ax.annotate('',
-                           xy=(flow['To_X'], flow['To_Y']),
-                           xytext=(flow['From_X'], flow['From_Y']),
-                           arrowprops=dict(
-                               arrowstyle='->',
-                               lw=width,
-                               color='gray',
-                               alpha=0.4,
-                               connectionstyle="arc3,rad=0.1"
-                           ))
+            # Arrow width proportional to flow, all arrows in one collection
+            widths = (flows_filtered['Flow_Units'] / max_flow * 3).clip(lower=0.5)
+            layout_render.add_arrows(
+                ax,
+                flows_filtered[['From_X', 'From_Y']].to_numpy(),
+                flows_filtered[['To_X', 'To_Y']].to_numpy(),
+                linewidths=widths.to_numpy(),
+                color='gray',
+                alpha=0.4,
+                rad=0.1
+            )
 
     # Draw processes
     for _, proc in processes.iterrows():
@@ -167,8 +168,8 @@ def create_comparison_visualization():
     Create comparison visualization showing scaling across years
     """
     # Load scaling analysis data
-    scaling_file = RESULTS_DIR / "Task4" / "Fractal" / "Fractal_Design" / "Fractal_Scaling_Analysis.csv"
-    scaling_df = pd.read_csv(scaling_file)
+    scaling_file = RESULTS_DIR / "task4" / "Fractal" / "Fractal_Design" / "Fractal_Scaling_Analysis.csv"
+    scaling_df = results_store.load(scaling_file)
 
     # Create figure
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
@@ -228,8 +229,8 @@ def create_yearly_equipment_comparison():
     Create visualization comparing equipment requirements across years
     """
     # Load comparison data
-    comparison_file = RESULTS_DIR / "Task4" / "Fractal" / "Fractal_Design" / "Fractal_Comparison_All_Years.csv"
-    df = pd.read_csv(comparison_file)
+    comparison_file = RESULTS_DIR / "task4" / "Fractal" / "Fractal_Design" / "Fractal_Comparison_All_Years.csv"
+    df = results_store.load(comparison_file)
 
     # Create figure
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
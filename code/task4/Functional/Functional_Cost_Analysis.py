@@ -11,6 +11,7 @@ comprehensive cost analysis for functional layout across years 2-5 including:
 author: machas^2 team
 """
 
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib
@@ -26,6 +27,9 @@ RESULTS_DIR = BASE_DIR / "results" / "task4" / "functional"
 COST_DIR = RESULTS_DIR / "Cost_Analysis"
 VISUALS_DIR = RESULTS_DIR / "Visuals"
 
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import equipment_catalog
+
 # Operating parameters
 DAYS_PER_WEEK = 5
 HOURS_PER_SHIFT = 8
@@ -35,21 +39,15 @@ HOURS_PER_YEAR = DAYS_PER_WEEK * HOURS_PER_SHIFT * SHIFTS_PER_DAY * WEEKS_PER_YE
 
 def load_equipment_costs():
     """
-    Load equipment cost data from Equip+Operator Specs.csv
+    Load the compiled equipment catalog (Equip+Operator Specs.csv)
     """
-    df = pd.read_csv(DATA_DIR / 'Equip+Operator Specs.csv')
-
-    # Clean up the data
-    df['Installed price'] = pd.to_numeric(df['Installed price'], errors='coerce')
-    df['Relocation cost'] = pd.to_numeric(df['Relocation cost'], errors='coerce')
-    df['Useful life (years)'] = pd.to_numeric(df['Useful life (years)'], errors='coerce')
-    df['Hourly Cost'] = pd.to_numeric(df['Hourly Cost'], errors='coerce')
+    catalog = equipment_catalog.load_catalog()
 
     print("Equipment cost data loaded:")
-    print(f"  Total equipment types: {len(df)}")
-    print(f"  Equipment with cost data: {df['Installed price'].notna().sum()}")
+    print(f"  Total equipment types: {len(catalog['names'])}")
+    print(f"  Equipment with cost data: {int((catalog['price'] > 0).sum())}")
 
-    return df
+    return catalog
 
 def load_equipment_requirements():
     """
@@ -60,85 +58,49 @@ def load_equipment_requirements():
 
     return equipment_df, efficiency_df
 
-def calculate_capital_costs(equipment_df, cost_df):
+def calculate_capital_costs(equipment_df, catalog):
     """
     Calculate total capital investment costs for functional layout across years
     """
-    capital_costs = []
-
-    for _, row in equipment_df.iterrows():
-        year = row['Year']
-        process = row['Process']
-        units_needed = int(row['Equipment_2_Shifts'])  # Using 2-shift requirements
-
-        if units_needed == 0:
-            continue
-
-        # find equipment cost data for this process
-        cost_row = cost_df[cost_df['Equipment'] == process]
-
-        if cost_row.empty:
-            print(f"Warning: No cost data found for process {process}")
-            continue
-
-        installed_price = cost_row['Installed price'].iloc[0]
-        relocation_cost = cost_row['Relocation cost'].iloc[0] if pd.notna(cost_row['Relocation cost'].iloc[0]) else 0
-
-        total_cost_per_unit = installed_price + relocation_cost
-        total_process_cost = units_needed * total_cost_per_unit
-
-        capital_costs.append({
-            'Year': year,
-            'Process': process,
-            'Units_Required': units_needed,
-            'Cost_Per_Unit': total_cost_per_unit,
-            'Total_Installed_Cost': installed_price * units_needed,
-            'Total_Relocation_Cost': relocation_cost * units_needed,
-            'Total_Process_Cost': total_process_cost,
-            'Utilization_2_Shifts': row['Utilization_2_Shifts']
-        })
-
-    return pd.DataFrame(capital_costs)
-
-def calculate_operating_costs(equipment_df, cost_df):
+    # using 2-shift requirements; summary rows such as TOTAL have no catalog entry
+    df = equipment_df[(equipment_df['Equipment_2_Shifts'] > 0) & equipment_df['Process'].isin(catalog['ids'])]
+    ids = equipment_catalog.lookup(catalog, df['Process'])
+
+    units_needed = df['Equipment_2_Shifts'].to_numpy(dtype=int)
+    installed_price = catalog['price'][ids]
+    relocation_cost = catalog['relocation'][ids]
+    total_cost_per_unit = installed_price + relocation_cost
+
+    return pd.DataFrame({
+        'Year': df['Year'].to_numpy(),
+        'Process': df['Process'].to_numpy(),
+        'Units_Required': units_needed,
+        'Cost_Per_Unit': total_cost_per_unit,
+        'Total_Installed_Cost': installed_price * units_needed,
+        'Total_Relocation_Cost': relocation_cost * units_needed,
+        'Total_Process_Cost': units_needed * total_cost_per_unit,
+        'Utilization_2_Shifts': df['Utilization_2_Shifts'].to_numpy()
+    })
+
+def calculate_operating_costs(equipment_df, catalog):
     """
     Calculate annual operating costs (labor) for functional layout
     """
-    operating_costs = []
-
-    for _, row in equipment_df.iterrows():
-        year = row['Year']
-        process = row['Process']
-        units_2shift = int(row['Equipment_2_Shifts'])
-
-        if units_2shift == 0:
-            continue
-
-        # find hourly labor cost for this process
-        cost_row = cost_df[cost_df['Equipment'] == process]
-
-        if cost_row.empty:
-            print(f"Warning: No labor cost data found for process {process}")
-            continue
-
-        hourly_cost = cost_row['Hourly Cost'].iloc[0]
-        if pd.isna(hourly_cost):
-            continue
-
-        # calculate annual operating cost
-        # 2 shifts per day, each requiring one operator per machine
-        annual_operating_cost = units_2shift * hourly_cost * HOURS_PER_YEAR
-
-        operating_costs.append({
-            'Year': year,
-            'Process': process,
-            'Units_2_Shifts': units_2shift,
-            'Hourly_Cost': hourly_cost,
-            'Annual_Operating_Cost': annual_operating_cost,
-            'Utilization_2_Shifts': row['Utilization_2_Shifts']
-        })
-
-    return pd.DataFrame(operating_costs)
+    df = equipment_df[(equipment_df['Equipment_2_Shifts'] > 0) & equipment_df['Process'].isin(catalog['ids'])]
+    ids = equipment_catalog.lookup(catalog, df['Process'])
+
+    # 2 shifts per day, each staffed with the operator mix of the equipment type
+    units_2shift = df['Equipment_2_Shifts'].to_numpy(dtype=int)
+    hourly_cost = catalog['hourly_cost'][ids]
+
+    return pd.DataFrame({
+        'Year': df['Year'].to_numpy(),
+        'Process': df['Process'].to_numpy(),
+        'Units_2_Shifts': units_2shift,
+        'Hourly_Cost': hourly_cost,
+        'Annual_Operating_Cost': units_2shift * hourly_cost * HOURS_PER_YEAR,
+        'Utilization_2_Shifts': df['Utilization_2_Shifts'].to_numpy()
+    })
 
 def calculate_depreciation(cost_df, useful_life_years=10):
     """
@@ -334,16 +296,16 @@ def main():
 
     # step 1: load data
     print("\n1. Loading Data...")
-    cost_df = load_equipment_costs()
+    catalog = load_equipment_costs()
     equipment_df, efficiency_df = load_equipment_requirements()
 
     # step 2: calculate capital costs
     print("\n2. Calculating Capital Costs...")
-    capital_df = calculate_capital_costs(equipment_df, cost_df)
+    capital_df = calculate_capital_costs(equipment_df, catalog)
 
     # step 3: calculate operating costs
     print("\n3. Calculating Operating Costs...")
-    operating_df = calculate_operating_costs(equipment_df, cost_df)
+    operating_df = calculate_operating_costs(equipment_df, catalog)
 
     # step 4: calculate depreciation
     print("\n4. Calculating Depreciation...")
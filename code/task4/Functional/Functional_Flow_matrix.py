@@ -3,8 +3,9 @@
 aggregate functional flow matrices per year.
 
 inputs (it will try in this order):
-  1) ../results/task4/part/flow_matrix/Flow_Matrix_Wide_All_Years.csv
-     (wide table with columns Year, Part, A_A..M_M)
+  1) ../results/task4/part/flow_matrix/Flow_Tensor_All_Years.npz
+     (sparse year x part x from x to tensor, femoasa.flow_tensor)
+     or its csv view Flow_Edges_All_Years.csv (Year, Part, From, To, Flow)
   2) ../results/task4/part/flow_matrix/per_year/<Year_>/P*_Flow_Matrix.csv
 
 outputs:
@@ -16,6 +17,7 @@ author: machas^2 team
 """
 
 import os
+import sys
 import pandas as pd
 from pathlib import Path
 
@@ -23,11 +25,14 @@ from pathlib import Path
 script_dir = Path(__file__).parent
 project_root = script_dir.parent.parent.parent  # adjust if your repo depth differs
 
+sys.path.insert(0, str(project_root / 'code'))
+from femoasa import flow_tensor
+
 PROCESSES = list("ABCDEFGHIJKLM")
-TRANSITION_COLS = [f"{a}_{b}" for a in PROCESSES for b in PROCESSES]
 
 # input candidates
-FLOW_WIDE = project_root / 'results' / 'task4' / 'part' / 'flow_matrix' / 'Flow_Matrix_Wide_All_Years.csv'
+FLOW_TENSOR = project_root / 'results' / 'task4' / 'part' / 'flow_matrix' / 'Flow_Tensor_All_Years.npz'
+FLOW_EDGES = project_root / 'results' / 'task4' / 'part' / 'flow_matrix' / 'Flow_Edges_All_Years.csv'
 PER_YEAR_DIR = project_root / 'results' / 'task4' / 'part' / 'flow_matrix' / 'per_year'
 
 # outputs
@@ -66,28 +71,20 @@ def save_year_outputs(year_label: str, flow_mat: pd.DataFrame):
     print(f"[{year_label}] Saved summary → {sum_path}")
     return summary_df
 
-# ---------------- strategy a: wide all-years file ----------------
-if FLOW_WIDE.exists():
-    df = pd.read_csv(FLOW_WIDE)
-    # Keep only transition columns that actually exist
-    trans_cols = [c for c in TRANSITION_COLS if c in df.columns]
-    if not trans_cols:
-        raise ValueError(f"No transition columns found in {FLOW_WIDE}")
+# ---------------- strategy a: sparse flow tensor (all years) ----------------
+if FLOW_TENSOR.exists() or FLOW_EDGES.exists():
+    if FLOW_TENSOR.exists():
+        tensor = flow_tensor.load(FLOW_TENSOR)
+    else:
+        tensor = flow_tensor.from_edges(pd.read_csv(FLOW_EDGES), PROCESSES)
 
-    years = sorted(df['Year'].dropna().unique(), key=year_sort_key)
+    # all 13x13 matrices in one pass over the nonzero flows
+    matrices = flow_tensor.aggregate(tensor, 'year')
+    index = [tensor['processes'].index(p) for p in PROCESSES]
     all_years_summary = []
 
-    for year in years:
-        df_y = df[df['Year'] == year]
-        totals = df_y[trans_cols].sum(axis=0) if not df_y.empty else pd.Series(0.0, index=trans_cols)
-
-        # Rebuild 13x13 matrix
-        mat = empty_matrix()
-        for col, val in totals.items():
-            a, b = col.split('_', 1)
-            if a in PROCESSES and b in PROCESSES:
-                mat.loc[a, b] = float(val)
-
+    for year, matrix in zip(tensor['years'], matrices):
+        mat = pd.DataFrame(matrix[index][:, index], index=PROCESSES, columns=PROCESSES)
         summary_df = save_year_outputs(year, mat)
         all_years_summary.append(summary_df)
 
@@ -135,6 +132,6 @@ elif PER_YEAR_DIR.exists():
 else:
     raise FileNotFoundError(
         "No per-year flow data found.\n"
-        f"Tried:\n  - {FLOW_WIDE}\n  - {PER_YEAR_DIR}\n"
-        "Generate per-year flow matrices (or the wide all-years file) and rerun."
+        f"Tried:\n  - {FLOW_TENSOR}\n  - {FLOW_EDGES}\n  - {PER_YEAR_DIR}\n"
+        "Generate per-year flow matrices (or the all-years flow tensor) and rerun."
     )
@@ -1,127 +1,50 @@
 # -*- coding: utf-8 -*-
 """
-Per-year flow matrices aggregated into single CSVs (all years).
+Per-year flow matrices of every part, stored as one sparse flow tensor (all years).
 Creates:
-  - ../results/task4/part/flow_matrix/Flow_Edges_All_Years.csv
-  - ../results/task4/part/flow_matrix/Flow_Matrix_Wide_All_Years.csv
+  - ../results/task4/part/flow_matrix/Flow_Tensor_All_Years.npz   (year x part x from x to, nonzero flows only)
+  - ../results/task4/part/flow_matrix/Flow_Edges_All_Years.csv    (csv view: Year, Part, From, To, Flow)
+
+The tensor replaces the former wide table (one A_A..M_M column per transition);
+femoasa.flow_tensor aggregates it by year, part, part group or organization.
 """
 
-import os
+import sys
 import pandas as pd
 from pathlib import Path
 
-# ---------------- Utilities ----------------
-def ensure_dir(path: str):
-    """Create directory if it doesn't exist."""
-    os.makedirs(path, exist_ok=True)
-
 # ---------------- Config ----------------
 BASE_DIR = Path(__file__).parent.parent.parent.parent  # project root
 RESULTS_DIR = BASE_DIR / "results"
 
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import data, flow_tensor
+
 # Output directory (single place, no per-year subfolders)
 OUT_DIR = RESULTS_DIR / "task4" / "part" / "flow_matrix"
-ensure_dir(str(OUT_DIR))
+OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 # ---------------- Load multi-year demand ----------------
-# Try both spellings just in case (Fulfilment vs Fulfillment)
-task4_load = r"results\task4\Task4_Demand_Fulfillment_Capacity_Plan_by_year.csv"
-df_all = None
-
-df_all = pd.read_csv(task4_load)
-
-if df_all is None:
-    raise FileNotFoundError(
-        f"Could not find Task4 multi-year CSV. Tried"
-    )
+task4_load = RESULTS_DIR / "task4" / "Task4_Demand_Fulfillment_Capacity_Plan_by_year.csv"
+df_all = pd.read_csv(task4_load, encoding='utf-8-sig')
 
 # Order years like 'Year 1', 'Year 2', ...
-years = sorted(
-    df_all['Year'].unique(),
-    key=lambda s: (int(''.join(ch for ch in str(s) if ch.isdigit()) or 0), str(s))
-)
+years = sorted(df_all['Year'].unique(), key=flow_tensor.year_sort_key)
 
 # ---------------- Routings ----------------
-process_operations = {
-    'P1': ['B', 'A', 'B', 'C', 'D', 'I', 'J'],
-    'P2': ['A', 'C', 'D', 'H', 'J'],
-    'P3': ['B', 'D', 'C', 'I', 'J'],
-    'P4': ['A', 'B', 'D', 'G', 'H'],
-    'P5': ['B', 'C', 'D', 'I'],
-    'P6': ['A', 'B', 'C', 'D', 'H', 'I', 'J'],
-    'P7': ['E', 'F', 'C', 'D', 'I', 'J'],
-    'P8': ['E', 'H', 'J', 'I'],
-    'P9': ['F', 'G', 'E', 'G', 'I', 'J'],
-    'P10': ['E', 'F', 'I', 'J'],
-    'P11': ['E', 'G', 'E', 'G', 'I'],
-    'P12': ['E', 'G', 'F', 'I', 'J'],
-    'P13': ['E', 'F', 'G', 'F', 'G', 'H', 'I'],
-    'P14': ['E', 'F', 'G', 'H'],
-    'P15': ['E', 'G', 'F', 'H', 'J'],
-    'P16': ['F', 'H', 'I', 'J'],
-    'P17': ['K', 'L', 'M'],
-    'P18': ['K', 'L', 'K', 'M'],
-    'P19': ['L', 'M', 'L', 'M'],
-    'P20': ['L', 'K', 'M']
-}
-processes = list('ABCDEFGHIJKLM')  # all processes
-all_transition_cols = [f"{a}_{b}" for a in processes for b in processes]
-
-# ---------------- Accumulators for aggregated outputs ----------------
-edges_rows = []   # tidy: Year, Part, From, To, Flow
-wide_rows = []    # wide: Year, Part, A_A, A_B, ..., M_M
-
-# ---------------- Build matrices for each Year × Part ----------------
-for year in years:
-    df_y = df_all[df_all['Year'] == year].copy()
-
-    # Weekly demand dict for this year (default 0 if a part is missing)
-    weekly_demand_year = {f'P{i}': 0.0 for i in range(1, 21)}
-    weekly_demand_year.update(
-        dict(zip(df_y['Part'].astype(str), df_y['Weekly_Demand_Units'].astype(float)))
-    )
-
-    for part, ops in process_operations.items():
-        demand = float(weekly_demand_year.get(part, 0.0))
-
-        # Initialize a 13x13 zero matrix (as a dict for speed/clarity)
-        mat = {f"{a}_{b}": 0.0 for a in processes for b in processes}
-
-        # Fill transitions present in the routing
-        for i in range(len(ops) - 1):
-            a = ops[i]
-            b = ops[i + 1]
-            key = f"{a}_{b}"
-            mat[key] += demand
-
-            # Also add to tidy edges (sparse; include zeros only if you want full trace)
-            edges_rows.append({
-                'Year': year,
-                'Part': part,
-                'From': a,
-                'To': b,
-                'Flow': demand
-            })
+routings = data.load_routings()
 
-        # Append wide row (Year, Part, then all 169 transitions)
-        wide_row = {'Year': year, 'Part': part}
-        wide_row.update(mat)
-        wide_rows.append(wide_row)
+# Weekly demand per year and part (0 if a part is missing in a year)
+weekly_demand = (df_all.pivot_table(index='Year', columns='Part', values='Weekly_Demand_Units', aggfunc='sum')
+                 .reindex(index=years, columns=list(routings), fill_value=0.0)
+                 .fillna(0.0))
 
-# ---------------- Write aggregated CSVs ----------------
-edges_df = pd.DataFrame(edges_rows)
-# Keep only nonzero flows to reduce size (comment out the next line to keep zeros too)
-edges_df = edges_df[edges_df['Flow'] != 0.0]
-edges_df.sort_values(['Year', 'Part', 'From', 'To'], inplace=True)
-edges_df.to_csv(OUT_DIR / "Flow_Edges_All_Years.csv", index=False)
+# ---------------- Build the flow tensor (year x part x from x to) ----------------
+tensor = flow_tensor.from_routings(weekly_demand.to_numpy(), routings, years=years)
 
-wide_df = pd.DataFrame(wide_rows)
-# Ensure all transition columns exist even if some never appear for some parts/years
-for col in all_transition_cols:
-    if col not in wide_df.columns:
-        wide_df[col] = 0.0
-wide_df = wide_df[['Year', 'Part'] + all_transition_cols]
-wide_df.sort_values(['Year', 'Part'], inplace=True)
-wide_df.to_csv(OUT_DIR / "Flow_Matrix_Wide_All_Years.csv", index=False)
+# ---------------- Write outputs ----------------
+flow_tensor.save(tensor, OUT_DIR / "Flow_Tensor_All_Years.npz")
+flow_tensor.to_edges(tensor).to_csv(OUT_DIR / "Flow_Edges_All_Years.csv", index=False)
 
+print(f"{len(tensor['flow'])} nonzero flows ({len(years)} years x {len(routings)} parts)")
 print("Done. Aggregated flow files written to:", OUT_DIR.resolve())
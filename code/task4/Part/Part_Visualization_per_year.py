@@ -6,6 +6,7 @@ then produces per-year dashboards and text reports.
 """
 
 import os
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -22,9 +23,12 @@ CAPACITY_1 = CAPACITY_DIR / "Part_Step_Process_Capacity_Requirements_1_shifts.cs
 CAPACITY_2 = CAPACITY_DIR / "Part_Step_Process_Capacity_Requirements_2_shifts.csv"
 PART_DEMAND = CAPACITY_DIR / "Weekly_Part_Demand.csv"  # Year, Part, Weekly_Demand
 
-# Aggregated flow inputs (with Year column)
+# Aggregated flow inputs (all years)
 FLOW_DIR = RESULTS_DIR / "task4" / "part" / "flow_matrix"
-FLOW_WIDE = FLOW_DIR / "Flow_Matrix_Wide_All_Years.csv"  # Year, Part, A_A..M_M
+FLOW_TENSOR = FLOW_DIR / "Flow_Tensor_All_Years.npz"  # sparse year x part x from x to
+
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import flow_tensor
 
 # Outputs
 VIS_OUT_DIR = RESULTS_DIR / "task4" / "part" / "visualizations" / "per_year"
@@ -46,7 +50,6 @@ MINUTES_PER_MACHINE_1 = HOURS_PER_SHIFT * DAYS_PER_WEEK * 60 * EFFECTIVE_AVAILAB
 MINUTES_PER_MACHINE_2 = 2 * HOURS_PER_SHIFT * DAYS_PER_WEEK * 60 * EFFECTIVE_AVAILABILITY
 
 PROCESSES = list('ABCDEFGHIJKLM')
-TRANSITION_COLS = [f"{a}_{b}" for a in PROCESSES for b in PROCESSES]
 
 # ---------------- Helpers ----------------
 def _require_file(path: Path, label: str):
@@ -60,16 +63,13 @@ def _year_labels(df: pd.DataFrame) -> list:
     )
     return list(years)
 
-def _build_total_flow_matrix_for_year(flow_wide_year: pd.DataFrame) -> pd.DataFrame:
+def _total_flow_matrices(tensor: dict) -> dict:
     """
-    Reconstruct a 13x13 total flow matrix for the year by summing transitions across all parts.
+    13x13 total flow matrix of every year (transitions summed across all parts), keyed by year label.
     """
-    totals = flow_wide_year[TRANSITION_COLS].sum(axis=0) if not flow_wide_year.empty else pd.Series(0.0, index=TRANSITION_COLS)
-    mat = pd.DataFrame(0.0, index=PROCESSES, columns=PROCESSES)
-    for col, val in totals.items():
-        a, b = col.split('_')
-        mat.loc[a, b] = float(val)
-    return mat
+    index = [tensor['processes'].index(p) for p in PROCESSES]
+    return {year: pd.DataFrame(matrix[index][:, index], index=PROCESSES, columns=PROCESSES)
+            for year, matrix in zip(tensor['years'], flow_tensor.aggregate(tensor, 'year'))}
 
 def _process_frequency_from_matrix(flow_mat: pd.DataFrame) -> pd.DataFrame:
     """
@@ -84,14 +84,14 @@ def create_visualizations_per_year():
     _require_file(CAPACITY_1, "capacity (1 shift)")
     _require_file(CAPACITY_2, "capacity (2 shifts)")
     _require_file(PART_DEMAND, "weekly part demand")
-    _require_file(FLOW_WIDE, "flow matrix (wide, all years)")
+    _require_file(FLOW_TENSOR, "flow tensor (all years)")
 
     cap1 = pd.read_csv(CAPACITY_1)      # expects columns incl. Year, Operation, Number_of_Machines, Time_Required_Min_Week, Part, Step...
     cap2 = pd.read_csv(CAPACITY_2)
     part_demand_all = pd.read_csv(PART_DEMAND)   # Year, Part, Weekly_Demand
-    flow_wide_all = pd.read_csv(FLOW_WIDE)       # Year, Part, A_A..M_M
+    flow_by_year = _total_flow_matrices(flow_tensor.load(FLOW_TENSOR))
 
-    years = sorted(set(cap1['Year']).union(set(cap2['Year'])).union(set(part_demand_all['Year'])).union(set(flow_wide_all['Year'])),
+    years = sorted(set(cap1['Year']).union(set(cap2['Year'])).union(set(part_demand_all['Year'])).union(set(flow_by_year)),
                    key=lambda s: (int(''.join([c for c in str(s) if c.isdigit()]) or 0), str(s)))
 
     for year in years:
@@ -100,7 +100,6 @@ def create_visualizations_per_year():
         cap1_y = cap1[year_mask1].copy()
         cap2_y = cap2[year_mask2].copy()
         pd_y = part_demand_all[part_demand_all['Year'] == year].copy()
-        flow_y = flow_wide_all[flow_wide_all['Year'] == year].copy()
 
         # ----- Process capacity (group by operation) -----
         # NOTE: Summing Number_of_Machines at step-level will count duplicates for repeated operations in a routing;
@@ -143,7 +142,7 @@ def create_visualizations_per_year():
         wl['Weekly_Hours'] = wl['Weekly_Minutes'] / 60.0
 
         # ----- Flow matrix for this year -----
-        total_flow_mat = _build_total_flow_matrix_for_year(flow_y)
+        total_flow_mat = flow_by_year.get(year, pd.DataFrame(0.0, index=PROCESSES, columns=PROCESSES))
         freq_df = _process_frequency_from_matrix(total_flow_mat)
 
         # ----- Part demand for this year -----
@@ -234,21 +233,20 @@ def generate_summary_reports_per_year():
     _require_file(CAPACITY_1, "capacity (1 shift)")
     _require_file(CAPACITY_2, "capacity (2 shifts)")
     _require_file(PART_DEMAND, "weekly part demand")
-    _require_file(FLOW_WIDE, "flow matrix (wide, all years)")
+    _require_file(FLOW_TENSOR, "flow tensor (all years)")
 
     cap1 = pd.read_csv(CAPACITY_1)
     cap2 = pd.read_csv(CAPACITY_2)
     part_demand_all = pd.read_csv(PART_DEMAND)
-    flow_wide_all = pd.read_csv(FLOW_WIDE)
+    flow_by_year = _total_flow_matrices(flow_tensor.load(FLOW_TENSOR))
 
-    years = sorted(set(cap1['Year']).union(set(cap2['Year'])).union(set(part_demand_all['Year'])).union(set(flow_wide_all['Year'])),
+    years = sorted(set(cap1['Year']).union(set(cap2['Year'])).union(set(part_demand_all['Year'])).union(set(flow_by_year)),
                    key=lambda s: (int(''.join([c for c in str(s) if c.isdigit()]) or 0), str(s)))
 
     for year in years:
         cap1_y = cap1[cap1['Year'] == year].copy()
         cap2_y = cap2[cap2['Year'] == year].copy()
         pd_y = part_demand_all[part_demand_all['Year'] == year].copy()
-        flow_y = flow_wide_all[flow_wide_all['Year'] == year].copy()
 
         # Equipment totals (sum of machines across operations; consistent with earlier logic)
         proc_cap_1 = cap1_y.groupby('Operation', as_index=False)['Number_of_Machines'].sum()
@@ -270,7 +268,7 @@ def generate_summary_reports_per_year():
         high_demand = pd_y2.nlargest(5, 'Weekly_Demand')[['Part','Weekly_Demand']]
 
         # Flow analytics
-        total_flow_mat = _build_total_flow_matrix_for_year(flow_y)
+        total_flow_mat = flow_by_year.get(year, pd.DataFrame(0.0, index=PROCESSES, columns=PROCESSES))
         freq_df = _process_frequency_from_matrix(total_flow_mat)
         total_ops = freq_df['Operations_Per_Week'].sum()
         top_freq = freq_df.nlargest(3, 'Operations_Per_Week')
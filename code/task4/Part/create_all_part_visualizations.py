@@ -9,13 +9,14 @@ import seaborn as sns
 import numpy as np
 from matplotlib.patches import Rectangle
 import os
+from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 
-base_path = r"c:\Users\jatin\OneDrive\Desktop\Georgia Tech\Coursework\6202 Benoit\Case Work\Case Study 3\ISYE6202_CW3"
+base_path = Path(__file__).parent.parent.parent.parent  # project root
 
 def create_visualizations(year_label, data_path, output_path, is_task3=False):
     """Create visualizations for a specific year"""
@@ -28,13 +29,13 @@ def create_visualizations(year_label, data_path, output_path, is_task3=False):
     
     # Read data
     if is_task3:
-        layout_df = pd.read_csv(f"{data_path}\\Part_Based_All_Parts_Layout_Summary.csv")
-        flow_df = pd.read_csv(f"{data_path}\\Part_Based_All_Parts_Flow_Analysis.csv")
-        machine_df = pd.read_csv(f"{data_path}\\Part_Based_All_Parts_Machine_Usage.csv")
+        layout_df = pd.read_csv(os.path.join(data_path, "Part_Based_All_Parts_Layout_Summary.csv"))
+        flow_df = pd.read_csv(os.path.join(data_path, "Part_Based_All_Parts_Flow_Analysis.csv"))
+        machine_df = pd.read_csv(os.path.join(data_path, "Part_Based_All_Parts_Machine_Usage.csv"))
     else:
-        layout_df = pd.read_csv(f"{data_path}\\Part_Based_{year_label}_All_Parts_Layout_Summary.csv")
-        flow_df = pd.read_csv(f"{data_path}\\Part_Based_{year_label}_All_Parts_Flow_Analysis.csv")
-        machine_df = pd.read_csv(f"{data_path}\\Part_Based_{year_label}_All_Parts_Machine_Usage.csv")
+        layout_df = pd.read_csv(os.path.join(data_path, f"Part_Based_{year_label}_All_Parts_Layout_Summary.csv"))
+        flow_df = pd.read_csv(os.path.join(data_path, f"Part_Based_{year_label}_All_Parts_Flow_Analysis.csv"))
+        machine_df = pd.read_csv(os.path.join(data_path, f"Part_Based_{year_label}_All_Parts_Machine_Usage.csv"))
     
     # Standardize columns
     if 'Total_Area_sqft' in layout_df.columns:
@@ -140,7 +141,7 @@ Smallest: {layout_df.loc[layout_df['Area'].idxmin(), 'Part']}
                 ax5.text(j, i, f'{int(value)}',
                         ha="center", va="center", color="black", fontsize=7, fontweight='bold')
     
-    plt.savefig(f"{output_path}\\{year_label}_Dashboard.png", dpi=300, bbox_inches='tight')
+    plt.savefig(os.path.join(output_path, f"{year_label}_Dashboard.png"), dpi=300, bbox_inches='tight')
     print(f"Saved: {year_label}_Dashboard.png")
     plt.close()
     
@@ -186,7 +187,7 @@ Smallest: {layout_df.loc[layout_df['Area'].idxmin(), 'Part']}
     ax.grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig(f"{output_path}\\{year_label}_Top10.png", dpi=300, bbox_inches='tight')
+    plt.savefig(os.path.join(output_path, f"{year_label}_Top10.png"), dpi=300, bbox_inches='tight')
     print(f"Saved: {year_label}_Top10.png")
     plt.close()
     
@@ -234,75 +235,86 @@ Machines: {total_machines:,}
            fontsize=11, verticalalignment='top',
            bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.9))
     
-    plt.savefig(f"{output_path}\\{year_label}_Schematic.png", dpi=300, bbox_inches='tight')
+    plt.savefig(os.path.join(output_path, f"{year_label}_Schematic.png"), dpi=300, bbox_inches='tight')
     print(f"Saved: {year_label}_Schematic.png")
     plt.close()
     
     print(f"{year_label} complete!")
     return total_machines, total_area
 
-# MAIN
-print("="*80)
-print("PART-BASED VISUALIZATIONS")
-print("="*80)
+def create_multi_year_comparison(metrics, output_path):
+    """Machine and area growth over the years of (year, machines, area) metrics"""
+    print("\nMULTI-YEAR COMPARISON")
+    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    fig.suptitle('Multi-Year Capacity Growth (Years 2-5)', fontsize=18, fontweight='bold')
 
-# Task 3
-print("\nTASK 3 - YEAR 1")
-task3_data = f"{base_path}\\results\\Task3\\Part\\Capacity"
-task3_output = f"{base_path}\\results\\Task3\\Part\\Visuals"
-y1_m, y1_a = create_visualizations("Year1", task3_data, task3_output, is_task3=True)
+    years = [y[0] for y in metrics]
+    machines = [y[1] for y in metrics]
+    areas = [y[2] for y in metrics]
 
-# Task 4
-task4_base = f"{base_path}\\results\\task4\\part"
-metrics = []
+    ax = axes[0]
+    ax.bar(years, machines, color=plt.cm.Blues(np.linspace(0.4, 0.9, len(years))),
+          edgecolor='black', linewidth=2, width=0.6)
+    ax.set_xlabel('Year', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Total Machines', fontsize=14, fontweight='bold')
+    ax.set_title('Machine Growth', fontsize=16, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+    ax.set_xticks(years)
+    for i, (y, m) in enumerate(zip(years, machines)):
+        ax.text(y, m, f'{int(m):,}', ha='center', va='bottom', fontsize=11, fontweight='bold')
 
-for year in [2, 3, 4, 5]:
-    print(f"\nTASK 4 - YEAR {year}")
-    year_label = f"Year{year}"
-    data_path = f"{task4_base}\\{year_label}"
-    m, a = create_visualizations(year_label, data_path, data_path, is_task3=False)
-    metrics.append((year, m, a))
+    ax = axes[1]
+    ax.bar(years, areas, color=plt.cm.Greens(np.linspace(0.4, 0.9, len(years))),
+          edgecolor='black', linewidth=2, width=0.6)
+    ax.set_xlabel('Year', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Total Area (sq ft)', fontsize=14, fontweight='bold')
+    ax.set_title('Area Growth', fontsize=16, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+    ax.set_xticks(years)
+    for i, (y, a) in enumerate(zip(years, areas)):
+        ax.text(y, a, f'{int(a):,}', ha='center', va='bottom', fontsize=11, fontweight='bold')
 
-# Multi-year comparison
-print("\nMULTI-YEAR COMPARISON")
-fig, axes = plt.subplots(1, 2, figsize=(16, 6))
-fig.suptitle('Multi-Year Capacity Growth (Years 2-5)', fontsize=18, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_path, "MultiYear_Comparison.png"), dpi=300, bbox_inches='tight')
+    print(f"Saved: MultiYear_Comparison.png")
+    plt.close()
+
+def create_task3_visualizations():
+    """Year 1 (Task 3) dashboards"""
+    task3_data = os.path.join(base_path, "results", "Task3", "Part", "Capacity")
+    task3_output = os.path.join(base_path, "results", "Task3", "Part", "Visuals")
+    print("\nTASK 3 - YEAR 1")
+    create_visualizations("Year1", task3_data, task3_output, is_task3=True)
+    return task3_output
+
+def main():
+    print("="*80)
+    print("PART-BASED VISUALIZATIONS")
+    print("="*80)
+
+    # Task 3
+    task3_output = create_task3_visualizations()
 
-years = [y[0] for y in metrics]
-machines = [y[1] for y in metrics]
-areas = [y[2] for y in metrics]
+    # Task 4
+    task4_base = os.path.join(base_path, "results", "task4", "part")
+    metrics = []
 
-ax = axes[0]
-ax.bar(years, machines, color=plt.cm.Blues(np.linspace(0.4, 0.9, len(years))),
-      edgecolor='black', linewidth=2, width=0.6)
-ax.set_xlabel('Year', fontsize=14, fontweight='bold')
-ax.set_ylabel('Total Machines', fontsize=14, fontweight='bold')
-ax.set_title('Machine Growth', fontsize=16, fontweight='bold')
-ax.grid(axis='y', alpha=0.3)
-ax.set_xticks(years)
-for i, (y, m) in enumerate(zip(years, machines)):
-    ax.text(y, m, f'{int(m):,}', ha='center', va='bottom', fontsize=11, fontweight='bold')
+    for year in [2, 3, 4, 5]:
+        print(f"\nTASK 4 - YEAR {year}")
+        year_label = f"Year{year}"
+        data_path = os.path.join(task4_base, year_label)
+        m, a = create_visualizations(year_label, data_path, data_path, is_task3=False)
+        metrics.append((year, m, a))
 
-ax = axes[1]
-ax.bar(years, areas, color=plt.cm.Greens(np.linspace(0.4, 0.9, len(years))),
-      edgecolor='black', linewidth=2, width=0.6)
-ax.set_xlabel('Year', fontsize=14, fontweight='bold')
-ax.set_ylabel('Total Area (sq ft)', fontsize=14, fontweight='bold')
-ax.set_title('Area Growth', fontsize=16, fontweight='bold')
-ax.grid(axis='y', alpha=0.3)
-ax.set_xticks(years)
-for i, (y, a) in enumerate(zip(years, areas)):
-    ax.text(y, a, f'{int(a):,}', ha='center', va='bottom', fontsize=11, fontweight='bold')
+    create_multi_year_comparison(metrics, task4_base)
 
-plt.tight_layout()
-plt.savefig(f"{task4_base}\\MultiYear_Comparison.png", dpi=300, bbox_inches='tight')
-print(f"Saved: MultiYear_Comparison.png")
-plt.close()
+    print("\n" + "="*80)
+    print("ALL VISUALIZATIONS COMPLETE!")
+    print("="*80)
+    print(f"\nTask 3: {task3_output}")
+    print(f"Task 4: {os.path.join(task4_base, 'Year[N]')}")
+    print("\nTotal: 16 visualization files created")
+    print("="*80)
 
-print("\n" + "="*80)
-print("ALL VISUALIZATIONS COMPLETE!")
-print("="*80)
-print(f"\nTask 3: {task3_output}")
-print(f"Task 4: {task4_base}\\Year[N]\\")
-print("\nTotal: 16 visualization files created")
-print("="*80)
+if __name__ == "__main__":
+    main()
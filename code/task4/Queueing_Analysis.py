@@ -0,0 +1,58 @@
+"""
+task 4: analytic lead time and WIP of every organization - years 1 to 5
+
+treats every process pool (functional), part cell and fractal center as a
+GI/G/c station fed by the routing flows of the 100-part kits and solves the
+networks with Whitt's QNA (femoasa.queueing) for the equipment of the
+capacity plan, and ranks the designs on flow time and WIP before simulation.
+the same designs re-sized for a target utilization (default 0.85) are
+reported next to them as *_at_Target columns.
+
+author: machas^2 team
+date: november 2025
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# configuration
+BASE_DIR = Path(__file__).parent.parent.parent  # go up to isye6202_cw3 directory
+RESULTS_DIR = BASE_DIR / "results" / "task4" / "queueing"
+
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import queueing, results_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queueing lead time and WIP of every organization")
+    parser.add_argument('--target-utilization', type=float, default=queueing.TARGET_UTILIZATION,
+                        help="utilization of the re-sized comparison columns (default: %(default)s)")
+    args = parser.parse_args()
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 80)
+    print("QUEUEING NETWORK - LEAD TIME AND WIP PER ORGANIZATION, YEARS 1 TO 5")
+    print("=" * 80)
+
+    start = time.time()
+    summary, stations = queueing.queueing_report(target_utilization=args.target_utilization)
+    print(f"\n{len(summary)} designs solved (and re-sized for {args.target_utilization:.0%} utilization) "
+          f"in {time.time() - start:.3f}s")
+
+    results_store.save(summary, RESULTS_DIR / "Queueing_Lead_Time_WIP_by_year.csv")
+    results_store.save(stations, RESULTS_DIR / "Queueing_Stations_by_year.csv")
+    print(summary.round(3).to_string(index=False))
+
+    ranking = summary.groupby('Organization')[['Mean_Flow_Time_h', 'WIP_Parts', 'Max_Utilization',
+                                                'Mean_Flow_Time_h_at_Target', 'WIP_Parts_at_Target']].mean()
+    print("\nMean over the 5 years (capacity plan, and re-sized for the target utilization):")
+    print(ranking.sort_values('Mean_Flow_Time_h').round(2).to_string())
+
+    print(f"\nResults saved to {RESULTS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
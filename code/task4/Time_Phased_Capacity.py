@@ -0,0 +1,67 @@
+"""
+task 4: time-phased capacity plan - 260 weeks over years 1 to 5
+
+interpolates the weekly product demand between the year averages and sizes
+every week of the horizon for each organization (femoasa.time_phased), then
+lists the week each additional machine becomes necessary next to the week the
+average-week yearly plan would buy it.
+
+author: machas^2 team
+date: november 2025
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# configuration
+BASE_DIR = Path(__file__).parent.parent.parent  # go up to isye6202_cw3 directory
+RESULTS_DIR = BASE_DIR / "results" / "task4" / "time_phased"
+
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import capacity, data, results_store, time_phased
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Week-by-week capacity plan over the 5-year horizon")
+    parser.add_argument('--data-dir', default=None, help="input csv directory (default: casework data)")
+    parser.add_argument('--memmap-dir', default=None, help="keep weekly arrays in .npy memory maps here")
+    args = parser.parse_args()
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    inputs = data.load_snapshot(args.data_dir)
+
+    print("=" * 80)
+    print("TIME-PHASED CAPACITY PLAN - WEEKLY WORKLOAD AND MACHINE ADDITIONS")
+    print("=" * 80)
+
+    weekly, additions = [], []
+    for organization in capacity.ORGANIZATIONS:
+        memmap_dir = Path(args.memmap_dir) / organization if args.memmap_dir else None
+        plan = time_phased.time_phased_plan(inputs, organization, memmap_dir=memmap_dir)
+        table = time_phased.machine_additions(plan)
+        table.insert(0, 'Organization', organization)
+        additions.append(table)
+
+        frame = pd.DataFrame(plan['equipment'], columns=[f"{p}_Machines" for p in plan['processes']])
+        frame.insert(0, 'Week', range(1, len(frame) + 1))
+        frame.insert(1, 'Year', plan['year'])
+        frame.insert(0, 'Organization', organization)
+        frame['Total_Workload_min'] = plan['workload'].sum(axis=1)
+        frame['Total_Machines'] = plan['equipment'].sum(axis=1)
+        weekly.append(frame)
+
+        deferred = (table['Weeks_Deferred'] > 0).sum()
+        print(f"\n{organization}: {int(plan['installed'][-1].sum())} machines by week {len(frame)}, "
+              f"{len(table)} purchase weeks, {deferred} can wait past the yearly plan "
+              f"(mean {table.loc[table['Weeks_Deferred'] > 0, 'Weeks_Deferred'].mean():.1f} weeks)")
+
+    results_store.save(pd.concat(weekly, ignore_index=True), RESULTS_DIR / "Time_Phased_Weekly_Equipment.csv")
+    results_store.save(pd.concat(additions, ignore_index=True), RESULTS_DIR / "Time_Phased_Machine_Additions.csv")
+    print(f"\nResults saved to {RESULTS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+task 4: inbound and outbound truck load plan - years 1 to 5
+
+packs the weekly MSC kit delivery and the hourly (client A) and 4-hourly
+(client B) tote shipments into trailers with the extreme-point heuristic and
+reports trucks per period, cube and weight fill, dock doors and trucking
+miles per flow and year.
+
+author: machas^2 team
+date: november 2025
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# configuration
+BASE_DIR = Path(__file__).parent.parent.parent  # go up to isye6202_cw3 directory
+RESULTS_DIR = BASE_DIR / "results" / "task4" / "truck_loads"
+
+sys.path.insert(0, str(BASE_DIR / "code"))
+from femoasa import load_planning, results_store
+
+
+def main():
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 80)
+    print("TRUCK LOAD PLAN - INBOUND KITS AND OUTBOUND TOTES, YEARS 1 TO 5")
+    print("=" * 80)
+
+    start = time.time()
+    report = load_planning.load_plan_report()
+    print(f"\n{len(report)} loads packed in {time.time() - start:.2f}s")
+
+    results_store.save(report, RESULTS_DIR / "Truck_Load_Plan_by_year_and_flow.csv")
+    print(report[['Year', 'Flow', 'Trucks_per_Period', 'Trucks_per_Week', 'Volume_Fill', 'Weight_Fill',
+                  'Dock_Doors']].round(3).to_string(index=False))
+
+    summary = report.groupby('Year').agg(
+        Trucks_per_Week=('Trucks_per_Week', 'sum'),
+        Dock_Doors=('Dock_Doors', 'sum'),
+        Truck_Miles_Week=('Truck_Miles_Week', 'sum'),
+        Trucking_Cost_Week=('Trucking_Cost_Week', 'sum'),
+    )
+    results_store.save(summary, RESULTS_DIR / "Truck_Load_Plan_summary.csv", index=True)
+    print("\n" + summary.round(1).to_string())
+
+    print(f"\nResults saved to {RESULTS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,16 @@ DATA SOURCE: All data loaded from CSV files in data/csv_outputs/
 """
 
 import csv
+import sys
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 from scipy import stats
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from femoasa import results_store, slotting, storage, storage_allocation
+
 # ============================================================================
 # DATA LOADING FROM CSV FILES
 # ============================================================================
@@ -449,7 +455,7 @@ out_dir = Path("results")
 out_dir.mkdir(parents=True, exist_ok=True)
 out_file = out_dir / "Task4_Demand_Fulfillment_Capacity_Plan_by_year.csv"
 
-task1_df.to_csv(out_file, index=False, encoding="utf-8-sig")
+results_store.save(task1_df, out_file, encoding="utf-8-sig")
 print(f"\n[OK] Task 1 results saved to: {out_file}")
 
 # # ============================================================================
@@ -466,42 +472,37 @@ CLIENT_A_BUFFER_HOURS = 4
 CLIENT_B_BUFFER_HOURS = 12
 OPERATING_HOURS_PER_WEEK = hours_per_week  # 2x8x5 = 80
 
-client_a_products = ['A1', 'A2', 'A3', 'A4']
-client_b_products = ['B1', 'B2', 'B3', 'B4']
-
-# DataFrames vides (parts x years) en float
-parts_demand_CA_hourly = pd.DataFrame(0.0, index=parts, columns=years)
-parts_demand_CB_hourly = pd.DataFrame(0.0, index=parts, columns=years)
-
-# Calcul vectoriel par annee
-BOM_A = bom_lines[client_a_products].fillna(0)
-BOM_B = bom_lines[client_b_products].fillna(0)
-
-for year in years:
-    # Demande hebdo (parts) = (partsxproducts) @ (products)
-    a_weekly = BOM_A @ weekly_demand_values.loc[year, client_a_products].fillna(0)
-    b_weekly = BOM_B @ weekly_demand_values.loc[year, client_b_products].fillna(0)
+WAREHOUSE_HEIGHT = 20.0
+STORAGE_UTILIZATION = 0.70
 
-    parts_demand_CA_hourly.loc[:, year] = a_weekly / OPERATING_HOURS_PER_WEEK
-    parts_demand_CB_hourly.loc[:, year] = b_weekly / OPERATING_HOURS_PER_WEEK
+# Storage plan for all parts x years x locations (factory, warehouse A, warehouse B)
+multi_year_demand = {
+    'years': years_index,
+    'products': products,
+    'weekly': weekly_demand_values[products].fillna(0).to_numpy(),
+    'cv': cv_values[products].fillna(0).to_numpy(),
+    'bom': bom_lines.loc[parts, products].fillna(0).to_numpy(dtype=float),
+}
+volumes_cuft = np.array([part_dimensions[p]['X'] * part_dimensions[p]['Y'] * part_dimensions[p]['Z']
+                         for p in parts]) / (12**3)
 
-# Buffer stock (unites finies a stocker) pour l'autonomie demandee
-buffer_A_units = parts_demand_CA_hourly * CLIENT_A_BUFFER_HOURS
-buffer_B_units = parts_demand_CB_hourly * CLIENT_B_BUFFER_HOURS
-buffer_total_units = buffer_A_units.add(buffer_B_units, fill_value=0)
+storage_plan = storage.storage_plan(
+    multi_year_demand, volumes_cuft, service_level=SERVICE_LEVEL, lead_time=LEAD_TIME_WEEKS,
+    buffer_hours=(CLIENT_A_BUFFER_HOURS, CLIENT_B_BUFFER_HOURS), operating_hours=OPERATING_HOURS_PER_WEEK,
+    height=WAREHOUSE_HEIGHT, utilization=STORAGE_UTILIZATION,
+)
+task2_df, storage_summary_by_year = storage.plan_tables(storage_plan, list(parts))
 
+# Hourly client demand and buffer stock (parts x years)
+client_weekly = storage.client_part_demand(multi_year_demand['weekly'], multi_year_demand['bom'], products)
+parts_demand_CA_hourly = pd.DataFrame(client_weekly[..., 0].T / OPERATING_HOURS_PER_WEEK, index=parts, columns=years)
+parts_demand_CB_hourly = pd.DataFrame(client_weekly[..., 1].T / OPERATING_HOURS_PER_WEEK, index=parts, columns=years)
+buffer_A_units = pd.DataFrame(storage_plan['units'][..., 1].T, index=parts, columns=years)
+buffer_B_units = pd.DataFrame(storage_plan['units'][..., 2].T, index=parts, columns=years)
 
 print("Client-Specific Hourly Demand and Buffer Stock:")
 print(f"{'Part':<6} {'A Hourly':<16} {'A Buffer':<16} {'B Hourly':<16} {'B Buffer':<16}")
 print("-" * 75)
-# for part in parts:
-#     print(
-#         f"{part:<6} "
-#         f"{parts_demand_CA_hourly.loc[part, 'Year 2']:>14,.1f}  "
-#         f"{buffer_A_units.loc[part, 'Year 2']:>14,.1f}  "
-#         f"{parts_demand_CB_hourly.loc[part, 'Year 2']:>14,.1f}  "
-#         f"{buffer_B_units.loc[part, 'Year 2']:>14,.1f}"
-#     )
 
 # ============================================================================
 # Step 2: Total Storage Allocation
@@ -509,29 +510,17 @@ print("-" * 75)
 
 print("\n--- Step 2: Storage Allocation Plan ---\n")
 
-
-# Cycle stock (average inventory between production runs)
-# Assuming weekly production batches
-parts_demand["cycle_stock_units"] = parts_demand["parts_weekly_demand"] / 2.0
-
+# Cycle stock (average inventory between weekly production runs)
 # Factory storage = Safety stock + Cycle stock
-parts_demand["factory_storage_units"] = (
-    parts_demand["safety_stock_99_5"] + parts_demand["cycle_stock_units"]
-)
-
+allocation = task2_df.set_index(["Year", "Part"])
 
 for target_year in years:
     print(f"\nStorage Allocation - {target_year}\n")
     print(f"{'Part':<6} {'Safety Stock':>14}  {'Cycle Stock':>14}  {'Factory Total':>16}  {'Warehouse A':>14}  {'Warehouse B':>14}")
     print("-" * 92)
-    df_y = parts_demand.loc[target_year, ["safety_stock_99_5", "cycle_stock_units", "factory_storage_units"]].reindex(parts)
-    for part in parts:
-        ss = df_y.loc[part, "safety_stock_99_5"]
-        cs = df_y.loc[part, "cycle_stock_units"]
-        ft = df_y.loc[part, "factory_storage_units"]
-        wa = float(buffer_A_units.loc[part, target_year])
-        wb = float(buffer_B_units.loc[part, target_year])
-        print(f"{part:<6} {ss:>14,.2f}  {cs:>14,.2f}  {ft:>16,.2f}  {wa:>14,.2f}  {wb:>14,.2f}")
+    for part, row in allocation.loc[target_year].iterrows():
+        print(f"{part:<6} {row['Safety_Stock_Units']:>14,.2f}  {row['Cycle_Stock_Units']:>14,.2f}  "
+              f"{row['Factory_Storage_Units']:>16,.2f}  {row['Warehouse_A_Units']:>14,.2f}  {row['Warehouse_B_Units']:>14,.2f}")
 
 
 # ============================================================================
@@ -540,122 +529,74 @@ for target_year in years:
 
 print("\n--- Step 3: Physical Storage Space Requirements (by year) ---\n")
 
-# Calculate volumes
-volumes_cuft = pd.Series(
-    {p: (part_dimensions[p]['X'] * part_dimensions[p]['Y'] * part_dimensions[p]['Z']) / (12**3)
-     for p in parts},
-    name="volume_cuft"
-).reindex(parts).astype(float)
-
-WAREHOUSE_HEIGHT = 20.0
-STORAGE_UTILIZATION = 0.70
-DENOM = WAREHOUSE_HEIGHT * STORAGE_UTILIZATION  
-
-
-buffer_A_df = buffer_A_units   # parts x years
-buffer_B_df = buffer_B_units
-
-
-summary_rows = []
-
-for year in years:
-    factory_units  = parts_demand.loc[year, "factory_storage_units"].reindex(parts).fillna(0.0).astype(float)
-    wh_a_units     = buffer_A_df.loc[parts, year].fillna(0.0).astype(float)
-    wh_b_units     = buffer_B_df.loc[parts, year].fillna(0.0).astype(float)
-
-
-    factory_volume_cuft    = (factory_units * volumes_cuft).sum()
-    warehouse_a_volume_cuft = (wh_a_units * volumes_cuft).sum()
-    warehouse_b_volume_cuft = (wh_b_units * volumes_cuft).sum()
-
-
-    factory_floor_sqft     = factory_volume_cuft / DENOM
-    warehouse_a_floor_sqft = warehouse_a_volume_cuft / DENOM
-    warehouse_b_floor_sqft = warehouse_b_volume_cuft / DENOM
-
+WAREHOUSE_COST_PER_SQFT = 200.0
 
+for year, row in storage_summary_by_year.iterrows():
     print(f"Storage Volumes - {year}:")
-    print(f"  Factory:     {factory_volume_cuft:>12,.2f} cubic feet")
-    print(f"  Warehouse A: {warehouse_a_volume_cuft:>12,.2f} cubic feet")
-    print(f"  Warehouse B: {warehouse_b_volume_cuft:>12,.2f} cubic feet")
+    print(f"  Factory:     {row['Factory_Volume_cuft']:>12,.2f} cubic feet")
+    print(f"  Warehouse A: {row['Warehouse_A_Volume_cuft']:>12,.2f} cubic feet")
+    print(f"  Warehouse B: {row['Warehouse_B_Volume_cuft']:>12,.2f} cubic feet")
     print(f"\nFloor Space (20 ft height, 70% utilization) - {year}:")
-    print(f"  Factory:     {factory_floor_sqft:>12,.2f} sq ft")
-    print(f"  Warehouse A: {warehouse_a_floor_sqft:>12,.2f} sq ft")
-    print(f"  Warehouse B: {warehouse_b_floor_sqft:>12,.2f} sq ft\n")
-
-
-    WAREHOUSE_COST_PER_SQFT = 200.0
-    warehouse_a_cost = warehouse_a_floor_sqft * WAREHOUSE_COST_PER_SQFT
-    warehouse_b_cost = warehouse_b_floor_sqft * WAREHOUSE_COST_PER_SQFT
-    total_investment = warehouse_a_cost + warehouse_b_cost
+    print(f"  Factory:     {row['Factory_Floor_sqft']:>12,.2f} sq ft")
+    print(f"  Warehouse A: {row['Warehouse_A_Floor_sqft']:>12,.2f} sq ft")
+    print(f"  Warehouse B: {row['Warehouse_B_Floor_sqft']:>12,.2f} sq ft\n")
 
     print(f"Warehouse Building Costs - {year}:")
-    print(f"  Warehouse A: {warehouse_a_floor_sqft:>10,.2f} sq ft x ${WAREHOUSE_COST_PER_SQFT:.0f}/sq ft = ${warehouse_a_cost:>15,.2f}")
-    print(f"  Warehouse B: {warehouse_b_floor_sqft:>10,.2f} sq ft x ${WAREHOUSE_COST_PER_SQFT:.0f}/sq ft = ${warehouse_b_cost:>15,.2f}")
-    print(f"  Total Investment:                                            ${total_investment:>15,.2f}\n")
-
-    summary_rows.append({
-        "Year": year,
-        "Factory_Volume_cuft": factory_volume_cuft,
-        "Warehouse_A_Volume_cuft": warehouse_a_volume_cuft,
-        "Warehouse_B_Volume_cuft": warehouse_b_volume_cuft,
-        "Factory_Floor_sqft": factory_floor_sqft,
-        "Warehouse_A_Floor_sqft": warehouse_a_floor_sqft,
-        "Warehouse_B_Floor_sqft": warehouse_b_floor_sqft,
-        "Warehouse_A_Cost": warehouse_a_cost,
-        "Warehouse_B_Cost": warehouse_b_cost,
-        "Total_Investment": total_investment,
-    })
-
+    print(f"  Warehouse A: {row['Warehouse_A_Floor_sqft']:>10,.2f} sq ft x ${WAREHOUSE_COST_PER_SQFT:.0f}/sq ft = ${row['Warehouse_A_Cost']:>15,.2f}")
+    print(f"  Warehouse B: {row['Warehouse_B_Floor_sqft']:>10,.2f} sq ft x ${WAREHOUSE_COST_PER_SQFT:.0f}/sq ft = ${row['Warehouse_B_Cost']:>15,.2f}")
+    print(f"  Total Investment:                                            ${row['Total_Investment']:>15,.2f}\n")
 
-storage_summary_by_year = pd.DataFrame(summary_rows).set_index("Year")
-storage_summary_by_year.to_csv("results/Task4_storage_summary_by_year.csv",
-                               encoding="utf-8-sig", float_format="%.2f")
 
+results_store.save(storage_summary_by_year, "results/Task4_storage_summary_by_year.csv",
+                   index=True, encoding="utf-8-sig", float_format="%.2f")
 
 
-
-task2_detail_rows = []
-
-for year in years:
-
-    ss  = parts_demand.loc[year, "safety_stock_99_5"].reindex(parts).astype(float)
-    cs  = parts_demand.loc[year, "cycle_stock_units"].reindex(parts).astype(float)
-    fs  = parts_demand.loc[year, "factory_storage_units"].reindex(parts).astype(float)
+out_dir = Path("results")
+out_dir.mkdir(parents=True, exist_ok=True)
+results_store.save(task2_df, out_dir / "Task4_Storage_Allocation_by_year_and_part.csv",
+                   encoding="utf-8-sig", float_format="%.2f")
 
 
-    wa = buffer_A_units.loc[parts, year].astype(float)
-    wb = buffer_B_units.loc[parts, year].astype(float)
+# ============================================================================
+# Step 4: Storage Location Allocation (factory vs near-client warehouses)
+# ============================================================================
 
+print("\n--- Step 4: Cost-Optimal Storage Location Allocation ---\n")
 
-    part_volumes_cuft = pd.Series(
-        {p: (part_dimensions[p]['X'] * part_dimensions[p]['Y'] * part_dimensions[p]['Z']) / (12**3) for p in parts},
-        index=parts, name="Part_Volume_CuFt"
-    ).astype(float)
+part_specs = {
+    'x_in': np.array([part_dimensions[p]['X'] for p in parts]),
+    'y_in': np.array([part_dimensions[p]['Y'] for p in parts]),
+    'z_in': np.array([part_dimensions[p]['Z'] for p in parts]),
+    'volume_cuft': volumes_cuft,
+    'weight_lbs': np.array([part_dimensions[p]['Weight'] for p in parts]),
+    'price': np.array([part_dimensions[p]['Price'] for p in parts]),
+}
+allocation_result = storage_allocation.allocate_storage(
+    multi_year_demand, part_specs, service_level=SERVICE_LEVEL, lead_time=LEAD_TIME_WEEKS,
+    buffer_hours=(CLIENT_A_BUFFER_HOURS, CLIENT_B_BUFFER_HOURS), operating_hours=OPERATING_HOURS_PER_WEEK,
+    height=WAREHOUSE_HEIGHT, utilization=STORAGE_UTILIZATION,
+)
+allocation_df, allocation_summary = storage_allocation.allocation_tables(allocation_result, list(parts))
 
-    detail_y = pd.DataFrame({
-        "Safety_Stock_Units":   ss,
-        "Cycle_Stock_Units":    cs,
-        "Factory_Storage_Units":fs,
-        "Warehouse_A_Units":    wa,
-        "Warehouse_B_Units":    wb,
-        "Part_Volume_CuFt":     part_volumes_cuft,
-    })
-    detail_y.index.name = "Part"
-    detail_y = detail_y.reset_index()
-    detail_y.insert(0, "Year", year)  
+print(allocation_summary.to_string(float_format=lambda v: f"{v:,.2f}"))
+print(f"\nBuildings: " + ", ".join(f"{loc} {area:,.0f} sq ft" for loc, area, built in
+                                   zip(storage_allocation.LOCATIONS, allocation_result['area_sqft'], allocation_result['built']) if built))
+print(f"5-year storage cost (NPV): ${allocation_result['npv']:,.2f}")
 
-    task2_detail_rows.extend(detail_y.to_dict(orient="records"))
+results_store.save(allocation_df, out_dir / "Task4_Storage_Location_Allocation_by_year_and_part.csv",
+                   encoding="utf-8-sig", float_format="%.2f")
+results_store.save(allocation_summary, out_dir / "Task4_Storage_Location_Allocation_summary.csv",
+                   index=True, encoding="utf-8-sig", float_format="%.2f")
 
 
-task2_df = pd.DataFrame(task2_detail_rows)[
-    ["Year","Part","Safety_Stock_Units","Cycle_Stock_Units","Factory_Storage_Units",
-     "Warehouse_A_Units","Warehouse_B_Units","Part_Volume_CuFt"]
-]
+# ============================================================================
+# Step 5: Rack Slotting of the Near-Client Warehouses
+# ============================================================================
 
+print("\n--- Step 5: Rack Slotting (standard pallet racking) ---\n")
 
-out_dir = Path("results")
-out_dir.mkdir(parents=True, exist_ok=True)
-task2_df.to_csv(out_dir / "Task4_Storage_Allocation_by_year_and_part.csv",
-                index=False, encoding="utf-8-sig", float_format="%.2f")
+slotting_df = slotting.slotting_report(storage_plan, part_specs)
+print(slotting_df.to_string(index=False, float_format=lambda v: f"{v:,.1f}"))
 
+results_store.save(slotting_df, out_dir / "Task4_Warehouse_Slotting_by_year.csv",
+                   encoding="utf-8-sig", float_format="%.2f")
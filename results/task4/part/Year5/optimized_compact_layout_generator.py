@@ -9,10 +9,14 @@ OPTIMIZED: Zero waste grids + compact 2D arrangement
 """
 
 from pathlib import Path
+import sys
 import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
 import csv
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent / "code"))
+from femoasa import layout_render
+
 # Optimal grid configurations - COMPACT (vertical stacking)
 # Year 5: 93 machines total (with 88.2% effective availability)
 AREAS = {
@@ -74,37 +78,13 @@ def draw_area(ax, x0, y0, area_data, process_name):
                          linestyle='--', alpha=0.5)
     ax.add_patch(boundary)
     
-    # Draw blocks
-    block_idx = 0
-    for r in range(rows):
-        for c in range(cols):
-            if block_idx >= count:
-                break
-            
-            if overlap > 0:
-                bx = x0 + c * (unit_w - overlap)
-                by = y0 + r * (unit_h - overlap)
-            else:
-                bx = x0 + c * unit_w
-                by = y0 + r * unit_h
-            
-            block = Rectangle((bx, by), unit_w, unit_h,
-                            facecolor=AREA_COLORS[process_name],
-                            edgecolor='#333', linewidth=0.5, alpha=0.7)
-            ax.add_patch(block)
-            
-            # Overlap zones
-            if overlap > 0:
-                if c < cols - 1:
-                    ov = Rectangle((bx + unit_w - overlap, by), overlap, unit_h,
-                                 facecolor='#ff6b6b', alpha=0.3)
-                    ax.add_patch(ov)
-                if r < rows - 1:
-                    ov = Rectangle((bx, by + unit_h - overlap), unit_w, overlap,
-                                 facecolor='#ff6b6b', alpha=0.3)
-                    ax.add_patch(ov)
-            
-            block_idx += 1
+    # Draw blocks and overlap zones (one collection each)
+    blocks = layout_render.grid_rects(rows, cols, count, unit_w, unit_h, overlap, overlap, x0, y0)
+    ax.add_collection(layout_render.rect_collection(
+        blocks, facecolor=AREA_COLORS[process_name], edgecolor='#333', linewidth=0.5, alpha=0.7))
+    if overlap > 0:
+        zones = layout_render.overlap_rects(rows, cols, count, unit_w, unit_h, overlap, overlap, x0, y0)
+        ax.add_collection(layout_render.rect_collection(zones, facecolor='#ff6b6b', edgecolor='none', alpha=0.3))
     
     # Label - only process name
     ax.text(x0 + area_data["eff_w"]/2, y0 + area_data["eff_h"]/2,
@@ -131,14 +111,10 @@ def generate_layout():
         draw_area(ax, pos["x"], pos["y"], area, process)
     
     # Draw arrows
-    for i in range(len(PROCESS_ORDER) - 1):
-        p1, p2 = PROCESS_ORDER[i], PROCESS_ORDER[i + 1]
-        x1 = positions[p1]["x"] + AREAS[p1]["eff_w"]
-        y1 = positions[p1]["y"] + AREAS[p1]["eff_h"] / 2
-        x2 = positions[p2]["x"]
-        y2 = positions[p2]["y"] + AREAS[p2]["eff_h"] / 2
-        ax.annotate('', xy=(x2, y2), xytext=(x1, y1),
-                   arrowprops=dict(arrowstyle='->', lw=2, color='red', alpha=0.6))
+    starts = [(positions[p]["x"] + AREAS[p]["eff_w"], positions[p]["y"] + AREAS[p]["eff_h"] / 2)
+              for p in PROCESS_ORDER[:-1]]
+    ends = [(positions[p]["x"], positions[p]["y"] + AREAS[p]["eff_h"] / 2) for p in PROCESS_ORDER[1:]]
+    layout_render.add_arrows(ax, starts, ends, linewidths=2, color='red', alpha=0.6, head_length=3)
     
     ax.set_xlim(-10, total_w + 10)
     ax.set_ylim(-10, total_h + 10)